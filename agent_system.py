@@ -9,6 +9,8 @@ import yfinance as yf
 import pandas as pd
 from greeks_calculator import compute_and_process_greeks
 from trading_setups import TradingSetupAnalyzer, SetupType
+from strike_exposures import strike_exposure_table
+from rate_limiter import call_upstream
 
 # Lock global para sincronizar o acesso à API do MT5
 mt5_lock = threading.Lock()
@@ -92,7 +94,7 @@ class AgentSystem(threading.Thread):
         
         try:
             stock = yf.Ticker(self.options_symbol)
-            self.nearest_expiry = stock.options[0]
+            self.nearest_expiry = call_upstream('yahoo', lambda: stock.options)[0]
             print(f"[{self.name}] Using nearest expiry for options analysis: {self.nearest_expiry}")
         except Exception as e:
             print(f"[{self.name}] Could not fetch options expirations: {e}")
@@ -140,7 +142,8 @@ class AgentSystem(threading.Thread):
         self._update_vwap_data(S)
 
         # Analyze all 6 setups using the new system
-        setups_results = self.setup_analyzer.analyze_all_setups(calls, puts, S, self.vwap_data)
+        setups_results = self.setup_analyzer.analyze_all_setups(
+            calls, puts, S, self.vwap_data, exposures=strike_exposure_table(calls, puts))
         self.current_setups = setups_results
 
         # Convert to legacy format for compatibility while transitioning
@@ -405,9 +408,9 @@ class AgentSystem(threading.Thread):
         if not expiry_date_str: return None, None, None, None
         try:
             stock = yf.Ticker(ticker)
-            S = stock.history(period="1d")['Close'].iloc[-1]
+            S = call_upstream('yahoo', stock.history, period="1d")['Close'].iloc[-1]
             if S == 0: return None, None, None, None
-            chain = stock.option_chain(expiry_date_str)
+            chain = call_upstream('yahoo', stock.option_chain, expiry_date_str)
             calls, puts = chain.calls, chain.puts
             if calls.empty or puts.empty: return None, None, None, None
             t = (datetime.strptime(expiry_date_str, "%Y-%m-%d").date() - datetime.today().date()).days / 365.0
@@ -422,7 +425,7 @@ class AgentSystem(threading.Thread):
         with mt5_lock:
             current_price_us100 = mt5.symbol_info_tick(self.symbol).ask
         try:
-            current_price_qqq = yf.Ticker(self.options_symbol).history(period="1d")['Close'].iloc[-1]
+            current_price_qqq = call_upstream('yahoo', yf.Ticker(self.options_symbol).history, period="1d")['Close'].iloc[-1]
             if current_price_qqq == 0: return None
             price_ratio = current_price_us100 / current_price_qqq
             return target_price * price_ratio
@@ -0,0 +1,743 @@
+# app_charts.py
+# Gráficos montados pelo app a partir do estado de sessão (cores, tipo de gráfico, faixa de
+# strikes): barras de exposição com cache, max pain, DAVI e mapas de calor de prêmio.
+# Importado só pelas páginas que desenham esses gráficos.
+from datetime import datetime
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from app_core import calculate_max_pain
+from chain_fetcher import writable_copy
+from chart_utils import add_current_price_line, calculate_strike_range, create_exposure_bar_chart
+from figure_cache import get_figure_cache
+from greeks_cache import chain_fingerprint, spot_bucket
+from greeks_calculator import calculate_greeks
+from strike_exposures import aggregate_by_strike, strike_exposure_table, strike_window
+
+
+def create_option_premium_heatmap(calls_df, puts_df, strikes, expiry_dates, current_price):
+    """Create a heatmap showing premium distribution across strikes and expiries"""
+    # Initialize data matrices
+    call_premium = np.zeros((len(expiry_dates), len(strikes)))
+    put_premium = np.zeros((len(expiry_dates), len(strikes)))
+    
+    # Map strikes and expiry dates to indices
+    strike_to_idx = {strike: i for i, strike in enumerate(strikes)}
+    expiry_to_idx = {expiry: i for i, expiry in enumerate(expiry_dates)}
+    
+    # Fill matrices with premium data (volume * price); missing volume leaves a NaN gap
+    calls_df = calls_df.assign(premium=calls_df['volume'].astype(float) * calls_df['lastPrice'] * 100)
+    puts_df = puts_df.assign(premium=puts_df['volume'].astype(float) * puts_df['lastPrice'] * 100)
+    for _, row in calls_df.iterrows():
+        if row['strike'] in strike_to_idx and row['expiry_date'] in expiry_to_idx:
+            i = expiry_to_idx[row['expiry_date']]
+            j = strike_to_idx[row['strike']]
+            call_premium[i, j] = row['premium']
+    
+    for _, row in puts_df.iterrows():
+        if row['strike'] in strike_to_idx and row['expiry_date'] in expiry_to_idx:
+            i = expiry_to_idx[row['expiry_date']]
+            j = strike_to_idx[row['strike']]
+            put_premium[i, j] = row['premium']
+    
+    # Create heatmaps
+    fig_calls = go.Figure(data=go.Heatmap(
+        z=call_premium,
+        x=strikes,
+        y=expiry_dates,
+        colorscale=[[0, 'rgba(0,0,0,0)'], [0.01, 'rgba(0,255,0,0.1)'], [1, st.session_state.call_color]],
+        hoverongaps=False,
+        name="Call Premium",
+        showscale=True,
+        colorbar=dict(
+            title="Premium ($)",
+            titleside="top",
+            tickformat="$,.0f"
+        )
+    ))
+    
+    # Add current price line
+    fig_calls.add_vline(
+        x=current_price,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7
+    )
+    
+    fig_calls.update_layout(
+        title=dict(
+            text="Call Premium Heatmap",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Strike Price',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Expiration Date',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        template="plotly_dark",
+        yaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        xaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        )
+    )
+    
+    fig_puts = go.Figure(data=go.Heatmap(
+        z=put_premium,
+        x=strikes,
+        y=expiry_dates,
+        colorscale=[[0, 'rgba(0,0,0,0)'], [0.01, 'rgba(255,0,0,0.1)'], [1, st.session_state.put_color]],
+        hoverongaps=False,
+        name="Put Premium",
+        showscale=True,
+        colorbar=dict(
+            title="Premium ($)",
+            titleside="top",
+            tickformat="$,.0f"
+        )
+    ))
+    
+    # Add current price line
+    fig_puts.add_vline(
+        x=current_price,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7
+    )
+    
+    fig_puts.update_layout(
+        title=dict(
+            text="Put Premium Heatmap",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Strike Price',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Expiration Date',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        template="plotly_dark",
+        yaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        xaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        )
+    )
+    
+    return fig_calls, fig_puts
+
+def create_premium_heatmap(calls_df, puts_df, filtered_strikes, selected_expiry_dates, current_price):
+    """Create heatmaps showing premium distribution across strikes and expiration dates."""
+    # Initialize data matrices
+    call_premium = np.zeros((len(selected_expiry_dates), len(filtered_strikes)))
+    put_premium = np.zeros((len(selected_expiry_dates), len(filtered_strikes)))
+    
+    # Map strikes and expiry dates to indices
+    strike_to_idx = {strike: i for i, strike in enumerate(filtered_strikes)}
+    expiry_to_idx = {expiry: i for i, expiry in enumerate(selected_expiry_dates)}
+    
+    # Fill matrices with premium data (volume * price); missing volume leaves a NaN gap
+    calls_df = calls_df.assign(premium=calls_df['volume'].astype(float) * calls_df['lastPrice'] * 100)
+    puts_df = puts_df.assign(premium=puts_df['volume'].astype(float) * puts_df['lastPrice'] * 100)
+    for _, row in calls_df.iterrows():
+        if row['strike'] in filtered_strikes and row['extracted_expiry'].strftime('%Y-%m-%d') in expiry_to_idx:
+            strike_idx = strike_to_idx[row['strike']]
+            expiry_idx = expiry_to_idx[row['extracted_expiry'].strftime('%Y-%m-%d')]
+            call_premium[expiry_idx][strike_idx] += row['premium']
+    
+    for _, row in puts_df.iterrows():
+        if row['strike'] in filtered_strikes and row['extracted_expiry'].strftime('%Y-%m-%d') in expiry_to_idx:
+            strike_idx = strike_to_idx[row['strike']]
+            expiry_idx = expiry_to_idx[row['extracted_expiry'].strftime('%Y-%m-%d')]
+            put_premium[expiry_idx][strike_idx] += row['premium']
+    
+    # Create heatmaps
+    fig_calls = go.Figure(data=go.Heatmap(
+        z=call_premium,
+        x=filtered_strikes,
+        y=selected_expiry_dates,
+        colorscale=[[0, 'rgba(0,0,0,0)'], [0.01, 'rgba(0,255,0,0.1)'], [1, st.session_state.call_color]],
+        hoverongaps=False,
+        name="Call Premium",
+        showscale=True,
+        colorbar=dict(
+            title="Premium ($)",
+            tickformat="$,.0f"
+        )
+    ))
+    
+    # Add current price line
+    fig_calls.add_vline(
+        x=current_price,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7
+    )
+    
+    fig_calls.update_layout(
+        title=dict(
+            text="Call Premium Heatmap",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Strike Price',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Expiration Date',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        template="plotly_dark",
+        yaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        xaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        )
+    )
+    
+    fig_puts = go.Figure(data=go.Heatmap(
+        z=put_premium,
+        x=filtered_strikes,
+        y=selected_expiry_dates,
+        colorscale=[[0, 'rgba(0,0,0,0)'], [0.01, 'rgba(255,0,0,0.1)'], [1, st.session_state.put_color]],
+        hoverongaps=False,
+        name="Put Premium",
+        showscale=True,
+        colorbar=dict(
+            title="Premium ($)",
+            tickformat="$,.0f"
+        )
+    ))
+    
+    # Add current price line
+    fig_puts.add_vline(
+        x=current_price,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7
+    )
+    
+    fig_puts.update_layout(
+        title=dict(
+            text="Put Premium Heatmap",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Strike Price',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Expiration Date',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        template="plotly_dark",
+        yaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        xaxis=dict(
+            tickfont=dict(size=st.session_state.chart_text_size)
+        )
+    )
+    
+    return fig_calls, fig_puts
+
+# Chart settings from the sidebar that change how an exposure bar chart looks
+EXPOSURE_CHART_SETTINGS = ['call_color', 'put_color', 'gex_type', 'show_calls', 'show_puts', 'show_net',
+                           'chart_type', 'chart_text_size']
+
+def exposure_bar_chart(calls, puts, exposure_type, title, S):
+    """
+    create_exposure_bar_chart with the sidebar chart settings, memoized on a fingerprint of the
+    plotted columns, the spot bucket and the settings, so unchanged charts are not rebuilt on every
+    rerun. The cache holds the figure dict; each call gets its own figure, with the price line at S.
+    """
+    settings = {name: st.session_state[name] for name in EXPOSURE_CHART_SETTINGS}
+    settings['strike_range_percentage'] = st.session_state.strike_range
+    figure_cache = get_figure_cache()
+    # The strike window follows the bucketed spot, so every tick inside a bucket is a hit
+    S_bucket = spot_bucket(S, figure_cache.spot_tick)
+    columns = ['strike', exposure_type]
+    cache_key = (
+        exposure_type, title, S_bucket,
+        chain_fingerprint(calls, columns), chain_fingerprint(puts, columns),
+        tuple(sorted(settings.items())),
+    )
+    fig = figure_cache.get_or_build(
+        cache_key,
+        lambda: create_exposure_bar_chart(calls, puts, exposure_type, title, S_bucket,
+                                          exposures=strike_exposure_table(calls, puts),
+                                          price_line=False, **settings)
+    )
+    return add_current_price_line(fig, S, settings['chart_type'], settings['chart_text_size'])
+
+def create_max_pain_chart(calls, puts, S):
+    """Create a chart showing max pain analysis with separate call and put pain."""
+    result = calculate_max_pain(calls, puts)
+    if result is None:
+        return None
+    
+    (max_pain_strike, call_max_pain_strike, put_max_pain_strike,
+     total_pain_by_strike, call_pain_by_strike, put_pain_by_strike) = result
+
+    # Get colors from session state
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+
+    # Calculate strike range around current price (percentage-based)
+    strike_range = calculate_strike_range(S, st.session_state.strike_range)
+    min_strike = S - strike_range
+    max_strike = S + strike_range
+    padding = strike_range * 0.1
+    
+    fig = go.Figure()
+
+    # Add total pain line (always vertical for max pain chart)
+    # Use a neutral color that works well with both call and put colors
+    total_pain_color = '#FFD700'  # Gold color for total pain
+    
+    if st.session_state.chart_type in ['Bar', 'Horizontal Bar']:
+        fig.add_trace(go.Bar(
+            x=list(total_pain_by_strike.keys()),
+            y=list(total_pain_by_strike.values()),
+            name='Total Pain',
+            marker_color=total_pain_color
+        ))
+    elif st.session_state.chart_type == 'Line':
+        fig.add_trace(go.Scatter(
+            x=list(total_pain_by_strike.keys()),
+            y=list(total_pain_by_strike.values()),
+            mode='lines',
+            name='Total Pain',
+            line=dict(color=total_pain_color, width=2)
+        ))
+    elif st.session_state.chart_type == 'Scatter':
+        fig.add_trace(go.Scatter(
+            x=list(total_pain_by_strike.keys()),
+            y=list(total_pain_by_strike.values()),
+            mode='markers',
+            name='Total Pain',
+            marker=dict(color=total_pain_color)
+        ))
+    else:  # Area
+        fig.add_trace(go.Scatter(
+            x=list(total_pain_by_strike.keys()),
+            y=list(total_pain_by_strike.values()),
+            fill='tozeroy',
+            name='Total Pain',
+            line=dict(color=total_pain_color, width=0.5),
+            fillcolor='rgba(255, 215, 0, 0.3)'  # Semi-transparent gold
+        ))
+
+    # Add call pain line
+    if st.session_state.show_calls:
+        fig.add_trace(go.Scatter(
+            x=list(call_pain_by_strike.keys()),
+            y=list(call_pain_by_strike.values()),
+            name='Call Pain',
+            line=dict(color=call_color, width=1, dash='dot')
+        ))
+
+    # Add put pain line
+    if st.session_state.show_puts:
+        fig.add_trace(go.Scatter(
+            x=list(put_pain_by_strike.keys()),
+            y=list(put_pain_by_strike.values()),
+            name='Put Pain',
+            line=dict(color=put_color, width=1, dash='dot')
+        ))
+
+    # Calculate y-axis range with improved padding
+    y_values = []
+    for trace in fig.data:
+        if hasattr(trace, 'y') and trace.y is not None:
+            y_values.extend([y for y in trace.y if y is not None and not np.isnan(y)])
+    
+    if y_values:
+        y_min = min(y_values)
+        y_max = max(y_values)
+        y_range = y_max - y_min
+        
+        # Add 15% padding on top and 5% on bottom (unless y_min is 0)
+        padding_top = y_range * 0.15
+        padding_bottom = y_range * 0.05 if y_min > 0 else 0
+        y_min = y_min - padding_bottom
+        y_max = y_max + padding_top
+    else:
+        # Default values if no valid y values
+        y_min = 0
+        y_max = 100
+
+    # Add vertical lines for different max pain points
+    fig.add_vline(
+        x=max_pain_strike,
+        line_dash="dash",
+        line_color=total_pain_color,
+        opacity=0.7,
+        annotation_text=f"Total Max Pain: {max_pain_strike}",
+        annotation_position="top"
+    )
+
+    if st.session_state.show_calls:
+        fig.add_vline(
+            x=call_max_pain_strike,
+            line_dash="dash",
+            line_color=call_color,
+            opacity=0.7,
+            annotation_text=f"Call Max Pain: {call_max_pain_strike}",
+            annotation_position="top"
+        )
+
+    if st.session_state.show_puts:
+        fig.add_vline(
+            x=put_max_pain_strike,
+            line_dash="dash",
+            line_color=put_color,
+            opacity=0.7,
+            annotation_text=f"Put Max Pain: {put_max_pain_strike}",
+            annotation_position="top"
+        )
+
+    # Add current price line
+    fig.add_vline(
+        x=S,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7,
+        annotation_text=f"{S}",
+        annotation_position="bottom"
+    )
+
+    fig.update_layout(
+        title=dict(
+            text='Max Pain',
+            font=dict(size=st.session_state.chart_text_size + 8)  # Title slightly larger
+        ),
+        xaxis_title=dict(
+            text='Strike Price',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Total Pain',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        hovermode='x unified',
+        xaxis=dict(
+            autorange=True,
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis=dict(
+            autorange=True,
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        height=600  # Increased height for better visibility
+    )
+    
+    # Remove range slider for max pain chart as requested
+    fig.update_xaxes(rangeslider=dict(visible=False))
+    
+    return fig
+
+def create_davi_chart(calls, puts, S):
+    """Create Delta-Adjusted Value Index chart that matches other exposure charts style"""
+    # Get colors from session state
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+
+    # Copies the new columns can go into without touching the cached chain
+    calls_df = writable_copy(calls)
+    puts_df = writable_copy(puts)
+    
+    # Check if calc_delta column exists, if not, calculate delta
+    if 'calc_delta' not in calls_df.columns:
+        # Get current date and calculate time to expiration
+        today = datetime.today().date()
+        
+        # Extract expiry date - use the first one if multiple
+        if 'extracted_expiry' in calls_df.columns and not calls_df['extracted_expiry'].empty:
+            selected_expiry = calls_df['extracted_expiry'].iloc[0]
+            t_days = max((selected_expiry - today).days, 1)  # Ensure at least 1 day
+            t = t_days / 365.0
+            
+            # Define function to compute delta
+            def compute_delta(row, flag):
+                sigma = row.get("impliedVolatility", None)
+                if sigma is None or sigma <= 0:
+                    return 0.5  # Default delta if IV is missing or invalid
+                try:
+                    delta_val, _, _ = calculate_greeks(flag, S, row["strike"], t, sigma, st.session_state.risk_free_rate)
+                    return delta_val
+                except Exception:
+                    return 0.5  # Default delta if calculation fails
+            
+            # Calculate delta for calls and puts
+            calls_df["calc_delta"] = calls_df.apply(lambda row: compute_delta(row, "c"), axis=1)
+            puts_df["calc_delta"] = puts_df.apply(lambda row: compute_delta(row, "p"), axis=1)
+        else:
+            # If no expiry information, use approximate delta based on strike
+            calls_df["calc_delta"] = calls_df.apply(lambda row: max(0, min(1, 1 - (row["strike"] - S) / (S * 0.1))), axis=1)
+            puts_df["calc_delta"] = puts_df.apply(lambda row: max(0, min(1, (row["strike"] - S) / (S * 0.1))), axis=1)
+    
+    # Calculate DAVI for calls and puts
+    calls_df['DAVI'] = (calls_df['volume'] + calls_df['openInterest']) * calls_df['lastPrice'] * calls_df['calc_delta']
+    puts_df['DAVI'] = (puts_df['volume'] + puts_df['openInterest']) * puts_df['lastPrice'] * puts_df['calc_delta']
+
+    # Per-strike call/put/net DAVI, sliced to the strike range around current price (percentage-based)
+    strike_range = calculate_strike_range(S, st.session_state.strike_range)
+    davi = strike_window(aggregate_by_strike(calls_df, puts_df, ['DAVI']), S - strike_range, S + strike_range)
+
+    # Only keep non-zero values
+    calls_df = davi[('DAVI', 'call')].dropna()
+    calls_df = calls_df[calls_df != 0].rename('DAVI').rename_axis('strike').reset_index()
+    puts_df = davi[('DAVI', 'put')].dropna()
+    puts_df = puts_df[puts_df != 0].rename('DAVI').rename_axis('strike').reset_index()
+
+    # Net DAVI
+    net_davi = davi[('DAVI', 'net')]
+
+    # Calculate totals for title
+    total_call_davi = calls_df['DAVI'].sum()
+    total_put_davi = puts_df['DAVI'].sum()
+
+    # Create title with totals
+    title_with_totals = (
+        f"Delta-Adjusted Value Index by Strike     "
+        f"<span style='color: {call_color}'>{total_call_davi:,.0f}</span> | "
+        f"<span style='color: {put_color}'>{total_put_davi:,.0f}</span>"
+    )
+
+    fig = go.Figure()
+
+    # Add calls if enabled
+    if st.session_state.show_calls:
+        if st.session_state.chart_type == 'Bar':
+            fig.add_trace(go.Bar(
+                x=calls_df['strike'],
+                y=calls_df['DAVI'],
+                name='Call',
+                marker_color=call_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig.add_trace(go.Bar(
+                y=calls_df['strike'],
+                x=calls_df['DAVI'],
+                name='Call',
+                marker_color=call_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig.add_trace(go.Scatter(
+                x=calls_df['strike'],
+                y=calls_df['DAVI'],
+                mode='markers',
+                name='Call',
+                marker=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig.add_trace(go.Scatter(
+                x=calls_df['strike'],
+                y=calls_df['DAVI'],
+                mode='lines',
+                name='Call',
+                line=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig.add_trace(go.Scatter(
+                x=calls_df['strike'],
+                y=calls_df['DAVI'],
+                fill='tozeroy',
+                name='Call',
+                line=dict(color=call_color, width=0.5),
+                fillcolor=call_color
+            ))
+
+    # Add puts if enabled
+    if st.session_state.show_puts:
+        if st.session_state.chart_type == 'Bar':
+            fig.add_trace(go.Bar(
+                x=puts_df['strike'],
+                y=puts_df['DAVI'],
+                name='Put',
+                marker_color=put_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig.add_trace(go.Bar(
+                y=puts_df['strike'],
+                x=puts_df['DAVI'],
+                name='Put',
+                marker_color=put_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig.add_trace(go.Scatter(
+                x=puts_df['strike'],
+                y=puts_df['DAVI'],
+                mode='markers',
+                name='Put',
+                marker=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig.add_trace(go.Scatter(
+                x=puts_df['strike'],
+                y=puts_df['DAVI'],
+                mode='lines',
+                name='Put',
+                line=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig.add_trace(go.Scatter(
+                x=puts_df['strike'],
+                y=puts_df['DAVI'],
+                fill='tozeroy',
+                name='Put',
+                line=dict(color=put_color, width=0.5),
+                fillcolor=put_color
+            ))
+
+    # Add Net if enabled
+    if st.session_state.show_net and not net_davi.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig.add_trace(go.Bar(
+                x=net_davi.index,
+                y=net_davi.values,
+                name='Net',
+                marker_color=[call_color if val >= 0 else put_color for val in net_davi.values]
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig.add_trace(go.Bar(
+                y=net_davi.index,
+                x=net_davi.values,
+                name='Net',
+                marker_color=[call_color if val >= 0 else put_color for val in net_davi.values],
+                orientation='h'
+            ))
+        elif st.session_state.chart_type in ['Scatter', 'Line']:
+            positive_mask = net_davi.values >= 0
+            if any(positive_mask):
+                fig.add_trace(go.Scatter(
+                    x=net_davi.index[positive_mask],
+                    y=net_davi.values[positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net (Positive)',
+                    marker=dict(color=call_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=call_color) if st.session_state.chart_type == 'Line' else None
+                ))
+            if any(~positive_mask):
+                fig.add_trace(go.Scatter(
+                    x=net_davi.index[~positive_mask],
+                    y=net_davi.values[~positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net (Negative)',
+                    marker=dict(color=put_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=put_color) if st.session_state.chart_type == 'Line' else None
+                ))
+        elif st.session_state.chart_type == 'Area':
+            positive_mask = net_davi.values >= 0
+            if any(positive_mask):
+                fig.add_trace(go.Scatter(
+                    x=net_davi.index[positive_mask],
+                    y=net_davi.values[positive_mask],
+                    fill='tozeroy',
+                    name='Net (Positive)',
+                    line=dict(color=call_color, width=0.5),
+                    fillcolor=call_color
+                ))
+            if any(~positive_mask):
+                fig.add_trace(go.Scatter(
+                    x=net_davi.index[~positive_mask],
+                    y=net_davi.values[~positive_mask],
+                    fill='tozeroy',
+                    name='Net (Negative)',
+                    line=dict(color=put_color, width=0.5),
+                    fillcolor=put_color
+                ))
+
+    # Add current price line
+    fig = add_current_price_line(fig, S, st.session_state.chart_type, st.session_state.chart_text_size)
+
+    # Update layout
+    padding = strike_range * 0.1
+    if st.session_state.chart_type == 'Horizontal Bar':
+        fig.update_layout(
+            title=dict(
+                text=title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='DAVI',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            barmode='relative',
+            hovermode='y unified',
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            height=600  # Increased height for better visibility
+        )
+    else:
+        fig.update_layout(
+            title=dict(
+                text=title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='DAVI',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            barmode='relative',
+            hovermode='x unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            height=600  # Increased height for better visibility
+        )
+
+    return fig
@@ -0,0 +1,626 @@
+# app_core.py
+# Helpers compartilhados pelo ezoptions.py e pelas páginas de app_pages/: formatação de
+# ticker, leitura das cadeias/preços/barras com cache, cálculo de greeks e estado de sessão.
+# Não importa plotly: os gráficos ficam em app_charts.py e só carregam com as páginas.
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+import streamlit as st
+
+from chain_fetcher import concat_chains, extract_expiry_from_contracts, fetch_chains_concurrently
+from data_provider import get_data_provider
+from greeks_cache import get_greeks_cache
+from greeks_calculator import (apply_mid_implied_volatility, compute_and_process_greeks,
+                               compute_and_process_greeks_multi)
+from intraday_store import get_intraday_bar_store
+from max_pain_engine import max_pain
+from quote_service import get_quote_service
+from scoped_cache import get_scoped_cache, scoped_cache
+from snapshot_store import get_snapshot_store, snapshot_ttl
+from ticker_registry import get_ticker_registry
+
+
+def format_ticker(ticker):
+    """Helper function to format tickers for indices"""
+    ticker = ticker.upper()
+    if ticker == "SPX":
+        return "^SPX"
+    elif ticker == "NDX":
+        return "^NDX"
+    elif ticker == "VIX":
+        return "^VIX"
+    elif ticker == "DJI":
+        return "^DJI"
+    elif ticker == "RUT":
+        return "^RUT"
+    return ticker
+
+def check_market_status():
+    """Check if we're in pre-market, market hours, or post-market"""
+    # Get current time in PST for market checks
+    pacific = datetime.now(tz=pytz.timezone('US/Pacific'))
+    
+    # Get local time and timezone
+    local = datetime.now()
+    local_tz = datetime.now().astimezone().tzinfo
+    
+    market_message = None
+    
+    if pacific.hour >= 21 or pacific.hour < 7:
+        next_update = pacific.replace(hour=7, minute=0) if pacific.hour < 7 else \
+                     (pacific + timedelta(days=1)).replace(hour=7, minute=00)
+        time_until = next_update - pacific
+        hours, remainder = divmod(time_until.seconds, 3600)
+        minutes, _ = divmod(remainder, 60)
+        
+        # Convert PST update time to local time
+        local_next_update = next_update.astimezone(local_tz)
+        
+        market_message = f"""
+        ⚠️ **WAIT FOR NEW DATA**
+        - Current time: {local.strftime('%I:%M %p')} {local_tz}
+        - New data will be available at approximately {local_next_update.strftime('%I:%M %p')}
+        - Time until new data: {hours}h {minutes}m
+        """
+    return market_message
+
+def get_cache_ttl():
+    """Get the cache TTL from session state refresh rate, with a minimum of 10 seconds"""
+    return max(float(st.session_state.get('refresh_rate', 10)), 10)
+
+# Refresh TTL of the latest script run. Cached fetchers run on worker threads, which can't read
+# session state, so ezoptions.py publishes it once per run through set_refresh_ttl()
+_refresh_ttl = 10.0
+
+def set_refresh_ttl(seconds):
+    """Publish this run's refresh TTL to the cached fetchers; quotes are reused until the tick ends"""
+    global _refresh_ttl
+    _refresh_ttl = float(seconds)
+    get_quote_service().tick_seconds = _refresh_ttl
+
+def refresh_ttl():
+    """Refresh TTL of the latest run (safe to call from worker threads)"""
+    return _refresh_ttl
+
+def live_region(render):
+    """
+    Render a data-bound chart region. In 'Charts only' auto-refresh mode it runs as a Streamlit
+    fragment that re-executes by itself every refresh interval, without rerunning the sidebar,
+    inputs or the rest of the page.
+    """
+    if st.session_state.get('auto_refresh_mode', 'Charts only') != 'Charts only':
+        render()
+        return
+    # The end-of-script refresh then leaves this run to the fragments
+    st.session_state.live_regions_rendered = True
+    st.fragment(render, run_every=get_cache_ttl())()
+
+def invalidate_ticker_data(ticker):
+    """Drop cached chains, prices, intraday bars and expirations for one ticker; other tickers stay cached"""
+    get_scoped_cache().invalidate(ticker=ticker)
+    get_snapshot_store().invalidate(ticker)
+    get_ticker_registry().invalidate(ticker)
+    get_intraday_bar_store().invalidate(ticker.replace('%5E', '^'))
+
+def read_through_provider(dataset, ticker, key, fetch, should_store=None):
+    """Read through the on-disk snapshot store for live providers; record/replay providers are called directly"""
+    if not get_data_provider().use_snapshot_store:
+        return fetch()
+    return get_snapshot_store().read_through(
+        dataset, ticker, key, snapshot_ttl(refresh_ttl()), fetch, should_store=should_store
+    )
+
+def get_expirations(ticker):
+    """Expiration dates for ticker from the configured data provider"""
+    return get_data_provider().expirations(ticker)
+
+@scoped_cache('chain', ttl=refresh_ttl, ignore=('S',))  # Cache TTL matches refresh rate; S is unused
+def fetch_options_for_date(ticker, date, S=None):
+    """Fetch options data for a specific date with caching, reading through the on-disk snapshot store"""
+    return read_through_provider(
+        'chain', ticker, date,
+        lambda: download_options_for_date(ticker, date),
+        should_store=lambda chain: not chain[0].empty or not chain[1].empty
+    )
+
+def download_options_for_date(ticker, date):
+    """Download the option chain for a specific date from the data provider.
+
+    May run in a chain_fetcher worker thread, where st.* calls are dropped, so errors are
+    only logged here; callers report empty or failed expiries on the script thread.
+    """
+    print(f"Fetching option chain for {ticker} EXP {date}")
+    try:
+        return get_data_provider().option_chain(ticker, date)
+    except Exception as e:
+        print(f"Error fetching options data for {ticker} EXP {date}: {e}")
+        return pd.DataFrame(), pd.DataFrame()
+
+def warn_failed_expiries(ticker, failed):
+    """Report expiries whose chain failed or came back empty (script thread only)"""
+    if failed:
+        st.warning(f"Could not fetch options data for {ticker} expiries: {', '.join(failed)}")
+
+def clear_page_state():
+    """Clear all page-specific content and containers"""
+    for key in list(st.session_state.keys()):
+        if key.startswith(('container_', 'chart_', 'table_', 'page_')):
+            del st.session_state[key]
+    
+    if 'current_page_container' in st.session_state:
+        del st.session_state['current_page_container']
+    
+    st.empty()
+
+def extract_expiry_from_contract(contract_symbol):
+    """
+    Extracts the expiration date from an option contract symbol.
+    Handles both 6-digit (YYMMDD) and 8-digit (YYYYMMDD) date formats.
+    Use extract_expiry_from_contracts for whole chains.
+    """
+    return extract_expiry_from_contracts([contract_symbol]).iloc[0]
+
+
+# -------------------------------
+# Fetch all options experations and add extract expiry
+# -------------------------------
+def fetch_all_options(ticker):
+    """
+    Fetches option chains for all available expirations for the given ticker.
+    Returns two DataFrames: one for calls and one for puts, with an added column 'extracted_expiry'.
+    Chains are fetched concurrently through the cached fetch_options_for_date.
+    """
+    print(f"Fetching avaiable expirations for {ticker}")  # Add print statement
+    # Only process options that haven't expired
+    current_market_date = datetime.now().date()
+    valid_dates = [
+        exp for exp in get_expirations(ticker)
+        if datetime.strptime(exp, '%Y-%m-%d').date() >= current_market_date
+    ]
+    
+    chains, failed = fetch_chains_concurrently(fetch_options_for_date, ticker, valid_dates)
+    warn_failed_expiries(ticker, failed)
+    return concat_chains(chains)
+
+# Charts and price fetching
+@scoped_cache('price', ttl=refresh_ttl)  # Cache TTL matches refresh rate
+def get_current_price(ticker):
+    """Get current price with fallback logic, reading through the on-disk snapshot store"""
+    return read_through_provider('price', ticker, 'last', lambda: download_current_price(ticker))
+
+def download_current_price(ticker):
+    """Download the current price from the data provider (live: fast_info first, SPX via ^GSPC)"""
+    print(f"Fetching current price for {ticker}")
+    return get_data_provider().current_price(ticker)
+
+# Greek Calculations
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def get_risk_free_rate():
+    """Fetch the current risk-free rate from the 3-month Treasury Bill yield with caching."""
+    try:
+        # 3-month Treasury Bill yield as a decimal (e.g., 5.2% -> 0.052) from the data provider
+        risk_free_rate = get_data_provider().risk_free_rate()
+        
+        if risk_free_rate is None:
+            # Fallback to a default value if price fetch fails
+            risk_free_rate = 0.02  # 2% as fallback
+            print("Using fallback risk-free rate of 2%")
+            
+        return risk_free_rate
+    except Exception as e:
+        print(f"Error fetching risk-free rate: {e}")
+        return 0.02  # 2% as fallback
+
+
+def find_delta_strikes(calls_df, puts_df, target_delta=0.5):
+    """Find strikes closest to the target delta (for delta-based analysis)."""
+    try:
+        # For calls, find strike closest to target delta
+        if 'calc_delta' in calls_df.columns:
+            call_deltas = calls_df[calls_df['calc_delta'].notna()]
+            if not call_deltas.empty:
+                call_target = call_deltas.iloc[(call_deltas['calc_delta'] - target_delta).abs().argsort()[:1]]
+                call_strike = call_target['strike'].iloc[0] if not call_target.empty else None
+                call_delta = call_target['calc_delta'].iloc[0] if not call_target.empty else None
+            else:
+                call_strike, call_delta = None, None
+        else:
+            call_strike, call_delta = None, None
+        
+        # For puts, find strike closest to -target_delta (puts have negative delta)
+        if 'calc_delta' in puts_df.columns:
+            put_deltas = puts_df[puts_df['calc_delta'].notna()]
+            if not put_deltas.empty:
+                put_target = put_deltas.iloc[(put_deltas['calc_delta'] - (-target_delta)).abs().argsort()[:1]]
+                put_strike = put_target['strike'].iloc[0] if not put_target.empty else None
+                put_delta = put_target['calc_delta'].iloc[0] if not put_target.empty else None
+            else:
+                put_strike, put_delta = None, None
+        else:
+            put_strike, put_delta = None, None
+        
+        return {
+            'call_strike': call_strike,
+            'call_delta': call_delta,
+            'put_strike': put_strike,
+            'put_delta': put_delta,
+            'call_prob_itm': call_delta if call_delta else None,
+            'put_prob_itm': abs(put_delta) if put_delta else None
+        }
+    except Exception as e:
+        print(f"Error finding delta strikes: {e}")
+        return None
+
+# Add error handling for fetching the last price to avoid KeyError.
+def get_last_price(stock):
+    """Helper function to get the last price of the stock."""
+    return get_current_price(stock.ticker)
+
+def is_valid_trading_day(expiry_date, current_date):
+    """Helper function to check if expiry is within valid trading window"""
+    days_difference = (expiry_date - current_date).days
+    return days_difference >= -1
+
+def fetch_and_process_multiple_dates(ticker, expiry_dates, process_func=None, S=None):
+    """
+    Fetches and processes data for multiple expiration dates.
+    
+    Args:
+        ticker: Stock ticker symbol
+        expiry_dates: List of expiration dates
+        process_func: Optional function (ticker, date, calls, puts) -> (calls, puts) applied to each chain
+        S: Current price, passed through to fetch_options_for_date
+        
+    Returns:
+        Tuple of processed calls and puts DataFrames
+    """
+    all_calls = []
+    all_puts = []
+    
+    # Only the raw chains are fetched concurrently; process_func (which may use st.* and
+    # session_state) runs here, on the script thread, in expiry order
+    chains, failed = fetch_chains_concurrently(fetch_options_for_date, ticker, expiry_dates, S)
+    warn_failed_expiries(ticker, failed)
+    for date, calls, puts in chains:
+        if process_func is not None:
+            result = process_func(ticker, date, calls, puts)
+            if result is None:
+                continue
+            calls, puts = result
+        if not calls.empty:
+            calls = calls.assign(expiry_date=date)  # Add expiry date column
+            all_calls.append(calls)
+        if not puts.empty:
+            puts = puts.assign(expiry_date=date)  # Add expiry date column
+            all_puts.append(puts)
+    
+    if all_calls and all_puts:
+        combined_calls = pd.concat(all_calls, ignore_index=True)
+        combined_puts = pd.concat(all_puts, ignore_index=True)
+        return combined_calls, combined_puts
+    return pd.DataFrame(), pd.DataFrame()
+
+@scoped_cache('intraday', ttl=refresh_ttl)  # Cache TTL matches refresh rate
+def get_combined_intraday_data(ticker, show_vix_overlay=False):
+    """Get intraday data with fallback logic, reading through the on-disk snapshot store"""
+    return read_through_provider(
+        'intraday', ticker, f"vix={show_vix_overlay}",
+        lambda: download_intraday_data(ticker, show_vix_overlay),
+        should_store=lambda result: result[0] is not None
+    )
+
+def download_intraday_data(ticker, show_vix_overlay):
+    """Download intraday bars (and VIX when the overlay is enabled) from the data provider in one batched request"""
+    formatted_ticker = ticker.replace('%5E', '^')
+    # Bars come back in ET, filtered to market hours (9:30 AM to 4:00 PM), with overlays on the same index
+    intraday_data, overlays = get_data_provider().intraday_bars(formatted_ticker, ('^VIX',) if show_vix_overlay else ())
+    vix_data = overlays.get('^VIX')
+    
+    if intraday_data.empty:
+        return None, None, None
+    
+    intraday_data = intraday_data.copy()
+    yahoo_last_price = intraday_data['Close'].iloc[-1] if not intraday_data.empty else None
+    latest_price = yahoo_last_price
+    
+    # Use ^GSPC for SPX
+    if formatted_ticker in ['^SPX'] or ticker in ['%5ESPX', 'SPX']:
+        try:
+            price = get_data_provider().current_price('^GSPC')
+            if price is not None:
+                latest_price = price
+                # Update the last data point with current price
+                last_idx = intraday_data.index[-1]
+                new_idx = last_idx + pd.Timedelta(minutes=1)  # Add 1 minute to ensure it shows as latest
+                new_row = pd.DataFrame({
+                    'Open': [latest_price],
+                    'High': [latest_price],
+                    'Low': [latest_price],
+                    'Close': [latest_price],
+                    'Volume': [0]
+                }, index=[new_idx])
+                intraday_data = pd.concat([intraday_data, new_row])
+        except Exception as e:
+            print(f"Error fetching SPX price: {str(e)}")
+            latest_price = yahoo_last_price
+    else:
+        try:
+            price = get_current_price(ticker)  # Use cached get_current_price
+            if price is not None:
+                latest_price = round(float(price), 2)
+                last_idx = intraday_data.index[-1]
+                new_idx = last_idx + pd.Timedelta(minutes=1)
+                new_row = pd.DataFrame({
+                    'Open': [latest_price],
+                    'High': [latest_price],
+                    'Low': [latest_price],
+                    'Close': [latest_price],
+                    'Volume': [0]
+                }, index=[new_idx])
+                intraday_data = pd.concat([intraday_data, new_row])
+        except Exception as e:
+            print(f"Error updating latest price: {str(e)}")
+    
+    return intraday_data, latest_price, vix_data
+
+# Modify the reset_session_state function to preserve color settings
+def reset_session_state():
+    """Reset all session state variables except for essential ones"""
+    # Keep track of keys we want to preserve
+    preserved_keys = {
+        'current_page', 
+        'initialized', 
+        'saved_ticker', 
+        'watchlist',
+        'prefetch_expiries',
+        'call_color', 
+        'put_color',
+        'vix_color',
+        'show_calls', 
+        'show_puts',
+        'show_net',
+        'strike_range',
+        'chart_type',
+        'chart_text_size',
+        'refresh_rate',
+        'auto_refresh_mode',
+        'intraday_chart_type',
+        'candlestick_type',
+        'show_vix_overlay',
+        'gex_type',
+        'show_gex_levels',
+        'show_dex_levels',
+        'show_technical_indicators',
+        'selected_indicators',
+        'ema_periods',
+        'sma_periods',
+        'bollinger_period',
+        'bollinger_std',
+        'rsi_period',
+        'fibonacci_levels',
+        'vwap_enabled'
+    }
+    
+    # Initialize visibility settings if they don't exist
+    if 'show_calls' not in st.session_state:
+        st.session_state.show_calls = True
+    if 'show_puts' not in st.session_state:
+        st.session_state.show_puts = True
+    if 'show_net' not in st.session_state:
+        st.session_state.show_net = True
+    
+    preserved_values = {key: st.session_state[key] 
+                       for key in preserved_keys 
+                       if key in st.session_state}
+    
+    # Clear everything safely
+    for key in list(st.session_state.keys()):
+        if key not in preserved_keys:
+            try:
+                del st.session_state[key]
+            except KeyError:
+                pass
+    
+    # Restore preserved values
+    for key, value in preserved_values.items():
+        st.session_state[key] = value
+
+    # Reset expiry selection keys explicitly
+    expiry_selection_keys = [
+        'oi_volume_expiry_multi',
+        'volume_ratio_expiry_multi',
+        'gamma_expiry_multi',
+        'vanna_expiry_multi',
+        'delta_expiry_multi',
+        'charm_expiry_multi',
+        'speed_expiry_multi',
+        'vomma_expiry_multi',
+        'notional_exposure_expiry_multi',
+        'max_pain_expiry_multi'
+    ]
+    for key in expiry_selection_keys:
+        if key in st.session_state:
+            del st.session_state[key]
+
+@st.fragment
+def expiry_selector_fragment(page_name, available_dates):
+    """Fragment for expiry date selection that properly resets"""
+    container = st.empty()
+    
+    # Initialize session state for this page's selections
+    state_key = f"{page_name}_selected_dates"
+    widget_key = f"{page_name}_expiry_selector"
+    
+    # Initialize previous selection state if not exists
+    if f"{widget_key}_prev" not in st.session_state:
+        st.session_state[f"{widget_key}_prev"] = []
+    
+    if state_key not in st.session_state:
+        st.session_state[state_key] = []
+    
+    with container:
+        # For implied probabilities page, use single select
+        if page_name == "Implied Probabilities":
+            # Get the first selected date if any, otherwise None
+            current_selection = st.session_state[state_key][0] if st.session_state[state_key] else None
+            
+            selected = [st.selectbox(
+                "Select Expiration Date:",
+                options=available_dates,
+                index=available_dates.index(current_selection) if current_selection in available_dates else 0,
+                key=widget_key
+            )]
+        else:
+            # For all other pages, use multiselect
+            selected = st.multiselect(
+                "Select Expiration Date(s):",
+                options=available_dates,
+                default=st.session_state[state_key],
+                key=widget_key
+            )
+        
+        # Check if selection changed
+        if selected != st.session_state[f"{widget_key}_prev"]:
+            st.session_state[state_key] = selected
+            st.session_state[f"{widget_key}_prev"] = selected.copy()
+            if selected:  # Only rerun if there are selections
+                st.rerun()
+    
+    return selected, container
+
+def handle_page_change(new_page):
+    """Handle page navigation and state management"""
+    if 'current_page' not in st.session_state:
+        st.session_state.current_page = new_page
+        return True
+    
+    if st.session_state.current_page != new_page:
+        # Clear page-specific state
+        old_state_key = f"{st.session_state.current_page}_selected_dates"
+        if old_state_key in st.session_state:
+            del st.session_state[old_state_key]
+            
+        if 'expiry_selector_container' in st.session_state:
+            st.session_state.expiry_selector_container.empty()
+        
+        st.session_state.current_page = new_page
+        reset_session_state()
+        st.rerun()
+        return True
+    
+    return False
+
+# Save selected ticker
+def save_ticker(ticker):
+    st.session_state.saved_ticker = ticker
+
+def validate_expiry(expiry_date):
+    """Helper function to validate expiration dates"""
+    if expiry_date is None:
+        return False
+    try:
+        current_market_date = datetime.now().date()
+        # For future dates, ensure they're treated as valid
+        return expiry_date >= current_market_date
+    except Exception:
+        return False
+
+def apply_iv_source(calls, puts, S, expiry_date_str, risk_free_rate):
+    """Replace Yahoo IVs with IVs solved from bid/ask mids, per the IV source setting."""
+    iv_source = st.session_state.get('iv_source', 'Yahoo')
+    if iv_source == 'Yahoo' or calls.empty or puts.empty:
+        return calls, puts
+
+    t_days = (datetime.strptime(expiry_date_str, "%Y-%m-%d").date() - datetime.today().date()).days
+    if t_days < 0:
+        return calls, puts
+
+    replace_all = iv_source == 'Mid Price'
+    t = t_days / 365.0
+    calls = apply_mid_implied_volatility(calls, 'c', S, t, risk_free_rate, replace_all)
+    puts = apply_mid_implied_volatility(puts, 'p', S, t, risk_free_rate, replace_all)
+    return calls, puts
+
+def compute_greeks_and_charts(ticker, expiry_date_str, page_key, S):
+    """Wrapper to fetch data and call the centralized greek calculator."""
+    if not expiry_date_str:
+        st.warning("Please select an expiration date.")
+        return None, None, None, None, None, None
+
+    # 1. Fetch data
+    calls, puts = fetch_options_for_date(ticker, expiry_date_str, S)
+    if calls.empty or puts.empty:
+        warn_failed_expiries(ticker, [expiry_date_str])
+        return None, None, None, None, None, None
+
+    # 2. Get risk-free rate from session state
+    if 'risk_free_rate' not in st.session_state:
+        st.session_state.risk_free_rate = get_risk_free_rate()
+    risk_free_rate = st.session_state.risk_free_rate
+    calls, puts = apply_iv_source(calls, puts, S, expiry_date_str, risk_free_rate)
+
+    # 3. Call the centralized calculator, reusing results while chain and spot bucket are unchanged
+    # On a miss, only rows whose inputs changed since the last refresh are recomputed
+    greeks_cache = get_greeks_cache()
+    cache_key = greeks_cache.make_key(ticker, expiry_date_str, calls, puts, risk_free_rate, S)
+    previous = greeks_cache.latest(ticker, expiry_date_str)
+    processed_calls, processed_puts = greeks_cache.get_or_compute(
+        cache_key,
+        lambda: compute_and_process_greeks(calls, puts, S, expiry_date_str, risk_free_rate, previous=previous)
+    )
+
+    # 4. Return the processed dataframes and other values the UI expects
+    selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+    today = datetime.today().date()
+    t_days = (selected_expiry - today).days
+    t = t_days / 365.0 if t_days >= 0 else 0
+
+    return processed_calls, processed_puts, S, t, selected_expiry, today
+
+def compute_greeks_for_dates(ticker, expiry_dates, S):
+    """Fetch every selected expiry and compute their greeks in one batched pass.
+
+    Returns combined calls and puts DataFrames with an 'expiry_date' column.
+    """
+    if 'risk_free_rate' not in st.session_state:
+        st.session_state.risk_free_rate = get_risk_free_rate()
+    risk_free_rate = st.session_state.risk_free_rate
+
+    fetched, failed = fetch_chains_concurrently(fetch_options_for_date, ticker, expiry_dates, S)
+    warn_failed_expiries(ticker, failed)
+    chains = [
+        (date,) + apply_iv_source(calls, puts, S, date, risk_free_rate)
+        for date, calls, puts in fetched
+    ]
+
+    greeks_cache = get_greeks_cache()
+    cache_key = greeks_cache.make_key(
+        ticker, tuple(expiry_dates),
+        [calls for _, calls, _ in chains], [puts for _, _, puts in chains],
+        risk_free_rate, S
+    )
+    previous = greeks_cache.latest(ticker, tuple(expiry_dates))
+    return greeks_cache.get_or_compute(
+        cache_key,
+        lambda: compute_and_process_greeks_multi(chains, S, risk_free_rate, previous=previous)
+    )
+
+
+def calculate_max_pain(calls, puts):
+    """Calculate max pain points based on call and put options (sorted cumulative sums, see max_pain_engine)."""
+    return max_pain(calls, puts)
+
+@st.cache_data(ttl=60)  # Depends only on the dates and today's date
+def get_nearest_expiry(available_dates):
+    """Get the nearest expiry date from a list of available dates"""
+    if not available_dates:
+        return None
+    
+    today = datetime.now().date()
+    future_dates = [datetime.strptime(date, '%Y-%m-%d').date() for date in available_dates if datetime.strptime(date, '%Y-%m-%d').date() >= today]
+    
+    if not future_dates:
+        return None
+    
+    return min(future_dates).strftime('%Y-%m-%d')
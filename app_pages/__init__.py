@@ -0,0 +1,5 @@
+# app_pages/
+# Uma página do app por módulo, cada um com uma função render(). O page_registry importa o
+# módulo da página ativa na primeira visita e chama render() a cada rerun, então os imports
+# e helpers usados só por uma página (plotly.subplots, scipy, yfinance...) ficam no módulo
+# dela e só carregam quando ela é aberta.
@@ -0,0 +1,429 @@
+# app_pages/analysis.py
+# Página Analysis: histórico de preço, volatilidade, indicadores e retornos por dia da semana.
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from app_core import format_ticker, get_current_price, invalidate_ticker_data, save_ticker
+from rate_limiter import call_upstream
+from ticker_registry import get_ticker
+
+
+def calculate_annualized_return(data, period='1y'):
+    """Calculate annualized return rate for each weekday"""
+    # Convert period to days
+    period_days = {
+        '1y': 365,
+        '6mo': 180,
+        '3mo': 90,
+        '1mo': 30,
+    }
+    days = period_days.get(period, 365)
+    
+    # Filter data for selected period using proper indexing
+    end_date = data.index.max()
+    start_date = end_date - pd.Timedelta(days=days)
+    filtered_data = data.loc[start_date:end_date].copy()
+    
+    # Calculate daily returns
+    filtered_data['Returns'] = filtered_data['Close'].pct_change()
+    
+    # Group by weekday and calculate mean return
+    weekday_returns = filtered_data.groupby(filtered_data.index.weekday)['Returns'].mean()
+    
+    # Annualize returns (252 trading days per year)
+    annualized_returns = (1 + weekday_returns) ** 252 - 1
+    
+    # Map weekday numbers to names
+    weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    annualized_returns.index = weekday_names
+    
+    return annualized_returns * 100  # Convert to percentage
+
+def create_weekday_returns_chart(returns):
+    """Create a bar chart of weekday returns"""
+    fig = go.Figure()
+    
+    # Add bars with colors based on return value
+    for day, value in returns.items():
+        color = st.session_state.call_color if value >= 0 else st.session_state.put_color
+        fig.add_trace(go.Bar(
+            x=[day],
+            y=[value],
+            name=day,
+            marker_color=color,
+            text=[f'{value:.2f}%'],
+            textposition='outside'
+        ))
+    
+    # Calculate y-axis range with padding
+    y_values = returns.values
+    y_max = max(y_values)
+    y_min = min(y_values)
+    y_range = y_max - y_min
+    padding = y_range * 0.2  # 20% padding
+    
+    fig.update_layout(
+        title=dict(
+            text='Annualized Return Rate by Weekday',
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Weekday',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Annualized Return (%)',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis=dict(
+            range=[y_min - padding, y_max + padding],  # Add padding to y-axis range
+            tickfont=dict(size=st.session_state.chart_text_size)
+        ),
+        showlegend=False,
+        template="plotly_dark"
+    )
+    
+    # Update axis fonts
+    fig.update_xaxes(tickfont=dict(size=st.session_state.chart_text_size))
+    
+    return fig
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="analysis_ticker")
+        with col2:
+            st.write("")
+            st.write("")
+            if st.button("🔄", key="refresh_button_analysis"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+    
+        ticker = format_ticker(user_ticker)
+    
+        if ticker != saved_ticker:
+            save_ticker(ticker)
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            stock = get_ticker(ticker)
+            # Fetch 1 year of historical data for maximum analysis period
+            historical_data = call_upstream('yahoo', stock.history, period="1y", interval="1d")
+        
+            if historical_data.empty:
+                st.warning("No historical data available for this ticker.")
+                st.stop()
+
+            # Add key price metrics at the top
+            recent_data = historical_data.tail(2)
+            if len(recent_data) >= 2:
+                prev_close = recent_data.iloc[-2]['Close']
+                current_close = recent_data.iloc[-1]['Close']
+                daily_change = (current_close - prev_close) / prev_close * 100
+                daily_range = recent_data.iloc[-1]['High'] - recent_data.iloc[-1]['Low']
+                daily_range_pct = daily_range / current_close * 100
+            
+                # Add price metrics in columns
+                metrics_cols = st.columns(4)
+                with metrics_cols[0]:
+                    st.metric("Current Price", f"${S:.2f}", f"{daily_change:.2f}%")
+                with metrics_cols[1]:
+                    st.metric("Daily Range", f"${daily_range:.2f}", f"{daily_range_pct:.2f}%")
+                with metrics_cols[2]:
+                    st.metric("52W High", f"${historical_data['High'].max():.2f}")
+                with metrics_cols[3]:
+                    st.metric("52W Low", f"${historical_data['Low'].min():.2f}")
+
+            # Calculate indicators with proper padding
+            lookback = 20  # Standard lookback period
+            padding_data = pd.concat([
+                historical_data['Close'].iloc[:lookback].iloc[::-1],  # Reverse first lookback periods
+                historical_data['Close']
+            ])
+        
+            # Calculate SMA and Bollinger Bands with padding
+            sma_padded = padding_data.rolling(window=lookback).mean()
+            std_padded = padding_data.rolling(window=lookback).std()
+        
+            # Trim padding and assign to historical_data
+            historical_data['SMA'] = sma_padded[lookback:].values
+            historical_data['Upper Band'] = historical_data['SMA'] + 2 * std_padded[lookback:].values
+            historical_data['Lower Band'] = historical_data['SMA'] - 2 * std_padded[lookback:].values
+
+            # Calculate RSI
+            def calculate_rsi(data, period=14):
+                # Add padding for RSI calculation
+                padding = pd.concat([data.iloc[:period].iloc[::-1], data])
+                delta = padding.diff()
+                gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+                loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+                rs = gain / loss
+                rsi = 100 - (100 / (1 + rs))
+                # Return only the non-padded portion
+                return rsi[period:].values
+
+            historical_data['RSI'] = calculate_rsi(historical_data['Close'])
+        
+            # Calculate MACD
+            historical_data['EMA12'] = historical_data['Close'].ewm(span=12, adjust=False).mean()
+            historical_data['EMA26'] = historical_data['Close'].ewm(span=26, adjust=False).mean()
+            historical_data['MACD'] = historical_data['EMA12'] - historical_data['EMA26']
+            historical_data['Signal'] = historical_data['MACD'].ewm(span=9, adjust=False).mean()
+            historical_data['Histogram'] = historical_data['MACD'] - historical_data['Signal']
+        
+            # Calculate Historical Volatility (20-day)
+            historical_data['Log_Return'] = np.log(historical_data['Close'] / historical_data['Close'].shift(1))
+            historical_data['Volatility_20d'] = historical_data['Log_Return'].rolling(window=20).std() * np.sqrt(252) * 100
+
+            # Create technical analysis chart
+            fig = make_subplots(
+                rows=2, 
+                cols=1, 
+                shared_xaxes=True,
+                vertical_spacing=0.1,
+                subplot_titles=(
+                    'Price vs. Simple Moving Average and Bollinger Bands',
+                    'RSI'
+                ),
+                row_heights=[0.7, 0.3]
+            )
+
+            call_color = st.session_state.call_color
+            put_color = st.session_state.put_color
+
+            # Price and indicators with consistent colors
+            fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['Close'], 
+                          name='Price', line=dict(color='gold')),
+                row=1, col=1
+            )
+            fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['SMA'], 
+                          name='SMA', line=dict(color='purple')),
+                row=1, col=1
+            )
+            fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['Upper Band'],
+                          name='Upper Band', line=dict(color=call_color, dash='dash')),
+                row=1, col=1
+            )
+            fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['Lower Band'],
+                          name='Lower Band', line=dict(color=put_color, dash='dash')),
+                row=1, col=1
+            )
+
+            # RSI
+            fig.add_trace(
+                go.Scatter(x=historical_data.index,
+                          y=historical_data['RSI'],
+                          name='RSI',
+                          line=dict(color='turquoise')),
+                row=2, col=1
+            )
+
+            # Add overbought/oversold lines to the RSI chart (row 2)
+            fig.add_hline(y=70, line_dash="dash", line_color=call_color,
+                         row=2, col=1, annotation_text="Overbought")
+            fig.add_hline(y=30, line_dash="dash", line_color=put_color,
+                         row=2, col=1, annotation_text="Oversold")
+
+            # Update layout
+            fig.update_layout(
+                template="plotly_dark",
+                title=dict(
+                    text=f"Technical Analysis for {ticker}",
+                    x=0,
+                    xanchor='left',
+                    font=dict(size=st.session_state.chart_text_size + 8)
+                ),
+                showlegend=True,
+                height=800,  # Reduced to better fit with weekday returns
+                legend=dict(
+                    font=dict(size=st.session_state.chart_text_size)
+                )
+            )
+
+            # Update axes for both rows
+            for i in range(1, 3):
+                fig.update_xaxes(
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size),
+                    row=i, col=1
+                )
+                fig.update_yaxes(
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size),
+                    row=i, col=1
+                )
+
+            # Set y-axis range for RSI
+            fig.update_yaxes(range=[0, 100], row=2, col=1)
+
+            # Display technical analysis chart
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Create MACD chart
+            macd_fig = make_subplots(rows=1, cols=1)
+        
+            macd_fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['MACD'], 
+                          name='MACD', line=dict(color='blue')),
+            )
+            macd_fig.add_trace(
+                go.Scatter(x=historical_data.index, y=historical_data['Signal'], 
+                          name='Signal', line=dict(color='red')),
+            )
+        
+            # Add histogram as bar chart
+            macd_fig.add_trace(
+                go.Bar(x=historical_data.index, y=historical_data['Histogram'],
+                      name='Histogram',
+                      marker_color=historical_data['Histogram'].apply(
+                          lambda x: call_color if x >= 0 else put_color
+                      )),
+            )
+        
+            macd_fig.update_layout(
+                title=dict(
+                    text="MACD Indicator",
+                    x=0,
+                    xanchor='left',
+                    font=dict(size=st.session_state.chart_text_size + 4)
+                ),
+                height=300,
+                template="plotly_dark",
+                legend=dict(
+                    font=dict(size=st.session_state.chart_text_size)
+                ),
+                xaxis=dict(
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size)
+                ),
+                yaxis=dict(
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size)
+                )
+            )
+        
+            # Display MACD chart
+            st.plotly_chart(macd_fig, use_container_width=True)
+        
+            # Historical volatility chart
+            vol_fig = go.Figure()
+            vol_fig.add_trace(
+                go.Scatter(
+                    x=historical_data.index,
+                    y=historical_data['Volatility_20d'],
+                    name='20-Day HV',
+                    line=dict(color='orange', width=2)
+                )
+            )
+        
+            vol_fig.update_layout(
+                title=dict(
+                    text="Historical Volatility (20-Day)",
+                    x=0,
+                    xanchor='left',
+                    font=dict(size=st.session_state.chart_text_size + 4)
+                ),
+                height=300,
+                template="plotly_dark",
+                xaxis=dict(
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size)
+                ),
+                yaxis=dict(
+                    title="Volatility %",
+                    tickfont=dict(size=st.session_state.chart_text_size),
+                    title_font=dict(size=st.session_state.chart_text_size),
+                    ticksuffix="%"
+                )
+            )
+        
+            # Display volatility chart
+            st.plotly_chart(vol_fig, use_container_width=True)
+
+            # Add trend indicator section
+            st.subheader("Technical Indicators Summary")
+        
+            # Calculate trend indicators
+            current_price = historical_data['Close'].iloc[-1]
+            sma20 = historical_data['SMA'].iloc[-1]
+            sma50 = historical_data['Close'].rolling(window=50).mean().iloc[-1]
+            sma200 = historical_data['Close'].rolling(window=200).mean().iloc[-1]
+            rsi = historical_data['RSI'].iloc[-1]
+            macd = historical_data['MACD'].iloc[-1]
+            signal = historical_data['Signal'].iloc[-1]
+        
+            # Create indicator cards in columns
+            indicator_cols = st.columns(3)
+        
+            with indicator_cols[0]:
+                st.markdown("**Price vs Moving Averages**")
+                ma_indicators = [
+                    f"Price vs 20 SMA: {'Bullish' if current_price > sma20 else 'Bearish'}",
+                    f"Price vs 50 SMA: {'Bullish' if current_price > sma50 else 'Bearish'}",
+                    f"Price vs 200 SMA: {'Bullish' if current_price > sma200 else 'Bearish'}"
+                ]
+                for ind in ma_indicators:
+                    st.markdown(f"- {ind}")
+        
+            with indicator_cols[1]:
+                st.markdown("**Momentum Indicators**")
+                momentum_indicators = [
+                    f"RSI (14): {rsi:.2f} ({'Overbought' if rsi > 70 else 'Oversold' if rsi < 30 else 'Neutral'})",
+                    f"MACD: {macd:.4f} vs Signal: {signal:.4f}",
+                    f"MACD Signal: {'Bullish' if macd > signal else 'Bearish'}"
+                ]
+                for ind in momentum_indicators:
+                    st.markdown(f"- {ind}")
+        
+            with indicator_cols[2]:
+                st.markdown("**Volatility Indicators**")
+                recent_vol = historical_data['Volatility_20d'].iloc[-1]
+                avg_vol = historical_data['Volatility_20d'].mean()
+                vol_indicators = [
+                    f"Current HV (20d): {recent_vol:.2f}%",
+                    f"Avg HV (1yr): {avg_vol:.2f}%",
+                    f"Vol Trend: {'Above Average' if recent_vol > avg_vol else 'Below Average'}"
+                ]
+                for ind in vol_indicators:
+                    st.markdown(f"- {ind}")
+
+            # Add weekday returns analysis without extra spacing
+            st.subheader("Weekday Returns Analysis")
+        
+            period = st.selectbox(
+                "Select Analysis Period:",
+                options=['1y', '6mo', '3mo', '1mo'], 
+                format_func=lambda x: {
+                    '1y': '1 Year',
+                    '6mo': '6 Months', 
+                    '3mo': '3 Months',
+                    '1mo': '1 Month'
+                }[x],
+                key="weekday_returns_period"
+            )
+
+            weekday_returns = calculate_annualized_return(historical_data, period)
+            weekday_fig = create_weekday_returns_chart(weekday_returns)
+            st.plotly_chart(weekday_fig, use_container_width=True)
+
+    st.stop()
@@ -0,0 +1,139 @@
+# app_pages/calculated_greeks.py
+# Página Calculated Greeks: delta, gamma e vanna calculados por strike.
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from app_core import (fetch_options_for_date, format_ticker, get_current_price, get_expirations,
+                      get_nearest_expiry, invalidate_ticker_data)
+from greeks_calculator import calculate_greeks
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()  # Clear previous content
+        st.write("This page calculates delta, gamma, and vanna based on market data.")
+    
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="calculated_greeks_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key="refresh_button_greeks"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+        ticker = format_ticker(user_ticker)
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                # Get nearest expiry and use it as default
+                nearest_expiry = get_nearest_expiry(available_dates)
+                expiry_date_str = st.selectbox(
+                    "Select an Exp. Date:", 
+                    options=available_dates, 
+                    index=available_dates.index(nearest_expiry) if nearest_expiry else None, 
+                    key="calculated_greeks_expiry_main"
+                )
+            
+                if expiry_date_str:  # Only proceed if an expiry date is selected
+                
+                    selected_expiry = datetime.strptime(expiry_date_str, '%Y-%m-%d').date()
+                    calls, puts = fetch_options_for_date(ticker, expiry_date_str, S)
+                
+                    if calls.empty and puts.empty:
+                        st.warning("No options data available for this ticker.")
+                        st.stop()
+
+                    # Rest of the Calculated Greeks logic
+                    combined = pd.concat([calls, puts])
+                    combined = combined.dropna(subset=['extracted_expiry'])
+                    calls = calls[calls['extracted_expiry'] == selected_expiry]
+                    puts = puts[puts['extracted_expiry'] == selected_expiry]
+                
+                    # Get stock price
+                    S = get_current_price(ticker)
+                    if S is None:
+                        st.error("Could not fetch underlying price.")
+                        st.stop()
+
+                    S = round(S, 2)
+                    st.markdown(f"**Underlying Price (S):** {S}")
+                
+                    today = datetime.today().date()
+                    t_days = (selected_expiry - today).days
+                    # Change this condition to allow same-day expiration
+                    if t_days < 0:  # Changed from t_days <= 0
+                        st.error("The selected expiration date is in the past!")
+                        st.stop()
+
+                    t = t_days / 365.0
+                    st.markdown(f"**Time to Expiration (t in years):** {t:.4f}")
+                
+                    def compute_row_greeks(row, flag):
+                        try:
+                            sigma = row.get("impliedVolatility", None)
+                            if sigma is None or sigma <= 0:
+                                return pd.Series({"calc_delta": None, "calc_gamma": None, "calc_vanna": None})
+                        
+                            delta_val, gamma_val, vanna_val = calculate_greeks(flag, S, row["strike"], t, sigma, st.session_state.risk_free_rate)
+                            return pd.Series({
+                                "calc_delta": delta_val,
+                                "calc_gamma": gamma_val,
+                                "calc_vanna": vanna_val
+                            })
+                        except Exception as e:
+                            st.warning(f"Error calculating greeks: {str(e)}")
+                            return pd.Series({"calc_delta": None, "calc_gamma": None, "calc_vanna": None})
+
+                    results = {}
+                
+                    # Process calls
+                    if not calls.empty:
+                        try:
+                            calls_copy = calls.copy()
+                            greeks_calls = calls_copy.apply(lambda row: compute_row_greeks(row, "c"), axis=1)
+                            results["Calls"] = pd.concat([calls_copy, greeks_calls], axis=1)
+                        except Exception as e:
+                            st.warning(f"Error processing calls: {str(e)}")
+                    else:
+                        st.warning("No call options data available.")
+
+                    # Process puts
+                    if not puts.empty:
+                        try:
+                            puts_copy = puts.copy()
+                            greeks_puts = puts_copy.apply(lambda row: compute_row_greeks(row, "p"), axis=1)
+                            results["Puts"] = pd.concat([puts_copy, greeks_puts], axis=1)
+                        except Exception as e:
+                            st.warning(f"Error processing puts: {str(e)}")
+                    else:
+                        st.warning("No put options data available.")
+
+                    # Display results
+                    for typ, df in results.items():
+                        try:
+                            st.write(f"### {typ} with Calculated Greeks")
+                            st.dataframe(df[['contractSymbol', 'strike', 'impliedVolatility', 'calc_delta', 'calc_gamma', 'calc_vanna']])
+                            fig = px.scatter(df, x="strike", y="calc_delta", title=f"{typ}: Delta vs. Strike",
+                                         labels={"strike": "Strike", "calc_delta": "Calculated Delta"})
+                            st.plotly_chart(fig, use_container_width=True, key=f"Calculated Greeks_{typ.lower()}_scatter")
+                        except Exception as e:
+                            st.error(f"Error displaying {typ} data: {str(e)}")
+                else:
+                    st.warning("Please select an expiration date to view the calculations.")
+                    st.stop()
@@ -0,0 +1,1127 @@
+# app_pages/dashboard.py
+# Página Dashboard: gráficos de exposição, intraday e resumo do mercado do vencimento escolhido.
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import yfinance as yf
+
+from app_charts import create_davi_chart, create_max_pain_chart, exposure_bar_chart
+from app_core import (compute_greeks_and_charts, fetch_options_for_date, format_ticker,
+                      get_combined_intraday_data, get_current_price, get_expirations, get_nearest_expiry,
+                      invalidate_ticker_data, live_region, refresh_ttl, save_ticker)
+from chart_utils import add_current_price_line, calculate_strike_range
+from rate_limiter import call_upstream
+from scoped_cache import scoped_cache
+
+
+def calculate_heikin_ashi(df):
+    """Calculate Heikin Ashi candlestick values."""
+    ha_df = pd.DataFrame(index=df.index)
+    
+    # Calculate Heikin Ashi values
+    ha_df['HA_Close'] = (df['Open'] + df['High'] + df['Low'] + df['Close']) / 4
+    
+    # Initialize HA_Open with first candle's opening price
+    ha_df['HA_Open'] = pd.Series(index=df.index)
+    ha_df.loc[ha_df.index[0], 'HA_Open'] = df['Open'].iloc[0]
+    
+    # Calculate subsequent HA_Open values
+    for i in range(1, len(df)):
+        ha_df.loc[ha_df.index[i], 'HA_Open'] = (ha_df['HA_Open'].iloc[i-1] + ha_df['HA_Close'].iloc[i-1]) / 2
+    
+    ha_df['HA_High'] = df[['High', 'Open', 'Close']].max(axis=1)
+    ha_df['HA_Low'] = df[['Low', 'Open', 'Close']].min(axis=1)
+    
+    return ha_df
+
+def calculate_technical_indicators(df):
+    """Calculate various technical indicators for intraday data."""
+    if df is None or len(df) == 0:
+        return {}
+    
+    indicators = {}
+    selected_indicators = st.session_state.get('selected_indicators', [])
+    
+    # EMA calculations
+    if "EMA (Exponential Moving Average)" in selected_indicators and st.session_state.get('ema_periods'):
+        indicators['ema'] = {}
+        for period in st.session_state.ema_periods:
+            if len(df) >= period:
+                indicators['ema'][period] = df['Close'].ewm(span=period, adjust=False).mean()
+    
+    # SMA calculations
+    if "SMA (Simple Moving Average)" in selected_indicators and st.session_state.get('sma_periods'):
+        indicators['sma'] = {}
+        for period in st.session_state.sma_periods:
+            if len(df) >= period:
+                indicators['sma'][period] = df['Close'].rolling(window=period).mean()
+    
+    # Bollinger Bands
+    if "Bollinger Bands" in selected_indicators and st.session_state.get('bollinger_period'):
+        period = st.session_state.bollinger_period
+        std_dev = st.session_state.get('bollinger_std', 2.0)
+        if len(df) >= period:
+            sma = df['Close'].rolling(window=period).mean()
+            std = df['Close'].rolling(window=period).std()
+            indicators['bollinger'] = {
+                'upper': sma + (std * std_dev),
+                'middle': sma,
+                'lower': sma - (std * std_dev)
+            }
+    
+    # RSI
+    if "RSI (Relative Strength Index)" in selected_indicators and st.session_state.get('rsi_period'):
+        period = st.session_state.rsi_period
+        if len(df) >= period + 1:
+            delta = df['Close'].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            rs = gain / loss
+            indicators['rsi'] = 100 - (100 / (1 + rs))
+    
+    # VWAP
+    if "VWAP (Volume Weighted Average Price)" in selected_indicators and 'Volume' in df.columns:
+        typical_price = (df['High'] + df['Low'] + df['Close']) / 3
+        cumulative_volume = df['Volume'].cumsum()
+        cumulative_price_volume = (typical_price * df['Volume']).cumsum()
+        indicators['vwap'] = cumulative_price_volume / cumulative_volume
+    
+    return indicators
+
+def calculate_fibonacci_levels(df):
+    """Calculate Fibonacci retracement levels based on recent high and low."""
+    if df is None or len(df) == 0:
+        return {}
+    
+    # Use the full range for fibonacci calculation
+    high = df['High'].max()
+    low = df['Low'].min()
+    diff = high - low
+    
+    fibonacci_ratios = [0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0]
+    levels = {}
+    
+    for ratio in fibonacci_ratios:
+        levels[f"{ratio:.3f}"] = high - (diff * ratio)
+    
+    return levels
+
+def add_technical_indicators_to_chart(fig, indicators, fibonacci_levels=None):
+    """Add technical indicators to the intraday chart."""
+    if not indicators:
+        return fig
+    
+    # Color palette for indicators
+    colors = ['#FFD700', '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#F0E68C']
+    color_index = 0
+    
+    # Add EMAs
+    if 'ema' in indicators:
+        ema_periods = list(indicators['ema'].keys())
+        for i, (period, ema_data) in enumerate(indicators['ema'].items()):
+            fig.add_trace(
+                go.Scatter(
+                    x=ema_data.index,
+                    y=ema_data.values,
+                    mode='lines',
+                    name=f'EMA {period}',
+                    line=dict(color=colors[color_index % len(colors)], width=2),
+                    opacity=0.8
+                ),
+                secondary_y=False
+            )
+            color_index += 1
+        
+        # Add EMA cloud if we have at least 2 EMAs
+        if len(ema_periods) >= 2:
+            # Create cloud between first two EMAs (typically fastest and slower)
+            ema1 = indicators['ema'][ema_periods[0]]
+            ema2 = indicators['ema'][ema_periods[1]]
+            
+            # Determine which EMA is above/below for coloring
+            fig.add_trace(
+                go.Scatter(
+                    x=ema1.index,
+                    y=ema1.values,
+                    mode='lines',
+                    line=dict(color='rgba(0,0,0,0)'),  # Invisible line
+                    showlegend=False,
+                    hoverinfo='skip'
+                ),
+                secondary_y=False
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=ema2.index,
+                    y=ema2.values,
+                    mode='lines',
+                    line=dict(color='rgba(0,0,0,0)'),  # Invisible line
+                    fill='tonexty',
+                    fillcolor='rgba(100, 150, 200, 0.1)',  # Light blue cloud
+                    name=f'EMA Cloud ({ema_periods[0]}-{ema_periods[1]})',
+                    showlegend=True,
+                    hoverinfo='skip'
+                ),
+                secondary_y=False
+            )
+    
+    # Add SMAs
+    if 'sma' in indicators:
+        for period, sma_data in indicators['sma'].items():
+            fig.add_trace(
+                go.Scatter(
+                    x=sma_data.index,
+                    y=sma_data.values,
+                    mode='lines',
+                    name=f'SMA {period}',
+                    line=dict(color=colors[color_index % len(colors)], width=2, dash='dash'),
+                    opacity=0.8
+                ),
+                secondary_y=False
+            )
+            color_index += 1
+    
+    # Add Bollinger Bands
+    if 'bollinger' in indicators:
+        bb = indicators['bollinger']
+        # Add middle line first
+        fig.add_trace(
+            go.Scatter(
+                x=bb['middle'].index,
+                y=bb['middle'].values,
+                mode='lines',
+                name=f'BB Middle ({st.session_state.bollinger_period})',
+                line=dict(color='gray', width=1, dash='dot'),
+                opacity=0.7
+            ),
+            secondary_y=False
+        )
+        # Upper band
+        fig.add_trace(
+            go.Scatter(
+                x=bb['upper'].index,
+                y=bb['upper'].values,
+                mode='lines',
+                name='BB Upper',
+                line=dict(color='rgba(128, 128, 128, 0.5)', width=1),
+                showlegend=False
+            ),
+            secondary_y=False
+        )
+        # Lower band with fill
+        fig.add_trace(
+            go.Scatter(
+                x=bb['lower'].index,
+                y=bb['lower'].values,
+                mode='lines',
+                name='BB Lower',
+                line=dict(color='rgba(128, 128, 128, 0.5)', width=1),
+                fill='tonexty',
+                fillcolor='rgba(128, 128, 128, 0.1)',
+                showlegend=False
+            ),
+            secondary_y=False
+        )
+    
+    # Add VWAP
+    if 'vwap' in indicators:
+        fig.add_trace(
+            go.Scatter(
+                x=indicators['vwap'].index,
+                y=indicators['vwap'].values,
+                mode='lines',
+                name='VWAP',
+                line=dict(color='orange', width=2, dash='dashdot'),
+                opacity=0.8
+            ),
+            secondary_y=False
+        )
+    
+    # Add Fibonacci levels as horizontal lines
+    if fibonacci_levels:
+        for level_name, level_value in fibonacci_levels.items():
+            fig.add_hline(
+                y=level_value,
+                line_dash="dash",
+                line_color="rgba(255, 255, 255, 0.4)",
+                annotation_text=f"Fib {level_name}",
+                annotation_position="right",
+                annotation_font_size=10
+            )
+    
+    return fig
+
+@scoped_cache('screener', ttl=refresh_ttl)  # Cache TTL matches refresh rate; keyed by screener name
+def get_screener_data(screener_type):
+    """Fetch screener data from Yahoo Finance"""
+    try:
+        response = call_upstream('yahoo', yf.screen, screener_type)
+        if isinstance(response, dict) and 'quotes' in response:
+            data = []
+            for quote in response['quotes']:
+                # Extract relevant information
+                info = {
+                    'symbol': quote.get('symbol', ''),
+                    'shortName': quote.get('shortName', ''),
+                    'regularMarketPrice': quote.get('regularMarketPrice', 0),
+                    'regularMarketChangePercent': quote.get('regularMarketChangePercent', 0),
+                    'regularMarketVolume': quote.get('regularMarketVolume', 0),
+                }
+                data.append(info)
+            return pd.DataFrame(data)
+        return pd.DataFrame()
+    except Exception as e:
+        print(f"Error fetching screener data: {e}")
+        return pd.DataFrame()
+
+def create_volume_by_strike_chart(calls, puts, S):
+    """Create a standalone volume by strike chart for the dashboard."""
+    if S is None:
+        st.error("Could not fetch underlying price.")
+        return None
+
+    # Get colors from session state at the start
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+
+    # Calculate strike range around current price (percentage-based)
+    strike_range = calculate_strike_range(S)
+    min_strike = S - strike_range
+    max_strike = S + strike_range
+    
+    # Filter data based on strike range
+    calls_filtered = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
+    puts_filtered = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+    
+    # Create separate dataframes for Volume, filtering out zeros
+    calls_vol_df = calls_filtered[['strike', 'volume']].copy()
+    calls_vol_df = calls_vol_df[calls_vol_df['volume'] > 0]
+    calls_vol_df['OptionType'] = 'Call'
+    
+    puts_vol_df = puts_filtered[['strike', 'volume']].copy()
+    puts_vol_df = puts_vol_df[puts_vol_df['volume'] > 0]
+    puts_vol_df['OptionType'] = 'Put'
+    
+    # Calculate Net Volume using filtered data
+    net_volume = calls_filtered.groupby('strike')['volume'].sum() - puts_filtered.groupby('strike')['volume'].sum()
+    
+    # Calculate total values for title (handle empty dataframes)
+    total_call_volume = calls_vol_df['volume'].sum() if not calls_vol_df.empty else 0
+    total_put_volume = puts_vol_df['volume'].sum() if not puts_vol_df.empty else 0
+    
+    # Create title with totals using HTML for colored values
+    volume_title_with_totals = (
+        f"Volume by Strike     "
+        f"<span style='color: {call_color}'>{total_call_volume:,.0f}</span> | "
+        f"<span style='color: {put_color}'>{total_put_volume:,.0f}</span>"
+    )
+    
+    # Create Volume Chart
+    fig_volume = go.Figure()
+    
+    # Add calls if enabled and data exists
+    if st.session_state.show_calls and not calls_vol_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                name='Call',
+                marker_color=call_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=calls_vol_df['strike'],
+                x=calls_vol_df['volume'],
+                name='Call',
+                marker_color=call_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='markers',
+                name='Call',
+                marker=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='lines',
+                name='Call',
+                line=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='lines',
+                fill='tozeroy',
+                name='Call',
+                line=dict(color=call_color, width=0.5),
+                fillcolor=call_color
+            ))
+
+    # Add puts if enabled and data exists
+    if st.session_state.show_puts and not puts_vol_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                name='Put',
+                marker_color=put_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=puts_vol_df['strike'],
+                x=puts_vol_df['volume'],
+                name='Put',
+                marker_color=put_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='markers',
+                name='Put',
+                marker=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='lines',
+                name='Put',
+                line=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='lines',
+                fill='tozeroy',
+                name='Put',
+                line=dict(color=put_color, width=0.5),
+                fillcolor=put_color
+            ))
+
+    # Add Net Volume if enabled
+    if st.session_state.show_net and not net_volume.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=net_volume.index,
+                y=net_volume.values,
+                name='Net Volume',
+                marker_color=[call_color if val >= 0 else put_color for val in net_volume.values]
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=net_volume.index,
+                x=net_volume.values,
+                name='Net Volume',
+                marker_color=[call_color if val >= 0 else put_color for val in net_volume.values],
+                orientation='h'
+            ))
+        elif st.session_state.chart_type in ['Scatter', 'Line']:
+            positive_mask = net_volume.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[positive_mask],
+                    y=net_volume.values[positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net Volume (Positive)',
+                    marker=dict(color=call_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=call_color) if st.session_state.chart_type == 'Line' else None
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[~positive_mask],
+                    y=net_volume.values[~positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net Volume (Negative)',
+                    marker=dict(color=put_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=put_color) if st.session_state.chart_type == 'Line' else None
+                ))
+        elif st.session_state.chart_type == 'Area':
+            positive_mask = net_volume.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[positive_mask],
+                    y=net_volume.values[positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net Volume (Positive)',
+                    line=dict(color=call_color, width=0.5),
+                    fillcolor=call_color
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[~positive_mask],
+                    y=net_volume.values[~positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net Volume (Negative)',
+                    line=dict(color=put_color, width=0.5),
+                    fillcolor=put_color
+                ))
+
+    # Update Volume chart layout
+    if st.session_state.chart_type == 'Horizontal Bar':
+        fig_volume.update_layout(
+            title=dict(
+                text=volume_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Volume',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='y unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600
+        )
+    else:
+        fig_volume.update_layout(
+            title=dict(
+                text=volume_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Volume',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='x unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600
+        )
+    
+    # Add current price line
+    S = round(S, 2)
+    fig_volume = add_current_price_line(fig_volume, S)
+    
+    return fig_volume
+
+def create_donut_chart(call_volume, put_volume):
+    labels = ['Calls', 'Puts']
+    values = [call_volume, put_volume]
+    # Get colors directly from session state at creation time
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+    
+    fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.3)])
+    fig.update_layout(
+        title_text='Call vs Put Volume Ratio',
+        title_font_size=st.session_state.chart_text_size + 8,  # Title slightly larger
+        showlegend=True,
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        )
+    )
+    fig.update_traces(
+        hoverinfo='label+percent+value',
+        marker=dict(colors=[call_color, put_color]),
+        textfont=dict(size=st.session_state.chart_text_size)
+    )
+    return fig
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    dashboard_container = st.container()
+    with dashboard_container:
+        st.empty()  # Clear previous content
+    
+        # Create a single input for ticker with refresh button
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="dashboard_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key="refresh_button_dashboard"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+    
+        ticker = format_ticker(user_ticker)
+    
+        # Save the ticker if it changes (cached data is scoped per ticker)
+        if ticker != saved_ticker:
+            save_ticker(ticker)
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                # Get nearest expiry and use it as default
+                nearest_expiry = get_nearest_expiry(available_dates)
+                expiry_date_str = st.selectbox(
+                    "Select an Exp. Date:", 
+                    options=available_dates,
+                    index=available_dates.index(nearest_expiry) if nearest_expiry else None,
+                    key="dashboard_expiry_main"
+                )
+            
+                if expiry_date_str:  # Only proceed if expiry date is selected
+                    # Chart picker stays outside the live region so it is not rebuilt on refresh ticks
+                    chart_options = [
+                        "Intraday Price", "Gamma Exposure", "Vanna Exposure", "Delta Exposure",
+                        "Charm Exposure", "Speed Exposure", "Vomma Exposure", "Volume Ratio",
+                        "Max Pain", "Delta-Adjusted Value Index", "Volume by Strike"
+                    ]
+                    default_charts = ["Intraday Price", "Gamma Exposure", "Vanna Exposure", "Delta Exposure", "Charm Exposure"]
+                    selected_charts = st.multiselect("Select charts to display:", chart_options, default=[
+                        chart for chart in default_charts if chart in chart_options
+                    ])
+
+                    def render_dashboard_charts():
+                        # Re-read the cached price so every refresh tick charts against the current spot
+                        S = get_current_price(ticker)
+                        if S is None:
+                            st.error("Could not fetch current price.")
+                            return
+
+                        calls, puts, _, t, selected_expiry, today = compute_greeks_and_charts(ticker, expiry_date_str, "dashboard", S)
+                        if calls is None or puts is None:
+                            st.stop()
+                        
+                        fig_gamma = exposure_bar_chart(calls, puts, "GEX", "Gamma Exposure by Strike", S)
+                        fig_vanna = exposure_bar_chart(calls, puts, "VEX", "Vanna Exposure by Strike", S)
+                        fig_delta = exposure_bar_chart(calls, puts, "DEX", "Delta Exposure by Strike", S)
+                        fig_charm = exposure_bar_chart(calls, puts, "Charm", "Charm Exposure by Strike", S)
+                        fig_speed = exposure_bar_chart(calls, puts, "Speed", "Speed Exposure by Strike", S)
+                        fig_vomma = exposure_bar_chart(calls, puts, "Vomma", "Vomma Exposure by Strike", S)
+                    
+                        # Intraday price chart
+                        intraday_data, current_price, vix_data = get_combined_intraday_data(ticker, st.session_state.show_vix_overlay)
+                        if intraday_data is None or current_price is None:
+                            st.warning("No intraday data available for this ticker.")
+                        else:
+                            # Initialize plot with cleared shapes/annotations
+                            fig_intraday = make_subplots(specs=[[{"secondary_y": True}]])
+                            fig_intraday.layout.shapes = []
+                            fig_intraday.layout.annotations = []
+
+                            # Add either candlestick or line trace based on selection
+                            if st.session_state.intraday_chart_type == 'Candlestick':
+                                if st.session_state.candlestick_type == 'Heikin Ashi':
+                                    # Calculate Heikin Ashi values
+                                    ha_data = calculate_heikin_ashi(intraday_data)
+                                    fig_intraday.add_trace(
+                                        go.Candlestick(
+                                            x=ha_data.index,
+                                            open=ha_data['HA_Open'],
+                                            high=ha_data['HA_High'],
+                                            low=ha_data['HA_Low'],
+                                            close=ha_data['HA_Close'],
+                                            name="Price",
+                                            increasing_line_color=st.session_state.call_color,
+                                            decreasing_line_color=st.session_state.put_color,
+                                            increasing_fillcolor=st.session_state.call_color,
+                                            decreasing_fillcolor=st.session_state.put_color,
+                                            showlegend=False
+                                        ),
+                                        secondary_y=False
+                                    )
+                                elif st.session_state.candlestick_type == 'Hollow':
+                                    fig_intraday.add_trace(
+                                        go.Candlestick(
+                                            x=intraday_data.index,
+                                            open=intraday_data['Open'],
+                                            high=intraday_data['High'],
+                                            low=intraday_data['Low'],
+                                            close=intraday_data['Close'],
+                                            name="Price",
+                                            increasing=dict(line=dict(color=st.session_state.call_color), fillcolor='rgba(0,0,0,0)'),
+                                            decreasing=dict(line=dict(color=st.session_state.put_color), fillcolor='rgba(0,0,0,0)'),
+                                            showlegend=False
+                                        ),
+                                        secondary_y=False
+                                    )
+                                else:  # Filled candlesticks
+                                    fig_intraday.add_trace(
+                                        go.Candlestick(
+                                            x=intraday_data.index,
+                                            open=intraday_data['Open'],
+                                            high=intraday_data['High'],
+                                            low=intraday_data['Low'],
+                                            close=intraday_data['Close'],
+                                            name="Price",
+                                            increasing_line_color=st.session_state.call_color,
+                                            decreasing_line_color=st.session_state.put_color,
+                                            increasing_fillcolor=st.session_state.call_color,
+                                            decreasing_fillcolor=st.session_state.put_color,
+                                            showlegend=False
+                                        ),
+                                        secondary_y=False
+                                    )
+                            else:  # Line chart
+                                fig_intraday.add_trace(
+                                    go.Scatter(
+                                        x=intraday_data.index,
+                                        y=intraday_data['Close'],
+                                        name="Price",
+                                        line=dict(color='gold'),
+                                        showlegend=False
+                                    ),
+                                    secondary_y=False
+                                )
+
+                            # Add technical indicators if enabled
+                            if st.session_state.get('show_technical_indicators') and st.session_state.get('selected_indicators'):
+                                # Calculate technical indicators
+                                indicators = calculate_technical_indicators(intraday_data)
+                            
+                                # Calculate Fibonacci levels if selected
+                                fibonacci_levels = None
+                                if "Fibonacci Retracements" in st.session_state.selected_indicators:
+                                    fibonacci_levels = calculate_fibonacci_levels(intraday_data)
+                            
+                                # Add indicators to chart
+                                fig_intraday = add_technical_indicators_to_chart(fig_intraday, indicators, fibonacci_levels)
+
+                            # Calculate base y-axis range from price data
+                            price_min = intraday_data['Low'].min()
+                            price_max = intraday_data['High'].max()
+                            price_range = price_max - price_min
+                            padding = price_range * 0.1  # 10% padding
+                            y_min = price_min - padding
+                            y_max = price_max + padding
+
+                            # Add VIX overlay if enabled
+                            if st.session_state.show_vix_overlay and vix_data is not None and not vix_data.empty:
+                                vix_min = vix_data['Close'].min()
+                                vix_max = vix_data['Close'].max()
+                                vix_range = vix_max - vix_min
+
+                                if vix_range == 0:
+                                    st.warning("VIX data has no range, overlay disabled")
+                                else:
+                                    # Normalize VIX to fit within 50% of price range, centered
+                                    target_vix_range = price_range * 0.5
+                                    vix_midpoint = (price_max + price_min) / 2
+                                    normalized_vix = vix_midpoint + (((vix_data['Close'] - vix_min) / vix_range - 0.5) * target_vix_range)
+
+
+                                    fig_intraday.add_trace(
+                                        go.Scatter(
+                                            x=vix_data.index,
+                                            y=normalized_vix,
+                                            name='VIX',
+                                            line=dict(color=st.session_state.vix_color, width=2),
+                                            opacity=0.9,
+                                            showlegend=False
+                                        ),
+                                        secondary_y=False
+                                    )
+
+                                    fig_intraday.add_annotation(
+                                        x=vix_data.index[-1],
+                                        y=normalized_vix.iloc[-1],
+                                        text=f"{vix_data['Close'].iloc[-1]:.2f}",
+                                        showarrow=False,
+                                        xshift=16,
+                                        font=dict(color=st.session_state.vix_color, size=st.session_state.chart_text_size)
+                                    )
+
+                                    # Adjust y-axis to include VIX
+                                    y_min = min(y_min, normalized_vix.min() - padding)
+                                    y_max = max(y_max, normalized_vix.max() + padding)
+
+                            elif st.session_state.show_vix_overlay:
+                                st.warning("VIX overlay enabled but no VIX data available")
+
+                            # Price annotation
+                            if current_price is not None:
+                                fig_intraday.add_annotation(
+                                    x=intraday_data.index[-1],
+                                    y=current_price,
+                                    xref='x',
+                                    yref='y',
+                                    xshift=27,
+                                    showarrow=False,
+                                    text=f"{current_price:,.2f}",
+                                    font=dict(color='yellow', size=st.session_state.chart_text_size)
+                                )
+                                y_min = min(y_min, current_price - padding)
+                                y_max = max(y_max, current_price + padding)
+
+                            # Process options data (GEX and DEX levels)
+                            calls['OptionType'] = 'Call'
+                            puts['OptionType'] = 'Put'
+                            added_strikes = set()
+
+                            # Add GEX levels if enabled
+                            if st.session_state.show_gex_levels:
+                                # Calculate strike range around current price (percentage-based)
+                                strike_range = calculate_strike_range(current_price)
+                                min_strike = current_price - strike_range
+                                max_strike = current_price + strike_range
+                            
+                                # Filter options within strike range
+                                calls_filtered = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
+                                puts_filtered = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+                            
+                                # Calculate Net or Absolute GEX based on gex_type setting
+                                if st.session_state.gex_type == 'Net':
+                                    # Net GEX: Calls positive, Puts negative
+                                    net_gex = calls_filtered.groupby('strike')['GEX'].sum() - puts_filtered.groupby('strike')['GEX'].sum()
+                                else:  # Absolute
+                                    # Absolute GEX: Take the larger absolute value at each strike
+                                    calls_gex = calls_filtered.groupby('strike')['GEX'].sum()
+                                    puts_gex = puts_filtered.groupby('strike')['GEX'].sum()
+                                    net_gex = pd.Series(index=set(calls_gex.index) | set(puts_gex.index))
+                                    for strike in net_gex.index:
+                                        call_val = abs(calls_gex.get(strike, 0))
+                                        put_val = abs(puts_gex.get(strike, 0))
+                                        net_gex[strike] = call_val if call_val >= put_val else -put_val
+                            
+                                # Remove zero values and get top 5 by absolute value
+                                net_gex = net_gex[net_gex != 0]
+                                if not net_gex.empty:
+                                    # Create DataFrame for easier manipulation
+                                    gex_df = pd.DataFrame({
+                                        'strike': net_gex.index,
+                                        'GEX': net_gex.values,
+                                        'abs_GEX': abs(net_gex.values)
+                                    })
+                                
+                                    # Get top 5 by absolute GEX value
+                                    top5_gex = gex_df.nlargest(5, 'abs_GEX')
+                                    top5_gex['distance'] = abs(top5_gex['strike'] - current_price)
+                                    nearest_3_gex = top5_gex.nsmallest(3, 'distance')
+                                    max_gex = top5_gex['abs_GEX'].max()
+
+                                    for row in top5_gex.itertuples():
+                                        if row.strike not in added_strikes and not pd.isna(row.GEX) and row.GEX != 0:
+                                            # Calculate intensity based on GEX value relative to max
+                                            intensity = max(0.6, min(1.0, row.abs_GEX / max_gex))  # Use abs_GEX for intensity
+                                        
+                                            # Determine color based on GEX sign (positive = call color, negative = put color)
+                                            base_color = st.session_state.call_color if row.GEX >= 0 else st.session_state.put_color
+                                        
+                                            # Convert hex to RGB
+                                            rgb = tuple(int(base_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+                                        
+                                            # Create color with intensity
+                                            color = f'rgba({rgb[0]}, {rgb[1]}, {rgb[2]}, {intensity})'
+                                        
+                                            fig_intraday.add_shape(
+                                                type='line',
+                                                x0=intraday_data.index[0],
+                                                x1=intraday_data.index[-1],
+                                                y0=row.strike,
+                                                y1=row.strike,
+                                                line=dict(
+                                                    color=color,
+                                                    width=2
+                                                ),
+                                                xref='x',
+                                                yref='y',
+                                                layer='below'
+                                            )
+                                        
+                                            # Add text annotation positioned to the right of the chart
+                                            gex_label = f"GEX {row.GEX:,.0f}"
+                                            fig_intraday.add_annotation(
+                                                x=0.92,
+                                                y=row.strike,
+                                                text=gex_label,
+                                                font=dict(color=color, size=st.session_state.chart_text_size - 2),
+                                                showarrow=False,
+                                                xref="paper",  # Use paper coordinates for x
+                                                yref="y",      # Use data coordinates for y
+                                                xanchor="left"
+                                            )
+                                            added_strikes.add(row.strike)
+
+                                    # Include GEX strikes in y-axis range
+                                    y_min = min(y_min, nearest_3_gex['strike'].min() - padding)
+                                    y_max = max(y_max, nearest_3_gex['strike'].max() + padding)
+
+                            # Add DEX levels if enabled
+                            if st.session_state.show_dex_levels:
+                                # Create combined DEX dataframe with absolute values for ranking
+                                dex_options_df = pd.concat([calls, puts]).dropna(subset=['DEX'])
+                            
+                                if not dex_options_df.empty:
+                                    # Use absolute DEX values for ranking (similar to GEX logic)
+                                    dex_options_df['abs_DEX'] = abs(dex_options_df['DEX'])
+                                    top5_dex = dex_options_df.nlargest(5, 'abs_DEX')[['strike', 'DEX', 'OptionType']]
+                                    top5_dex['distance'] = abs(top5_dex['strike'] - current_price)
+                                    nearest_3_dex = top5_dex.nsmallest(3, 'distance')
+                                    max_dex = abs(top5_dex['DEX']).max()
+
+                                    for row in top5_dex.itertuples():
+                                        if row.strike not in added_strikes and not pd.isna(row.DEX) and row.DEX != 0:
+                                            # Calculate intensity based on DEX value relative to max
+                                            intensity = max(0.6, min(1.0, abs(row.DEX) / max_dex))
+                                        
+                                            # Get base color from session state - use different style for DEX
+                                            base_color = st.session_state.call_color if row.OptionType == 'Call' else st.session_state.put_color
+                                        
+                                            # Convert hex to RGB
+                                            rgb = tuple(int(base_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+                                        
+                                            # Create color with intensity
+                                            color = f'rgba({rgb[0]}, {rgb[1]}, {rgb[2]}, {intensity})'
+                                        
+                                            # Add dashed line for DEX levels to distinguish from GEX
+                                            fig_intraday.add_shape(
+                                                type='line',
+                                                x0=intraday_data.index[0],
+                                                x1=intraday_data.index[-1],
+                                                y0=row.strike,
+                                                y1=row.strike,
+                                                line=dict(
+                                                    color=color,
+                                                    width=2,
+                                                    dash='dash'  # Dashed line to distinguish from GEX
+                                                ),
+                                                xref='x',
+                                                yref='y',
+                                                layer='below'
+                                            )
+                                        
+                                            # Add text annotation positioned to the right of the chart
+                                            fig_intraday.add_annotation(
+                                                x=0.92,
+                                                y=row.strike,
+                                                text=f"DEX {row.DEX:,.0f}",
+                                                font=dict(color=color, size=st.session_state.chart_text_size - 2),
+                                                showarrow=False,
+                                                xref="paper",  # Use paper coordinates for x
+                                                yref="y",      # Use data coordinates for y
+                                                xanchor="left"
+                                            )
+                                            added_strikes.add(row.strike)
+
+                                    # Include DEX strikes in y-axis range
+                                    y_min = min(y_min, nearest_3_dex['strike'].min() - padding)
+                                    y_max = max(y_max, nearest_3_dex['strike'].max() + padding)
+
+                            # Ensure minimum range
+                            if abs(y_max - y_min) < (current_price * 0.01):  # Minimum 1% range
+                                center = (y_max + y_min) / 2
+                                y_min = center * 0.99
+                                y_max = center * 1.01
+
+                            # Update layout
+                            fig_intraday.update_layout(
+                                title=dict(
+                                    text=f"Intraday Price for {ticker}",
+                                    font=dict(size=st.session_state.chart_text_size + 4)
+                                ),
+                                height=600,
+                                hovermode='x unified',
+                                margin=dict(r=150, l=50),
+                                xaxis=dict(
+                                    autorange=True, 
+                                    rangeslider=dict(visible=False),
+                                    showgrid=False,
+                                    tickfont=dict(size=st.session_state.chart_text_size)
+                                ),
+                                yaxis=dict(
+                                    autorange=True,
+                                    fixedrange=False,
+                                    showgrid=False,
+                                    zeroline=False,
+                                    tickfont=dict(size=st.session_state.chart_text_size)
+                                ),
+                                showlegend=bool(st.session_state.get('show_technical_indicators') and st.session_state.get('selected_indicators')),  # Show legend when technical indicators are enabled
+                                legend=dict(
+                                    x=1.02,
+                                    y=1,
+                                    xanchor="left",
+                                    yanchor="top",
+                                    bgcolor="rgba(0,0,0,0.5)",
+                                    bordercolor="rgba(255,255,255,0.2)",
+                                    borderwidth=1
+                                )
+                            )
+
+
+                        # Volume ratio and other charts
+                        call_volume = calls['volume'].sum()
+                        put_volume = puts['volume'].sum()
+                        fig_volume_ratio = create_donut_chart(call_volume, put_volume)
+                        fig_max_pain = create_max_pain_chart(calls, puts, S)
+                    
+                        if 'saved_ticker' in st.session_state and st.session_state.saved_ticker:
+                            current_price = get_current_price(st.session_state.saved_ticker)
+                            if current_price:
+                                gainers_df = get_screener_data("day_gainers")
+                                losers_df = get_screener_data("day_losers")
+                            
+                                if not gainers_df.empty and not losers_df.empty:
+                                    market_text = (
+                                        "<span style='color: gray; font-size: 14px;'>Gainers:</span> " +
+                                        " ".join([f"<span style='color: {st.session_state.call_color}'>{gainer['symbol']}: +{gainer['regularMarketChangePercent']:.1f}%</span> "
+                                                for _, gainer in gainers_df.head().iterrows()]) +
+                                        " | <span style='color: gray; font-size: 14px;'>Losers:</span> " +
+                                        " ".join([f"<span style='color: {st.session_state.put_color}'>{loser['symbol']}: {loser['regularMarketChangePercent']:.1f}%</span> "
+                                                for _, loser in losers_df.head().iterrows()])
+                                    )
+                                    st.markdown(market_text, unsafe_allow_html=True)
+                            
+                                # Get additional market data
+                                try:
+                                    stock_info = call_upstream('yahoo', lambda: yf.Ticker(st.session_state.saved_ticker).info)
+                                    prev_close = stock_info.get('previousClose', 0)
+                                    day_high = stock_info.get('dayHigh', 0)
+                                    day_low = stock_info.get('dayLow', 0)
+                                    day_open = stock_info.get('regularMarketOpen', 0)
+                                    change = current_price - prev_close
+                                    change_percent = (change / prev_close) * 100
+                                
+                                    # Get additional metrics
+                                    market_cap = stock_info.get('marketCap', 0)
+                                    market_cap_str = f"${market_cap/1e9:.2f}B" if market_cap >= 1e9 else f"${market_cap/1e6:.2f}M"
+                                
+                                    avg_volume = stock_info.get('averageVolume', 0)
+                                    current_volume = stock_info.get('volume', 0)
+                                    volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
+                                
+                                    fifty_two_week_high = stock_info.get('fiftyTwoWeekHigh', 0)
+                                    fifty_two_week_low = stock_info.get('fiftyTwoWeekLow', 0)
+                                    from_52_week_high = ((current_price - fifty_two_week_high) / fifty_two_week_high) * 100
+                                    from_52_week_low = ((current_price - fifty_two_week_low) / fifty_two_week_low) * 100
+                                
+                                    # Get options data if available (to calculate call-to-put ratio)
+                                    call_put_ratio_text = ""
+                                    options_volume_text = ""
+                                
+                                    try:
+                                        expirations = get_expirations(st.session_state.saved_ticker)
+                                        if expirations:
+                                            # Get nearest expiry
+                                            nearest_expiry = get_nearest_expiry(expirations)
+                                            if nearest_expiry:
+                                                calls, puts = fetch_options_for_date(st.session_state.saved_ticker, nearest_expiry, current_price)
+                                                call_volume = calls['volume'].sum()
+                                                put_volume = puts['volume'].sum()
+                                                call_oi = calls['openInterest'].sum()
+                                                put_oi = puts['openInterest'].sum()
+                                            
+                                                if put_volume > 0:
+                                                    cp_volume_ratio = call_volume / put_volume
+                                                    cp_ratio_color = st.session_state.call_color if cp_volume_ratio > 1 else st.session_state.put_color
+                                                    options_volume_text = f"<span style='color: gray;'>Call Vol:</span> <span style='color: {st.session_state.call_color}'>{call_volume:,}</span> | <span style='color: gray;'>Put Vol:</span> <span style='color: {st.session_state.put_color}'>{put_volume:,}</span>"
+                                                    call_put_ratio_text = f" | <span style='color: gray;'>C/P Ratio:</span> <span style='color: {cp_ratio_color}'>{cp_volume_ratio:.2f}</span>"
+                                            
+                                                if put_oi > 0:
+                                                    cp_oi_ratio = call_oi / put_oi
+                                                    oi_ratio_color = st.session_state.call_color if cp_oi_ratio > 1 else st.session_state.put_color
+                                                    call_put_ratio_text += f" | <span style='color: gray;'>OI Ratio:</span> <span style='color: {oi_ratio_color}'>{cp_oi_ratio:.2f}</span>"
+                                    except Exception as e:
+                                        print(f"Error fetching options data: {e}")
+
+                                    # Create market data display
+                                    price_color = st.session_state.call_color if change >= 0 else st.session_state.put_color
+                                    change_symbol = '+' if change >= 0 else ''
+                                
+                                    price_text = f"""
+                                <div style='background-color: rgba(0,0,0,0.2); padding: 10px; border-radius: 5px;'>
+                                    <span style='font-size: 24px; color: {price_color}'>
+                                        ${current_price:.2f} {change_symbol}{change:.2f} ({change_symbol}{change_percent:.2f}%)
+                                    </span><br>
+                                    <span style='color: gray; font-size: 14px;'>
+                                        Open: ${day_open:.2f} | High: ${day_high:.2f} | Low: ${day_low:.2f} | Prev Close: ${prev_close:.2f}
+                                    </span><br>
+                                    <span style='color: gray; font-size: 14px;'>
+                                        Market Cap: {market_cap_str} | Vol: {current_volume:,} ({volume_ratio:.2f}x avg)
+                                    </span><br>
+                                    <span style='color: gray; font-size: 14px;'>
+                                        52W Range: ${fifty_two_week_low:.2f} to ${fifty_two_week_high:.2f} ({from_52_week_low:.1f}% from low, {from_52_week_high:.1f}% from high)
+                                    </span>
+                                    {options_volume_text and f"<br><span style='color: gray; font-size: 14px;'>{options_volume_text}{call_put_ratio_text}</span>" or ""}
+                                </div>
+                                """
+                                    st.markdown(price_text, unsafe_allow_html=True)
+                                except Exception as e:
+                                    st.markdown(f"#### Current Price: ${current_price:.2f}")
+                                    print(f"Error fetching additional market data: {e}")
+                            
+                                st.markdown("---")
+                        # Display selected charts
+                        if "Intraday Price" in selected_charts:
+                            if 'fig_intraday' in locals():
+                                st.plotly_chart(fig_intraday, use_container_width=True, key="Dashboard_intraday_chart")
+                            else:
+                                st.warning("Could not display Intraday Price chart because data is unavailable.")
+                    
+                        supplemental_charts = []
+                        for chart, fig in [
+                            ("Gamma Exposure", fig_gamma), ("Delta Exposure", fig_delta),
+                            ("Vanna Exposure", fig_vanna), ("Charm Exposure", fig_charm),
+                            ("Speed Exposure", fig_speed), ("Vomma Exposure", fig_vomma),
+                            ("Volume Ratio", fig_volume_ratio), ("Max Pain", fig_max_pain),
+                            ("Delta-Adjusted Value Index", create_davi_chart(calls, puts, S)),
+                            ("Volume by Strike", create_volume_by_strike_chart(calls, puts, S))
+                        ]:
+                            if chart in selected_charts:
+                                supplemental_charts.append(fig)
+                    
+                        for i in range(0, len(supplemental_charts), 2):
+                            cols = st.columns(2)
+                            for j, chart in enumerate(supplemental_charts[i:i+2]):
+                                if chart is not None:
+                                    cols[j].plotly_chart(chart, use_container_width=True)
+
+                    live_region(render_dashboard_charts)
+
+                else:
+                    st.warning("Please select an expiration date to view the dashboard.")
+                    st.stop()
@@ -0,0 +1,92 @@
+# app_pages/davi.py
+# Página Delta-Adjusted Value Index (DAVI).
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+
+from app_charts import create_davi_chart
+from app_core import (compute_greeks_for_dates, expiry_selector_fragment, format_ticker, get_current_price,
+                      get_expirations, invalidate_ticker_data, save_ticker)
+from chain_fetcher import writable_copy
+from greeks_calculator import calculate_greeks
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="davi_ticker")
+        with col2:
+            st.write("")
+            st.write("")
+            if st.button("🔄", key="refresh_button_davi"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+    
+        ticker = format_ticker(user_ticker)
+    
+        if ticker != saved_ticker:
+            save_ticker(ticker)
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.warning("Please select at least one expiration date.")
+                    st.stop()
+            
+                # The issue is here - we need to make sure the Greek values are computed
+                all_calls, all_puts = compute_greeks_for_dates(ticker, selected_expiry_dates, S)
+            
+                if all_calls.empty and all_puts.empty:
+                    st.warning("No options data available for the selected dates.")
+                    st.stop()
+                
+                # Calculate delta values if they don't exist
+                if 'calc_delta' not in all_calls.columns:
+                    all_calls = writable_copy(all_calls)
+                    all_puts = writable_copy(all_puts)
+                
+                    # Calculate days to expiry for each option
+                    today = datetime.today().date()
+                    all_calls['t'] = (pd.to_datetime(all_calls['extracted_expiry']) - pd.Timestamp(today)).dt.days / 365.0
+                    all_puts['t'] = (pd.to_datetime(all_puts['extracted_expiry']) - pd.Timestamp(today)).dt.days / 365.0
+                
+                    # Define delta calculation function
+                    def compute_delta(row, flag):
+                        try:
+                            sigma = row.get("impliedVolatility", None)
+                            if sigma is None or sigma <= 0:
+                                return None
+                            t = row.get("t", None)
+                            if t is None or t <= 0:
+                                return None
+                            K = row.get("strike", None)
+                            if K is None:
+                                return None
+                            return calculate_greeks(flag, S, K, t, sigma, st.session_state.risk_free_rate)[0]
+                        except Exception:
+                            return None
+                
+                    # Calculate delta
+                    all_calls['calc_delta'] = all_calls.apply(lambda row: compute_delta(row, "c"), axis=1)
+                    all_puts['calc_delta'] = all_puts.apply(lambda row: compute_delta(row, "p"), axis=1)
+
+                fig = create_davi_chart(all_calls, all_puts, S)
+                st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,104 @@
+# app_pages/exposure.py
+# Páginas de exposição por strike (Gamma, Vanna, Delta, Charm, Speed, Vomma) e perfil de GEX.
+import streamlit as st
+
+from app_charts import exposure_bar_chart
+from app_core import (compute_greeks_for_dates, expiry_selector_fragment, format_ticker, get_current_price,
+                      get_expirations, invalidate_ticker_data, live_region, save_ticker)
+from chart_utils import create_gex_profile_chart
+from greeks_cache import get_greeks_cache
+from greeks_calculator import compute_gex_profile
+
+
+def get_gex_profile(ticker, expiry_dates, calls, puts, S):
+    """Spot-ladder GEX profile and zero-gamma level, cached per chain snapshot."""
+    risk_free_rate = st.session_state.get('risk_free_rate', 0.02)
+    profile_cache = get_greeks_cache('gex_profile', max_entries=32)
+    cache_key = profile_cache.make_key(ticker, tuple(expiry_dates), calls, puts, risk_free_rate, S)
+    return profile_cache.get_or_compute(
+        cache_key,
+        lambda: compute_gex_profile(calls, puts, S, risk_free_rate)
+    )
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    exposure_container = st.container()
+    with exposure_container:
+        st.empty()  # Clear previous content
+        page_name = st.session_state.current_page.split()[0].lower()  # gamma, vanna, delta, charm, speed, or vomma
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key=f"{page_name}_exposure_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key=f"refresh_button_{page_name}"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+        ticker = format_ticker(user_ticker)
+    
+        # Save the ticker if it changes (cached data is scoped per ticker)
+        if ticker != saved_ticker:
+            save_ticker(ticker)  # Save the ticker
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.warning("Please select at least one expiration date.")
+                    st.stop()
+            
+                def render_exposure_charts():
+                    # Re-read the cached price so every refresh tick charts against the current spot
+                    S = get_current_price(ticker)
+                    if S is None:
+                        st.error("Could not fetch current price.")
+                        return
+
+                    all_calls, all_puts = compute_greeks_for_dates(ticker, selected_expiry_dates, S)
+                
+                    if all_calls.empty and all_puts.empty:
+                        st.warning("No options data available for the selected dates.")
+                        st.stop()
+                
+                    exposure_type_map = {
+                        "Gamma Exposure": "GEX",
+                        "Vanna Exposure": "VEX",
+                        "Delta Exposure": "DEX",
+                        "Charm Exposure": "Charm",
+                        "Speed Exposure": "Speed",
+                        "Vomma Exposure": "Vomma"
+                    }
+                
+                    exposure_type = exposure_type_map[st.session_state.current_page]
+                
+                    # Modify the bar chart title to show multiple dates
+                    title = f"{st.session_state.current_page} by Strike ({len(selected_expiry_dates)} dates)"
+                    fig_bar = exposure_bar_chart(all_calls, all_puts, exposure_type, title, S)
+                    st.plotly_chart(fig_bar, use_container_width=True)
+
+                    if exposure_type == "GEX":
+                        # Dealer gamma re-evaluated across a ±10% spot ladder, with the gamma flip level
+                        gex_profile, zero_gamma = get_gex_profile(ticker, selected_expiry_dates, all_calls, all_puts, S)
+                        fig_profile = create_gex_profile_chart(
+                            gex_profile, zero_gamma, S,
+                            call_color=st.session_state.call_color,
+                            put_color=st.session_state.put_color,
+                            chart_text_size=st.session_state.chart_text_size
+                        )
+                        st.plotly_chart(fig_profile, use_container_width=True)
+
+                live_region(render_exposure_charts)
@@ -0,0 +1,234 @@
+# app_pages/gex_surface.py
+# Página GEX Surface: superfície de exposição a gamma por strike e vencimento.
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from scipy.interpolate import griddata
+
+from app_core import (compute_greeks_and_charts, format_ticker, get_current_price, get_expirations,
+                      invalidate_ticker_data, save_ticker)
+from chart_utils import calculate_strike_range
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    main_container = st.container()
+    with main_container:
+        # Layout for ticker input and refresh button
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input(
+                "Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):",
+                value=st.session_state.get('saved_ticker', ''),
+                key="gex_surface_ticker"
+            )
+        with col2:
+            st.write("")  # Spacer
+            st.write("")  # Spacer
+            if st.button("🔄", key="refresh_button_gex"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+
+        # Format and save ticker
+        ticker = format_ticker(user_ticker)
+        if ticker != st.session_state.get('saved_ticker', ''):
+            save_ticker(ticker)
+
+        if ticker:
+            # Fetch current price
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            # Get options data
+            available_dates = get_expirations(ticker)
+
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+                st.stop()
+
+            # Multiselect for expiration dates with no default selection
+            selected_expiry_dates = st.multiselect(
+                "Select Expiration Dates (1 for 2D chart, 2+ for 3D surface):",
+                options=available_dates,
+                default=None,
+                key="gex_date_selector"
+            )
+
+            # Store the user's selection
+            st.session_state.gex_selected_dates = selected_expiry_dates
+
+            # Proceed only if the user has selected at least one date
+            if not selected_expiry_dates:
+                st.info("Please select at least one expiration date to generate the chart.")
+                st.stop()
+
+            try:
+                # Fetch options data
+                with st.spinner('Fetching options data...'):
+                    all_data = []  # Store all computed GEX data
+
+                    # Calculate strike range using percentage-based setting
+                    strike_range = calculate_strike_range(S)
+                    min_strike = S - strike_range
+                    max_strike = S + strike_range
+
+                    for date in selected_expiry_dates:
+                        # Compute greeks using the same function as gamma exposure chart
+                        calls, puts, _, t, selected_expiry, today = compute_greeks_and_charts(ticker, date, "gex", S)
+                    
+                        if calls is not None and puts is not None:
+                            days_to_exp = (selected_expiry - today).days
+                        
+                            # Filter and process data within strike range
+                            calls = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
+                            puts = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+                        
+                            for _, row in calls.iterrows():
+                                if not pd.isna(row['GEX']) and abs(row['GEX']) >= 100:
+                                    all_data.append({
+                                        'strike': row['strike'],
+                                        'days': days_to_exp,
+                                        'gex': row['GEX']
+                                    })
+                        
+                            for _, row in puts.iterrows():
+                                if not pd.isna(row['GEX']) and abs(row['GEX']) >= 100:
+                                    all_data.append({
+                                        'strike': row['strike'],
+                                        'days': days_to_exp,
+                                        'gex': -row['GEX']
+                                    })
+
+                    if not all_data:
+                        st.warning("No valid GEX data available.")
+                        st.stop()
+
+                    # Convert to DataFrame
+                    df = pd.DataFrame(all_data)
+
+                    if len(selected_expiry_dates) == 1:
+                        # 2D Plot for single expiration
+                        fig = go.Figure()
+                    
+                        # Filter data for the single expiration date
+                        single_date_df = df[df['days'] == df['days'].iloc[0]]
+                    
+                        # Group by strike and sum GEX values
+                        grouped_gex = single_date_df.groupby('strike')['gex'].sum().reset_index()
+                    
+                        # Create line plot with color gradient based on GEX sign
+                        for i in range(len(grouped_gex) - 1):
+                            if grouped_gex['gex'].iloc[i] >= 0:
+                                color = st.session_state.call_color
+                            else:
+                                color = st.session_state.put_color
+                            
+                            fig.add_trace(go.Scatter(
+                                x=grouped_gex['strike'].iloc[i:i+2],
+                                y=grouped_gex['gex'].iloc[i:i+2],
+                                mode='lines',
+                                line=dict(color=color, width=2),
+                                showlegend=False,
+                                hovertemplate='Strike: %{x:.2f}<br>GEX: %{y:,.0f}<extra></extra>'
+                            ))
+                    
+                        # Add current price line
+                        fig.add_vline(
+                            x=S,
+                            line_dash="dash",
+                            line_color="white",
+                            opacity=0.7,
+                            annotation_text=f"{S:.2f}",
+                            annotation_position="top"
+                        )
+                    
+                        # Update layout with adjusted range
+                        padding = (max_strike - min_strike) * 0.05
+                        fig.update_layout(
+                            template="plotly_dark",
+                            title=f'Gamma Exposure Profile - {ticker} (Expiration: {selected_expiry_dates[0]})',
+                            xaxis_title='Strike Price',
+                            yaxis_title='Gamma Exposure',
+                            width=800,
+                            height=600,
+                            xaxis=dict(range=[min_strike - padding, max_strike + padding])
+                        )
+
+                    else:
+                        # 3D Surface Plot for multiple expirations
+                        # Create meshgrid with adjusted strike range
+                        padding = (max_strike - min_strike) * 0.05
+                        unique_strikes = np.linspace(min_strike - padding, max_strike + padding, 200)
+                        unique_days = np.linspace(df['days'].min(), df['days'].max(), 200)
+                        X, Y = np.meshgrid(unique_strikes, unique_days)
+
+                        # Aggregate GEX values by strike and days
+                        df_grouped = df.groupby(['strike', 'days'])['gex'].sum().reset_index()
+
+                        # Interpolation
+                        Z = griddata(
+                            (df_grouped['strike'], df_grouped['days']),
+                            df_grouped['gex'],
+                            (X, Y),
+                            method='linear',
+                            fill_value=0
+                        )
+
+                        # Create custom colorscale using call/put colors
+                        call_rgb = [int(st.session_state.call_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)]
+                        put_rgb = [int(st.session_state.put_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)]
+                    
+                        colorscale = [
+                            [0, f'rgb({put_rgb[0]}, {put_rgb[1]}, {put_rgb[2]})'],
+                            [0.5, 'rgb(255, 215, 0)'],  # Gold at zero
+                            [1, f'rgb({call_rgb[0]}, {call_rgb[1]}, {call_rgb[2]})']
+                        ]
+
+                        # Create 3D surface plot
+                        fig = go.Figure()
+
+                        # Add GEX surface with custom colorscale
+                        fig.add_trace(go.Surface(
+                            x=X, y=Y, z=Z,
+                            colorscale=colorscale,
+                            opacity=1.0,
+                            colorbar=dict(
+                                title=dict(text='Net GEX', side='right'),
+                                tickformat=',.0f'
+                            ),
+                            hovertemplate='Strike: %{x:.2f}<br>Days: %{y:.0f}<br>Net GEX: %{z:,.0f}<extra></extra>'
+                        ))
+
+                        # Add current price plane
+                        fig.add_trace(go.Surface(
+                            x=[[S, S], [S, S]],
+                            y=[[df['days'].min(), df['days'].min()], [df['days'].max(), df['days'].max()]],
+                            z=[[df['gex'].min(), df['gex'].max()], [df['gex'].min(), df['gex'].max()]],
+                            opacity=0.3,
+                            showscale=False,
+                            colorscale='oranges',
+                            name='Current Price',
+                            hovertemplate='Current Price: $%{x:.2f}<extra></extra>'
+                        ))
+
+                        # Update layout
+                        fig.update_layout(
+                            template="plotly_dark",
+                            title=f'Gamma Exposure Surface - {ticker}',
+                            scene=dict(
+                                xaxis=dict(title='Strike Price'),
+                                yaxis=dict(title='Days to Expiration'),
+                                zaxis=dict(title='Gamma Exposure', tickformat=',.0f')
+                            ),
+                            width=800,
+                            height=800
+                        )
+
+                    st.plotly_chart(fig, use_container_width=True)
+
+            except Exception as e:
+                st.error(f"Error generating chart: {str(e)}")
+    st.stop()
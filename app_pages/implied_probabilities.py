@@ -0,0 +1,643 @@
+# app_pages/implied_probabilities.py
+# Página Implied Probabilities: distribuição de probabilidades implícita nas opções.
+from datetime import datetime
+from math import log, sqrt
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from scipy.stats import norm
+from plotly.subplots import make_subplots
+
+from app_core import (compute_greeks_for_dates, expiry_selector_fragment, format_ticker, get_current_price,
+                      get_expirations, invalidate_ticker_data, save_ticker)
+
+
+def calculate_implied_move(S, calls_df, puts_df):
+    """Calculate implied move based on straddle prices."""
+    try:
+        # Find ATM strike (closest to current price)
+        all_strikes = pd.concat([calls_df['strike'], puts_df['strike']]).unique()
+        atm_strike = min(all_strikes, key=lambda x: abs(x - S))
+        
+        # Get ATM call and put prices
+        atm_call = calls_df[calls_df['strike'] == atm_strike]
+        atm_put = puts_df[puts_df['strike'] == atm_strike]
+        
+        if not atm_call.empty and not atm_put.empty:
+            call_price = atm_call['lastPrice'].iloc[0] if 'lastPrice' in atm_call.columns else atm_call['ask'].iloc[0]
+            put_price = atm_put['lastPrice'].iloc[0] if 'lastPrice' in atm_put.columns else atm_put['ask'].iloc[0]
+            
+            straddle_price = call_price + put_price
+            implied_move_pct = (straddle_price / S) * 100
+            implied_move_dollars = straddle_price
+            
+            return {
+                'atm_strike': atm_strike,
+                'straddle_price': straddle_price,
+                'implied_move_pct': implied_move_pct,
+                'implied_move_dollars': implied_move_dollars,
+                'upper_range': S + implied_move_dollars,
+                'lower_range': S - implied_move_dollars
+            }
+    except Exception as e:
+        print(f"Error calculating implied move: {e}")
+    
+    return None
+
+def find_probability_strikes(calls_df, puts_df, S, expiry_date, target_prob=0.5):
+    """Find strikes where there's exactly target_prob chance of being above/below at expiration."""
+    try:
+        # Calculate probability distribution first
+        prob_df = calculate_probability_distribution(calls_df, puts_df, S, expiry_date)
+        
+        if prob_df.empty:
+            return None
+        
+        # For 50% probability: find the strike where prob_above ≈ 0.5 (median)
+        # For other probabilities: find strikes where prob_above = target_prob and prob_above = 1-target_prob
+        
+        # Industry standard: Use target_prob directly as delta levels
+        # For 16 delta: find strikes where prob_above = 0.16 and prob_above = 0.84
+        # For 30 delta: find strikes where prob_above = 0.30 and prob_above = 0.70
+        
+        # Lower bound: target_prob chance of being above
+        lower_prob = target_prob
+        # Upper bound: (1-target_prob) chance of being above  
+        upper_prob = 1 - target_prob
+        
+        # Find strike where prob_above = lower_prob (lower bound of confidence interval)
+        prob_above_target = prob_df.iloc[(prob_df['prob_above'] - lower_prob).abs().argsort()[:1]]
+        strike_above = prob_above_target['strike'].iloc[0] if not prob_above_target.empty else None
+        actual_prob_above = prob_above_target['prob_above'].iloc[0] if not prob_above_target.empty else None
+        
+        # Find strike where prob_above = upper_prob (upper bound of confidence interval)
+        prob_below_target = prob_df.iloc[(prob_df['prob_above'] - upper_prob).abs().argsort()[:1]]
+        strike_below = prob_below_target['strike'].iloc[0] if not prob_below_target.empty else None
+        actual_prob_below = 1 - prob_below_target['prob_above'].iloc[0] if not prob_below_target.empty else None
+        
+        return {
+            'strike_above': strike_above,  # Strike with target_prob chance of being above
+            'prob_above': actual_prob_above,
+            'strike_below': strike_below,  # Strike with target_prob chance of being below  
+            'prob_below': actual_prob_below,
+            'target_probability': target_prob
+        }
+    except Exception as e:
+        print(f"Error finding probability strikes: {e}")
+        return None
+
+def calculate_probability_distribution(calls_df, puts_df, S, expiry_date):
+    """Calculate probability distribution from option prices using risk-neutral probabilities."""
+    try:
+        # Get all strikes and sort them
+        all_strikes = sorted(pd.concat([calls_df['strike'], puts_df['strike']]).unique())
+        
+        probabilities = []
+        strikes_data = []
+        
+        today = datetime.today().date()
+        if isinstance(expiry_date, str):
+            expiry_date = datetime.strptime(expiry_date, "%Y-%m-%d").date()
+        
+        t_days = (expiry_date - today).days
+        t = max(t_days / 365.0, 1/365)  # At least 1 day
+        r = st.session_state.risk_free_rate
+        
+        for strike in all_strikes:
+            # Get call and put data for this strike
+            call_data = calls_df[calls_df['strike'] == strike]
+            put_data = puts_df[puts_df['strike'] == strike]
+            
+            # Prefer using implied volatility to calculate risk-neutral probabilities
+            iv = None
+            if not call_data.empty and 'impliedVolatility' in call_data.columns:
+                iv = call_data['impliedVolatility'].iloc[0]
+            elif not put_data.empty and 'impliedVolatility' in put_data.columns:
+                iv = put_data['impliedVolatility'].iloc[0]
+            
+            if iv and iv > 0:
+                # Calculate risk-neutral probability using Black-Scholes
+                try:
+                    d1 = (log(S / strike) + (r + 0.5 * iv**2) * t) / (iv * sqrt(t))
+                    d2 = d1 - iv * sqrt(t)
+                    
+                    # Risk-neutral probability of finishing above strike
+                    prob_above = norm.cdf(d2)  # Use d2 for risk-neutral probability
+                    
+                    probabilities.append(prob_above)
+                    strikes_data.append(strike)
+                except:
+                    continue
+            else:
+                # Fallback to delta if available
+                if not call_data.empty and 'calc_delta' in call_data.columns:
+                    delta = call_data['calc_delta'].iloc[0]
+                    prob_above = delta
+                elif not put_data.empty and 'calc_delta' in put_data.columns:
+                    delta = put_data['calc_delta'].iloc[0]
+                    prob_above = 1 + delta  # Put delta is negative
+                else:
+                    continue
+                
+                probabilities.append(prob_above)
+                strikes_data.append(strike)
+        
+        if not strikes_data:
+            return pd.DataFrame()
+            
+        # Sort by strike
+        prob_df = pd.DataFrame({
+            'strike': strikes_data,
+            'prob_above': probabilities,
+            'prob_below': [1 - p for p in probabilities]
+        }).sort_values('strike').reset_index(drop=True)
+        
+        return prob_df
+        
+    except Exception as e:
+        print(f"Error calculating probability distribution: {e}")
+        return pd.DataFrame()
+
+def create_implied_probabilities_chart(prob_df, S, prob_16_data, prob_30_data, implied_move_data):
+    """Create simplified implied probabilities visualization focusing on key levels."""
+    try:
+        # Get colors from session state
+        call_color = st.session_state.call_color
+        put_color = st.session_state.put_color
+
+        # Create two simple bar charts: one for probability levels and one for expected range
+        fig = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=(
+                'Key Probability Levels',
+                'Expected Trading Range'
+            ),
+            specs=[[{"type": "bar"}, {"type": "bar"}]]
+        )
+        
+        # First subplot: Key Probability Levels
+        prob_levels = []
+        
+        # Add current price
+        prob_levels.append({
+            'level': 'Current Price',
+            'strike': S,
+            'type': 'neutral'
+        })
+        
+                # Add probability levels (delta-based)
+        if prob_16_data:
+            if prob_16_data['strike_above']:
+                prob_levels.append({
+                    'level': '16Δ Above (1σ)',
+                    'strike': prob_16_data['strike_above'],
+                    'type': 'call'
+                })
+            if prob_16_data['strike_below']:
+                prob_levels.append({
+                    'level': '16Δ Below (1σ)',
+                    'strike': prob_16_data['strike_below'],
+                    'type': 'put'
+                })
+        
+        if prob_30_data:
+            if prob_30_data['strike_above']:
+                prob_levels.append({
+                    'level': '30Δ Above',
+                    'strike': prob_30_data['strike_above'],
+                    'type': 'call'
+                })
+            if prob_30_data['strike_below']:
+                prob_levels.append({
+                    'level': '30Δ Below', 
+                    'strike': prob_30_data['strike_below'],
+                    'type': 'put'
+                })
+        
+        if prob_levels:
+            levels_df = pd.DataFrame(prob_levels)
+            # Sort by strike price for better visualization
+            levels_df = levels_df.sort_values('strike')
+            
+            fig.add_trace(
+                go.Bar(
+                    x=levels_df['level'],
+                    y=levels_df['strike'],
+                    name='Probability Levels',
+                    marker_color=[
+                        call_color if row['type'] == 'call' 
+                        else put_color if row['type'] == 'put'
+                        else 'yellow' for _, row in levels_df.iterrows()
+                    ],
+                    text=[f"${v:.2f}" for v in levels_df['strike']],
+                    textposition='auto',
+                    textfont=dict(size=st.session_state.chart_text_size)
+                ),
+                row=1, col=1
+            )
+        
+        # Second subplot: Expected Trading Range
+        if implied_move_data:
+            range_data = [
+                {'level': 'Lower Range', 'value': implied_move_data['lower_range'], 'type': 'put'},
+                {'level': 'Current Price', 'value': S, 'type': 'neutral'},
+                {'level': 'Upper Range', 'value': implied_move_data['upper_range'], 'type': 'call'}
+            ]
+            range_df = pd.DataFrame(range_data)
+            
+            fig.add_trace(
+                go.Bar(
+                    x=range_df['level'],
+                    y=range_df['value'],
+                    name='Trading Range',
+                    marker_color=[
+                        put_color if row['type'] == 'put'
+                        else call_color if row['type'] == 'call'
+                        else 'yellow' for _, row in range_df.iterrows()
+                    ],
+                    text=[f"${v:.2f}" for v in range_df['value']],
+                    textposition='auto',
+                    textfont=dict(size=st.session_state.chart_text_size)
+                ),
+                row=1, col=2
+            )
+        
+        # Update layout
+        fig.update_layout(
+            height=500,  # Reduced height since we have fewer elements
+            title=dict(
+                text="Implied Probabilities Analysis",
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            showlegend=False,  # No need for legend
+            template="plotly_dark",
+            # Add more vertical space for labels
+            margin=dict(t=100, b=50)
+        )
+        
+        # Update subplot titles
+        for i in fig['layout']['annotations']:
+            i['font'] = dict(size=st.session_state.chart_text_size + 4)
+        
+        # Update axes
+        fig.update_xaxes(
+            title_text="Probability Level",
+            title_font=dict(size=st.session_state.chart_text_size),
+            tickfont=dict(size=st.session_state.chart_text_size),
+            row=1, col=1
+        )
+        fig.update_yaxes(
+            title_text="Strike Price ($)",
+            title_font=dict(size=st.session_state.chart_text_size),
+            tickfont=dict(size=st.session_state.chart_text_size),
+            row=1, col=1
+        )
+        fig.update_xaxes(
+            title_text="Price Level",
+            title_font=dict(size=st.session_state.chart_text_size),
+            tickfont=dict(size=st.session_state.chart_text_size),
+            row=1, col=2
+        )
+        fig.update_yaxes(
+            title_text="Price ($)",
+            title_font=dict(size=st.session_state.chart_text_size),
+            tickfont=dict(size=st.session_state.chart_text_size),
+            row=1, col=2
+        )
+        
+        return fig
+    except Exception as e:
+        print(f"Error creating implied probabilities chart: {e}")
+        return go.Figure()
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()  # Clear previous content
+    
+        # Header
+        st.title("🎲 Implied Probabilities Analysis")
+        st.markdown("""
+    **Analyze option-implied probabilities and expected moves based on market pricing.**
+    
+    This page calculates:
+    - **16 Delta levels (1σ)** - Industry standard one standard deviation levels (16%/84% probability)
+    - **30 Delta levels** - Common institutional trading levels (30%/70% probability)
+    - **Implied move** - Expected price range based on straddle pricing
+    - **Probability distribution** - Market-implied likelihood of price levels using Black-Scholes
+    - **Trading ranges** - Expected breakout levels and support/resistance zones
+    """)
+    
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="implied_prob_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key="refresh_button_implied_prob"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+    
+        ticker = format_ticker(user_ticker)
+    
+        # Save the ticker if it changes (cached data is scoped per ticker)
+        if ticker != saved_ticker:
+            save_ticker(ticker)  # Save the ticker
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.info("Please select at least one expiration date.")
+                    st.stop()
+            
+                # For implied probabilities, we typically focus on the nearest expiry
+                # But allow multiple for comparison
+                all_calls, all_puts = compute_greeks_for_dates(ticker, selected_expiry_dates, S)
+            
+                if all_calls.empty and all_puts.empty:
+                    st.warning("No options data available for the selected dates.")
+                    st.stop()
+            
+                # Create tabs for different analyses
+                tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "🎯 Delta Levels", "📈 Probability Charts", "📋 Detailed Analysis"])
+            
+                with tab1:
+                    st.subheader("Key Probability Metrics")
+                
+                    # Calculate key metrics for the first (nearest) expiry
+                    nearest_expiry = selected_expiry_dates[0]
+                    nearest_calls = all_calls[all_calls['extracted_expiry'] == pd.to_datetime(nearest_expiry).date()]
+                    nearest_puts = all_puts[all_puts['extracted_expiry'] == pd.to_datetime(nearest_expiry).date()]
+                
+                    # Calculate implied move
+                    implied_move_data = calculate_implied_move(S, nearest_calls, nearest_puts)
+                
+                    # Calculate delta-based probability strikes (industry standard)
+                    prob_16_data = find_probability_strikes(nearest_calls, nearest_puts, S, nearest_expiry, 0.16)  # ~1 standard deviation
+                    prob_30_data = find_probability_strikes(nearest_calls, nearest_puts, S, nearest_expiry, 0.30)  # Common institutional level
+                
+                    # Display metrics in columns
+                    col1, col2, col3 = st.columns(3)
+                
+                    with col1:
+                        st.metric("Current Price", f"${S:.2f}")
+                        if implied_move_data:
+                            st.metric("Implied Move", f"${implied_move_data['implied_move_dollars']:.2f}", 
+                                     f"({implied_move_data['implied_move_pct']:.1f}%)")
+                
+                    with col2:
+                        if prob_16_data and prob_16_data['strike_above']:
+                            st.metric("16Δ Above (1σ) - 16%", f"${prob_16_data['strike_above']:.2f}", 
+                                     f"Actual: {prob_16_data['prob_above']*100:.1f}% above")
+                        if prob_16_data and prob_16_data['strike_below']:
+                            st.metric("16Δ Below (1σ) - 84%", f"${prob_16_data['strike_below']:.2f}", 
+                                     f"Actual: {prob_16_data['prob_below']*100:.1f}% below")
+                
+                    with col3:
+                        if prob_30_data and prob_30_data['strike_above']:
+                            st.metric("30Δ Above - 30%", f"${prob_30_data['strike_above']:.2f}", 
+                                     f"Actual: {prob_30_data['prob_above']*100:.1f}% above")
+                        if prob_30_data and prob_30_data['strike_below']:
+                            st.metric("30Δ Below - 70%", f"${prob_30_data['strike_below']:.2f}", 
+                                     f"Actual: {prob_30_data['prob_below']*100:.1f}% below")
+                
+                    # Expected trading range with better formatting
+                    if implied_move_data:
+                        st.subheader("📊 Expected Trading Range")
+                    
+                        range_col1, range_col2, range_col3 = st.columns(3)
+                        with range_col1:
+                            st.metric("Lower Range", f"${implied_move_data['lower_range']:.2f}")
+                        with range_col2:
+                            st.metric("Upper Range", f"${implied_move_data['upper_range']:.2f}")
+                        with range_col3:
+                            range_width = implied_move_data['upper_range'] - implied_move_data['lower_range']
+                            range_pct = (range_width / S) * 100
+                            st.metric("Range Width", f"${range_width:.2f}", f"({range_pct:.2f}%)")
+                
+                    # Probability levels relative to current price with better formatting
+                    st.subheader("🎯 Price Targets & Movement Required")
+                
+                    # Create tabs for different delta levels (industry standard)
+                    prob_tab1, prob_tab2 = st.tabs(["16Δ Levels (1σ) - 16%/84%", "30Δ Levels - 30%/70%"])
+                
+                    with prob_tab1:
+                        if prob_16_data and prob_16_data['strike_above'] and prob_16_data['strike_below']:
+                            strike_16_above = prob_16_data['strike_above']
+                            strike_16_below = prob_16_data['strike_below']
+                        
+                            # Ensure proper ordering
+                            if strike_16_above < strike_16_below:
+                                strike_16_above, strike_16_below = strike_16_below, strike_16_above
+                        
+                            distance_above = strike_16_above - S
+                            distance_below = strike_16_below - S
+                            distance_pct_above = (distance_above / S) * 100
+                            distance_pct_below = (distance_below / S) * 100
+                        
+                            # Upper and lower bounds
+                            bound_col1, bound_col2 = st.columns(2)
+                        
+                            with bound_col1:
+                                st.markdown("**🔺 16Δ Upper Level (1σ) - 16% Above**")
+                                st.metric("Strike Price", f"${strike_16_above:.2f}")
+                                st.metric("Distance", f"${distance_above:.2f}", f"⬆️ {distance_pct_above:+.2f}%")
+                            
+                            with bound_col2:
+                                st.markdown("**🔻 16Δ Lower Level (1σ) - 84% Above**")
+                                st.metric("Strike Price", f"${strike_16_below:.2f}")
+                                st.metric("Distance", f"${abs(distance_below):.2f}", f"⬇️ {distance_pct_below:+.2f}%")
+                        
+                            # Range analysis
+                            st.markdown("**📏 Range Analysis**")
+                            range_col1, range_col2, range_col3 = st.columns(3)
+                        
+                            with range_col1:
+                                range_width = strike_16_above - strike_16_below
+                                st.metric("Total Range", f"${range_width:.2f}")
+                        
+                            with range_col2:
+                                range_pct = (range_width / S) * 100
+                                st.metric("Range %", f"{range_pct:.2f}%")
+                        
+                            with range_col3:
+                                # Calculate if current price is within the range
+                                if strike_16_below <= S <= strike_16_above:
+                                    position = "Within Range ✅"
+                                elif S > strike_16_above:
+                                    position = "Above Range ⬆️"
+                                else:
+                                    position = "Below Range ⬇️"
+                                st.metric("Current Position", position)
+                        
+                            # Explanation
+                            st.info(f"💡 **16 Delta Levels (1σ) - 16%/84%**: These represent approximate one standard deviation levels. The upper level has a 16% probability above, lower level has 84% probability above. There's roughly a 68% probability the stock will finish between ${strike_16_below:.2f} and ${strike_16_above:.2f} at expiration.")
+                
+                    with prob_tab2:
+                        if prob_30_data and prob_30_data['strike_above'] and prob_30_data['strike_below']:
+                            strike_30_above = prob_30_data['strike_above']
+                            strike_30_below = prob_30_data['strike_below']
+                        
+                            # Ensure proper ordering
+                            if strike_30_above < strike_30_below:
+                                strike_30_above, strike_30_below = strike_30_below, strike_30_above
+                        
+                            distance_above = strike_30_above - S
+                            distance_below = strike_30_below - S
+                            distance_pct_above = (distance_above / S) * 100
+                            distance_pct_below = (distance_below / S) * 100
+                        
+                            # Upper and lower bounds
+                            bound_col1, bound_col2 = st.columns(2)
+                        
+                            with bound_col1:
+                                st.markdown("**🔺 30Δ Upper Level - 30% Above**")
+                                st.metric("Strike Price", f"${strike_30_above:.2f}")
+                                st.metric("Distance", f"${distance_above:.2f}", f"⬆️ {distance_pct_above:+.2f}%")
+                            
+                            with bound_col2:
+                                st.markdown("**🔻 30Δ Lower Level - 70% Above**")
+                                st.metric("Strike Price", f"${strike_30_below:.2f}")
+                                st.metric("Distance", f"${abs(distance_below):.2f}", f"⬇️ {distance_pct_below:+.2f}%")
+                        
+                            # Range analysis
+                            st.markdown("**📏 Range Analysis**")
+                            range_col1, range_col2, range_col3 = st.columns(3)
+                        
+                            with range_col1:
+                                range_width = strike_30_above - strike_30_below
+                                st.metric("Total Range", f"${range_width:.2f}")
+                        
+                            with range_col2:
+                                range_pct = (range_width / S) * 100
+                                st.metric("Range %", f"{range_pct:.2f}%")
+                        
+                            with range_col3:
+                                # Calculate if current price is within the range
+                                if strike_30_below <= S <= strike_30_above:
+                                    position = "Within Range ✅"
+                                elif S > strike_30_above:
+                                    position = "Above Range ⬆️"
+                                else:
+                                    position = "Below Range ⬇️"
+                                st.metric("Current Position", position)
+                        
+                            # Explanation
+                            st.info(f"💡 **30 Delta Levels - 30%/70%**: Common institutional trading levels. The upper level has a 30% probability above, lower level has 70% probability above. There's roughly a 40% probability the stock will finish between ${strike_30_below:.2f} and ${strike_30_above:.2f} at expiration.")
+            
+                with tab2:
+                    st.subheader("Probability Levels Analysis")
+                
+                    # Create a detailed table of probability levels
+                    prob_levels = [0.10, 0.16, 0.20, 0.25, 0.30, 0.40, 0.50, 0.60, 0.70, 0.75, 0.80, 0.84, 0.90]
+                    prob_data = []
+                
+                    for prob in prob_levels:
+                        prob_info = find_probability_strikes(nearest_calls, nearest_puts, S, nearest_expiry, prob)
+                        if prob_info:
+                            prob_data.append({
+                                'Probability Level': f"{prob*100:.0f}%",
+                                'Strike Above': f"${prob_info['strike_above']:.2f}" if prob_info['strike_above'] else "N/A",
+                                'Strike Below': f"${prob_info['strike_below']:.2f}" if prob_info['strike_below'] else "N/A",
+                                'Actual Prob Above': f"{prob_info['prob_above']*100:.1f}%" if prob_info['prob_above'] else "N/A",
+                                'Actual Prob Below': f"{prob_info['prob_below']*100:.1f}%" if prob_info['prob_below'] else "N/A"
+                            })
+                
+                    if prob_data:
+                        prob_df_display = pd.DataFrame(prob_data)
+                        st.dataframe(prob_df_display, use_container_width=True)
+                
+                    # Explanatory text
+                    st.markdown("""
+                **Understanding Probability Levels:**
+                - **50% Probability**: Even odds - coin flip probability of being above/below
+                - **70% Probability**: High confidence levels for directional moves
+                - **16% Probability**: Approximately one standard deviation (84% chance of staying within range)
+                - **84% Probability**: Very high confidence levels, approximately one standard deviation
+                - **90% Probability**: Extreme confidence levels for range-bound strategies
+                
+                **Key Insight:** The wider the gap between "Strike Above" and "Strike Below" for the same probability, 
+                the higher the implied volatility and expected price movement.
+                """)
+            
+                with tab3:
+                    st.subheader("Probability Visualization")
+                
+                    # Calculate probability distribution
+                    prob_df = calculate_probability_distribution(nearest_calls, nearest_puts, S, nearest_expiry)
+                
+                    # Create comprehensive chart
+                    if not prob_df.empty:
+                        fig = create_implied_probabilities_chart(prob_df, S, prob_16_data, prob_30_data, implied_move_data)
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.warning("Could not calculate probability distribution.")
+            
+                with tab4:
+                    st.subheader("Detailed Probability Analysis")
+                
+                    # Show probability distribution table
+                    if not prob_df.empty:
+                        # Add additional calculations
+                        prob_df['distance_from_current'] = abs(prob_df['strike'] - S)
+                        prob_df['prob_above_pct'] = prob_df['prob_above'] * 100
+                        prob_df['prob_below_pct'] = prob_df['prob_below'] * 100
+                    
+                        # Format for display
+                        display_df = prob_df[['strike', 'prob_above_pct', 'prob_below_pct', 'distance_from_current']].copy()
+                        display_df.columns = ['Strike', 'Prob Above (%)', 'Prob Below (%)', 'Distance from Current']
+                        display_df['Strike'] = display_df['Strike'].apply(lambda x: f"${x:.2f}")
+                        display_df['Prob Above (%)'] = display_df['Prob Above (%)'].apply(lambda x: f"{x:.1f}%")
+                        display_df['Prob Below (%)'] = display_df['Prob Below (%)'].apply(lambda x: f"{x:.1f}%")
+                        display_df['Distance from Current'] = display_df['Distance from Current'].apply(lambda x: f"${x:.2f}")
+                    
+                        st.dataframe(display_df, use_container_width=True)
+                
+                    # Additional metrics
+                    if implied_move_data:
+                        st.subheader("Implied Move Analysis")
+                    
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write("**ATM Straddle Analysis:**")
+                            st.write(f"ATM Strike: ${implied_move_data['atm_strike']:.2f}")
+                            st.write(f"Straddle Price: ${implied_move_data['straddle_price']:.2f}")
+                            st.write(f"Implied Move: {implied_move_data['implied_move_pct']:.2f}%")
+                    
+                        with col2:
+                            st.write("**Breakeven Levels:**")
+                            st.write(f"Upper Breakeven: ${implied_move_data['upper_range']:.2f}")
+                            st.write(f"Lower Breakeven: ${implied_move_data['lower_range']:.2f}")
+                        
+                            # Calculate probability of staying within range
+                            if not prob_df.empty:
+                                within_range = prob_df[
+                                    (prob_df['strike'] >= implied_move_data['lower_range']) & 
+                                    (prob_df['strike'] <= implied_move_data['upper_range'])
+                                ]
+                                if not within_range.empty:
+                                    prob_within = within_range['prob_above'].iloc[-1] - within_range['prob_above'].iloc[0]
+                                    st.write(f"Prob within range: {prob_within*100:.1f}%")
+                
+                    st.markdown("""
+                **Note:** Probabilities are derived from option delta values and implied volatilities. 
+                These represent the market's implied view of future price movements, not predictions.
+                """)
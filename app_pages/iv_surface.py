@@ -0,0 +1,311 @@
+# app_pages/iv_surface.py
+# Página IV Surface: superfície de volatilidade implícita interpolada.
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from scipy.interpolate import griddata
+
+from app_core import (fetch_options_for_date, format_ticker, get_current_price, get_expirations,
+                      invalidate_ticker_data, save_ticker)
+from chart_utils import calculate_strike_range
+
+
+def create_iv_surface(calls_df, puts_df, current_price, selected_dates=None):
+    """Create data for IV surface plot with enhanced smoothing and data validation."""
+    # Filter by selected dates if provided
+    if selected_dates:
+        calls_df = calls_df[calls_df['extracted_expiry'].isin(selected_dates)]
+        puts_df = puts_df[puts_df['extracted_expiry'].isin(selected_dates)]
+    
+    # Combine calls and puts and drop rows with NaN values
+    options_data = pd.concat([calls_df, puts_df])
+    options_data = options_data.dropna(subset=['impliedVolatility', 'strike', 'extracted_expiry'])
+    
+    if options_data.empty:
+        st.warning("No valid options data available for IV surface.")
+        return None, None, None
+    
+    # Calculate moneyness and months to expiration
+    options_data['moneyness'] = options_data['strike'].apply(
+        lambda x: (x / current_price) * 100
+    )
+    
+    options_data['months'] = options_data['extracted_expiry'].apply(
+        lambda x: (x - datetime.now().date()).days / 30.44
+    )
+    
+    # Remove extreme values
+    for col in ['impliedVolatility', 'moneyness', 'months']:
+        q1 = options_data[col].quantile(0.01)
+        q99 = options_data[col].quantile(0.99)
+        options_data = options_data[
+            (options_data[col] >= q1) & 
+            (options_data[col] <= q99)
+        ]
+    
+    if options_data.empty:
+        st.warning("No valid data points after filtering.")
+        return None, None, None
+    
+    # Create grid for interpolation
+    moneyness_range = np.linspace(85, 115, 200)
+    months_range = np.linspace(
+        options_data['months'].min(),
+        options_data['months'].max(),
+        200
+    )
+    
+    # Create meshgrid
+    X, Y = np.meshgrid(moneyness_range, months_range)
+    
+    try:
+        # Prepare data for interpolation
+        points = options_data[['moneyness', 'months']].values
+        values = options_data['impliedVolatility'].values * 100
+        
+        # Initial interpolation
+        Z = griddata(
+            points,
+            values,
+            (X, Y),
+            method='linear',  # Start with linear interpolation
+            fill_value=np.nan
+        )
+        
+        # Fill remaining NaN values with nearest neighbor interpolation
+        mask = np.isnan(Z)
+        Z[mask] = griddata(
+            points,
+            values,
+            (X[mask], Y[mask]),
+            method='nearest'
+        )
+        
+        # Apply Gaussian smoothing with multiple passes
+        if not np.isnan(Z).any():  # Only smooth if we have valid data
+            from scipy.ndimage import gaussian_filter
+            Z = gaussian_filter(Z, sigma=1.5)
+            Z = gaussian_filter(Z, sigma=0.75)
+            Z = gaussian_filter(Z, sigma=0.5)
+        
+        return X, Y, Z
+        
+    except Exception as e:
+        st.error(f"Error creating IV surface: {str(e)}")
+        return None, None, None
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    main_container = st.container()
+    with main_container:
+        # Layout for ticker input and refresh button
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input(
+                "Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):",
+                value=st.session_state.get('saved_ticker', ''),
+                key="iv_skew_ticker"
+            )
+        with col2:
+            st.write("")  # Spacer
+            st.write("")  # Spacer
+            if st.button("🔄", key="refresh_button_skew"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+
+        # Format and save ticker
+        ticker = format_ticker(user_ticker)
+        if ticker != st.session_state.get('saved_ticker', ''):
+            save_ticker(ticker)
+
+        if ticker:
+            # Fetch current price
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            # Get options data
+            available_dates = get_expirations(ticker)
+
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+                st.stop()
+
+            # Multiselect for expiration dates with no default selection
+            selected_expiry_dates = st.multiselect(
+                "Select Expiration Dates (1 for 2D chart, 2+ for 3D surface):",
+                options=available_dates,
+                default=None,  # Explicitly set to None to avoid pre-selection
+                key="iv_date_selector"
+            )
+
+            # Store the user's selection
+            st.session_state.iv_selected_dates = selected_expiry_dates
+
+            # Proceed only if the user has selected at least one date
+            if not selected_expiry_dates:
+                st.info("Please select at least one expiration date to generate the chart.")
+                st.stop()
+
+            try:
+                # Fetch options data
+                with st.spinner('Fetching options data...'):
+                    all_data = []  # Store all IV data
+
+                    # Calculate strike range using percentage-based setting
+                    strike_range = calculate_strike_range(S)
+                    min_strike = S - strike_range
+                    max_strike = S + strike_range
+
+                    for exp_date in selected_expiry_dates:
+                        expiry_date = datetime.strptime(exp_date, '%Y-%m-%d').date()
+                        days_to_exp = (expiry_date - datetime.now().date()).days
+                        calls, puts = fetch_options_for_date(ticker, exp_date, S)
+
+                        # Filter strikes within range
+                        calls = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
+                        puts = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+
+                        for strike in sorted(set(calls['strike'].unique()) | set(puts['strike'].unique())):
+                            call_iv = calls[calls['strike'] == strike]['impliedVolatility'].mean()
+                            put_iv = puts[puts['strike'] == strike]['impliedVolatility'].mean()
+                            iv = np.nanmean([call_iv, put_iv])
+                            if not np.isnan(iv):
+                                all_data.append({
+                                    'strike': strike,
+                                    'days': days_to_exp,
+                                    'iv': iv * 100  # Convert to percentage
+                                })
+
+                    if not all_data:
+                        st.warning("No valid IV data available within strike range.")
+                        st.stop()
+
+                    # Convert to DataFrame
+                    df = pd.DataFrame(all_data)
+
+                    # Create custom colorscale using call/put colors
+                    call_rgb = [int(st.session_state.call_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)]
+                    put_rgb = [int(st.session_state.put_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)]
+                    custom_colorscale = [
+                        [0, f'rgb({put_rgb[0]}, {put_rgb[1]}, {put_rgb[2]})'],
+                        [0.5, 'rgb(255, 215, 0)'],  # Gold at center
+                        [1, f'rgb({call_rgb[0]}, {call_rgb[1]}, {call_rgb[2]})']
+                    ]
+
+                    if len(selected_expiry_dates) == 1:
+                        # 2D Plot
+                        fig = go.Figure()
+
+                        # Filter data for single expiration
+                        single_date_df = df[df['days'] == df['days'].iloc[0]]
+                    
+                        # Calculate center IV for coloring
+                        center_iv = single_date_df['iv'].median()
+
+                        # Create line segments with color gradient based on IV value
+                        for i in range(len(single_date_df) - 1):
+                            iv_val = single_date_df['iv'].iloc[i]
+                            if iv_val >= center_iv:
+                                color = st.session_state.call_color
+                            else:
+                                color = st.session_state.put_color
+                        
+                            fig.add_trace(go.Scatter(
+                                x=single_date_df['strike'].iloc[i:i+2],
+                                y=single_date_df['iv'].iloc[i:i+2],
+                                mode='lines',
+                                line=dict(color=color, width=2),
+                                showlegend=False,
+                                hovertemplate='Strike: %{x:.2f}<br>IV: %{y:.2f}%<extra></extra>'
+                            ))
+
+                        # Add current price line
+                        fig.add_vline(
+                            x=S,
+                            line_dash="dash",
+                            line_color="white",
+                            opacity=0.7,
+                            annotation_text=f"{S:.2f}",
+                            annotation_position="top"
+                        )
+
+                        # Update layout
+                        padding = strike_range * 0.05
+                        fig.update_layout(
+                            template="plotly_dark",
+                            title=f'Implied Volatility Surface - {ticker} (Expiration: {selected_expiry_dates[0]})',
+                            xaxis_title='Strike Price',
+                            yaxis_title='Implied Volatility (%)',
+                            yaxis=dict(tickformat='.1f', ticksuffix='%'),
+                            xaxis=dict(range=[min_strike - padding, max_strike + padding]),
+                            width=800,
+                            height=600
+                        )
+
+                    else:
+                        # 3D Surface Plot
+                        # Create meshgrid for interpolation
+                        unique_strikes = np.linspace(min_strike, max_strike, 200)
+                        unique_days = np.linspace(df['days'].min(), df['days'].max(), 200)
+                        X, Y = np.meshgrid(unique_strikes, unique_days)
+
+                        # Interpolate surface
+                        Z = griddata(
+                            (df['strike'], df['days']),
+                            df['iv'],
+                            (X, Y),
+                            method='linear',
+                            fill_value=np.nan
+                        )
+
+                        # Create 3D surface plot
+                        fig = go.Figure()
+
+                        # Add IV surface with custom colorscale
+                        fig.add_trace(go.Surface(
+                            x=X, y=Y, z=Z,
+                            colorscale=custom_colorscale,
+                            colorbar=dict(
+                                title=dict(text='IV %', side='right'),
+                                tickformat='.1f',
+                                ticksuffix='%'
+                            ),
+                            hovertemplate='Strike: %{x:.2f}<br>Days: %{y:.0f}<br>IV: %{z:.2f}%<extra></extra>'
+                        ))
+
+                        # Add current price plane
+                        fig.add_trace(go.Surface(
+                            x=[[S, S], [S, S]],
+                            y=[[df['days'].min(), df['days'].min()], [df['days'].max(), df['days'].max()]],
+                            z=[[df['iv'].min(), df['iv'].max()], [df['iv'].min(), df['iv'].max()]],
+                            opacity=0.3,
+                            showscale=False,
+                            colorscale='oranges',
+                            name='Current Price',
+                            hovertemplate='Current Price: $%{x:.2f}<extra></extra>'
+                        ))
+
+                        # Update layout
+                        fig.update_layout(
+                            template="plotly_dark",
+                            title=f'Implied Volatility Surface - {ticker}',
+                            scene=dict(
+                                xaxis=dict(title='Strike Price'),
+                                yaxis=dict(title='Days to Expiration'),
+                                zaxis=dict(title='Implied Volatility (%)', tickformat='.1f', ticksuffix='%')
+                            ),
+                            width=800,
+                            height=800
+                        )
+
+                    st.plotly_chart(fig, use_container_width=True)
+
+            except Exception as e:
+                st.error(f"Error generating chart: {str(e)}")
+    st.stop()
@@ -0,0 +1,140 @@
+# app_pages/max_pain.py
+# Página Max Pain.
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+from app_charts import create_max_pain_chart
+from app_core import (calculate_max_pain, expiry_selector_fragment, fetch_and_process_multiple_dates,
+                      format_ticker, get_current_price, get_expirations, invalidate_ticker_data, save_ticker)
+from max_pain_engine import max_pain_term_structure
+
+
+def create_max_pain_term_structure_chart(term, S):
+    """Max pain strike per expiry (one batch over all selected expiries) against the current price."""
+    expiries = pd.to_datetime(term['expiry_date'])
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=expiries,
+        y=term['max_pain'],
+        mode='lines+markers',
+        name='Max Pain',
+        line=dict(color='#FFD700', width=2),  # Same gold as the total pain curve
+        customdata=np.stack([term['call_oi'], term['put_oi']], axis=-1),
+        hovertemplate="%{x|%Y-%m-%d}<br>Max Pain: %{y:.2f}<br>Call OI: %{customdata[0]:,.0f}"
+                      "<br>Put OI: %{customdata[1]:,.0f}<extra></extra>"
+    ))
+    fig.add_hline(
+        y=S,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7,
+        annotation_text=f"{S}",
+        annotation_position="bottom right"
+    )
+    fig.update_layout(
+        title=dict(
+            text='Max Pain by Expiry',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Expiration Date',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Max Pain Strike',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        hovermode='x unified',
+        xaxis=dict(tickfont=dict(size=st.session_state.chart_text_size)),
+        yaxis=dict(tickfont=dict(size=st.session_state.chart_text_size)),
+        height=450
+    )
+    return fig
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="max_pain_ticker")
+        with col2:
+            st.write("")
+            st.write("")
+            if st.button("🔄", key="refresh_button_max_pain"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+        ticker = format_ticker(user_ticker)
+    
+        if ticker != saved_ticker:
+            save_ticker(ticker)
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.warning("Please select at least one expiration date.")
+                    st.stop()
+            
+                all_calls, all_puts = fetch_and_process_multiple_dates(
+                    ticker,
+                    selected_expiry_dates,
+                    S=S  # Pass S to fetch_options_for_date
+                )
+            
+                if all_calls.empty and all_puts.empty:
+                    st.warning("No options data available for the selected dates.")
+                    st.stop()
+
+                # Calculate and display max pain
+                result = calculate_max_pain(all_calls, all_puts)
+                if result is not None:
+                    max_pain_strike, call_max_pain_strike, put_max_pain_strike, *_ = result
+                    st.markdown(f"### Total Max Pain Strike: ${max_pain_strike:.2f}")
+                    st.markdown(f"### Call Max Pain Strike: ${call_max_pain_strike:.2f}")
+                    st.markdown(f"### Put Max Pain Strike: ${put_max_pain_strike:.2f}")
+                    st.markdown(f"### Current Price: ${S:.2f}")
+                    st.markdown(f"### Distance to Max Pain: ${abs(S - max_pain_strike):.2f}")
+                
+                    # Create and display the max pain chart
+                    fig = create_max_pain_chart(all_calls, all_puts, S)
+                    if fig is not None:
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    # Term structure: each selected expiry's own max pain, all computed in one batch,
+                    # grouped by the expiry each chain was fetched for
+                    term = max_pain_term_structure(all_calls, all_puts, by='expiry_date')
+                    if len(term) > 1:
+                        st.plotly_chart(create_max_pain_term_structure_chart(term, S), use_container_width=True)
+                        st.dataframe(
+                            pd.DataFrame({
+                                'Expiry': term['expiry_date'],
+                                'Max Pain': term['max_pain'],
+                                'Distance': term['max_pain'] - S,
+                                'Call OI': term['call_oi'],
+                                'Put OI': term['put_oi'],
+                            }),
+                            hide_index=True,
+                            use_container_width=True
+                        )
+                else:
+                    st.warning("Could not calculate max pain point.")
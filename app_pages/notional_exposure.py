@@ -0,0 +1,152 @@
+# app_pages/notional_exposure.py
+# Página Exposure by Notional Value: exposições das greeks em valor nocional.
+import streamlit as st
+
+from app_charts import exposure_bar_chart
+from app_core import (compute_greeks_for_dates, expiry_selector_fragment, format_ticker, get_current_price,
+                      get_expirations, invalidate_ticker_data, live_region, save_ticker)
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    exposure_container = st.container()
+    with exposure_container:
+        st.empty()  # Clear previous content
+        page_name = "notional"  # Use consistent page name for compute_greeks_and_charts
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="notional_exposure_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key="refresh_button_notional"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+        ticker = format_ticker(user_ticker)
+    
+        # Save the ticker if it changes (cached data is scoped per ticker)
+        if ticker != saved_ticker:
+            save_ticker(ticker)  # Save the ticker
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.warning("Please select at least one expiration date.")
+                    st.stop()
+            
+                def render_exposure_charts():
+                    # Re-read the cached price so every refresh tick charts against the current spot
+                    S = get_current_price(ticker)
+                    if S is None:
+                        st.error("Could not fetch current price.")
+                        return
+
+                    all_calls, all_puts = compute_greeks_for_dates(ticker, selected_expiry_dates, S)
+                
+                    if all_calls.empty and all_puts.empty:
+                        st.warning("No options data available for the selected dates.")
+                        st.stop()
+                
+                    # Calculate notional value exposure from raw greek values
+                    def calculate_notional_exposure(df, exposure_col):
+                        """Calculate notional value exposure from raw greek values × contract price × contract size"""
+                        if exposure_col not in df.columns:
+                            return df
+                    
+                        # Use lastPrice if available, otherwise use ask price
+                        price_col = 'lastPrice' if 'lastPrice' in df.columns else 'ask'
+                    
+                        # Calculate notional exposure from raw greek values (not the already-scaled exposure values)
+                        # This avoids double-scaling issues
+                        if exposure_col == "GEX":
+                            # Notional = Gamma × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_gamma'] * df['openInterest'] * 100 * df[price_col]
+                        elif exposure_col == "VEX":
+                            # Notional = Vanna × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_vanna'] * df['openInterest'] * 100 * df[price_col]
+                        elif exposure_col == "DEX":
+                            # Notional = Delta × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_delta'] * df['openInterest'] * 100 * df[price_col]
+                        elif exposure_col == "Charm":
+                            # Notional = Charm × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_charm'] * df['openInterest'] * 100 * df[price_col]
+                        elif exposure_col == "Speed":
+                            # Notional = Speed × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_speed'] * df['openInterest'] * 100 * df[price_col]
+                        elif exposure_col == "Vomma":
+                            # Notional = Vomma × OI × Contract Size × Contract Price
+                            df[f'{exposure_col}_notional'] = df['calc_vomma'] * df['openInterest'] * 100 * df[price_col]
+                    
+                        return df
+                
+                    # Calculate notional exposure for all exposure types
+                    for exposure_type in ["GEX", "VEX", "DEX", "Charm", "Speed", "Vomma"]:
+                        if f'calc_{exposure_type.lower()}' in all_calls.columns or exposure_type in all_calls.columns:
+                            all_calls = calculate_notional_exposure(all_calls, exposure_type)
+                            all_puts = calculate_notional_exposure(all_puts, exposure_type)
+                
+                    # Create tabs for different exposure types
+                    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Gamma (GEX)", "Vanna (VEX)", "Delta (DEX)", "Charm", "Speed", "Vomma"])
+                
+                    with tab1:
+                        if "GEX_notional" in all_calls.columns:
+                            title = f"GEX Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_gex = exposure_bar_chart(all_calls, all_puts, "GEX_notional", title, S)
+                            st.plotly_chart(fig_gex, use_container_width=True)
+                        else:
+                            st.warning("GEX data not available.")
+                
+                    with tab2:
+                        if "VEX_notional" in all_calls.columns:
+                            title = f"VEX Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_vex = exposure_bar_chart(all_calls, all_puts, "VEX_notional", title, S)
+                            st.plotly_chart(fig_vex, use_container_width=True)
+                        else:
+                            st.warning("VEX data not available.")
+                
+                    with tab3:
+                        if "DEX_notional" in all_calls.columns:
+                            title = f"DEX Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_dex = exposure_bar_chart(all_calls, all_puts, "DEX_notional", title, S)
+                            st.plotly_chart(fig_dex, use_container_width=True)
+                        else:
+                            st.warning("DEX data not available.")
+                
+                    with tab4:
+                        if "Charm_notional" in all_calls.columns:
+                            title = f"Charm Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_charm = exposure_bar_chart(all_calls, all_puts, "Charm_notional", title, S)
+                            st.plotly_chart(fig_charm, use_container_width=True)
+                        else:
+                            st.warning("Charm data not available.")
+                
+                    with tab5:
+                        if "Speed_notional" in all_calls.columns:
+                            title = f"Speed Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_speed = exposure_bar_chart(all_calls, all_puts, "Speed_notional", title, S)
+                            st.plotly_chart(fig_speed, use_container_width=True)
+                        else:
+                            st.warning("Speed data not available.")
+                
+                    with tab6:
+                        if "Vomma_notional" in all_calls.columns:
+                            title = f"Vomma Notional Value Exposure by Strike ({len(selected_expiry_dates)} dates)"
+                            fig_vomma = exposure_bar_chart(all_calls, all_puts, "Vomma_notional", title, S)
+                            st.plotly_chart(fig_vomma, use_container_width=True)
+                        else:
+                            st.warning("Vomma data not available.")
+
+                live_region(render_exposure_charts)
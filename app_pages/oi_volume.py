@@ -0,0 +1,1796 @@
+# app_pages/oi_volume.py
+# Página OI & Volume: OI/volume por strike, fluxo de opções, prêmios, tabelas e Market Maker (OCC).
+from datetime import datetime, timedelta
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+import requests
+
+from app_core import (expiry_selector_fragment, fetch_and_process_multiple_dates, format_ticker,
+                      get_current_price, get_expirations, invalidate_ticker_data, save_ticker)
+from chain_fetcher import writable_copy
+from chart_utils import add_current_price_line, calculate_strike_range
+from rate_limiter import call_upstream
+
+
+def analyze_options_flow(calls_df, puts_df, current_price):
+    """Analyze options flow to determine bought vs sold contracts"""
+    # Copies the new columns can go into without touching the cached chain
+    calls = writable_copy(calls_df)
+    puts = writable_copy(puts_df)
+    
+    # Determine if option is likely bought/sold based on trade price vs bid/ask
+    # For calls: trades near ask = likely bought, trades near bid = likely sold
+    calls['trade_type'] = np.where(calls['lastPrice'] >= calls['bid'] + (calls['ask'] - calls['bid']) * 0.6, 'bought', 'sold')
+    puts['trade_type'] = np.where(puts['lastPrice'] >= puts['bid'] + (puts['ask'] - puts['bid']) * 0.6, 'bought', 'sold')
+    
+    # Add ITM/OTM classification
+    calls['moneyness'] = np.where(calls['strike'] <= current_price, 'ITM', 'OTM')
+    puts['moneyness'] = np.where(puts['strike'] >= current_price, 'ITM', 'OTM')
+    
+    # Calculate volume-weighted stats
+    call_stats = {
+        'bought': {
+            'volume': calls[calls['trade_type'] == 'bought']['volume'].sum(),
+            'premium': (calls[calls['trade_type'] == 'bought']['volume'] * calls[calls['trade_type'] == 'bought']['lastPrice'] * 100).sum()
+        },
+        'sold': {
+            'volume': calls[calls['trade_type'] == 'sold']['volume'].sum(),
+            'premium': (calls[calls['trade_type'] == 'sold']['volume'] * calls[calls['trade_type'] == 'sold']['lastPrice'] * 100).sum()
+        },
+        'OTM': {
+            'volume': calls[calls['moneyness'] == 'OTM']['volume'].sum(),
+            'premium': (calls[calls['moneyness'] == 'OTM']['volume'] * calls[calls['moneyness'] == 'OTM']['lastPrice'] * 100).sum()
+        },
+        'ITM': {
+            'volume': calls[calls['moneyness'] == 'ITM']['volume'].sum(), 
+            'premium': (calls[calls['moneyness'] == 'ITM']['volume'] * calls[calls['moneyness'] == 'ITM']['lastPrice'] * 100).sum()
+        }
+    }
+    
+    put_stats = {
+        'bought': {
+            'volume': puts[puts['trade_type'] == 'bought']['volume'].sum(),
+            'premium': (puts[puts['trade_type'] == 'bought']['volume'] * puts[puts['trade_type'] == 'bought']['lastPrice'] * 100).sum()
+        },
+        'sold': {
+            'volume': puts[puts['trade_type'] == 'sold']['volume'].sum(),
+            'premium': (puts[puts['trade_type'] == 'sold']['volume'] * puts[puts['trade_type'] == 'sold']['lastPrice'] * 100).sum()
+        },
+        'OTM': {
+            'volume': puts[puts['moneyness'] == 'OTM']['volume'].sum(),
+            'premium': (puts[puts['moneyness'] == 'OTM']['volume'] * puts[puts['moneyness'] == 'OTM']['lastPrice'] * 100).sum()
+        },
+        'ITM': {
+            'volume': puts[puts['moneyness'] == 'ITM']['volume'].sum(), 
+            'premium': (puts[puts['moneyness'] == 'ITM']['volume'] * puts[puts['moneyness'] == 'ITM']['lastPrice'] * 100).sum()
+        }
+    }
+    
+    # Calculate OTM bought/sold breakdown
+    otm_calls_bought = calls[(calls['moneyness'] == 'OTM') & (calls['trade_type'] == 'bought')]['volume'].sum()
+    otm_calls_sold = calls[(calls['moneyness'] == 'OTM') & (calls['trade_type'] == 'sold')]['volume'].sum()
+    otm_puts_bought = puts[(puts['moneyness'] == 'OTM') & (puts['trade_type'] == 'bought')]['volume'].sum()
+    otm_puts_sold = puts[(puts['moneyness'] == 'OTM') & (puts['trade_type'] == 'sold')]['volume'].sum()
+    
+    # Calculate total premium values
+    total_call_premium = (calls['volume'] * calls['lastPrice'] * 100).sum()
+    total_put_premium = (puts['volume'] * puts['lastPrice'] * 100).sum()
+    
+    return {
+        'calls': call_stats,
+        'puts': put_stats,
+        'otm_detail': {
+            'calls_bought': otm_calls_bought,
+            'calls_sold': otm_calls_sold,
+            'puts_bought': otm_puts_bought,
+            'puts_sold': otm_puts_sold
+        },
+        'total_premium': {
+            'calls': total_call_premium,
+            'puts': total_put_premium
+        }
+    }
+
+def create_option_flow_charts(flow_data, title="Options Flow Analysis"):
+    """Create visual charts for options flow analysis"""
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+    
+    # Create bar chart for bought vs sold
+    fig_flow = go.Figure()
+    
+    # Calls bought/sold
+    fig_flow.add_trace(go.Bar(
+        x=['Calls Bought', 'Calls Sold'],
+        y=[flow_data['calls']['bought']['volume'], flow_data['calls']['sold']['volume']],
+        name='Calls',
+        marker_color=call_color
+    ))
+    
+    # Puts bought/sold
+    fig_flow.add_trace(go.Bar(
+        x=['Puts Bought', 'Puts Sold'],
+        y=[flow_data['puts']['bought']['volume'], flow_data['puts']['sold']['volume']],
+        name='Puts',
+        marker_color=put_color
+    ))
+    
+    fig_flow.update_layout(
+        title=dict(
+            text=title,
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Trade Direction',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Volume',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        barmode='relative',
+        template="plotly_dark"
+    )
+    
+    # Create OTM/ITM chart
+    fig_money = go.Figure()
+    
+    # Calls OTM/ITM
+    fig_money.add_trace(go.Bar(
+        x=['OTM Calls', 'ITM Calls'],
+        y=[flow_data['calls']['OTM']['volume'], flow_data['calls']['ITM']['volume']],
+        name='Calls',
+        marker_color=call_color
+    ))
+    
+    # Puts OTM/ITM
+    fig_money.add_trace(go.Bar(
+        x=['OTM Puts', 'ITM Puts'],
+        y=[flow_data['puts']['OTM']['volume'], flow_data['puts']['ITM']['volume']],
+        name='Puts',
+        marker_color=put_color
+    ))
+    
+    fig_money.update_layout(
+        title=dict(
+            text="OTM vs ITM Volume",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Moneyness',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Volume',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        barmode='relative',
+        template="plotly_dark"
+    )
+    
+    # Premium chart (donut)
+    premium_labels = ['Call Premium', 'Put Premium']
+    premium_values = [flow_data['total_premium']['calls'], flow_data['total_premium']['puts']]
+    
+    fig_premium = go.Figure(data=[go.Pie(
+        labels=premium_labels,
+        values=premium_values,
+        hole=0.4,
+        marker=dict(colors=[call_color, put_color])
+    )])
+    
+    total_premium = flow_data['total_premium']['calls'] + flow_data['total_premium']['puts']
+    premium_text = f"${total_premium:,.0f}"
+    
+    fig_premium.update_layout(
+        title=dict(
+            text="Total Premium Flow",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        legend=dict(font=dict(size=st.session_state.chart_text_size)),
+        annotations=[dict(
+            text=premium_text,
+            x=0.5, y=0.5,
+            font=dict(size=st.session_state.chart_text_size + 4),
+            showarrow=False
+        )],
+        template="plotly_dark"
+    )
+    
+    # OTM Analysis Breakdown (horizontal)
+    fig_otm = go.Figure()
+    
+    # OTM Calls bought/sold
+    fig_otm.add_trace(go.Bar(
+        y=['OTM Calls'],
+        x=[flow_data['otm_detail']['calls_bought']],
+        name='Bought',
+        orientation='h',
+        marker_color='lightgreen',
+        offsetgroup=0
+    ))
+    
+    fig_otm.add_trace(go.Bar(
+        y=['OTM Calls'],
+        x=[flow_data['otm_detail']['calls_sold']],
+        name='Sold',
+        orientation='h',
+        marker_color='darkgreen',
+        offsetgroup=1
+    ))
+    
+    # OTM Puts bought/sold
+    fig_otm.add_trace(go.Bar(
+        y=['OTM Puts'],
+        x=[flow_data['otm_detail']['puts_bought']],
+        name='Bought',
+        orientation='h',
+        marker_color='pink',
+        offsetgroup=0
+    ))
+    
+    fig_otm.add_trace(go.Bar(
+        y=['OTM Puts'],
+        x=[flow_data['otm_detail']['puts_sold']],
+        name='Sold',
+        orientation='h',
+        marker_color='darkred',
+        offsetgroup=1
+    ))
+    
+    fig_otm.update_layout(
+        title=dict(
+            text="OTM Options Bought vs Sold",
+            x=0,
+            xanchor='left',
+            font=dict(size=st.session_state.chart_text_size + 8)
+        ),
+        xaxis_title=dict(
+            text='Volume',
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=st.session_state.chart_text_size)
+        ),
+        barmode='relative',
+        template="plotly_dark"
+    )
+    
+    return fig_flow, fig_money, fig_premium, fig_otm
+
+def create_oi_volume_charts(calls, puts, S):
+    if S is None:
+        st.error("Could not fetch underlying price.")
+        return
+
+    # Get colors from session state at the start
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+
+    # Calculate strike range around current price (percentage-based)
+    strike_range = calculate_strike_range(S)
+    min_strike = S - strike_range
+    max_strike = S + strike_range
+    
+    # Filter data based on strike range
+    calls_filtered = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
+    puts_filtered = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+    
+    # Create separate dataframes for OI and Volume, filtering out zeros
+    calls_oi_df = calls_filtered[['strike', 'openInterest']].copy()
+    calls_oi_df = calls_oi_df[calls_oi_df['openInterest'] > 0]  # Changed from != 0 to > 0
+    calls_oi_df['OptionType'] = 'Call'
+    
+    puts_oi_df = puts_filtered[['strike', 'openInterest']].copy()
+    puts_oi_df = puts_oi_df[puts_oi_df['openInterest'] > 0]  # Changed from != 0 to > 0
+    puts_oi_df['OptionType'] = 'Put'
+    
+    calls_vol_df = calls_filtered[['strike', 'volume']].copy()
+    calls_vol_df = calls_vol_df[calls_vol_df['volume'] > 0]  # Changed from != 0 to > 0
+    calls_vol_df['OptionType'] = 'Call'
+    
+    puts_vol_df = puts_filtered[['strike', 'volume']].copy()
+    puts_vol_df = puts_vol_df[puts_vol_df['volume'] > 0]  # Changed from != 0 to > 0
+    puts_vol_df['OptionType'] = 'Put'
+    
+    # Calculate Net Open Interest and Net Volume using filtered data
+    net_oi = calls_filtered.groupby('strike')['openInterest'].sum() - puts_filtered.groupby('strike')['openInterest'].sum()
+    net_volume = calls_filtered.groupby('strike')['volume'].sum() - puts_filtered.groupby('strike')['volume'].sum()
+    
+    # Calculate total values for titles (handle empty dataframes)
+    total_call_oi = calls_oi_df['openInterest'].sum() if not calls_oi_df.empty else 0
+    total_put_oi = puts_oi_df['openInterest'].sum() if not puts_oi_df.empty else 0
+    total_call_volume = calls_vol_df['volume'].sum() if not calls_vol_df.empty else 0
+    total_put_volume = puts_vol_df['volume'].sum() if not puts_vol_df.empty else 0
+    
+    # Create titles with totals using HTML for colored values
+    oi_title_with_totals = (
+        f"Open Interest by Strike     "
+        f"<span style='color: {call_color}'>{total_call_oi:,.0f}</span> | "
+        f"<span style='color: {put_color}'>{total_put_oi:,.0f}</span>"
+    )
+    
+    volume_title_with_totals = (
+        f"Volume by Strike     "
+        f"<span style='color: {call_color}'>{total_call_volume:,.0f}</span> | "
+        f"<span style='color: {put_color}'>{total_put_volume:,.0f}</span>"
+    )
+    
+    # Create Open Interest Chart
+    fig_oi = go.Figure()
+    
+    # Add calls if enabled and data exists
+    if st.session_state.show_calls and not calls_oi_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_oi.add_trace(go.Bar(
+                x=calls_oi_df['strike'],
+                y=calls_oi_df['openInterest'],
+                name='Call',
+                marker_color=call_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_oi.add_trace(go.Bar(
+                y=calls_oi_df['strike'],
+                x=calls_oi_df['openInterest'],
+                name='Call',
+                marker_color=call_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_oi.add_trace(go.Scatter(
+                x=calls_oi_df['strike'],
+                y=calls_oi_df['openInterest'],
+                mode='markers',
+                name='Call',
+                marker=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_oi.add_trace(go.Scatter(
+                x=calls_oi_df['strike'],
+                y=calls_oi_df['openInterest'],
+                mode='lines',
+                name='Call',
+                line=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_oi.add_trace(go.Scatter(
+                x=calls_oi_df['strike'],
+                y=calls_oi_df['openInterest'],
+                mode='lines',
+                fill='tozeroy',
+                name='Call',
+                line=dict(color=call_color, width=0.5),
+                fillcolor=call_color
+            ))
+
+    # Add puts if enabled and data exists
+    if st.session_state.show_puts and not puts_oi_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_oi.add_trace(go.Bar(
+                x=puts_oi_df['strike'],
+                y=puts_oi_df['openInterest'],
+                name='Put',
+                marker_color=put_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_oi.add_trace(go.Bar(
+                y=puts_oi_df['strike'],
+                x=puts_oi_df['openInterest'],
+                name='Put',
+                marker_color=put_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_oi.add_trace(go.Scatter(
+                x=puts_oi_df['strike'],
+                y=puts_oi_df['openInterest'],
+                mode='markers',
+                name='Put',
+                marker=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_oi.add_trace(go.Scatter(
+                x=puts_oi_df['strike'],
+                y=puts_oi_df['openInterest'],
+                mode='lines',
+                name='Put',
+                line=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_oi.add_trace(go.Scatter(
+                x=puts_oi_df['strike'],
+                y=puts_oi_df['openInterest'],
+                mode='lines',
+                fill='tozeroy',
+                name='Put',
+                line=dict(color=put_color, width=0.5),
+                fillcolor=put_color
+            ))
+
+    # Add Net OI if enabled
+    if st.session_state.show_net and not net_oi.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_oi.add_trace(go.Bar(
+                x=net_oi.index,
+                y=net_oi.values,
+                name='Net OI',
+                marker_color=[call_color if val >= 0 else put_color for val in net_oi.values]
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_oi.add_trace(go.Bar(
+                y=net_oi.index,
+                x=net_oi.values,
+                name='Net OI',
+                marker_color=[call_color if val >= 0 else put_color for val in net_oi.values],
+                orientation='h'
+            ))
+        elif st.session_state.chart_type in ['Scatter', 'Line']:
+            positive_mask = net_oi.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_oi.add_trace(go.Scatter(
+                    x=net_oi.index[positive_mask],
+                    y=net_oi.values[positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net OI (Positive)',
+                    marker=dict(color=call_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=call_color) if st.session_state.chart_type == 'Line' else None
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_oi.add_trace(go.Scatter(
+                    x=net_oi.index[~positive_mask],
+                    y=net_oi.values[~positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net OI (Negative)',
+                    marker=dict(color=put_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=put_color) if st.session_state.chart_type == 'Line' else None
+                ))
+        elif st.session_state.chart_type == 'Area':
+            positive_mask = net_oi.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_oi.add_trace(go.Scatter(
+                    x=net_oi.index[positive_mask],
+                    y=net_oi.values[positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net OI (Positive)',
+                    line=dict(color=call_color, width=0.5),
+                    fillcolor=call_color
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_oi.add_trace(go.Scatter(
+                    x=net_oi.index[~positive_mask],
+                    y=net_oi.values[~positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net OI (Negative)',
+                    line=dict(color=put_color, width=0.5),
+                    fillcolor=put_color
+                ))
+
+    # Calculate y-axis range with improved padding for OI chart
+    y_values = []
+    for trace in fig_oi.data:
+        if hasattr(trace, 'y') and trace.y is not None:
+            y_values.extend([y for y in trace.y if y is not None and not np.isnan(y)])
+    
+    if y_values:
+        oi_y_min = min(min(y_values), 0)  # Include 0 in the range
+        oi_y_max = max(y_values)
+        oi_y_range = oi_y_max - oi_y_min
+        
+        # Add 15% padding on top and 5% on bottom
+        oi_padding_top = oi_y_range * 0.15
+        oi_padding_bottom = oi_y_range * 0.05
+        oi_y_min = oi_y_min - oi_padding_bottom
+        oi_y_max = oi_y_max + oi_padding_top
+    else:
+        # Default values if no valid y values
+        oi_y_min = 0
+        oi_y_max = 100
+    
+    # Add padding for x-axis range
+    padding = strike_range * 0.1
+    
+    # Update OI chart layout
+    if st.session_state.chart_type == 'Horizontal Bar':
+        fig_oi.update_layout(
+            title=dict(
+                text=oi_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Open Interest',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='y unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600  # Increased height for better visibility
+        )
+    else:
+        fig_oi.update_layout(
+            title=dict(
+                text=oi_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Open Interest',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='x unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600  # Increased height for better visibility
+        )
+    
+    # Create Volume Chart
+    fig_volume = go.Figure()
+    
+    # Add calls if enabled and data exists
+    if st.session_state.show_calls and not calls_vol_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                name='Call',
+                marker_color=call_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=calls_vol_df['strike'],
+                x=calls_vol_df['volume'],
+                name='Call',
+                marker_color=call_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='markers',
+                name='Call',
+                marker=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='lines',
+                name='Call',
+                line=dict(color=call_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_volume.add_trace(go.Scatter(
+                x=calls_vol_df['strike'],
+                y=calls_vol_df['volume'],
+                mode='lines',
+                fill='tozeroy',
+                name='Call',
+                line=dict(color=call_color, width=0.5),
+                fillcolor=call_color
+            ))
+
+    # Add puts if enabled and data exists
+    if st.session_state.show_puts and not puts_vol_df.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                name='Put',
+                marker_color=put_color
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=puts_vol_df['strike'],
+                x=puts_vol_df['volume'],
+                name='Put',
+                marker_color=put_color,
+                orientation='h'
+            ))
+        elif st.session_state.chart_type == 'Scatter':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='markers',
+                name='Put',
+                marker=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Line':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='lines',
+                name='Put',
+                line=dict(color=put_color)
+            ))
+        elif st.session_state.chart_type == 'Area':
+            fig_volume.add_trace(go.Scatter(
+                x=puts_vol_df['strike'],
+                y=puts_vol_df['volume'],
+                mode='lines',
+                fill='tozeroy',
+                name='Put',
+                line=dict(color=put_color, width=0.5),
+                fillcolor=put_color
+            ))
+
+    # Add Net Volume if enabled
+    if st.session_state.show_net and not net_volume.empty:
+        if st.session_state.chart_type == 'Bar':
+            fig_volume.add_trace(go.Bar(
+                x=net_volume.index,
+                y=net_volume.values,
+                name='Net Volume',
+                marker_color=[call_color if val >= 0 else put_color for val in net_volume.values]
+            ))
+        elif st.session_state.chart_type == 'Horizontal Bar':
+            fig_volume.add_trace(go.Bar(
+                y=net_volume.index,
+                x=net_volume.values,
+                name='Net Volume',
+                marker_color=[call_color if val >= 0 else put_color for val in net_volume.values],
+                orientation='h'
+            ))
+        elif st.session_state.chart_type in ['Scatter', 'Line']:
+            positive_mask = net_volume.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[positive_mask],
+                    y=net_volume.values[positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net Volume (Positive)',
+                    marker=dict(color=call_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=call_color) if st.session_state.chart_type == 'Line' else None
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[~positive_mask],
+                    y=net_volume.values[~positive_mask],
+                    mode='markers' if st.session_state.chart_type == 'Scatter' else 'lines',
+                    name='Net Volume (Negative)',
+                    marker=dict(color=put_color) if st.session_state.chart_type == 'Scatter' else None,
+                    line=dict(color=put_color) if st.session_state.chart_type == 'Line' else None
+                ))
+        elif st.session_state.chart_type == 'Area':
+            positive_mask = net_volume.values >= 0
+            
+            # Plot positive values
+            if any(positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[positive_mask],
+                    y=net_volume.values[positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net Volume (Positive)',
+                    line=dict(color=call_color, width=0.5),
+                    fillcolor=call_color
+                ))
+            
+            # Plot negative values
+            if any(~positive_mask):
+                fig_volume.add_trace(go.Scatter(
+                    x=net_volume.index[~positive_mask],
+                    y=net_volume.values[~positive_mask],
+                    mode='lines',
+                    fill='tozeroy',
+                    name='Net Volume (Negative)',
+                    line=dict(color=put_color, width=0.5),
+                    fillcolor=put_color
+                ))
+
+    # Calculate y-axis range with improved padding for volume chart
+    y_values = []
+    for trace in fig_volume.data:
+        if hasattr(trace, 'y') and trace.y is not None:
+            y_values.extend([y for y in trace.y if y is not None and not np.isnan(y)])
+    
+    if y_values:
+        vol_y_min = min(min(y_values), 0)  # Include 0 in the range
+        vol_y_max = max(y_values)
+        vol_y_range = vol_y_max - vol_y_min
+        
+        # Add 15% padding on top and 5% on bottom
+        vol_padding_top = vol_y_range * 0.15
+        vol_padding_bottom = vol_y_range * 0.05
+        vol_y_min = vol_y_min - vol_padding_bottom
+        vol_y_max = vol_y_max + vol_padding_top
+    else:
+        # Default values if no valid y values
+        vol_y_min = 0
+        vol_y_max = 100
+    
+    # Update Volume chart layout
+    if st.session_state.chart_type == 'Horizontal Bar':
+        fig_volume.update_layout(
+            title=dict(
+                text=volume_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Volume',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='y unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600  # Increased height for better visibility
+        )
+    else:
+        fig_volume.update_layout(
+            title=dict(
+                text=volume_title_with_totals,
+                x=0,
+                xanchor='left',
+                font=dict(size=st.session_state.chart_text_size + 8)
+            ),
+            xaxis_title=dict(
+                text='Strike Price',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis_title=dict(
+                text='Volume',
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            legend=dict(
+                font=dict(size=st.session_state.chart_text_size)
+            ),
+            hovermode='x unified',
+            xaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            yaxis=dict(
+                autorange=True,
+                tickfont=dict(size=st.session_state.chart_text_size)
+            ),
+            template="plotly_dark",
+            height=600  # Increased height for better visibility
+        )
+    
+    # Add current price line
+    S = round(S, 2)
+    fig_oi = add_current_price_line(fig_oi, S, st.session_state.chart_type, st.session_state.chart_text_size)
+    fig_volume = add_current_price_line(fig_volume, S, st.session_state.chart_type, st.session_state.chart_text_size)
+    
+    return fig_oi, fig_volume
+
+# Market Maker Functions
+def get_latest_business_day():
+    """Get the latest business day (Monday-Friday) from 24 hours ago."""
+    now = datetime.now()
+    twenty_four_hours_ago = now - timedelta(hours=24)
+    
+    # Start with the date from 24 hours ago
+    target_date = twenty_four_hours_ago
+    
+    # If the date from 24 hours ago is a weekend, find the most recent weekday
+    while target_date.weekday() > 4:  # Saturday=5, Sunday=6
+        target_date -= timedelta(days=1)
+    
+    # Always return a business day, even if it's more than 24 hours ago
+    # This ensures we get market maker data for the most recent trading day
+    return target_date
+
+def should_run_script():
+    """Check if script should run (based on whether there's a trading day within 24 hours)."""
+    # The script should run if there's a valid trading day within the last 24 hours
+    # This will be determined by get_latest_business_day(), so we'll let it run
+    # and let that function determine if there's valid data to fetch
+    return True
+
+def get_params_for_date(target_date, symbol=None, symbol_type="U"):
+    """Get API parameters for a specific date and optional symbol."""
+    # Safety check: ensure we never request future dates
+    today = datetime.now().date()
+    if target_date.date() > today:
+        target_date = datetime.now() - timedelta(days=1)  # Use yesterday instead
+        while target_date.weekday() > 4:  # Skip weekends
+            target_date -= timedelta(days=1)
+    
+    params = {
+        "format": "csv",
+        "volumeQueryType": "O",  # Options
+        "symbolType": "ALL" if symbol is None else symbol_type,  # ALL for all symbols, O/U for specific
+        "reportType": "D",       # Daily report (can be modified to W or M)
+        "accountType": "M",      # Market Maker
+        "productKind": "ALL",    # All product types (Equity, Index, etc.)
+        "porc": "BOTH",          # Calls and Puts
+        "reportDate": target_date.strftime("%Y%m%d")  # Date in YYYYMMDD format
+    }
+    
+    # If a specific symbol is provided, add it as a filter parameter
+    if symbol:
+        params["symbol"] = symbol.upper()
+    
+    return params
+
+def process_market_maker_data(csv_data):
+    """Process market maker CSV data and return summary statistics"""
+    try:
+        from io import StringIO
+        
+        # Skip any header lines that are not part of the CSV data
+        lines = csv_data.strip().split('\n')
+        
+        # Find the first line that looks like CSV data (has commas and starts with a number)
+        start_index = 0
+        for i, line in enumerate(lines):
+            if ',' in line and line.strip() and line.strip()[0].isdigit():
+                start_index = i
+                break
+        
+        # Reconstruct CSV data from the actual data lines
+        csv_lines = lines[start_index:]
+        clean_csv = '\n'.join(csv_lines)
+        
+        # Read CSV with proper column names based on OCC layout
+        df = pd.read_csv(StringIO(clean_csv), header=None, names=[
+            'Quantity',           # Column 1: Volume
+            'Underlying_Symbol',  # Column 2: Underlying symbol  
+            'Options_Symbol',     # Column 3: Options symbol
+            'Account_Type',       # Column 4: Account type (C/F/M)
+            'Call_Put_Indicator', # Column 5: Call/Put indicator (C/P)
+            'Exchange',           # Column 6: Exchange
+            'Activity_Date',      # Column 7: Activity date
+            'Series_Date'         # Column 8: Series/contract date
+        ])
+        
+        if df.empty:
+            return None
+        
+        # Initialize summary data
+        summary = {
+            'total_volume': 0,
+            'call_volume': 0,
+            'put_volume': 0,
+            'call_percentage': 0,
+            'put_percentage': 0,
+            'raw_data': df
+        }
+        
+        # Filter for Market Maker data only
+        mm_data = df[df['Account_Type'] == 'M']
+        
+        if mm_data.empty:
+            # If no MM data, use all data
+            mm_data = df
+        
+        # Calculate call and put volumes using the Call_Put_Indicator column
+        call_data = mm_data[mm_data['Call_Put_Indicator'] == 'C']
+        put_data = mm_data[mm_data['Call_Put_Indicator'] == 'P']
+        
+        summary['call_volume'] = call_data['Quantity'].sum() if not call_data.empty else 0
+        summary['put_volume'] = put_data['Quantity'].sum() if not put_data.empty else 0
+        summary['total_volume'] = summary['call_volume'] + summary['put_volume']
+        
+        if summary['total_volume'] > 0:
+            summary['call_percentage'] = (summary['call_volume'] / summary['total_volume']) * 100
+            summary['put_percentage'] = (summary['put_volume'] / summary['total_volume']) * 100
+        
+
+        
+        return summary
+        
+    except Exception as e:
+        # Fallback to original logic if the structured approach fails
+        try:
+            df = pd.read_csv(StringIO(csv_data))
+            if df.empty:
+                return None
+                
+            summary = {
+                'total_volume': 0,
+                'call_volume': 0,
+                'put_volume': 0,
+                'call_percentage': 0,
+                'put_percentage': 0,
+                'raw_data': df
+            }
+            
+            # Try to find volume column
+            volume_col = None
+            for col in df.columns:
+                if any(term in col.lower() for term in ['quantity', 'volume', 'vol']):
+                    volume_col = col
+                    break
+            
+            if volume_col is None and len(df.select_dtypes(include=[np.number]).columns) > 0:
+                volume_col = df.select_dtypes(include=[np.number]).columns[0]
+            
+            if volume_col:
+                # Try to find call/put indicator column
+                cp_col = None
+                for col in df.columns:
+                    if df[col].dtype == 'object':
+                        unique_vals = df[col].unique()
+                        if any('C' in str(unique_vals)) and any('P' in str(unique_vals)):
+                            cp_col = col
+                            break
+                
+                if cp_col:
+                    call_data = df[df[cp_col] == 'C']
+                    put_data = df[df[cp_col] == 'P']
+                    
+                    summary['call_volume'] = call_data[volume_col].sum() if not call_data.empty else 0
+                    summary['put_volume'] = put_data[volume_col].sum() if not put_data.empty else 0
+                    summary['total_volume'] = summary['call_volume'] + summary['put_volume']
+                    
+                    if summary['total_volume'] > 0:
+                        summary['call_percentage'] = (summary['call_volume'] / summary['total_volume']) * 100
+                        summary['put_percentage'] = (summary['put_volume'] / summary['total_volume']) * 100
+            
+            return summary
+            
+        except Exception:
+            return None
+
+def create_market_maker_charts(summary_data):
+    """Create charts for market maker data visualization"""
+    call_color = st.session_state.call_color
+    put_color = st.session_state.put_color
+    
+    # Ensure we have valid data for charts
+    call_vol = max(summary_data['call_volume'], 0)
+    put_vol = max(summary_data['put_volume'], 0)
+    
+    # If both volumes are zero, create placeholder charts
+    if call_vol == 0 and put_vol == 0:
+        call_vol, put_vol = 1, 1  # Equal placeholder values
+    
+    # Call/Put Volume Pie Chart
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=['Calls', 'Puts'],
+        values=[call_vol, put_vol],
+        marker_colors=[call_color, put_color],
+        hole=0.4,
+        textinfo='label+percent+value',
+        textfont_size=14
+    )])
+    
+    fig_pie.update_layout(
+        title=dict(
+            text="Market Maker Call/Put Volume Distribution",
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18)
+        ),
+        template="plotly_dark",
+        height=500,  # Increased height for bigger chart
+        showlegend=False,  # Remove legend
+        margin=dict(t=80, b=80, l=80, r=80)  # Add margins for better spacing
+    )
+    
+    # Volume Bar Chart
+    fig_bar = go.Figure()
+    
+    fig_bar.add_trace(go.Bar(
+        x=['Calls', 'Puts'],
+        y=[call_vol, put_vol],
+        marker_color=[call_color, put_color],
+        text=[f"{summary_data['call_volume']:,}", f"{summary_data['put_volume']:,}"],
+        textposition='auto',
+        name='Volume'
+    ))
+    
+    fig_bar.update_layout(
+        title=dict(
+            text="Market Maker Volume Breakdown",
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18)
+        ),
+        xaxis_title=dict(
+            text="Option Type",
+            font=dict(size=14)
+        ),
+        yaxis_title=dict(
+            text="Volume",
+            font=dict(size=14)
+        ),
+        template="plotly_dark",
+        height=500,  # Increased height for bigger chart
+        showlegend=False,
+        margin=dict(t=80, b=80, l=80, r=80)  # Add margins for better spacing
+    )
+    
+    return fig_pie, fig_bar
+
+def download_volume_csv(symbol=None, symbol_type="U", expiry_date=None):
+    """Download market maker volume data from OCC API"""
+    BASE_URL = "https://marketdata.theocc.com/volume-query"
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
+    
+    # Check if we should run the script
+    if not should_run_script():
+        return None, "Script is currently disabled."
+    
+    # Clean symbol for OCC API (remove ^ prefix from index symbols)
+    clean_symbol = symbol
+    if symbol and symbol.startswith('^'):
+        clean_symbol = symbol[1:]  # Remove the ^ prefix
+    
+    # The API report date should be from the latest business day from 24 hours ago
+    api_report_date = get_latest_business_day()
+    
+    # If expiry_date is provided, use it for display purposes
+    # The actual API still uses the api_report_date for the reportDate parameter
+    display_date = expiry_date if expiry_date else api_report_date
+    
+    params = get_params_for_date(api_report_date, clean_symbol, symbol_type)
+    
+    try:
+        # Make the GET request to the OCC volume query endpoint
+        response = call_upstream('occ', requests.get, BASE_URL, params=params, headers=HEADERS)
+        
+        # Check if the request was successful
+        if response.status_code == 200:
+            if expiry_date:
+                # Convert expiry_date string to datetime for formatting
+                try:
+                    if isinstance(expiry_date, str):
+                        expiry_dt = datetime.strptime(expiry_date, '%Y-%m-%d')
+                        display_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_dt.strftime('%Y-%m-%d (%A)')} (API report date: {api_report_date.strftime('%Y-%m-%d')})"
+                    else:
+                        display_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_date.strftime('%Y-%m-%d (%A)')} (API report date: {api_report_date.strftime('%Y-%m-%d')})"
+                except:
+                    display_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_date} (API report date: {api_report_date.strftime('%Y-%m-%d')})"
+            else:
+                display_text = f"Market Maker Positioning Data Retrieved Successfully for {api_report_date.strftime('%Y-%m-%d (%A)')}"
+            return response.text, display_text
+        else:
+            # Try previous business days (up to 5 days back)
+            for days_back in range(1, 6):  # Try up to 5 days back
+                fallback_date = datetime.now() - timedelta(days=days_back)
+                
+                # Skip weekends
+                if fallback_date.weekday() > 4:
+                    continue
+                
+                params_fallback = get_params_for_date(fallback_date, clean_symbol, symbol_type)
+                
+                try:
+                    response_fallback = call_upstream('occ', requests.get, BASE_URL, params=params_fallback, headers=HEADERS)
+                    if response_fallback.status_code == 200:
+                        if expiry_date:
+                            try:
+                                if isinstance(expiry_date, str):
+                                    expiry_dt = datetime.strptime(expiry_date, '%Y-%m-%d')
+                                    fallback_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_dt.strftime('%Y-%m-%d (%A)')} (API fallback date: {fallback_date.strftime('%Y-%m-%d')})"
+                                else:
+                                    fallback_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_date.strftime('%Y-%m-%d (%A)')} (API fallback date: {fallback_date.strftime('%Y-%m-%d')})"
+                            except:
+                                fallback_text = f"Market Maker Positioning Data Retrieved Successfully for expiry: {expiry_date} (API fallback date: {fallback_date.strftime('%Y-%m-%d')})"
+                        else:
+                            fallback_text = f"Market Maker Positioning Data Retrieved Successfully for {fallback_date.strftime('%Y-%m-%d (%A)')}"
+                        return response_fallback.text, fallback_text
+                except requests.exceptions.RequestException:
+                    continue
+            
+            return None, f"Error: Failed to download CSV. Status code: {response.status_code}"
+            
+    except requests.exceptions.RequestException as e:
+        return None, f"Error during request: {e}"
+
+
+def render():
+    """Render the page; called by page_registry on every rerun."""
+    saved_ticker = st.session_state.get("saved_ticker", "")
+    main_container = st.container()
+    with main_container:
+        st.empty()  # Clear previous content
+        col1, col2 = st.columns([0.94, 0.06])
+        with col1:
+            user_ticker = st.text_input("Enter Stock Ticker (e.g., SPY, TSLA, SPX, NDX):", saved_ticker, key="options_data_ticker")
+        with col2:
+            st.write("")  # Add some spacing
+            st.write("")  # Add some spacing
+            if st.button("🔄", key="refresh_button_oi"):
+                invalidate_ticker_data(format_ticker(user_ticker))  # Drop this ticker's cached data before rerunning
+                st.rerun()
+        ticker = format_ticker(user_ticker)
+    
+        # Clear expiry selections if ticker changes (cached data is scoped per ticker)
+        if ticker != saved_ticker:
+            save_ticker(ticker)  # Save the ticker
+        
+            # Clear expiry selection state for current page when ticker changes
+            page_expiry_key = f"{st.session_state.current_page}_selected_dates"
+            if page_expiry_key in st.session_state:
+                st.session_state[page_expiry_key] = []
+        
+            # Also clear any expiry selector widgets
+            selector_key = f"{st.session_state.current_page}_expiry_selector"
+            if selector_key in st.session_state:
+                st.session_state[selector_key] = []
+        
+            # Force rerun to refresh available expiry dates
+            st.rerun()
+    
+        if ticker:
+            # Fetch price once
+            S = get_current_price(ticker)
+            if S is None:
+                st.error("Could not fetch current price.")
+                st.stop()
+
+            available_dates = get_expirations(ticker)
+            if not available_dates:
+                st.warning("No options data available for this ticker.")
+            else:
+                selected_expiry_dates, selector_container = expiry_selector_fragment(st.session_state.current_page, available_dates)
+                st.session_state.expiry_selector_container = selector_container
+            
+                if not selected_expiry_dates:
+                    st.info("Please select at least one expiration date.")
+                    st.stop()
+            
+                all_calls, all_puts = fetch_and_process_multiple_dates(
+                    ticker,
+                    selected_expiry_dates,
+                    S=S
+                )
+            
+                if all_calls.empty and all_puts.empty:
+                    st.warning("No options data available for the selected dates.")
+                    st.stop()
+            
+                # New: Add tabs to organize content
+                tab1, tab2, tab3, tab4, tab5 = st.tabs(["OI & Volume Charts", "Options Flow Analysis", "Premium Analysis", "Data Tables", "Market Maker"])
+            
+                with tab1:
+                    # Original OI and Volume charts
+                    oi_fig, volume_fig = create_oi_volume_charts(all_calls, all_puts, S)
+                    st.plotly_chart(oi_fig, use_container_width=True)
+                    st.plotly_chart(volume_fig, use_container_width=True)
+            
+                with tab2:
+                    # New: Options flow analysis and visualizations
+                    flow_data = analyze_options_flow(all_calls, all_puts, S)
+                    flow_fig, money_fig, premium_fig, otm_fig = create_option_flow_charts(flow_data)
+                
+                    # Create two columns for flow metrics
+                    flow_col1, flow_col2 = st.columns(2)
+                
+                    with flow_col1:
+                        # Show bought vs sold volume
+                        st.plotly_chart(flow_fig, use_container_width=True)
+                    
+                        # Show OTM vs ITM volume
+                        st.plotly_chart(money_fig, use_container_width=True)
+                
+                    with flow_col2:
+                        # Show premium distribution
+                        st.plotly_chart(premium_fig, use_container_width=True)
+                    
+                        # Show OTM analysis
+                        st.plotly_chart(otm_fig, use_container_width=True)
+                
+                    # Summary metrics display
+                    st.subheader("Options Flow Summary")
+                
+                    # Create a styled DataFrame for summary stats
+                    summary_data = {
+                        'Metric': [
+                            'Total Call Premium', 'Total Put Premium',
+                            'Call Volume', 'Put Volume',
+                            'OTM Calls Bought', 'OTM Calls Sold',
+                            'OTM Puts Bought', 'OTM Puts Sold'
+                        ],
+                        'Value': [
+                            f"${flow_data['total_premium']['calls']:,.0f}",
+                            f"${flow_data['total_premium']['puts']:,.0f}",
+                            f"{flow_data['calls']['bought']['volume'] + flow_data['calls']['sold']['volume']:,.0f}",
+                            f"{flow_data['puts']['bought']['volume'] + flow_data['puts']['sold']['volume']:,.0f}",
+                            f"{flow_data['otm_detail']['calls_bought']:,.0f}",
+                            f"{flow_data['otm_detail']['calls_sold']:,.0f}",
+                            f"{flow_data['otm_detail']['puts_bought']:,.0f}",
+                            f"{flow_data['otm_detail']['puts_sold']:,.0f}"
+                        ],
+                        'Type': [
+                            'Call', 'Put',
+                            'Call', 'Put',
+                            'Call', 'Call',
+                            'Put', 'Put'
+                        ]
+                    }
+                
+                    summary_df = pd.DataFrame(summary_data)
+                
+                    # Apply styling with conditional formatting
+                    def color_type(val):
+                        color = st.session_state.call_color if val == 'Call' else st.session_state.put_color
+                        return f'color: {color}'
+
+                    # Display the table with styling
+                    st.dataframe(
+                        summary_df.style.map(lambda val: f'color: {st.session_state.call_color if val == "Call" else st.session_state.put_color}', subset=['Type']),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    # Calculate and display put/call ratio
+                    put_call_ratio = flow_data['puts']['bought']['volume'] / max(flow_data['calls']['bought']['volume'], 1)
+                
+                    # Format the ratio as a string with 2 decimal places
+                    ratio_str = f"{put_call_ratio:.2f}"
+                
+                    # Determine background color based on ratio value
+                    if put_call_ratio > 1.5:
+                        bgcolor = "rgba(255, 0, 0, 0.2)"  # Red background for high put/call ratio
+                    elif put_call_ratio < 0.7:
+                        bgcolor = "rgba(0, 255, 0, 0.2)"  # Green background for low put/call ratio
+                    else:
+                        bgcolor = "rgba(255, 255, 255, 0.1)"  # Neutral background
+                
+                    # Display put/call ratio in a styled container
+                    st.markdown(
+                        f"""
+                    <div style="background-color: {bgcolor}; padding: 10px; border-radius: 5px; margin-bottom: 10px;">
+                        <h3 style="margin: 0;">Put/Call Volume Ratio: {ratio_str}</h3>
+                        <p style="margin: 5px 0 0 0; font-size: 0.8em;">
+                            {
+                                "Elevated put buying - possible bearish sentiment" if put_call_ratio > 1.5 else
+                                "More call buying than put buying - possible bullish sentiment" if put_call_ratio < 0.7 else
+                                "Neutral put/call ratio"
+                            }
+                        </p>
+                    </div>
+                    """,
+                        unsafe_allow_html=True
+                    )
+            
+                with tab3:
+                    # New: Advanced premium analysis
+                    st.subheader("Premium Distribution Analysis")
+                
+                
+                    # Premium summary statistics
+                    total_call_premium = (all_calls['volume'] * all_calls['lastPrice'] * 100).sum()
+                    total_put_premium = (all_puts['volume'] * all_puts['lastPrice'] * 100).sum()
+                    premium_ratio = total_call_premium / max(total_put_premium, 1)  # Avoid division by zero
+                
+                    # Premium by moneyness
+                    all_calls['moneyness'] = all_calls.apply(lambda x: 'ITM' if x['strike'] <= S else 'OTM', axis=1)
+                    all_puts['moneyness'] = all_puts.apply(lambda x: 'ITM' if x['strike'] >= S else 'OTM', axis=1)
+                
+                    otm_call_premium = (all_calls[all_calls['moneyness'] == 'OTM']['volume'] * 
+                                    all_calls[all_calls['moneyness'] == 'OTM']['lastPrice'] * 100).sum()
+                    itm_call_premium = (all_calls[all_calls['moneyness'] == 'ITM']['volume'] * 
+                                    all_calls[all_calls['moneyness'] == 'ITM']['lastPrice'] * 100).sum()
+                    otm_put_premium = (all_puts[all_puts['moneyness'] == 'OTM']['volume'] * 
+                                    all_puts[all_puts['moneyness'] == 'OTM']['lastPrice'] * 100).sum()
+                    itm_put_premium = (all_puts[all_puts['moneyness'] == 'ITM']['volume'] * 
+                                    all_puts[all_puts['moneyness'] == 'ITM']['lastPrice'] * 100).sum()
+                
+                    # Calculate ITM premium flow
+                    itm_net_premium = itm_call_premium - itm_put_premium
+                    itm_premium_ratio = itm_call_premium / max(itm_put_premium, 1)
+                
+                    # Determine ITM premium flow sentiment
+                    if itm_premium_ratio > 1.5:
+                        itm_sentiment = "Bullish"
+                        itm_color = st.session_state.call_color
+                    elif itm_premium_ratio < 0.7:
+                        itm_sentiment = "Bearish"
+                        itm_color = st.session_state.put_color
+                    else:
+                        itm_sentiment = "Neutral"
+                        itm_color = "white"
+                    
+                    # Display premium metrics in a cleaner format with call/put ratio indicator
+                    st.markdown("### Premium Summary")
+                
+                    # Call/put premium ratio status indicator
+                    ratio_status = ""
+                    if premium_ratio > 1.5:
+                        ratio_status = "Bullish (high call premium)"
+                        ratio_color = st.session_state.call_color
+                    elif premium_ratio < 0.7:
+                        ratio_status = "Bearish (high put premium)"
+                        ratio_color = st.session_state.put_color
+                    else:
+                        ratio_status = "Neutral"
+                        ratio_color = "white"
+                
+                    # Create metrics with custom styling
+                    st.markdown(
+                        f"""
+                    <div style="padding: 10px; border-radius: 5px; background-color: rgba(50,50,50,0.3); margin-bottom: 15px;">
+                        <h4>Call/Put Premium Ratio: <span style="color: {ratio_color}">{premium_ratio:.2f}</span> {ratio_status}</h4>
+                    </div>
+                    """, 
+                        unsafe_allow_html=True
+                    )
+                
+                    # Add ITM premium flow indicator
+                    st.markdown(
+                        f"""
+                    <div style="padding: 10px; border-radius: 5px; background-color: rgba(50,50,50,0.3); margin-bottom: 15px;">
+                        <h4>ITM Premium Flow: <span style="color: {itm_color}">{itm_sentiment}</span> (Call/Put Ratio: {itm_premium_ratio:.2f})</h4>
+                        <p>Net ITM Premium: <span style="color: {st.session_state.call_color if itm_net_premium > 0 else st.session_state.put_color}">${abs(itm_net_premium):,.0f}</span> 
+                        {" toward calls" if itm_net_premium > 0 else " toward puts"}</p>
+                    </div>
+                    """, 
+                        unsafe_allow_html=True
+                    )
+                
+                    # Create three columns for better organization
+                    premium_col1, premium_col2, premium_col3 = st.columns(3)
+                
+                    with premium_col1:
+                        st.markdown(f"<h4 style='color: {st.session_state.call_color}'>Call Premium</h4>", unsafe_allow_html=True)
+                        st.metric("Total", f"${total_call_premium:,.0f}")
+                        st.metric("OTM", f"${otm_call_premium:,.0f}", f"{otm_call_premium/total_call_premium*100:.1f}%" if total_call_premium > 0 else "0%")
+                        st.metric("ITM", f"${itm_call_premium:,.0f}", f"{itm_call_premium/total_call_premium*100:.1f}%" if total_call_premium > 0 else "0%")
+                
+                    with premium_col2:
+                        st.markdown(f"<h4 style='color: {st.session_state.put_color}'>Put Premium</h4>", unsafe_allow_html=True)
+                        st.metric("Total", f"${total_put_premium:,.0f}")
+                        st.metric("OTM", f"${otm_put_premium:,.0f}", f"{otm_put_premium/total_put_premium*100:.1f}%" if total_put_premium > 0 else "0%")
+                        st.metric("ITM", f"${itm_put_premium:,.0f}", f"{itm_put_premium/total_put_premium*100:.1f}%" if total_put_premium > 0 else "0%")
+                
+                    with premium_col3:
+                        st.markdown("<h4>Premium Analysis</h4>", unsafe_allow_html=True)
+                    
+                        # Calculate OTM/ITM ratios for sentiment analysis
+                        otm_itm_call_ratio = otm_call_premium / max(itm_call_premium, 1)
+                        otm_itm_put_ratio = otm_put_premium / max(itm_put_premium, 1)
+                    
+                        # Show OTM to ITM ratios
+                        st.metric("OTM/ITM Call Ratio", f"{otm_itm_call_ratio:.2f}")
+                        st.metric("OTM/ITM Put Ratio", f"{otm_itm_put_ratio:.2f}")
+                    
+                        # Premium concentration
+                        total_premium = total_call_premium + total_put_premium
+                        st.metric("Call Premium %", f"{total_call_premium/total_premium*100:.1f}%" if total_premium > 0 else "0%")
+                        st.metric("Put Premium %", f"{total_put_premium/total_premium*100:.1f}%" if total_premium > 0 else "0%")
+                    
+                    # Add new ITM premium flow analysis chart
+                    st.markdown("### ITM Premium Flow Analysis")
+                
+                    # Create a bar chart to visualize ITM premium distribution
+                    itm_premium_fig = go.Figure()
+                
+                    # Add bars for ITM Call and Put premium
+                    itm_premium_fig.add_trace(go.Bar(
+                        x=['ITM Calls'],
+                        y=[itm_call_premium],
+                        name='ITM Call Premium',
+                        marker_color=st.session_state.call_color
+                    ))
+                
+                    itm_premium_fig.add_trace(go.Bar(
+                        x=['ITM Puts'],
+                        y=[itm_put_premium],
+                        name='ITM Put Premium',
+                        marker_color=st.session_state.put_color
+                    ))
+                
+                    # Add a third bar for net ITM premium flow if needed
+                    itm_premium_fig.add_trace(go.Bar(
+                        x=['Net ITM Flow'],
+                        y=[itm_net_premium],
+                        name='Net ITM Premium',
+                        marker_color=st.session_state.call_color if itm_net_premium > 0 else st.session_state.put_color
+                    ))
+                
+                    itm_premium_fig.update_layout(
+                        title=dict(
+                            text=f"ITM Premium Flow - {itm_sentiment}",
+                            font=dict(size=st.session_state.chart_text_size + 6)
+                        ),
+                        xaxis_title=dict(
+                            text="Option Type",
+                            font=dict(size=st.session_state.chart_text_size)
+                        ),
+                        yaxis_title=dict(
+                            text="Premium ($)",
+                            font=dict(size=st.session_state.chart_text_size)
+                        ),
+                        template="plotly_dark",
+                        xaxis=dict(
+                            tickfont=dict(size=st.session_state.chart_text_size)
+                        ),
+                        yaxis=dict(
+                            tickfont=dict(size=st.session_state.chart_text_size)
+                        )
+                    )
+                
+                    st.plotly_chart(itm_premium_fig, use_container_width=True)
+                
+                    # Add additional premium insights with ITM flow details
+                    st.markdown("### Premium Insights")
+                
+                    # Create strike-based premium insights - Fix for deprecation warning
+                    # Instead of using groupby().apply(), calculate premium directly
+                    calls_premium = all_calls.copy()
+                    calls_premium['premium'] = calls_premium['volume'] * calls_premium['lastPrice'] * 100
+                    call_premium_by_strike = calls_premium.groupby('strike')['premium'].sum().reset_index()
+                
+                    puts_premium = all_puts.copy()
+                    puts_premium['premium'] = puts_premium['volume'] * puts_premium['lastPrice'] * 100
+                    put_premium_by_strike = puts_premium.groupby('strike')['premium'].sum().reset_index()
+                
+                    # Find top premium concentrations
+                    top_call_strikes = call_premium_by_strike.nlargest(5, 'premium')
+                    top_put_strikes = put_premium_by_strike.nlargest(5, 'premium')
+                
+                    # Calculate call vs put premium for each strike and net premium flow
+                    premium_combined = pd.merge(call_premium_by_strike, put_premium_by_strike, on='strike', how='outer', suffixes=('_call', '_put')).fillna(0)
+                    premium_combined['net_premium'] = premium_combined['premium_call'] - premium_combined['premium_put']
+                    premium_combined['ratio'] = premium_combined['premium_call'] / premium_combined['premium_put'].replace(0, 1)
+                
+                    # Find strikes with most bullish and bearish premium flow
+                    bullish_strikes = premium_combined.nlargest(5, 'net_premium')
+                    bearish_strikes = premium_combined.nsmallest(5, 'net_premium')
+                
+                    # Calculate total premium for percentages
+                    total_call_premium_sum = call_premium_by_strike['premium'].sum()
+                    total_put_premium_sum = put_premium_by_strike['premium'].sum()
+                
+                    insight_col1, insight_col2 = st.columns(2)
+                
+                    # Use a table format instead of text lines to avoid formatting issues
+                    with insight_col1:
+                        st.markdown(f"<h5 style='color: {st.session_state.call_color}'>Top Call Premium Strikes</h5>", unsafe_allow_html=True)
+                    
+                        # Create DataFrames for display
+                        call_strikes_data = []
+                        for _, row in top_call_strikes.iterrows():
+                            pct = (row['premium'] / total_call_premium_sum * 100) if total_call_premium_sum > 0 else 0
+                            call_strikes_data.append({
+                                "Strike": f"${row['strike']:.1f}", 
+                                "Premium": f"${row['premium']:,.0f}", 
+                                "% of Total": f"{pct:.1f}%"
+                            })
+                        st.table(pd.DataFrame(call_strikes_data))
+                    
+                        st.markdown(f"<h5 style='color: {st.session_state.call_color}'>Most Bullish Premium Flow</h5>", unsafe_allow_html=True)
+                    
+                        bullish_data = []
+                        for _, row in bullish_strikes.iterrows():
+                            bullish_data.append({
+                                "Strike": f"${row['strike']:.1f}", 
+                                "Net Premium": f"+${row['net_premium']:,.0f}", 
+                                "C/P Ratio": f"{row['ratio']:.2f}"
+                            })
+                        st.table(pd.DataFrame(bullish_data))
+                
+                    with insight_col2:
+                        st.markdown(f"<h5 style='color: {st.session_state.put_color}'>Top Put Premium Strikes</h5>", unsafe_allow_html=True)
+                    
+                        put_strikes_data = []
+                        for _, row in top_put_strikes.iterrows():
+                            pct = (row['premium'] / total_put_premium_sum * 100) if total_put_premium_sum > 0 else 0
+                            put_strikes_data.append({
+                                "Strike": f"${row['strike']:.1f}", 
+                                "Premium": f"${row['premium']:,.0f}", 
+                                "% of Total": f"{pct:.1f}%"
+                            })
+                        st.table(pd.DataFrame(put_strikes_data))
+                    
+                        st.markdown(f"<h5 style='color: {st.session_state.put_color}'>Most Bearish Premium Flow</h5>", unsafe_allow_html=True)
+                    
+                        bearish_data = []
+                        for _, row in bearish_strikes.iterrows():
+                            bearish_data.append({
+                                "Strike": f"${row['strike']:.1f}", 
+                                "Net Premium": f"-${abs(row['net_premium']):,.0f}", 
+                                "C/P Ratio": f"{row['ratio']:.2f}"
+                            })
+                        st.table(pd.DataFrame(bearish_data))
+
+                with tab4:
+                    # Original data tables
+                    volume_over_oi = st.checkbox("Show only rows where Volume > Open Interest")
+                    # Filter data based on volume over OI if checked
+                    calls_filtered = all_calls
+                    puts_filtered = all_puts
+                    if volume_over_oi:
+                        calls_filtered = calls_filtered[calls_filtered['volume'] > calls_filtered['openInterest']]
+                        puts_filtered = puts_filtered[puts_filtered['volume'] > puts_filtered['openInterest']]
+                    if calls_filtered.empty and puts_filtered.empty:
+                        st.warning("No data left after applying filters.")
+                    else:
+                        st.write("### Filtered Data Tables")
+                        if not calls_filtered.empty:
+                            st.write("**Calls Table**")
+                            st.dataframe(calls_filtered)
+                        else:
+                            st.write("No calls match filters.")
+                        if not puts_filtered.empty:
+                            st.write("**Puts Table**")
+                            st.dataframe(puts_filtered)
+                        else:
+                            st.write("No puts match filters.")
+            
+                with tab5:
+                    # Market Maker tab content
+                    st.write("### 📊 Market Maker Positioning")
+                    st.write(f"**Symbol:** {ticker.upper()} | **Expiry:** {', '.join(selected_expiry_dates)}")
+                    st.info("📅 **Data Source**: OCC (Options Clearing Corporation) | **Timing**: Latest business day from past 24 hours")
+                
+                    # Add informational section about OCC and data timing
+                    with st.expander("ℹ️ About OCC Market Maker Data", expanded=False):
+                        st.markdown("""
+                    **What is the OCC (Options Clearing Corporation)?**
+                    
+                    The OCC is the world's largest equity derivatives clearing organization and acts as the central counterparty for all options trades in the U.S. They guarantee the performance of all options contracts and provide transparency into market activity.
+                    
+                    **Market Maker Role:**
+                    - Market makers provide liquidity by continuously quoting bid and ask prices
+                    - They facilitate trading by being ready to buy or sell options contracts
+                    - Their positioning data reveals institutional sentiment and flow direction
+                    
+                    **Data Timing & Availability:**
+                    - 📅 **Report Date**: Data is from the latest business day within the past 24 hours
+                    - ⏰ **Update Schedule**: OCC updates this data daily after market close
+                    - 🕐 **Lag Time**: Data typically reflects previous trading day activity
+                    - 📊 **Coverage**: All option types (equity, index, ETF options)
+                    
+                    **Why This Matters:**
+                    - Market maker positioning can indicate institutional sentiment
+                    - Large call positions may suggest bullish positioning
+                    - Large put positions may suggest bearish positioning or hedging activity
+                    - Combined with other analysis, helps understand market dynamics
+                    
+                    **Important Notes:**
+                    - This is historical data (not real-time)
+                    - Market maker positions can change rapidly during trading hours
+                    - Data should be used in conjunction with other analysis tools
+                    """)
+                
+                    st.write("")  # Add spacing
+                
+                    # Initialize session state for market maker data
+                    if 'mm_data' not in st.session_state:
+                        st.session_state.mm_data = None
+                        st.session_state.mm_message = None
+                        st.session_state.mm_last_ticker = None
+                        st.session_state.mm_last_expiry = None
+                
+                    # Check if we need to fetch new data (ticker or expiry changed)
+                    current_expiries = tuple(selected_expiry_dates) if selected_expiry_dates else None
+                    need_refresh = (
+                        st.session_state.mm_last_ticker != ticker or 
+                        st.session_state.mm_last_expiry != current_expiries or
+                        st.session_state.mm_data is None
+                    )
+                
+                    # Auto-fetch data when symbol or expiry changes
+                    if need_refresh and ticker and current_expiries:
+                        with st.spinner("Loading market maker data for multiple expiration dates..."):
+                            combined_data = []
+                            success_messages = []
+                        
+                            # Fetch data for each selected expiration date
+                            for expiry_date in selected_expiry_dates:
+                                data, message = download_volume_csv(ticker, "U", expiry_date)
+                                if data:
+                                    combined_data.append(data)
+                                    success_messages.append(f"✓ {expiry_date}")
+                                else:
+                                    success_messages.append(f"✗ {expiry_date}: {message}")
+                        
+                            # Combine all CSV data
+                            if combined_data:
+                                # Join all CSV data with headers
+                                all_csv_data = []
+                                for i, csv_data in enumerate(combined_data):
+                                    lines = csv_data.strip().split('\n')
+                                    # Skip header lines and add only data lines
+                                    data_lines = []
+                                    for line in lines:
+                                        if ',' in line and line.strip() and line.strip()[0].isdigit():
+                                            data_lines.extend(lines[lines.index(line):])
+                                            break
+                                    all_csv_data.extend(data_lines)
+                            
+                                combined_csv = '\n'.join(all_csv_data)
+                                combined_message = f"Market Maker Data Retrieved for {len(selected_expiry_dates)} expiration dates:\n" + '\n'.join(success_messages)
+                            
+                                st.session_state.mm_data = combined_csv
+                                st.session_state.mm_message = combined_message
+                            else:
+                                st.session_state.mm_data = None
+                                st.session_state.mm_message = "Failed to retrieve data for any selected expiration dates."
+                        
+                            st.session_state.mm_last_ticker = ticker
+                            st.session_state.mm_last_expiry = current_expiries
+                
+
+                    # Display results
+                    if st.session_state.mm_message:
+                        if st.session_state.mm_data:
+                            st.success(st.session_state.mm_message)
+                        
+                            # Process the market maker data
+                            summary_data = process_market_maker_data(st.session_state.mm_data)
+                        
+                            if summary_data:
+                                # Display summary metrics
+                                st.write("### 📊 Market Maker Summary")
+                            
+                                # Create metric columns
+                                col1, col2, col3, col4 = st.columns(4)
+                            
+                                with col1:
+                                    st.metric(
+                                        label="Total Volume",
+                                        value=f"{summary_data['total_volume']:,}"
+                                    )
+                            
+                                with col2:
+                                    call_color = st.session_state.call_color
+                                    st.markdown(f"""
+                                <div style="border: 1px solid #333; border-radius: 5px; padding: 10px; text-align: center;">
+                                    <p style="margin: 0; font-size: 14px; color: #888;">Call Volume</p>
+                                    <p style="margin: 5px 0; font-size: 24px; font-weight: bold; color: {call_color};">{summary_data['call_volume']:,}</p>
+                                    <p style="margin: 0; font-size: 14px; color: {call_color};">{summary_data['call_percentage']:.1f}%</p>
+                                </div>
+                                """, unsafe_allow_html=True)
+                            
+                                with col3:
+                                    put_color = st.session_state.put_color
+                                    st.markdown(f"""
+                                <div style="border: 1px solid #333; border-radius: 5px; padding: 10px; text-align: center;">
+                                    <p style="margin: 0; font-size: 14px; color: #888;">Put Volume</p>
+                                    <p style="margin: 5px 0; font-size: 24px; font-weight: bold; color: {put_color};">{summary_data['put_volume']:,}</p>
+                                    <p style="margin: 0; font-size: 14px; color: {put_color};">{summary_data['put_percentage']:.1f}%</p>
+                                </div>
+                                """, unsafe_allow_html=True)
+                            
+                                with col4:
+                                    if summary_data['call_volume'] > summary_data['put_volume']:
+                                        bias = "Call Bias"
+                                        bias_pct = summary_data['call_percentage'] - 50
+                                        bias_color = "#00FF00"  # Green for call bias
+                                    else:
+                                        bias = "Put Bias"
+                                        bias_pct = summary_data['put_percentage'] - 50
+                                        bias_color = "#FF0000"  # Red for put bias
+                                
+                                    st.markdown(f"""
+                                <div style="border: 1px solid #333; border-radius: 5px; padding: 10px; text-align: center;">
+                                    <p style="margin: 0; font-size: 14px; color: #888;">Market Bias</p>
+                                    <p style="margin: 5px 0; font-size: 24px; font-weight: bold; color: {bias_color};">{bias}</p>
+                                    <p style="margin: 0; font-size: 14px; color: {bias_color};">{'+' if bias_pct > 0 else ''}{bias_pct:.1f}%</p>
+                                </div>
+                                """, unsafe_allow_html=True)
+                            
+                                st.write("---")
+                            
+                                # Create and display charts
+                                if summary_data['total_volume'] > 0:
+                                    st.write("### 📈 Visual Analysis")
+                                
+                                    fig_pie, fig_bar = create_market_maker_charts(summary_data)
+                                
+                                    # Display charts in columns
+                                    chart_col1, chart_col2 = st.columns(2)
+                                
+                                    with chart_col1:
+                                        st.plotly_chart(fig_pie, use_container_width=True)
+                                
+                                    with chart_col2:
+                                        st.plotly_chart(fig_bar, use_container_width=True)
+                            
+                                # Optional: Show data table in collapsible section
+                                with st.expander("📋 View Raw Data Table", expanded=False):
+                                    if not summary_data['raw_data'].empty:
+                                        st.dataframe(summary_data['raw_data'], use_container_width=True)
+                                    else:
+                                        st.warning("No data available in the table.")
+                            else:
+                                st.warning("Unable to process market maker data. The data format may not be recognized.")
+                            
+                        else:
+                            st.error(st.session_state.mm_message)
+                    else:
+                        # Show loading state or instructions
+                        if not ticker:
+                            st.info("💡 Enter a symbol above to view market maker positioning data.")
+                        elif not current_expiries:
+                            st.info("💡 Select expiration date(s) to view market maker positioning data.")
+                        else:
+                            st.info("🔄 Loading market maker data automatically...")
+                    
+                        # Show some help information
+                        with st.expander("ℹ️ About Market Maker Data"):
+                            st.write("""
+                        **Market Maker Positioning Data from OCC:**
+                        
+                        - **Source**: Options Clearing Corporation (OCC)
+                        - **Data Type**: Market maker volume and positioning
+                        - **Update Frequency**: Daily (business days only)
+                        - **Report Date**: Latest business day from 24 hours ago
+                        - **Coverage**: All option types (Equity, Index, etc.)
+                        
+                        **How it works:**
+                        - Data loads automatically when you enter a symbol and select expiration date(s)
+                        - Supports multiple expiration dates - data is combined automatically
+                        - Data refreshes automatically when you change the symbol or expiration selection
+                        
+                        **Data shows:**
+                        - Call vs Put volume distribution
+                        - Market maker activity breakdown
+                        - Symbol-specific positioning data
+                        
+                        **Note**: Data availability depends on market maker activity and OCC reporting schedules.
+                        """)
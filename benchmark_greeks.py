@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK GREEKS
+================
+
+Compara o cálculo linha a linha (df.apply + scipy escalar) com o motor
+vetorizado de greeks_calculator em cadeias sintéticas de 1k, 10k e 100k strikes.
+
+Uso:
+    python benchmark_greeks.py
+    python benchmark_greeks.py --sizes 1000 10000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from greeks_calculator import calculate_greeks, calculate_charm, calculate_greeks_vectorized
+
+SPOT = 5000.0
+T_YEARS = 30 / 365.0
+RATE = 0.045
+
+
+def make_chain(n_rows, seed=42):
+    """Gera uma cadeia sintética com strikes em torno do spot."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'strike': np.linspace(SPOT * 0.5, SPOT * 1.5, n_rows),
+        'impliedVolatility': rng.uniform(0.08, 0.9, n_rows),
+        'openInterest': rng.integers(0, 20000, n_rows),
+    })
+
+
+def run_rowwise(df, flag):
+    """Caminho antigo: duas passadas df.apply com scipy escalar."""
+    greeks = df.apply(
+        lambda row: calculate_greeks(flag, SPOT, row["strike"], T_YEARS, row["impliedVolatility"], RATE),
+        axis=1, result_type='expand'
+    )
+    charm = df.apply(
+        lambda row: calculate_charm(flag, SPOT, row["strike"], T_YEARS, row["impliedVolatility"], RATE),
+        axis=1
+    )
+    return greeks, charm
+
+
+def run_vectorized(df, flag):
+    """Caminho novo: uma passada colunar."""
+    return calculate_greeks_vectorized(
+        flag, SPOT, df['strike'].to_numpy(dtype=float), T_YEARS,
+        df['impliedVolatility'].to_numpy(dtype=float), RATE
+    )
+
+
+def best_time(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df, 'c')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de greeks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'apply (s)':>12} {'vetorizado (s)':>16} {'speedup':>10}")
+    print("-" * 52)
+    for n_rows in args.sizes:
+        df = make_chain(n_rows)
+        # O caminho linha a linha é lento demais para repetir em 100k
+        rowwise = best_time(run_rowwise, df, 1 if n_rows >= 100000 else args.repeat)
+        vectorized = best_time(run_vectorized, df, args.repeat)
+        print(f"{n_rows:>10} {rowwise:>12.4f} {vectorized:>16.5f} {rowwise / vectorized:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK STARTUP
+=================
+
+Mede a partida real do app: cada amostra é um processo Python novo que roda o
+ezoptions.py inteiro com o AppTest do Streamlit (primeiro run da sessão) e, em
+seguida, abre uma página pelo menu lateral (primeira visita, que importa o
+módulo dela). Também conta os módulos carregados e se plotly, scipy e numpy já
+estavam importados ao fim do primeiro run.
+
+Com --baseline, o mesmo roteiro roda numa cópia da revisão dada (git worktree
+temporário) para comparar. Sem --ticker nenhuma página busca dados, então o
+tempo medido é o de imports e execução do script, não o da rede.
+
+Uso:
+    python benchmark_startup.py
+    python benchmark_startup.py --baseline c6f5182 --pages Dashboard "IV Surface" --repeat 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter: first run of the app, then the first visit of one page
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import streamlit as st
+
+def _stop(seconds):
+    # The end-of-script auto-refresh sleeps before rerunning; end the run there instead
+    st.stop()
+time.sleep = _stop
+
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.session_state['saved_ticker'] = {ticker!r}
+at.session_state['prefetch_expiries'] = 0
+run_start = time.perf_counter()
+at.run()
+result = {{
+    'first_run': time.perf_counter() - run_start,
+    'total': time.perf_counter() - start,
+    'modules': len(sys.modules),
+    'loaded': [name for name in ('plotly', 'scipy', 'numpy') if name in sys.modules],
+    'exceptions': [str(e.value)[:80] for e in at.exception],
+}}
+page = {page!r}
+if page:
+    radio = at.sidebar.radio[0]
+    radio.set_value(next(option for option in radio.options if option.split(' ', 1)[1] == page))
+    visit_start = time.perf_counter()
+    at.run()
+    result['page_visit'] = time.perf_counter() - visit_start
+print(json.dumps(result))
+'''
+
+
+def run_app(tree, page, ticker):
+    """Um processo novo: primeiro run do app em `tree` e, se dada, a primeira visita a `page`."""
+    code = CHILD.format(app=os.path.join(tree, 'ezoptions.py'), ticker=ticker, page=page)
+    env = dict(os.environ, EZOPTIONS_SNAPSHOT_DB=os.path.join(tempfile.mkdtemp(), 'snapshots.sqlite'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=tree, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(tree, pages, ticker, repeat):
+    """Medianas do primeiro run e da primeira visita de cada página (uma página por processo)."""
+    startup = [run_app(tree, None, ticker) for _ in range(repeat)]
+    visits = {page: statistics.median(run_app(tree, page, ticker)['page_visit'] for _ in range(repeat))
+              for page in pages}
+    return {
+        'first_run': statistics.median(sample['first_run'] for sample in startup),
+        'total': statistics.median(sample['total'] for sample in startup),
+        'modules': startup[-1]['modules'],
+        'loaded': startup[-1]['loaded'],
+        'exceptions': startup[-1]['exceptions'],
+        'visits': visits,
+    }
+
+
+def checkout(revision):
+    """Worktree temporário (destacado) com `revision`; remover com remove_checkout()."""
+    path = tempfile.mkdtemp(prefix='ezoptions_baseline_')
+    subprocess.run(['git', 'worktree', 'add', '--detach', path, revision], cwd=ROOT,
+                   capture_output=True, check=True)
+    return path
+
+
+def remove_checkout(path):
+    subprocess.run(['git', 'worktree', 'remove', '--force', path], cwd=ROOT, capture_output=True)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de partida do app (primeiro run e primeira visita)")
+    parser.add_argument('--pages', nargs='+', default=["Dashboard", "Gamma Exposure", "IV Surface", "Implied Probabilities"])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', help="revisão do git para comparar (ex.: o commit anterior à divisão em páginas)")
+    parser.add_argument('--ticker', default='', help="ticker salvo na sessão (vazio: sem buscas de dados)")
+    args = parser.parse_args()
+
+    results = {'atual': measure(ROOT, args.pages, args.ticker, args.repeat)}
+    if args.baseline:
+        path = checkout(args.baseline)
+        try:
+            results[args.baseline] = measure(path, args.pages, args.ticker, args.repeat)
+        finally:
+            remove_checkout(path)
+
+    names = list(results)
+    print(f"{'medida (mediana, s)':<32}" + ''.join(f"{name:>14}" for name in names))
+    print("-" * (32 + 14 * len(names)))
+    print(f"{'primeiro run':<32}" + ''.join(f"{results[name]['first_run']:>14.3f}" for name in names))
+    print(f"{'processo (imports + run)':<32}" + ''.join(f"{results[name]['total']:>14.3f}" for name in names))
+    for page in args.pages:
+        print(f"{'visita: ' + page:<32}" + ''.join(f"{results[name]['visits'][page]:>14.3f}" for name in names))
+    print(f"{'módulos carregados':<32}" + ''.join(f"{results[name]['modules']:>14}" for name in names))
+    for name in names:
+        print(f"{name}: após o primeiro run já carregados: {', '.join(results[name]['loaded']) or '-'}"
+              + (f"; exceções: {results[name]['exceptions']}" if results[name]['exceptions'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# chain_fetcher.py
+# Busca concorrente de cadeias de opções em um pool de threads limitado.
+# Não depende de Streamlit: a função de busca (ex.: fetch_options_for_date com cache) é injetada.
+import math
+import string
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+# Copy-on-Write é sempre ligado a partir do pandas 3; no 2.x depende de mode.copy_on_write
+_PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 20.0  # Segundos por requisição
+
+# Raiz + data (YYMMDD ou YYYYMMDD) + C/P + strike, ex.: SPXW250117C05000000.
+# Um único grupo (raiz+data): é a chave da memoização e deixa o str.extract mais barato.
+CONTRACT_SYMBOL_PATTERN = r'([A-Z]+W?(?:\d{6}|\d{8}))[CP]\d+'
+_expiry_memo = {}
+_EXPIRY_MEMO_LIMIT = 20000
+
+# Colunas da cadeia usadas pelo app; o resto (currency, contractSize, inTheMoney, change...) é descartado.
+# Cotações e IV cabem em float32 (~7 dígitos: centavos até 100 mil); o strike fica em float64
+# porque é chave de groupby/merge e é comparado com o spot e com listas de strikes em float64.
+CHAIN_KEY_FLOAT_COLUMNS = ['strike']
+CHAIN_FLOAT_COLUMNS = ['lastPrice', 'bid', 'ask', 'impliedVolatility']
+CHAIN_COUNT_COLUMNS = ['volume', 'openInterest']
+CHAIN_CATEGORY_COLUMNS = ['extracted_expiry']
+CHAIN_COLUMNS = (['contractSymbol'] + CHAIN_KEY_FLOAT_COLUMNS + CHAIN_FLOAT_COLUMNS
+                 + CHAIN_COUNT_COLUMNS + CHAIN_CATEGORY_COLUMNS)
+
+
+def fetch_concurrently(fetch, keys, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Executa `fetch(key)` para cada chave em um pool limitado.
+
+    Cada requisição tem `timeout` segundos a partir do momento em que começa a rodar.
+    Falhas e timeouts são registrados e ignorados. Retorna [(key, result), ...]
+    na mesma ordem de `keys`, só com as chaves que deram certo.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    results = {}
+    started = {}
+
+    def run(key):
+        started[key] = time.monotonic()
+        return fetch(key)
+
+    # Queued requests can't time out on their own, so bound the whole batch as well
+    waves = math.ceil(len(keys) / max(1, max_workers))
+    batch_deadline = time.monotonic() + timeout * (waves + 1)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys))),
+                                  thread_name_prefix='chain-fetch')
+    futures = {executor.submit(run, key): key for key in keys}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {key}: {e}")
+
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                timed_out = key in started and now - started[key] > timeout
+                if timed_out or now > batch_deadline:
+                    print(f"Timed out fetching {key} after {timeout:.0f}s")
+                    future.cancel()
+                    pending.discard(future)
+    finally:
+        # Don't block the page on stragglers; they finish (or fail) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return [(key, results[key]) for key in keys if key in results]
+
+
+def fetch_chains_concurrently(fetch_options_for_date, ticker, expiry_dates, S=None,
+                              max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Busca as cadeias de vários vencimentos em paralelo usando a função de busca por data
+    (a mesma usada pelas páginas de um vencimento, então o cache é compartilhado).
+
+    Retorna ([(expiry_date, calls, puts), ...], failed): as cadeias na ordem dos
+    vencimentos e a lista dos vencimentos que falharam, estouraram o timeout ou vieram
+    vazios. Os erros só são registrados no log da thread; quem chamou decide como
+    avisar o usuário (st.* não funciona nas threads do pool).
+    """
+    expiry_dates = list(expiry_dates)
+    fetched = fetch_concurrently(
+        lambda date: fetch_options_for_date(ticker, date, S),
+        expiry_dates, max_workers=max_workers, timeout=timeout
+    )
+    chains = [(date, calls, puts) for date, (calls, puts) in fetched
+              if not (calls.empty and puts.empty)]
+    fetched_dates = {date for date, _, _ in chains}
+    failed = [date for date in expiry_dates if date not in fetched_dates]
+    return chains, failed
+
+
+def concat_chains(chains):
+    """Concatena as calls e as puts de [(expiry_date, calls, puts), ...] (já compactadas)."""
+    all_calls = [calls for _, calls, _ in chains if not calls.empty]
+    all_puts = [puts for _, _, puts in chains if not puts.empty]
+    combined_calls = _concat_keeping_categories(all_calls)
+    combined_puts = _concat_keeping_categories(all_puts)
+    return combined_calls, combined_puts
+
+
+def _concat_keeping_categories(frames):
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    # concat turns categoricals with different categories into objects
+    categories = {col: 'category' for col in CHAIN_CATEGORY_COLUMNS if col in combined.columns}
+    return combined.astype(categories) if categories else combined
+
+
+def compact_chain(df):
+    """
+    Representação compacta de uma cadeia na ingestão: só as colunas usadas, strike em
+    float64, preços/IV em float32, volume/OI em Int32 (nulável: sem dado continua sem dado,
+    não vira zero) e o vencimento como categórica.
+    O frame é compartilhado pelo cache; quem vai alterá-lo trabalha numa writable_copy.
+    """
+    if df is None or df.empty:
+        return df
+    df = df[[col for col in CHAIN_COLUMNS if col in df.columns]]
+    conversions = {}
+    for col in CHAIN_KEY_FLOAT_COLUMNS:
+        if col in df.columns:
+            conversions[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in CHAIN_FLOAT_COLUMNS:
+        if col in df.columns:
+            conversions[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    for col in CHAIN_COUNT_COLUMNS:
+        if col in df.columns:
+            # Missing counts stay <NA> (sums skip them, as they skipped NaN)
+            counts = pd.to_numeric(df[col], errors='coerce').clip(lower=0).round()
+            conversions[col] = counts.astype('Int32')
+    for col in CHAIN_CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            conversions[col] = df[col].astype('category')
+    return df.assign(**conversions)
+
+
+def copy_on_write_enabled():
+    """True se o pandas em uso tem Copy-on-Write ligado (sempre no pandas >= 3)."""
+    return _PANDAS_MAJOR >= 3 or pd.get_option('mode.copy_on_write') is True
+
+
+def writable_copy(df):
+    """
+    Cópia de um frame (em geral uma cadeia em cache) que o chamador pode alterar à vontade.
+    Com Copy-on-Write basta a cópia rasa; sem ele (pandas 2.x padrão) a cópia rasa divide
+    os arrays com o original e um .loc/.iloc alteraria o cache, então a cópia é profunda.
+    """
+    return df.copy(deep=not copy_on_write_enabled())
+
+
+def extract_expiry_from_contracts(symbols):
+    """
+    Versão vetorizada de extract_expiry_from_contract: um str.extract e um to_datetime
+    só para os pares raiz+data ainda não vistos (memoizados entre chamadas).
+    Retorna uma Series de datetime.date (None quando o símbolo não casa), com o índice de `symbols`.
+    """
+    symbols = pd.Series(symbols)
+    if symbols.empty:
+        return pd.Series([], index=symbols.index, dtype=object)
+
+    keys = symbols.astype('string').str.extract(CONTRACT_SYMBOL_PATTERN, expand=False)
+
+    missing = [key for key in keys.dropna().unique() if key not in _expiry_memo]
+    if missing:
+        date_strs = pd.Series([key.lstrip(string.ascii_uppercase) for key in missing])
+        # Same century rule as strptime('%y'): 69-99 -> 19xx, 00-68 -> 20xx
+        century = date_strs.str[:2].astype(int).map(lambda yy: '19' if yy >= 69 else '20')
+        full = date_strs.where(date_strs.str.len() == 8, century + date_strs)
+        parsed = pd.to_datetime(full, format='%Y%m%d', errors='coerce')
+        if len(_expiry_memo) + len(missing) > _EXPIRY_MEMO_LIMIT:
+            _expiry_memo.clear()
+        for key, ts in zip(missing, parsed):
+            _expiry_memo[key] = None if pd.isna(ts) else ts.date()
+
+    expiries = keys.map(_expiry_memo).astype(object)
+    return expiries.where(expiries.notna(), None)
@@ -3,6 +3,8 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+from strike_exposures import aggregate_by_strike, absolute_net, strike_window
+
 def calculate_strike_range(current_price, strike_range_percentage):
     """Calculate strike range based on percentage of current price"""
     return current_price * (strike_range_percentage / 100.0)
@@ -36,45 +38,28 @@ def add_current_price_line(fig, current_price, chart_type, chart_text_size):
 def create_exposure_bar_chart(calls, puts, exposure_type, title, S, height=600, 
                               call_color='#00FF00', put_color='#FF0000', gex_type='Absolute',
                               show_calls=True, show_puts=True, show_net=True, chart_type='Bar',
-                              strike_range_percentage=1.0, chart_text_size=12):
-    # Filter out zero values
-    calls_df = calls[['strike', exposure_type]].copy()
-    calls_df = calls_df[calls_df[exposure_type] != 0]
-    calls_df['OptionType'] = 'Call'
-
-    puts_df = puts[['strike', exposure_type]].copy()
-    puts_df = puts_df[puts_df[exposure_type] != 0]
-    puts_df['OptionType'] = 'Put'
+                              strike_range_percentage=1.0, chart_text_size=12, exposures=None,
+                              price_line=True):
+    # Per-strike call/put/net table (pass `exposures` to share one aggregation across charts).
+    # price_line=False leaves the current price line to the caller (cached figures add it per rerun)
+    if exposures is None:
+        exposures = aggregate_by_strike(calls, puts, [exposure_type])
 
     # Calculate strike range around current price (percentage-based)
     strike_range = calculate_strike_range(S, strike_range_percentage)
-    min_strike = S - strike_range
-    max_strike = S + strike_range
-    
-    # Apply strike range filter
-    calls_df = calls_df[(calls_df['strike'] >= min_strike) & (calls_df['strike'] <= max_strike)]
-    puts_df = puts_df[(puts_df['strike'] >= min_strike) & (puts_df['strike'] <= max_strike)]
+    in_range = strike_window(exposures, S - strike_range, S + strike_range)
 
-    # Filter the original dataframes for net exposure calculation
-    calls_filtered = calls[(calls['strike'] >= min_strike) & (calls['strike'] <= max_strike)]
-    puts_filtered = puts[(puts['strike'] >= min_strike) & (puts['strike'] <= max_strike)]
+    # Filter out zero values
+    calls_df = in_range[(exposure_type, 'call')].dropna()
+    calls_df = calls_df[calls_df != 0].rename(exposure_type).rename_axis('strike').reset_index()
+    puts_df = in_range[(exposure_type, 'put')].dropna()
+    puts_df = puts_df[puts_df != 0].rename(exposure_type).rename_axis('strike').reset_index()
 
-    # Calculate Net Exposure based on type using filtered data
-    if exposure_type == 'GEX' or exposure_type == 'GEX_notional':
-        if gex_type == 'Net':
-            net_exposure = calls_filtered.groupby('strike')[exposure_type].sum() - puts_filtered.groupby('strike')[exposure_type].sum()
-        else:  # Absolute
-            calls_gex = calls_filtered.groupby('strike')[exposure_type].sum()
-            puts_gex = puts_filtered.groupby('strike')[exposure_type].sum()
-            net_exposure = pd.Series(index=set(calls_gex.index) | set(puts_gex.index))
-            for strike in net_exposure.index:
-                call_val = abs(calls_gex.get(strike, 0))
-                put_val = abs(puts_gex.get(strike, 0))
-                net_exposure[strike] = call_val if call_val >= put_val else -put_val
-    elif exposure_type == 'DEX':
-        net_exposure = calls_filtered.groupby('strike')[exposure_type].sum() + puts_filtered.groupby('strike')[exposure_type].sum()
-    else:  # VEX, Charm, Speed, Vomma
-        net_exposure = calls_filtered.groupby('strike')[exposure_type].sum() + puts_filtered.groupby('strike')[exposure_type].sum()
+    # Net exposure: GEX is call - put (Net) or the dominant side (Absolute); the rest are call + put
+    if exposure_type in ('GEX', 'GEX_notional') and gex_type != 'Net':
+        net_exposure = absolute_net(in_range, exposure_type)
+    else:
+        net_exposure = in_range[(exposure_type, 'net')]
 
     # Calculate total Greek values
     total_call_value = calls_df[exposure_type].sum()
@@ -336,5 +321,81 @@ def create_exposure_bar_chart(calls, puts, exposure_type, title, S, height=600,
             height=height
         )
 
-    fig = add_current_price_line(fig, S, chart_type, chart_text_size)
+    if price_line:
+        fig = add_current_price_line(fig, S, chart_type, chart_text_size)
+    return fig
+
+def create_gex_profile_chart(profile, zero_gamma, S, height=600, call_color='#00FF00',
+                             put_color='#FF0000', chart_text_size=12):
+    """
+    Plots net dealer GEX across hypothetical spot prices, with the zero-gamma
+    (gamma flip) level and the current price marked.
+    """
+    fig = go.Figure()
+    net = profile['net_gex'].to_numpy()
+
+    fig.add_trace(go.Scatter(
+        x=profile['spot'],
+        y=np.where(net >= 0, net, np.nan),
+        mode='lines',
+        fill='tozeroy',
+        name='Positive Gamma',
+        line=dict(color=call_color, width=1),
+        fillcolor=call_color
+    ))
+    fig.add_trace(go.Scatter(
+        x=profile['spot'],
+        y=np.where(net < 0, net, np.nan),
+        mode='lines',
+        fill='tozeroy',
+        name='Negative Gamma',
+        line=dict(color=put_color, width=1),
+        fillcolor=put_color
+    ))
+
+    title = 'Gamma Exposure Profile'
+    if zero_gamma is not None:
+        title = f"{title}     <span style='color: #FFD700'>Zero Gamma: {zero_gamma:,.2f}</span>"
+        fig.add_vline(
+            x=zero_gamma,
+            line_dash="dot",
+            line_color='#FFD700',
+            opacity=0.9,
+            annotation_text=f"Zero Gamma {zero_gamma:,.2f}",
+            annotation_position="bottom",
+            annotation=dict(font=dict(size=chart_text_size))
+        )
+
+    fig.update_layout(
+        title=dict(
+            text=title,
+            xref="paper",
+            x=0,
+            xanchor='left',
+            font=dict(size=chart_text_size + 8)  # Title slightly larger
+        ),
+        xaxis_title=dict(
+            text='Spot Price',
+            font=dict(size=chart_text_size)
+        ),
+        yaxis_title=dict(
+            text='Net GEX',
+            font=dict(size=chart_text_size)
+        ),
+        legend=dict(
+            font=dict(size=chart_text_size)
+        ),
+        hovermode='x unified',
+        xaxis=dict(
+            autorange=True,
+            tickfont=dict(size=chart_text_size)
+        ),
+        yaxis=dict(
+            autorange=True,
+            tickfont=dict(size=chart_text_size)
+        ),
+        height=height
+    )
+
+    fig = add_current_price_line(fig, S, 'Line', chart_text_size)
     return fig
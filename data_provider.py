@@ -0,0 +1,225 @@
+# data_provider.py
+# Fontes de dados de mercado do app (cadeias, preços, barras intraday, vencimentos, taxa livre de risco).
+# - YFinanceProvider: ao vivo, via Yahoo (registry, quote service, rate limiter, barras incrementais).
+# - RecordingProvider: repassa a outro provider e grava cada resultado num arquivo SQLite.
+# - ReplayProvider: serve uma gravação sem rede, com o relógio da gravação andando a `speed`x.
+# Escolha via EZOPTIONS_DATA_PROVIDER: 'yfinance' (padrão), 'record[:arquivo]' ou 'replay[:arquivo]';
+# a velocidade do replay vem de EZOPTIONS_REPLAY_SPEED (0 = congelado no início da gravação).
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import yfinance as yf
+
+from chain_fetcher import compact_chain, extract_expiry_from_contracts
+from intraday_store import get_intraday_bar_store, split_aligned
+from quote_service import get_quote_service
+from rate_limiter import call_upstream
+from snapshot_store import SnapshotStore
+from ticker_registry import get_ticker, get_expirations
+
+DEFAULT_RECORDING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots', 'recording.sqlite')
+RISK_FREE_SYMBOL = '^IRX'
+
+
+class DataProvider(ABC):
+    """
+    Interface comum; `use_snapshot_store` diz se o app deve ler/gravar o cache em disco por cima.
+    Um provider que não implemente algum método abstrato falha já ao ser instanciado.
+    """
+
+    use_snapshot_store = False
+
+    @abstractmethod
+    def expirations(self, ticker):
+        """Vencimentos ('YYYY-MM-DD') do ticker, em tupla."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def option_chain(self, ticker, date):
+        """(calls, puts) compactadas, com `extracted_expiry`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def current_price(self, ticker):
+        """Último preço ou None."""
+        raise NotImplementedError
+
+    def quotes(self, symbols):
+        """{símbolo: preço ou None}, com as chaves como foram pedidas."""
+        return {symbol: self.current_price(symbol) for symbol in symbols}
+
+    @abstractmethod
+    def intraday_bars(self, symbol, overlay_symbols=()):
+        """(barras 1m do dia em US/Eastern, {overlay: barras alinhadas ao índice do símbolo})."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def risk_free_rate(self):
+        """Taxa livre de risco em decimal (yield do T-Bill de 3 meses) ou None."""
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    """Dados ao vivo do Yahoo Finance."""
+
+    use_snapshot_store = True
+
+    def expirations(self, ticker):
+        return get_expirations(ticker)
+
+    def option_chain(self, ticker, date):
+        chain = call_upstream('yahoo', get_ticker(ticker).option_chain, date)
+        calls, puts = chain.calls, chain.puts
+        # Compact once at ingestion; downstream code reads these frames without copying
+        if not calls.empty:
+            calls = compact_chain(calls.assign(extracted_expiry=extract_expiry_from_contracts(calls['contractSymbol'])))
+        if not puts.empty:
+            puts = compact_chain(puts.assign(extracted_expiry=extract_expiry_from_contracts(puts['contractSymbol'])))
+        return calls, puts
+
+    def current_price(self, ticker):
+        return get_quote_service().get_quote(ticker)
+
+    def quotes(self, symbols):
+        return get_quote_service().get_quotes(symbols)
+
+    def intraday_bars(self, symbol, overlay_symbols=()):
+        # One batched download; on refresh only bars from the last stored one onward
+        symbols = tuple(dict.fromkeys((symbol,) + tuple(overlay_symbols)))
+
+        def fetch(start):
+            if start is None:
+                return call_upstream('yahoo', yf.download, list(symbols), period="1d", interval="1m",
+                                     progress=False, threads=True, multi_level_index=True, weight=len(symbols))
+            return call_upstream('yahoo', yf.download, list(symbols), start=start, interval="1m",
+                                 progress=False, threads=True, multi_level_index=True, weight=len(symbols))
+
+        frame = get_intraday_bar_store().update(symbols, fetch)
+        return split_aligned(frame, symbol, symbols[1:])
+
+    def risk_free_rate(self):
+        price = self.current_price(RISK_FREE_SYMBOL)
+        return price / 100 if price is not None else None
+
+
+class RecordingProvider(DataProvider):
+    """Repassa para `inner` e grava cada resultado (com timestamp) para replay posterior."""
+
+    def __init__(self, inner, path=DEFAULT_RECORDING_PATH):
+        self.inner = inner
+        # Recordings are never pruned
+        self.store = SnapshotStore(path, retention_seconds=float('inf'))
+
+    def _record(self, dataset, ticker, key, value):
+        if value is not None:
+            self.store.save(dataset, ticker, key, value)
+        return value
+
+    def expirations(self, ticker):
+        return self._record('expirations', ticker, 'all', tuple(self.inner.expirations(ticker)))
+
+    def option_chain(self, ticker, date):
+        return self._record('chain', ticker, date, self.inner.option_chain(ticker, date))
+
+    def current_price(self, ticker):
+        return self._record('price', ticker, 'last', self.inner.current_price(ticker))
+
+    def quotes(self, symbols):
+        quotes = self.inner.quotes(symbols)
+        for symbol, price in quotes.items():
+            self._record('price', symbol, 'last', price)
+        return quotes
+
+    def intraday_bars(self, symbol, overlay_symbols=()):
+        return self._record('bars', symbol, ','.join(overlay_symbols),
+                            self.inner.intraday_bars(symbol, overlay_symbols))
+
+    def risk_free_rate(self):
+        return self._record('rate', RISK_FREE_SYMBOL, 'last', self.inner.risk_free_rate())
+
+
+class ReplayProvider(DataProvider):
+    """
+    Serve uma gravação do RecordingProvider sem acesso à rede. O relógio da gravação começa
+    no primeiro snapshot (ou em `start`) e anda `speed` segundos por segundo real, parando no
+    último; cada leitura devolve o snapshot mais recente até esse instante.
+    """
+
+    def __init__(self, path=DEFAULT_RECORDING_PATH, speed=1.0, start=None, clock=time.time):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Replay recording not found: {path}")
+        self.store = SnapshotStore(path, retention_seconds=float('inf'))
+        self.speed = speed
+        self._clock = clock
+        first, self.end = self.store.time_range()
+        self.start = start if start is not None else (first or 0.0)
+        self._started_at = clock()
+        self._lock = threading.Lock()
+
+    def replay_time(self):
+        """Instante da gravação que está sendo servido agora."""
+        with self._lock:
+            elapsed = (self._clock() - self._started_at) * self.speed
+        return min(self.start + elapsed, self.end) if self.end is not None else self.start
+
+    def _load(self, dataset, ticker, key):
+        return self.store.load_nearest(dataset, ticker, key, self.replay_time())
+
+    def expirations(self, ticker):
+        recorded = self._load('expirations', ticker, 'all')
+        # Older recordings may lack the expiration list; the recorded chains imply it
+        return tuple(recorded) if recorded is not None else tuple(self.store.keys('chain', ticker))
+
+    def option_chain(self, ticker, date):
+        chain = self._load('chain', ticker, date)
+        if chain is None:
+            raise ValueError(f"Expiration {date} for {ticker} is not in the replay recording")
+        return chain
+
+    def current_price(self, ticker):
+        return self._load('price', ticker, 'last')
+
+    def intraday_bars(self, symbol, overlay_symbols=()):
+        recorded = self._load('bars', symbol, ','.join(overlay_symbols))
+        if recorded is None:
+            raise ValueError(f"No intraday bars for {symbol} in the replay recording")
+        return recorded
+
+    def risk_free_rate(self):
+        return self._load('rate', RISK_FREE_SYMBOL, 'last')
+
+
+def provider_from_env(environ=None):
+    """Provider configurado por EZOPTIONS_DATA_PROVIDER / EZOPTIONS_REPLAY_SPEED."""
+    environ = os.environ if environ is None else environ
+    name, _, path = environ.get('EZOPTIONS_DATA_PROVIDER', 'yfinance').partition(':')
+    if name == 'yfinance':
+        return YFinanceProvider()
+    if name == 'record':
+        return RecordingProvider(YFinanceProvider(), path or DEFAULT_RECORDING_PATH)
+    if name == 'replay':
+        return ReplayProvider(path or DEFAULT_RECORDING_PATH,
+                              speed=float(environ.get('EZOPTIONS_REPLAY_SPEED', 1.0)))
+    raise ValueError(f"Unknown data provider: {name}")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_data_provider():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_env()
+        return _provider
+
+
+def set_data_provider(provider):
+    """Troca o provider do processo (benchmarks e testes); None volta à configuração do ambiente."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,60 @@
+# figure_cache.py
+# Cache de gráficos Plotly compartilhado entre reruns e sessões.
+# Guarda o dicionário da figura (fig.to_dict()), não o go.Figure vivo: cada acerto monta
+# uma figura nova, então quem chama pode alterá-la (ex.: linha do preço atual) sem afetar
+# outras sessões. O dicionário já foi validado quando a figura foi construída, então o
+# acerto monta a figura sem revalidar (o que custaria quase tanto quanto reconstruí-la).
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+
+from greeks_cache import GreeksCache
+
+
+def _payload_bytes(value):
+    """Tamanho aproximado de um dicionário de figura (arrays em base64, textos e números)."""
+    if isinstance(value, dict):
+        return sum(len(key) + _payload_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_bytes(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return 8
+
+
+class FigureCache(GreeksCache):
+    """LRU de dicionários de figuras, limitado por entradas e pelo tamanho dos dicionários."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, spot_tick=0.05):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes, spot_tick=spot_tick)
+
+    def _sizeof(self, value):
+        return _payload_bytes(value)
+
+    def get_or_build(self, key, build):
+        """Figura nova a partir do dicionário em cache, ou `build()` (e o dicionário dela vai para o cache)."""
+        payload = self.get(key)
+        if payload is not None:
+            # go.Figure copies the dict, so changes to the returned figure stay out of the cache
+            return go.Figure(payload, _validate=False)
+        fig = build()
+        self.put(key, fig.to_dict())
+        return fig
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_figure_cache(name='figures', **kwargs):
+    """
+    Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit).
+    Cada `name` é um cache separado; `kwargs` só valem na primeira criação.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = FigureCache(**kwargs)
+        return _caches[name]
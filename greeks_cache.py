@@ -0,0 +1,164 @@
+# greeks_cache.py
+# Cache LRU para os dataframes processados por greeks_calculator.
+# Independente de Streamlit: a instância do módulo sobrevive aos reruns do script.
+import hashlib
+import threading
+from datetime import datetime
+from collections import OrderedDict
+
+import pandas as pd
+
+from chain_fetcher import writable_copy
+
+FINGERPRINT_COLUMNS = ['strike', 'impliedVolatility', 'openInterest']
+
+
+def chain_fingerprint(df, columns=FINGERPRINT_COLUMNS):
+    """Hash estável das colunas `columns` (padrão: strike/IV/OI) de uma cadeia (ou lista de cadeias)."""
+    if isinstance(df, (list, tuple)):
+        return tuple(chain_fingerprint(item, columns) for item in df)
+    if df is None or df.empty:
+        return None
+    cols = [col for col in columns if col in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def spot_bucket(S, tick):
+    """Arredonda o spot para o tick configurado."""
+    if S is None or not tick:
+        return S
+    return round(round(S / tick) * tick, 10)
+
+
+def _frame_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(_frame_bytes(item) for item in value)
+    return 0
+
+
+def _writable_copy(value):
+    # Callers change the returned frames; don't let that leak into the cache
+    if isinstance(value, pd.DataFrame):
+        return writable_copy(value)
+    if isinstance(value, tuple):
+        return tuple(_writable_copy(item) for item in value)
+    return value
+
+
+class GreeksCache:
+    """LRU limitado por número de entradas e por memória, com contadores de hit/miss."""
+
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024, spot_tick=0.05):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spot_tick = spot_tick
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, ticker, expiry, calls, puts, risk_free_rate, S, valuation_date=None):
+        """
+        Chave: ticker, vencimento(s), data de avaliação, fingerprint da cadeia, taxa e spot
+        arredondado. O tempo até o vencimento sai da data de hoje, então a virada do dia
+        (o cache vive entre reruns) não pode reaproveitar greeks calculados com outro `t`.
+        """
+        if isinstance(expiry, (list, tuple)):
+            expiry = tuple(expiry)
+        if valuation_date is None:
+            valuation_date = datetime.today().date()
+        return (
+            ticker,
+            expiry,
+            valuation_date,
+            chain_fingerprint(calls),
+            chain_fingerprint(puts),
+            round(float(risk_free_rate), 8),
+            spot_bucket(S, self.spot_tick),
+        )
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _writable_copy(self._entries[key])
+
+    def _sizeof(self, value):
+        return _frame_bytes(value)
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def latest(self, ticker, expiry):
+        """Entrada mais recente para ticker/vencimento, seja qual for o fingerprint (sem contar hit/miss)."""
+        if isinstance(expiry, (list, tuple)):
+            expiry = tuple(expiry)
+        with self._lock:
+            for key in reversed(self._entries):
+                if key[0] == ticker and key[1] == expiry:
+                    return _writable_copy(self._entries[key])
+        return None
+
+    def get_or_compute(self, key, compute):
+        """Retorna o valor em cache ou chama `compute()` e armazena o resultado."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+            value = _writable_copy(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_greeks_cache(name='greeks', **kwargs):
+    """
+    Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit).
+    Cada `name` é um cache separado; `kwargs` só valem na primeira criação.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = GreeksCache(**kwargs)
+        return _caches[name]
@@ -1,14 +1,33 @@
+import numpy as np
 import pandas as pd
-from scipy.stats import norm
-from math import log, sqrt
+from scipy.special import ndtr
+from math import log, sqrt, pi
 from datetime import datetime
 
-# Funções de cálculo de greeks, independentes de Streamlit e de outros arquivos.
+from chain_fetcher import writable_copy
+
+# Funções de cálculo de greeks, independentes de Streamlit (de outros arquivos, só o chain_fetcher).
+
+MIN_T = 1/525600  # Mínimo de 1 minuto em anos
+_INV_SQRT_2PI = 1.0 / sqrt(2.0 * pi)
+
+# Colunas de greeks brutos (calc_*) e exposições ponderadas por OI
+GREEK_COLUMNS = [
+    'calc_delta', 'calc_gamma', 'calc_vanna', 'calc_charm',
+    'calc_speed', 'calc_vomma', 'calc_vega', 'calc_theta', 'calc_zomma', 'calc_color',
+    'GEX', 'DEX', 'VEX', 'Charm', 'Speed', 'Vomma', 'Vega', 'Theta', 'Zomma', 'Color',
+]
+RAW_GREEK_COLUMNS = [col for col in GREEK_COLUMNS if col.startswith('calc_')]
+
+# Variação relativa do spot a partir da qual o recálculo incremental refaz a cadeia inteira
+SPOT_RECOMPUTE_TOLERANCE = 0.001
 
 def calculate_greeks(flag, S, K, t, sigma, r):
     """Calcula delta, gamma e vanna para uma opção."""
+    # Scalar reference path only (benchmarks); scipy.stats stays off the app's startup imports
+    from scipy.stats import norm
     try:
-        t = max(t, 1/525600) # Mínimo de 1 minuto em anos
+        t = max(t, MIN_T)
         d1 = (log(S / K) + (r + 0.5 * sigma**2) * t) / (sigma * sqrt(t))
         d2 = d1 - sigma * sqrt(t)
         
@@ -26,8 +45,9 @@ def calculate_greeks(flag, S, K, t, sigma, r):
 
 def calculate_charm(flag, S, K, t, sigma, r):
     """Calcula o charm (dDelta/dTime) para uma opção."""
+    from scipy.stats import norm
     try:
-        t = max(t, 1/525600)
+        t = max(t, MIN_T)
         d1 = (log(S / K) + (r + 0.5 * sigma**2) * t) / (sigma * sqrt(t))
         d2 = d1 - sigma * sqrt(t)
         norm_d1 = norm.pdf(d1)
@@ -41,8 +61,180 @@ def calculate_charm(flag, S, K, t, sigma, r):
     except (ValueError, ZeroDivisionError):
         return 0 # Return 0 instead of None for failed calculations
 
-def compute_and_process_greeks(calls, puts, S, expiry_date_str, risk_free_rate):
-    """Função centralizada que recebe dataframes e calcula os greeks."""
+def _zero_invalid(values, valid):
+    """Zera entradas inválidas ou não finitas (mesma semântica do fallback escalar)."""
+    return np.where(valid & np.isfinite(values), values, 0.0)
+
+def calculate_greeks_vectorized(flag, S, K, t, sigma, r):
+    """
+    Calcula delta, gamma, vanna, charm e os greeks de ordem superior (speed, vomma,
+    vega, theta, zomma e color) para uma cadeia inteira em uma única passada.
+
+    `K` e `sigma` são arrays; `S`, `t` e `r` podem ser escalares ou arrays do mesmo
+    tamanho. `flag` é 'c'/'p' ou um array booleano (True = call).
+    Linhas inválidas recebem 0, como em calculate_greeks/calculate_charm.
+    """
+    K = np.asarray(K, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    S = np.asarray(S, dtype=float)
+    t = np.maximum(np.asarray(t, dtype=float), MIN_T)
+    r = np.asarray(r, dtype=float)
+    if isinstance(flag, str):
+        is_call = np.full(K.shape, flag == 'c')
+    else:
+        is_call = np.asarray(flag, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        valid = (S > 0) & (K > 0) & (sigma > 0)
+        sqrt_t = np.sqrt(t)
+        sigma_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * t) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        pdf_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+
+        delta = np.where(is_call, ndtr(d1), ndtr(d1) - 1)
+        gamma = pdf_d1 / (S * sigma_sqrt_t)
+        vanna = -pdf_d1 * d2 / sigma
+        charm = -pdf_d1 * (2*r*t - d2*sigma_sqrt_t) / (2*t*sigma_sqrt_t)
+        charm = np.where(is_call, charm, charm - r * ndtr(-d2))
+
+        # Higher-order greeks reuse d1/d2/pdf from the same pass.
+        # Theta and color are per year of calendar time, like charm.
+        vega = S * pdf_d1 * sqrt_t
+        vomma = vega * d1 * d2 / sigma
+        speed = -gamma / S * (d1 / sigma_sqrt_t + 1)
+        zomma = gamma * (d1 * d2 - 1) / sigma
+        color = pdf_d1 / (2 * S * t * sigma_sqrt_t) * (1 + d1 * (2*r*t - d2*sigma_sqrt_t) / sigma_sqrt_t)
+        discount = K * np.exp(-r * t)
+        theta_decay = -S * pdf_d1 * sigma / (2 * sqrt_t)
+        theta = np.where(is_call, theta_decay - r * discount * ndtr(d2), theta_decay + r * discount * ndtr(-d2))
+
+    return {
+        'delta': _zero_invalid(delta, valid),
+        'gamma': _zero_invalid(gamma, valid),
+        'vanna': _zero_invalid(vanna, valid),
+        'charm': _zero_invalid(charm, valid),
+        'speed': _zero_invalid(speed, valid),
+        'vomma': _zero_invalid(vomma, valid),
+        'vega': _zero_invalid(vega, valid),
+        'theta': _zero_invalid(theta, valid),
+        'zomma': _zero_invalid(zomma, valid),
+        'color': _zero_invalid(color, valid),
+    }
+
+def _reusable_rows(df, previous, S, t, r, dedupe_subset, spot_tolerance):
+    """
+    Alinha o frame processado anterior com a cadeia atual.
+    Retorna (spot de referência, máscara de linhas reaproveitáveis, valores alinhados)
+    ou (S, None, None) quando é preciso recalcular tudo.
+    """
+    if previous is None or previous.empty:
+        return S, None, None
+
+    inputs = previous.attrs.get('greeks_inputs')
+    if not inputs or inputs['r'] != r or inputs['t'] != t:
+        return S, None, None
+    # Spot moved past the tolerance: every row depends on S, recompute everything
+    if abs(S - inputs['S']) > spot_tolerance * inputs['S']:
+        return S, None, None
+
+    keys = list(dedupe_subset)
+    match_cols = ['impliedVolatility'] + (['time_to_expiry'] if t is None else [])
+    if any(col not in previous.columns for col in keys + match_cols + RAW_GREEK_COLUMNS):
+        return S, None, None
+
+    prev = previous.drop_duplicates(subset=keys).set_index(keys)
+    if len(keys) > 1:
+        aligned = prev.reindex(pd.MultiIndex.from_frame(df[keys]))
+    else:
+        aligned = prev.reindex(pd.Index(df[keys[0]]))
+
+    reuse = np.ones(len(df), dtype=bool)
+    for col in match_cols:
+        reuse &= aligned[col].to_numpy() == df[col].to_numpy()
+    # Greeks stay anchored to the spot they were computed at, so changed rows use it too
+    return inputs['S'], reuse, aligned
+
+def _process_chain(df, flag, S, t, r, dedupe_subset=('strike',), previous=None,
+                   spot_tolerance=SPOT_RECOMPUTE_TOLERANCE):
+    """
+    Limpa a cadeia e calcula greeks e exposições em uma passada vetorizada.
+    `t` é o tempo em anos; se for None, usa a coluna `time_to_expiry` de cada linha.
+    Com `previous`, só as linhas cuja IV (ou vencimento) mudou são recalculadas.
+    """
+    # The cached chain is never modified
+    df = writable_copy(df)
+    
+    # Ensure all expected Greek columns exist before processing
+    # Initialize with 0 to avoid KeyError if no valid rows exist later
+    for col in GREEK_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0.0
+
+    if df.empty:
+        return df
+
+    # Drop rows where impliedVolatility is missing or invalid, as it's crucial for Greeks
+    df = df.dropna(subset=['impliedVolatility'])
+    df = df[df['impliedVolatility'] > 0]
+    df = df.drop_duplicates(subset=list(dedupe_subset))
+    df = df.reset_index(drop=True)
+
+    if df.empty:
+        return df
+
+    if t is not None:
+        df['time_to_expiry'] = t
+
+    greeks_S, reuse, aligned = _reusable_rows(df, previous, S, t, r, dedupe_subset, spot_tolerance)
+    t_rows = df['time_to_expiry'].to_numpy(dtype=float) if t is None else t
+    changed = slice(None) if reuse is None else ~reuse
+
+    if reuse is not None:
+        for col in RAW_GREEK_COLUMNS:
+            df[col] = aligned[col].to_numpy(dtype=float)
+        if t is None:
+            t_rows = t_rows[changed]
+
+    # Calculate greeks for the (changed part of the) chain in one array pass
+    if reuse is None or changed.any():
+        greeks = calculate_greeks_vectorized(
+            flag, greeks_S, df['strike'].to_numpy(dtype=float)[changed], t_rows,
+            df['impliedVolatility'].to_numpy(dtype=float)[changed], r
+        )
+        for name, values in greeks.items():
+            if reuse is None:
+                df[f'calc_{name}'] = values
+            else:
+                df.loc[changed, f'calc_{name}'] = values
+    
+    # Calculate exposures (cheap, always refreshed so OI and spot changes show up).
+    # Missing OI (nullable Int32 in the chain) becomes NaN, so the exposure columns stay float64
+    oi = df["openInterest"].astype(float)
+    df["GEX"] = df["calc_gamma"] * oi * 100 * S * S * 0.01
+    df["DEX"] = df["calc_delta"] * oi * 100 * S
+    df["VEX"] = df["calc_vanna"] * oi * 100 * S
+    df["Charm"] = df["calc_charm"] * oi * 100 * S / 365.0
+    df["Speed"] = df["calc_speed"] * oi * 100 * S * S * 0.01
+    df["Vomma"] = df["calc_vomma"] * oi * 100 * 0.01 # Per 1 vol point
+    df["Vega"] = df["calc_vega"] * oi * 100 * 0.01 # Per 1 vol point
+    df["Theta"] = df["calc_theta"] * oi * 100 / 365.0 # Per day
+    df["Zomma"] = df["calc_zomma"] * oi * 100 * S * S * 0.01 * 0.01 # GEX change per 1 vol point
+    df["Color"] = df["calc_color"] * oi * 100 * S * S * 0.01 / 365.0 # GEX change per day
+
+    df.attrs['greeks_inputs'] = {'S': greeks_S, 't': t, 'r': r}
+    
+    return df
+
+def compute_and_process_greeks(calls, puts, S, expiry_date_str, risk_free_rate, previous=None,
+                               spot_tolerance=SPOT_RECOMPUTE_TOLERANCE):
+    """
+    Função centralizada que recebe dataframes e calcula os greeks.
+
+    `previous` é o par (calls, puts) processado no refresh anterior: linhas com a mesma
+    IV reaproveitam os greeks, desde que o spot não tenha se movido mais que
+    `spot_tolerance` (relativo) em relação ao spot usado no cálculo.
+    """
     if calls.empty or puts.empty:
         return pd.DataFrame(), pd.DataFrame() # Return empty DataFrames
 
@@ -55,65 +247,253 @@ def compute_and_process_greeks(calls, puts, S, expiry_date_str, risk_free_rate):
         return pd.DataFrame(), pd.DataFrame() # Return empty DataFrames
 
     t = t_days / 365.0
-    r = risk_free_rate
 
-    def process_df(df, flag):
-        df = df.copy()
-        
-        # Ensure all expected Greek columns exist before processing
-        # Initialize with 0 to avoid KeyError if no valid rows exist later
-        for col in ['calc_delta', 'calc_gamma', 'VEX', 'calc_charm', 'GEX', 'DEX', 'Charm']:
-            if col not in df.columns:
-                df[col] = 0.0
-
-        if df.empty:
-            return df
-
-        # Drop rows where impliedVolatility is missing or invalid, as it's crucial for Greeks
-        df = df.dropna(subset=['impliedVolatility'])
-        df = df[df['impliedVolatility'] > 0]
-        df = df.drop_duplicates(subset=['strike'])
-        df = df.reset_index(drop=True)
-
-        if df.empty:
-            return df
-
-        # Calculate greeks
-        greeks_results = df.apply(
-            lambda row: calculate_greeks(flag, S, row["strike"], t, row["impliedVolatility"], r),
-            axis=1, result_type='expand'
-        )
-        greeks_results.columns = ['calc_delta', 'calc_gamma', 'VEX'] # VEX is the raw vanna value
+    prev_calls, prev_puts = previous if previous is not None else (None, None)
+    processed_calls = _process_chain(calls, 'c', S, t, risk_free_rate,
+                                     previous=prev_calls, spot_tolerance=spot_tolerance)
+    processed_puts = _process_chain(puts, 'p', S, t, risk_free_rate,
+                                    previous=prev_puts, spot_tolerance=spot_tolerance)
 
-        # Calculate charm
-        charm_results = df.apply(
-            lambda row: calculate_charm(flag, S, row["strike"], t, row["impliedVolatility"], r),
-            axis=1
-        )
-        charm_results.name = 'calc_charm'
+    return processed_calls, processed_puts
 
-        # Combine greeks and charm into the DataFrame
-        df['calc_delta'] = greeks_results['calc_delta']
-        df['calc_gamma'] = greeks_results['calc_gamma']
-        df['VEX'] = greeks_results['VEX']
-        df['calc_charm'] = charm_results
+def compute_and_process_greeks_multi(chains, S, risk_free_rate, previous=None,
+                                     spot_tolerance=SPOT_RECOMPUTE_TOLERANCE):
+    """
+    Calcula os greeks de vários vencimentos em uma única passada vetorizada.
 
-        # Fill any remaining NaN values in Greek columns with 0 (from failed calculations)
-        for col in ['calc_delta', 'calc_gamma', 'VEX', 'calc_charm']:
-            df[col] = df[col].fillna(0)
-        
-        # Debugging: Print sum of Charm to check if values are non-zero
-        print(f"Debug: Sum of Charm for {flag} options: {df['Charm'].sum()}")
-
-        # Calculate exposures
-        df["GEX"] = df["calc_gamma"] * df["openInterest"] * 100 * S * S * 0.01
-        df["DEX"] = df["calc_delta"] * df["openInterest"] * 100 * S
-        df["VEX"] = df["VEX"] * df["openInterest"] * 100 * S # VEX is now the exposure
-        df["Charm"] = df["calc_charm"] * df["openInterest"] * 100 * S / 365.0
-        
-        return df
+    `chains` é um iterável de (expiry_date_str, calls, puts). As cadeias são empilhadas
+    uma vez, cada linha recebe seu próprio `time_to_expiry`, e o retorno é um par
+    calls/puts combinado com a coluna `expiry_date`. `previous` funciona como em
+    compute_and_process_greeks.
+    """
+    today = datetime.today().date()
+    call_frames = []
+    put_frames = []
+
+    for expiry_date_str, calls, puts in chains:
+        if calls.empty or puts.empty:
+            continue
 
-    processed_calls = process_df(calls, 'c')
-    processed_puts = process_df(puts, 'p')
+        selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+        t_days = (selected_expiry - today).days
+        if t_days < 0:
+            print(f"Data de expiração no passado: {expiry_date_str}")
+            continue
+
+        t = t_days / 365.0
+        call_frames.append(calls.assign(expiry_date=expiry_date_str, time_to_expiry=t))
+        put_frames.append(puts.assign(expiry_date=expiry_date_str, time_to_expiry=t))
+
+    if not call_frames:
+        return pd.DataFrame(), pd.DataFrame() # Return empty DataFrames
+
+    all_calls = pd.concat(call_frames, ignore_index=True)
+    all_puts = pd.concat(put_frames, ignore_index=True)
+
+    dedupe_subset = ('expiry_date', 'strike')
+    prev_calls, prev_puts = previous if previous is not None else (None, None)
+    processed_calls = _process_chain(all_calls, 'c', S, None, risk_free_rate, dedupe_subset,
+                                     previous=prev_calls, spot_tolerance=spot_tolerance)
+    processed_puts = _process_chain(all_puts, 'p', S, None, risk_free_rate, dedupe_subset,
+                                    previous=prev_puts, spot_tolerance=spot_tolerance)
 
     return processed_calls, processed_puts
+
+# Tamanho máximo (linhas × spots) de cada bloco da grade do perfil de GEX
+_PROFILE_CHUNK_ELEMENTS = 2_000_000
+
+def _gex_on_spot_grid(df, spots, r):
+    """GEX (gamma × OI × 100 × s² × 0.01) somado por spot da grade, em blocos strikes × spots."""
+    total = np.zeros(len(spots))
+    if df is None or df.empty or 'time_to_expiry' not in df.columns:
+        return total
+
+    K = df['strike'].to_numpy(dtype=float)
+    sigma = df['impliedVolatility'].to_numpy(dtype=float)
+    t = np.maximum(df['time_to_expiry'].to_numpy(dtype=float), MIN_T)
+    oi = df['openInterest'].fillna(0).to_numpy(dtype=float)
+    keep = (K > 0) & (sigma > 0) & (oi > 0) & np.isfinite(sigma)
+    K, sigma, t, oi = K[keep], sigma[keep], t[keep], oi[keep]
+    if len(K) == 0:
+        return total
+
+    # d1 is affine in log(s): d1 = a * log(s) + b, and gamma * s^2 = pdf(d1) * s / (sigma * sqrt(t))
+    sigma_sqrt_t = sigma * np.sqrt(t)
+    a = 1.0 / sigma_sqrt_t
+    b = (-np.log(K) + (r + 0.5 * sigma**2) * t) / sigma_sqrt_t
+    weight = oi * 100 * 0.01 / sigma_sqrt_t
+    log_spots = np.log(spots)
+
+    chunk = max(1, _PROFILE_CHUNK_ELEMENTS // len(spots))
+    for start in range(0, len(K), chunk):
+        rows = slice(start, start + chunk)
+        d1 = np.outer(a[rows], log_spots) + b[rows, None]
+        total += weight[rows] @ np.exp(-0.5 * d1 * d1)
+
+    return total * _INV_SQRT_2PI * spots
+
+def find_zero_gamma(spots, net_gex, S):
+    """
+    Interpola o cruzamento de zero do GEX líquido mais próximo de S (None se não houver).
+    Um perfil todo zerado (nenhum contrato utilizável) não tem cruzamento; um zero exato só
+    conta quando fica entre valores não nulos de sinais opostos.
+    """
+    spots = np.asarray(spots, dtype=float)
+    net_gex = np.asarray(net_gex, dtype=float)
+    nonzero = np.nonzero(net_gex)[0]
+    if len(nonzero) == 0:
+        return None
+
+    # Runs of exact zeros between opposite-sign neighbours cross at the middle of the run
+    crossings = []
+    gaps = np.nonzero(np.diff(nonzero) > 1)[0]
+    before, after = nonzero[gaps], nonzero[gaps + 1]
+    flips = np.sign(net_gex[before]) * np.sign(net_gex[after]) < 0
+    crossings.extend((spots[before[flips] + 1] + spots[after[flips] - 1]) / 2)
+
+    idx = np.nonzero(np.sign(net_gex[:-1]) * np.sign(net_gex[1:]) < 0)[0]
+    x0, x1 = spots[idx], spots[idx + 1]
+    y0, y1 = net_gex[idx], net_gex[idx + 1]
+    crossings.extend(x0 - y0 * (x1 - x0) / (y1 - y0))
+
+    if not crossings:
+        return None
+    return float(min(crossings, key=lambda level: abs(level - S)))
+
+def compute_gex_profile(calls, puts, S, risk_free_rate=None, range_pct=0.10, steps=200):
+    """
+    Reavalia o GEX total numa grade de spots hipotéticos (S ± range_pct, `steps` pontos).
+
+    Usa os frames processados (coluna `time_to_expiry`), então funciona para um ou vários
+    vencimentos de uma vez. Retorna (profile, zero_gamma): DataFrame com
+    spot/call_gex/put_gex/net_gex e o nível interpolado onde o GEX líquido cruza zero
+    (None se nenhum contrato tiver time_to_expiry, IV e OI utilizáveis).
+    """
+    if risk_free_rate is None:
+        risk_free_rate = calls.attrs.get('greeks_inputs', {}).get('r', 0.02)
+
+    spots = np.linspace(S * (1 - range_pct), S * (1 + range_pct), steps)
+    call_gex = _gex_on_spot_grid(calls, spots, risk_free_rate)
+    put_gex = _gex_on_spot_grid(puts, spots, risk_free_rate)
+    net_gex = call_gex - put_gex
+
+    profile = pd.DataFrame({
+        'spot': spots,
+        'call_gex': call_gex,
+        'put_gex': put_gex,
+        'net_gex': net_gex,
+    })
+    return profile, find_zero_gamma(spots, net_gex, S)
+
+# Limites da volatilidade procurada pelo solver de IV
+IV_LOWER = 1e-4
+IV_UPPER = 5.0
+
+def _bs_price_and_vega(is_call, S, K, t, sigma, r):
+    """Preço Black-Scholes (put via paridade) e vega, vetorizados."""
+    sqrt_t = np.sqrt(t)
+    sigma_sqrt_t = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * t) / sigma_sqrt_t
+    d2 = d1 - sigma_sqrt_t
+    discount = K * np.exp(-r * t)
+    call = S * ndtr(d1) - discount * ndtr(d2)
+    price = np.where(is_call, call, call - S + discount)
+    vega = S * np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI * sqrt_t
+    return price, vega
+
+def implied_volatility_vectorized(flag, price, S, K, t, r, initial=None, tol=1e-8, max_iter=60):
+    """
+    Resolve a volatilidade implícita de uma cadeia inteira a partir dos preços.
+
+    Passo de Newton dentro de um intervalo [lo, hi] que encolhe a cada iteração;
+    quando o passo sai do intervalo ou o vega é ~0, usa bisseção. Só as linhas ainda
+    ativas são reavaliadas; `tol` é relativo ao valor extrínseco. Retorna (iv, converged); linhas sem solução (preço fora
+    dos limites de arbitragem ou sem convergência em `max_iter`) ficam NaN.
+    """
+    price = np.asarray(price, dtype=float)
+    shape = price.shape
+    S = np.broadcast_to(np.asarray(S, dtype=float), shape)
+    K = np.broadcast_to(np.asarray(K, dtype=float), shape)
+    t = np.broadcast_to(np.maximum(np.asarray(t, dtype=float), MIN_T), shape)
+    r = np.broadcast_to(np.asarray(r, dtype=float), shape)
+    if isinstance(flag, str):
+        is_call = np.full(shape, flag == 'c')
+    else:
+        is_call = np.broadcast_to(np.asarray(flag, dtype=bool), shape)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        discount = K * np.exp(-r * t)
+        intrinsic = np.where(is_call, np.maximum(S - discount, 0), np.maximum(discount - S, 0))
+        upper_bound = np.where(is_call, S, discount)
+        active = np.isfinite(price) & (S > 0) & (K > 0) & (price > intrinsic) & (price < upper_bound)
+        time_value = price - intrinsic
+
+        if initial is None:
+            # Brenner-Subrahmanyam: sigma ~ sqrt(2*pi/t) * price / S
+            sigma = np.sqrt(2 * pi / t) * price / S
+        else:
+            sigma = np.broadcast_to(np.asarray(initial, dtype=float), shape).copy()
+        sigma = np.where(np.isfinite(sigma), sigma, 0.2)
+        sigma = np.clip(sigma, IV_LOWER * 10, IV_UPPER / 2)
+
+        lo = np.full(shape, IV_LOWER)
+        hi = np.full(shape, IV_UPPER)
+        converged = np.zeros(shape, dtype=bool)
+
+        for _ in range(max_iter):
+            idx = np.nonzero(active)[0]
+            if len(idx) == 0:
+                break
+            sig = sigma[idx]
+            model, vega = _bs_price_and_vega(is_call[idx], S[idx], K[idx], t[idx], sig, r[idx])
+            diff = model - price[idx]
+
+            # Price is increasing in sigma, so the sign of diff tells which side the root is on
+            hi[idx] = np.where(diff > 0, sig, hi[idx])
+            lo[idx] = np.where(diff <= 0, sig, lo[idx])
+
+            done = (np.abs(diff) <= tol * time_value[idx]) | (hi[idx] - lo[idx] <= tol * 1e-3)
+            newton = sig - diff / vega
+            use_newton = (vega > 1e-12) & (newton > lo[idx]) & (newton < hi[idx])
+            step = np.where(use_newton, newton, 0.5 * (lo[idx] + hi[idx]))
+
+            sigma[idx] = np.where(done, sig, step)
+            converged[idx[done]] = True
+            active[idx[done]] = False
+
+    return np.where(converged, sigma, np.nan), converged
+
+def option_mid_price(df):
+    """Preço médio bid/ask; cai para lastPrice quando não há bid e ask válidos."""
+    bid = df['bid'].to_numpy(dtype=float) if 'bid' in df.columns else np.full(len(df), np.nan)
+    ask = df['ask'].to_numpy(dtype=float) if 'ask' in df.columns else np.full(len(df), np.nan)
+    mid = np.where((bid > 0) & (ask > 0) & (ask >= bid), 0.5 * (bid + ask), np.nan)
+    if 'lastPrice' in df.columns:
+        last = df['lastPrice'].to_numpy(dtype=float)
+        mid = np.where(np.isfinite(mid), mid, np.where(last > 0, last, np.nan))
+    return mid
+
+def apply_mid_implied_volatility(df, flag, S, t, r, replace_all=False):
+    """
+    Retorna uma cópia da cadeia com `impliedVolatility` resolvida dos preços médios.
+
+    Por padrão só preenche IVs ausentes ou zeradas (que seriam descartadas pelo cálculo
+    de greeks); com `replace_all=True` troca todas as que convergirem. A IV resolvida
+    também fica na coluna `mid_iv`. `t` pode ser escalar ou array por linha.
+    """
+    df = writable_copy(df)
+    if df.empty:
+        df['mid_iv'] = pd.Series(dtype=float)
+        return df
+
+    current_iv = df['impliedVolatility'].to_numpy(dtype=float)
+    valid_iv = np.isfinite(current_iv) & (current_iv > 0)
+    iv, converged = implied_volatility_vectorized(
+        flag, option_mid_price(df), S, df['strike'].to_numpy(dtype=float), t, r,
+        initial=np.where(valid_iv, current_iv, 0.2)
+    )
+    df['mid_iv'] = iv
+
+    replace = converged if replace_all else (converged & ~valid_iv)
+    df['impliedVolatility'] = np.where(replace, iv, current_iv)
+    return df
@@ -0,0 +1,107 @@
+# intraday_store.py
+# Barras de 1 minuto do dia em memória, atualizadas de forma incremental:
+# só as barras a partir do último timestamp guardado são baixadas a cada refresh.
+# O índice já fica convertido para US/Eastern e filtrado para o pregão regular.
+# A chave pode ser um símbolo ou uma tupla de símbolos baixados juntos (colunas campo x símbolo).
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+EASTERN = pytz.timezone('US/Eastern')
+
+
+def to_session_bars(bars):
+    """Converte o índice para US/Eastern e mantém só 09:30-16:00."""
+    if bars is None or bars.empty:
+        return pd.DataFrame() if bars is None else bars
+    bars = bars.copy()
+    bars.index = bars.index.tz_convert(EASTERN)
+    return bars.between_time('09:30', '16:00')
+
+
+def split_aligned(frame, primary, overlays):
+    """
+    Separa um frame com colunas (campo, símbolo) nas barras do `primary` e em um dict
+    {overlay: barras} reindexado nas barras do primário (forward-fill, sem descartar barras).
+    """
+    if frame is None or frame.empty or primary not in frame.columns.get_level_values(1):
+        return pd.DataFrame(), {}
+    primary_bars = frame.xs(primary, axis=1, level=1).dropna(subset=['Close'])
+    aligned = {}
+    for symbol in overlays:
+        if symbol not in frame.columns.get_level_values(1):
+            continue
+        bars = frame.xs(symbol, axis=1, level=1).reindex(primary_bars.index).ffill()
+        if bars['Close'].notna().any():
+            aligned[symbol] = bars
+    return primary_bars, aligned
+
+
+class IntradayBarStore:
+    """Barras do dia por chave (símbolo ou tupla de símbolos); `update` baixa só o que falta e faz o merge."""
+
+    def __init__(self):
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self._bars = {}  # symbol -> DataFrame (US/Eastern index)
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def update(self, symbol, fetch, now=None):
+        """
+        Retorna as barras do dia de `symbol` (ou da tupla de símbolos). `fetch(start)` baixa as
+        barras de 1 minuto a partir de `start` (datetime com fuso) ou, com start=None, o dia inteiro.
+        """
+        today = (now or datetime.now(tz=EASTERN)).astimezone(EASTERN).date()
+        with self._symbol_lock(symbol):
+            stored = self._bars.get(symbol)
+            if stored is not None and not stored.empty and stored.index[-1].date() == today:
+                # Re-fetch the last stored bar too: it may have been still forming
+                start = stored.index[-1]
+                new_bars = to_session_bars(fetch(start))
+                self.incremental_fetches += 1
+                if not new_bars.empty:
+                    merged = pd.concat([stored[stored.index < start], new_bars])
+                    stored = merged[~merged.index.duplicated(keep='last')].sort_index()
+            else:
+                stored = to_session_bars(fetch(None))
+                self.full_fetches += 1
+            with self._lock:
+                self._bars[symbol] = stored
+            return stored.copy()
+
+    def invalidate(self, symbol=None):
+        """Remove as barras do símbolo, inclusive de lotes que o contêm (None = tudo)."""
+        with self._lock:
+            for key in list(self._bars):
+                symbols = key if isinstance(key, tuple) else (key,)
+                if symbol is None or symbol in symbols:
+                    del self._bars[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._bars),
+                'bars': sum(len(bars) for bars in self._bars.values()),
+                'full_fetches': self.full_fetches,
+                'incremental_fetches': self.incremental_fetches,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_intraday_bar_store():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = IntradayBarStore()
+        return _store
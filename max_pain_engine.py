@@ -0,0 +1,139 @@
+# max_pain_engine.py
+# Max pain com strikes ordenados e somas acumuladas de OI e OI×strike.
+# Para cada strike candidato K (união dos strikes de calls e puts):
+#   dor das calls = K·ΣOI(k<=K) - ΣOI·k(k<=K)
+#   dor das puts  = ΣOI·k(k>=K) - K·ΣOI(k>=K)
+# Cada soma sai de um searchsorted nos acumulados: O(n log n) pela ordenação, em vez
+# de refiltrar as cadeias inteiras a cada strike. Com `by` (ex.: vencimento) todos os
+# grupos são calculados num só lote, cada um com seus próprios strikes.
+import numpy as np
+import pandas as pd
+
+
+def _group_codes(calls, puts, by):
+    """
+    Códigos inteiros (0..n-1, em ordem) do grupo de cada linha de calls e puts, e os rótulos.
+    Linhas sem valor em `by` recebem -1 (não pertencem a nenhum grupo).
+    """
+    if by is None:
+        return np.zeros(len(calls), dtype=np.int64), np.zeros(len(puts), dtype=np.int64), pd.Index([None])
+    labels = pd.concat([calls[by].astype(object), puts[by].astype(object)], ignore_index=True)
+    codes, uniques = pd.factorize(labels, sort=True)
+    return codes[:len(calls)], codes[len(calls):], pd.Index(uniques)
+
+
+def _sorted_side(codes, strikes, oi, span):
+    """Chaves (grupo, strike) ordenadas e acumulados de OI e OI×strike, com 0 na frente."""
+    keys = codes * span + strikes
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    oi = oi[order]
+    cum_oi = np.concatenate(([0.0], np.cumsum(oi)))
+    cum_oik = np.concatenate(([0.0], np.cumsum(oi * strikes[order])))
+    return keys, cum_oi, cum_oik
+
+
+def pain_table(calls, puts, by=None):
+    """
+    Curvas de dor por strike candidato: colunas call_pain, put_pain e total_pain, índice
+    'strike' (ou (by, 'strike') quando agrupado), ordenado. OI ausente conta como 0;
+    linhas sem valor em `by` ficam de fora.
+    """
+    call_strikes = calls['strike'].to_numpy(dtype=float)
+    put_strikes = puts['strike'].to_numpy(dtype=float)
+    call_oi = np.nan_to_num(calls['openInterest'].to_numpy(dtype=float))
+    put_oi = np.nan_to_num(puts['openInterest'].to_numpy(dtype=float))
+    call_codes, put_codes, labels = _group_codes(calls, puts, by)
+    # Rows without a group key (code -1) would otherwise land in the last group via labels[-1]
+    call_rows, put_rows = call_codes >= 0, put_codes >= 0
+    call_codes, call_strikes, call_oi = call_codes[call_rows], call_strikes[call_rows], call_oi[call_rows]
+    put_codes, put_strikes, put_oi = put_codes[put_rows], put_strikes[put_rows], put_oi[put_rows]
+
+    # Groups are laid out one after another on a single sorted axis: key = code * span + strike
+    span = float(max(call_strikes.max(initial=0.0), put_strikes.max(initial=0.0))) + 1.0
+    call_keys, call_cum_oi, call_cum_oik = _sorted_side(call_codes, call_strikes, call_oi, span)
+    put_keys, put_cum_oi, put_cum_oik = _sorted_side(put_codes, put_strikes, put_oi, span)
+
+    # Candidates: every (group, strike) present on either side, keyed like the sides
+    pairs = pd.DataFrame({
+        'code': np.concatenate((call_codes, put_codes)),
+        'strike': np.concatenate((call_strikes, put_strikes)),
+    }).drop_duplicates().sort_values(['code', 'strike'])
+    codes = pairs['code'].to_numpy()
+    strikes = pairs['strike'].to_numpy()
+    candidates = codes * span + strikes
+    group_start = codes * span
+    group_end = (codes + 1) * span
+
+    # Calls of the same group with strike <= K
+    lo = np.searchsorted(call_keys, group_start, 'left')
+    hi = np.searchsorted(call_keys, candidates, 'right')
+    call_pain = strikes * (call_cum_oi[hi] - call_cum_oi[lo]) - (call_cum_oik[hi] - call_cum_oik[lo])
+
+    # Puts of the same group with strike >= K
+    lo = np.searchsorted(put_keys, candidates, 'left')
+    hi = np.searchsorted(put_keys, group_end, 'left')
+    put_pain = (put_cum_oik[hi] - put_cum_oik[lo]) - strikes * (put_cum_oi[hi] - put_cum_oi[lo])
+
+    if by is None:
+        index = pd.Index(strikes, name='strike')
+    else:
+        index = pd.MultiIndex.from_arrays([labels[codes], strikes], names=[by, 'strike'])
+    # Pain is never negative (only cumulative-sum rounding can make it so)
+    call_pain = np.maximum(call_pain, 0.0)
+    put_pain = np.maximum(put_pain, 0.0)
+    return pd.DataFrame({
+        'call_pain': call_pain,
+        'put_pain': put_pain,
+        'total_pain': call_pain + put_pain,
+    }, index=index)
+
+
+# Pains within this fraction of the curve's largest value count as a tie (cumulative-sum rounding)
+TIE_TOLERANCE = 1e-9
+
+
+def _first_min_strike(pain):
+    # First strike with the lowest pain: ties go to the lower strike, as in a plain min()
+    values = pain.to_numpy()
+    return pain.index[np.argmax(values <= values.min() + TIE_TOLERANCE * values.max())]
+
+
+def max_pain(calls, puts):
+    """
+    (max pain total, de calls, de puts, {strike: dor total}, {strike: dor de calls},
+    {strike: dor de puts}); cinco None se uma das cadeias estiver vazia.
+    """
+    if calls.empty or puts.empty:
+        return None, None, None, None, None
+    table = pain_table(calls, puts)
+    return (_first_min_strike(table['total_pain']),
+            _first_min_strike(table['call_pain']),
+            _first_min_strike(table['put_pain']),
+            table['total_pain'].to_dict(), table['call_pain'].to_dict(), table['put_pain'].to_dict())
+
+
+def max_pain_term_structure(calls, puts, by='extracted_expiry'):
+    """
+    Max pain de cada vencimento num só lote: uma linha por valor de `by` com max_pain,
+    call_oi, put_oi e total_pain (dor no strike de max pain). Vencimentos sem calls ou
+    sem puts ficam de fora, como no cálculo de um vencimento só.
+    """
+    columns = [by, 'max_pain', 'call_oi', 'put_oi', 'total_pain']
+    if calls.empty or puts.empty:
+        return pd.DataFrame(columns=columns)
+    table = pain_table(calls, puts, by=by).reset_index()
+    # Rows are sorted by group then strike, so the first near-minimum row of each group wins
+    pain = table.groupby(by, sort=False)['total_pain']
+    near_min = table['total_pain'] <= pain.transform('min') + TIE_TOLERANCE * pain.transform('max')
+    lowest = table[near_min].groupby(by, sort=True).head(1)
+    call_oi = calls.groupby(calls[by].astype(object))['openInterest'].sum()
+    put_oi = puts.groupby(puts[by].astype(object))['openInterest'].sum()
+    result = pd.DataFrame({
+        by: lowest[by].to_numpy(),
+        'max_pain': lowest['strike'].to_numpy(),
+        'call_oi': call_oi.reindex(lowest[by]).to_numpy(),
+        'put_oi': put_oi.reindex(lowest[by]).to_numpy(),
+        'total_pain': lowest['total_pain'].to_numpy(),
+    })
+    return result[result['call_oi'].notna() & result['put_oi'].notna()].reset_index(drop=True)
@@ -0,0 +1,74 @@
+# page_registry.py
+# Registro das páginas do app: cada página é um módulo em app_pages/ com uma função render().
+# Só o módulo da página ativa é importado (uma vez por processo, na primeira visita), então
+# os imports pesados de cada página (plotly, scipy.interpolate, yfinance...) só são feitos
+# quando ela é aberta. Arquivos editados são recarregados pelo próprio Streamlit.
+import importlib
+import threading
+import time
+
+# Page name -> module in app_pages/ (the greek exposure pages share one module)
+PAGE_MODULES = {
+    "Dashboard": "app_pages.dashboard",
+    "OI & Volume": "app_pages.oi_volume",
+    "Gamma Exposure": "app_pages.exposure",
+    "Delta Exposure": "app_pages.exposure",
+    "Vanna Exposure": "app_pages.exposure",
+    "Charm Exposure": "app_pages.exposure",
+    "Speed Exposure": "app_pages.exposure",
+    "Vomma Exposure": "app_pages.exposure",
+    "Exposure by Notional Value": "app_pages.notional_exposure",
+    "Delta-Adjusted Value Index": "app_pages.davi",
+    "Max Pain": "app_pages.max_pain",
+    "GEX Surface": "app_pages.gex_surface",
+    "IV Surface": "app_pages.iv_surface",
+    "Implied Probabilities": "app_pages.implied_probabilities",
+    "Analysis": "app_pages.analysis",
+    "Calculated Greeks": "app_pages.calculated_greeks",
+}
+
+
+class PageRegistry:
+    """Importa o módulo de cada página na primeira visita e chama o render() dele."""
+
+    def __init__(self, modules=None):
+        self.modules = dict(PAGE_MODULES if modules is None else modules)
+        self.load_seconds = 0.0
+        self._loaded = set()
+        self._lock = threading.Lock()
+
+    def module(self, page):
+        """Módulo da página (KeyError para página desconhecida), importado na primeira chamada."""
+        name = self.modules[page]
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded.add(name)
+                self.load_seconds += time.perf_counter() - start
+        return module
+
+    def render(self, page):
+        """Desenha a página ativa."""
+        self.module(page).render()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pages': len(self.modules),
+                'loaded': len(self._loaded),
+                'load_seconds': self.load_seconds,
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_page_registry():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PageRegistry()
+        return _registry
@@ -0,0 +1,143 @@
+# prefetch_scheduler.py
+# Agendador de prefetch em segundo plano: cada job (ex.: cadeia de um vencimento da
+# watchlist) roda de novo um pouco antes de o dado em cache expirar, num pool de threads.
+# Os limites de requisição ficam por conta de rate_limiter (os jobs usam call_upstream).
+# Fora do pregão nada muda no upstream: a instância compartilhada não dispara jobs.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from snapshot_store import market_is_open
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_LEAD = 0.8           # Refresh at 80% of the cache TTL
+DEFAULT_IDLE_TIMEOUT = 600   # Drop jobs no session has asked for in 10 minutes
+
+
+class PrefetchScheduler:
+    """
+    Jobs recorrentes por chave, disparados a cada `interval * lead` segundos enquanto
+    `is_active()` for verdadeiro (ex.: pregão aberto); fora disso ficam só agendados.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, lead=DEFAULT_LEAD,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, poll_interval=0.25, clock=time.monotonic,
+                 is_active=None):
+        self.max_workers = max_workers
+        self.lead = lead
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._is_active = is_active or (lambda: True)
+        self.completed = 0
+        self.failed = 0
+        self._jobs = {}       # key -> {'job', 'interval', 'next_run', 'last_requested'}
+        self._pending = set()  # keys submitted and not finished yet
+        self._lock = threading.Lock()
+        self._executor = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def schedule(self, key, job, interval):
+        """
+        Registra (ou renova) o job `key`. Chamar de novo a cada rerun mantém o job vivo;
+        jobs que ninguém renova por `idle_timeout` segundos são descartados.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._jobs.get(key)
+            if entry is None:
+                self._jobs[key] = {'job': job, 'interval': interval, 'next_run': now, 'last_requested': now}
+            else:
+                entry.update(job=job, interval=interval, last_requested=now)
+                entry['next_run'] = min(entry['next_run'], now + interval * self.lead)
+        self.start()
+
+    def run_pending(self, now=None):
+        """Envia ao pool os jobs vencidos; retorna as chaves enviadas."""
+        now = self._clock() if now is None else now
+        submitted = []
+        with self._lock:
+            for key in [key for key, entry in self._jobs.items() if now - entry['last_requested'] > self.idle_timeout]:
+                del self._jobs[key]
+        if not self._is_active():
+            return submitted
+        with self._lock:
+            for key, entry in self._jobs.items():
+                if key in self._pending or entry['next_run'] > now:
+                    continue
+                entry['next_run'] = now + entry['interval'] * self.lead
+                self._pending.add(key)
+                submitted.append((key, entry['job']))
+        for key, job in submitted:
+            self._get_executor().submit(self._run, key, job)
+        return [key for key, _ in submitted]
+
+    def _run(self, key, job):
+        try:
+            job()
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            print(f"Prefetch {key} failed: {e}")
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='prefetch')
+            return self._executor
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.run_pending()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='prefetch-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def queue_depth(self):
+        """Jobs enviados ao pool que ainda não terminaram (na fila ou rodando)."""
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'jobs': len(self._jobs),
+                'queue_depth': len(self._pending),
+                'completed': self.completed,
+                'failed': self.failed,
+                'active': self._is_active(),
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_prefetch_scheduler():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit); só roda no pregão."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler(is_active=market_is_open)
+        return _scheduler
@@ -0,0 +1,142 @@
+# quote_service.py
+# Cotações de último preço: caminho leve (fast_info) primeiro, .info só como último recurso.
+# Vários tickers (watchlist, ^GSPC, ^VIX...) saem de um único yf.download em lote.
+# As cotações valem até o fim do "tick" de refresh em que foram buscadas.
+import math
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from rate_limiter import call_upstream
+
+DEFAULT_TICK_SECONDS = 10.0
+# SPX quotes come from ^GSPC, as elsewhere in the app
+SPX_ALIASES = {'^SPX', 'SPX'}
+
+
+def normalize_quote_symbol(symbol):
+    """'%5ESPX' -> '^GSPC', '%5EVIX' -> '^VIX'."""
+    symbol = symbol.replace('%5E', '^')
+    return '^GSPC' if symbol in SPX_ALIASES else symbol
+
+
+def _valid_price(price):
+    try:
+        return price is not None and math.isfinite(float(price)) and float(price) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def fetch_single_price(symbol):
+    """Último preço de um ticker: fast_info e, se não houver, regularMarketPrice do .info."""
+    # Fresh Ticker on purpose: yfinance caches fast_info/info on the object
+    ticker = yf.Ticker(symbol)
+    price = call_upstream('yahoo', lambda: ticker.fast_info.get("lastPrice"))
+    if not _valid_price(price):
+        price = call_upstream('yahoo', lambda: ticker.info.get("regularMarketPrice"))
+    return float(price) if _valid_price(price) else None
+
+
+def fetch_batch_prices(symbols):
+    """Último fechamento de vários tickers em um único yf.download (barras diárias)."""
+    # yf.download makes one request per ticker, so the batch costs that many tokens
+    data = call_upstream('yahoo', yf.download, list(symbols), period='5d', interval='1d',
+                         auto_adjust=False, progress=False, threads=True, weight=len(symbols))
+    if data is None or data.empty or 'Close' not in data:
+        return {}
+    close = data['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    prices = {}
+    for symbol in close.columns:
+        series = close[symbol].dropna()
+        if not series.empty and _valid_price(series.iloc[-1]):
+            prices[symbol] = float(series.iloc[-1])
+    return prices
+
+
+class QuoteService:
+    """Cotações em cache por tick de refresh, com busca em lote para vários tickers."""
+
+    def __init__(self, tick_seconds=DEFAULT_TICK_SECONDS,
+                 batch_fetch=fetch_batch_prices, single_fetch=fetch_single_price):
+        self.tick_seconds = tick_seconds
+        self.batch_fetch = batch_fetch
+        self.single_fetch = single_fetch
+        self.hits = 0
+        self.batch_calls = 0
+        self.single_calls = 0
+        self._quotes = {}  # symbol -> (tick, price)
+        self._lock = threading.Lock()
+
+    def _tick(self, now):
+        return int(now // max(self.tick_seconds, 1e-9))
+
+    def get_quotes(self, symbols, now=None):
+        """{symbol: preço arredondado ou None}, com as chaves como foram pedidas."""
+        tick = self._tick(time.time() if now is None else now)
+        requested = {symbol: normalize_quote_symbol(symbol) for symbol in symbols}
+
+        prices = {}
+        missing = []
+        with self._lock:
+            for quote_symbol in dict.fromkeys(requested.values()):
+                cached = self._quotes.get(quote_symbol)
+                if cached is not None and cached[0] == tick:
+                    prices[quote_symbol] = cached[1]
+                    self.hits += 1
+                else:
+                    missing.append(quote_symbol)
+
+        if len(missing) > 1:
+            self.batch_calls += 1
+            try:
+                fetched = self.batch_fetch(missing)
+                prices.update({symbol: fetched[symbol] for symbol in missing if symbol in fetched})
+            except Exception as e:
+                print(f"Error fetching batch quotes for {', '.join(missing)}: {e}")
+
+        for quote_symbol in missing:
+            if quote_symbol in prices:
+                continue
+            self.single_calls += 1
+            try:
+                prices[quote_symbol] = self.single_fetch(quote_symbol)
+            except Exception as e:
+                print(f"Error fetching quote for {quote_symbol}: {e}")
+                prices[quote_symbol] = None
+
+        with self._lock:
+            for quote_symbol in missing:
+                if prices.get(quote_symbol) is not None:
+                    prices[quote_symbol] = round(float(prices[quote_symbol]), 2)
+                    self._quotes[quote_symbol] = (tick, prices[quote_symbol])
+
+        return {symbol: prices.get(quote_symbol) for symbol, quote_symbol in requested.items()}
+
+    def get_quote(self, symbol, now=None):
+        return self.get_quotes([symbol], now=now)[symbol]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._quotes),
+                'hits': self.hits,
+                'batch_calls': self.batch_calls,
+                'single_calls': self.single_calls,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_quote_service():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = QuoteService()
+        return _service
@@ -0,0 +1,140 @@
+# rate_limiter.py
+# Token bucket por upstream (Yahoo, OCC) + retry com backoff exponencial e jitter.
+# Rajadas acima do orçamento entram na fila (esperam a vez) em vez de falhar.
+import random
+import threading
+import time
+
+# Requests per second and burst size for each upstream
+UPSTREAM_BUDGETS = {
+    'yahoo': {'rate': 5.0, 'capacity': 10},
+    'occ': {'rate': 1.0, 'capacity': 2},
+}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket com fila: quem chega sem token reserva o próximo e dorme até ele."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Consome `tokens`, esperando se preciso. Retorna quantos segundos esperou."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a slot in the queue; later callers wait behind it
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+def _status_code(value):
+    response = getattr(value, 'response', value)
+    return getattr(response, 'status_code', None)
+
+
+def is_retryable_error(exc):
+    """Throttling, 5xx e falhas de rede/timeout; erros de uso (ex.: vencimento inválido) não."""
+    if _status_code(exc) in RETRYABLE_STATUS:
+        return True
+    name = type(exc).__name__
+    if 'RateLimit' in name or name in ('ConnectionError', 'Timeout', 'ReadTimeout',
+                                       'ConnectTimeout', 'TimeoutError', 'ChunkedEncodingError'):
+        return True
+    return 'Too Many Requests' in str(exc)
+
+
+class RetryPolicy:
+    """Backoff exponencial com jitter total: espera uniforme em [0, min(max_delay, base * 2**n)]."""
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=8.0, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt):
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class Upstream:
+    """Orçamento + política de retry de um upstream."""
+
+    def __init__(self, name, rate, capacity, retry=None, sleep=time.sleep, clock=time.monotonic):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity, clock=clock, sleep=sleep)
+        self.retry = retry or RetryPolicy()
+        self._sleep = sleep
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.queued_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args, weight=1, **kwargs):
+        """
+        Executa `fn(*args, **kwargs)` respeitando o orçamento, com retry para erros transitórios.
+        `weight` é quantas requisições a chamada faz (ex.: um lote de N tickers).
+        Respostas HTTP com status 429/5xx também são repetidas; na última tentativa são devolvidas.
+        """
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire(weight)
+            with self._lock:
+                self.calls += 1
+                self.queued_seconds += waited
+            last_attempt = attempt + 1 >= self.retry.max_attempts
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if last_attempt or not is_retryable_error(e):
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                print(f"[{self.name}] {type(e).__name__}: {e}; retrying ({attempt + 1}/{self.retry.max_attempts - 1})")
+            else:
+                if last_attempt or _status_code(result) not in RETRYABLE_STATUS:
+                    return result
+                print(f"[{self.name}] HTTP {_status_code(result)}; retrying ({attempt + 1}/{self.retry.max_attempts - 1})")
+            with self._lock:
+                self.retries += 1
+            self._sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'queued_seconds': self.queued_seconds,
+            }
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name):
+    """Upstream compartilhado pelo processo; o orçamento vem de UPSTREAM_BUDGETS."""
+    with _upstreams_lock:
+        if name not in _upstreams:
+            budget = UPSTREAM_BUDGETS[name]
+            _upstreams[name] = Upstream(name, budget['rate'], budget['capacity'])
+        return _upstreams[name]
+
+
+def call_upstream(name, fn, *args, weight=1, **kwargs):
+    """Atalho para get_upstream(name).call(fn, *args, **kwargs)."""
+    return get_upstream(name).call(fn, *args, weight=weight, **kwargs)
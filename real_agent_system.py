@@ -9,6 +9,7 @@ from datetime import datetime, time as datetime_time
 import pytz
 import logging
 from trading_setups import TradingSetupAnalyzer, SetupType
+from strike_exposures import strike_exposure_table
 from multi_agent_system import MultiAgentTradingSystem, MarketAnalysis, TradingDecision
 from smart_order_system import SmartOrderSystem, TrendDirection
 
@@ -221,7 +222,8 @@ class RealAgentSystem(threading.Thread):
 
             # Também manter análise de setups tradicional para compatibilidade
             setups_results = self.setup_analyzer.analyze_all_setups(
-                mock_calls, mock_puts, current_price, vwap_data)
+                mock_calls, mock_puts, current_price, vwap_data,
+                exposures=strike_exposure_table(mock_calls, mock_puts))
 
             self.current_setups = setups_results
 
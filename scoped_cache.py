@@ -0,0 +1,194 @@
+# scoped_cache.py
+# Cache de dados de mercado com namespaces por dataset e por ticker.
+# Substitui st.cache_data.clear() (que apaga tudo, de todos os tickers e sessões):
+# o refresh de um ticker invalida só as entradas daquele ticker/dataset.
+# Misses concorrentes para a mesma chave são agrupados (single-flight): uma só busca upstream.
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+from greeks_cache import _writable_copy
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ScopedCache:
+    """LRU com TTL cujas chaves são (dataset, ticker, função, argumentos)."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset, ticker, key, ttl, now=None, record=True):
+        """Valor armazenado há no máximo `ttl` segundos, ou None (`record=False` não conta hit/miss)."""
+        now = time.time() if now is None else now
+        full_key = (dataset, ticker, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            # TTL is checked on read, so a new refresh rate applies to existing entries too
+            if entry is None or now - entry[0] > ttl:
+                self.misses += record
+                return None
+            self._entries.move_to_end(full_key)
+            self.hits += record
+            return _writable_copy(entry[1])
+
+    def put(self, dataset, ticker, key, value, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[(dataset, ticker, key)] = (now, value)
+            self._entries.move_to_end((dataset, ticker, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ticker=None, dataset=None):
+        """Remove as entradas do ticker e/ou dataset (None = qualquer um). Retorna quantas saíram."""
+        with self._lock:
+            doomed = [
+                full_key for full_key in self._entries
+                if (ticker is None or full_key[1] == ticker)
+                and (dataset is None or full_key[0] == dataset)
+            ]
+            for full_key in doomed:
+                del self._entries[full_key]
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'tickers': len({full_key[1] for full_key in self._entries}),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """Agrupa chamadas concorrentes com a mesma chave em uma só execução."""
+
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Executa `fn()` ou, se já há uma execução em andamento para `key`, espera e reaproveita o resultado."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'value': None, 'error': None}
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call['value'] = fn()
+            except BaseException as e:
+                call['error'] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call['done'].set()
+        else:
+            call['done'].wait()
+
+        if call['error'] is not None:
+            raise call['error']
+        return call['value']
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+_cache = ScopedCache()
+_flight = SingleFlight()
+
+
+def get_scoped_cache():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    return _cache
+
+
+def get_single_flight():
+    """Contadores de buscas executadas e de chamadas duplicadas evitadas."""
+    return _flight
+
+
+def scoped_cache(dataset, ttl, ignore=()):
+    """
+    Decorador no estilo de st.cache_data(ttl=...), mas com namespace (dataset, ticker).
+    `ttl` pode ser um número ou uma função sem argumentos, lida a cada chamada.
+    O ticker é o primeiro argumento da função decorada; parâmetros em `ignore` ficam fora
+    da chave. Misses simultâneos da mesma chave (várias sessões/páginas) esperam uma
+    única busca e compartilham o resultado. `func.refresh(...)` rebusca e regrava a
+    entrada sem olhar o cache (usado pelo prefetch em segundo plano).
+    """
+    def decorator(func):
+        name = func.__qualname__
+        signature = inspect.signature(func)
+
+        def make_key(ticker, args, kwargs):
+            bound = signature.bind(ticker, *args, **kwargs)
+            bound.apply_defaults()
+            # Positional and keyword spellings of the same call share one entry
+            params = tuple((param, value) for param, value in list(bound.arguments.items())[1:]
+                           if param not in ignore)
+            return (name, params)
+
+        def load_fresh(ticker, args, kwargs, key):
+            fresh = func(ticker, *args, **kwargs)
+            if fresh is not None:
+                _cache.put(dataset, ticker, key, fresh)
+            return fresh
+
+        @functools.wraps(func)
+        def wrapper(ticker, *args, **kwargs):
+            key = make_key(ticker, args, kwargs)
+            seconds = ttl() if callable(ttl) else ttl
+            value = _cache.get(dataset, ticker, key, seconds)
+            if value is not None:
+                return value
+
+            def load():
+                # Another caller may have filled the entry while we queued for the flight
+                cached = _cache.get(dataset, ticker, key, seconds, record=False)
+                if cached is not None:
+                    return cached
+                return load_fresh(ticker, args, kwargs, key)
+
+            return _writable_copy(_flight.do((dataset, ticker, key), load))
+
+        def refresh(ticker, *args, **kwargs):
+            key = make_key(ticker, args, kwargs)
+            return _writable_copy(_flight.do((dataset, ticker, key),
+                                            lambda: load_fresh(ticker, args, kwargs, key)))
+
+        wrapper.refresh = refresh
+        return wrapper
+    return decorator
+
+
+def invalidate(ticker=None, dataset=None):
+    """Atalho para get_scoped_cache().invalidate(...)."""
+    return _cache.invalidate(ticker=ticker, dataset=dataset)
@@ -0,0 +1,183 @@
+# snapshot_store.py
+# Armazenamento local (SQLite) de snapshots de cadeias, preços e barras intraday.
+# Chave: dataset + ticker + chave do dataset (ex.: vencimento) + timestamp do snapshot.
+# Só usa a biblioteca padrão; os valores são DataFrames/tuplas serializados com pickle.
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytz
+
+DEFAULT_DB_PATH = os.environ.get(
+    'EZOPTIONS_SNAPSHOT_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots', 'option_snapshots.sqlite')
+)
+DEFAULT_RETENTION_SECONDS = 3 * 24 * 3600
+# Fora do pregão os dados não mudam, então o snapshot em disco vale por mais tempo
+CLOSED_MARKET_TTL_SECONDS = 12 * 3600
+
+
+def market_is_open(now=None):
+    """True durante o pregão regular americano (9:30-16:00 ET, dias úteis)."""
+    eastern = pytz.timezone('US/Eastern')
+    now = now.astimezone(eastern) if now is not None else datetime.now(tz=eastern)
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+
+def snapshot_ttl(open_market_ttl, now=None):
+    """TTL do snapshot em disco: o TTL de refresh no pregão, bem mais longo fora dele."""
+    if market_is_open(now):
+        return open_market_ttl
+    return max(open_market_ttl, CLOSED_MARKET_TTL_SECONDS)
+
+
+class SnapshotStore:
+    """Snapshots persistentes com leitura sob TTL; seguro para uso entre threads."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS snapshots (
+                       dataset TEXT NOT NULL,
+                       ticker TEXT NOT NULL,
+                       key TEXT NOT NULL,
+                       snapshot_ts REAL NOT NULL,
+                       payload BLOB NOT NULL,
+                       PRIMARY KEY (dataset, ticker, key, snapshot_ts)
+                   )"""
+            )
+            self._conn.commit()
+        self._last_prune = 0.0
+        # (dataset, ticker) -> ts; snapshots older than this are ignored (history stays on disk)
+        self._invalidated = {}
+        self._local = threading.local()
+
+    def save(self, dataset, ticker, key, value, snapshot_ts=None):
+        """Grava um snapshot novo (o histórico fica até a retenção expirar)."""
+        snapshot_ts = time.time() if snapshot_ts is None else snapshot_ts
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                (dataset, ticker, str(key), snapshot_ts, payload)
+            )
+            self._conn.commit()
+        if snapshot_ts - self._last_prune > 3600:
+            self.prune()
+
+    def load(self, dataset, ticker, key, max_age, now=None):
+        """Snapshot mais recente com idade <= max_age segundos, ou None."""
+        now = time.time() if now is None else now
+        cutoff = max(now - max_age,
+                     self._invalidated.get((dataset, ticker), 0.0),
+                     self._invalidated.get((None, ticker), 0.0))
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT payload FROM snapshots
+                   WHERE dataset = ? AND ticker = ? AND key = ? AND snapshot_ts >= ?
+                   ORDER BY snapshot_ts DESC LIMIT 1""",
+                (dataset, ticker, str(key), cutoff)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            print(f"Error reading snapshot {dataset}/{ticker}/{key}: {e}")
+            return None
+
+    def load_nearest(self, dataset, ticker, key, at):
+        """Snapshot mais recente gravado até `at` (ou o primeiro depois dele), ignorando TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT payload FROM snapshots
+                   WHERE dataset = ? AND ticker = ? AND key = ?
+                   ORDER BY snapshot_ts > ?, ABS(snapshot_ts - ?) LIMIT 1""",
+                (dataset, ticker, str(key), at, at)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            print(f"Error reading snapshot {dataset}/{ticker}/{key}: {e}")
+            return None
+
+    def keys(self, dataset, ticker):
+        """Chaves gravadas para o dataset/ticker, em ordem."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT key FROM snapshots WHERE dataset = ? AND ticker = ? ORDER BY key",
+                (dataset, ticker)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def time_range(self):
+        """(primeiro, último) timestamp gravado, ou (None, None) se vazio."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(snapshot_ts), MAX(snapshot_ts) FROM snapshots").fetchone()
+
+    @contextmanager
+    def bypass_reads(self):
+        """Nesta thread, read_through sempre busca de novo (e grava o resultado)."""
+        previous = getattr(self._local, 'bypass', False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+
+    def read_through(self, dataset, ticker, key, max_age, fetch, should_store=None):
+        """Lê do disco sob TTL; senão chama `fetch()` e grava se `should_store(value)` permitir."""
+        if not getattr(self._local, 'bypass', False):
+            value = self.load(dataset, ticker, key, max_age)
+            if value is not None:
+                return value
+        value = fetch()
+        if value is not None and (should_store is None or should_store(value)):
+            self.save(dataset, ticker, key, value)
+        return value
+
+    def invalidate(self, ticker, dataset=None, now=None):
+        """Faz `load` ignorar os snapshots atuais do ticker (todos os datasets se dataset=None)."""
+        self._invalidated[(dataset, ticker)] = time.time() if now is None else now
+
+    def prune(self, now=None):
+        """Apaga snapshots mais antigos que a retenção."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("DELETE FROM snapshots WHERE snapshot_ts < ?", (now - self.retention_seconds,))
+            self._conn.commit()
+        self._last_prune = now
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore()
+        return _store
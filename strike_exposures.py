@@ -0,0 +1,97 @@
+# strike_exposures.py
+# Tabela de exposições por strike: calls, puts e net de todas as colunas de exposição
+# (GEX, DEX, VEX, Charm, Speed, Vomma e variantes *_notional) num único groupby.
+# Os gráficos de exposição, o DAVI e o TradingSetupAnalyzer fatiam essa tabela
+# (índice de strikes ordenado) com searchsorted em vez de refiltrar e reagrupar as cadeias.
+# strike_exposure_table() guarda a tabela por fingerprint da cadeia, então o app e os
+# agentes que olham o mesmo snapshot agregam uma vez só.
+import numpy as np
+import pandas as pd
+
+from greeks_cache import chain_fingerprint, get_greeks_cache
+
+EXPOSURE_COLUMNS = ['GEX', 'DEX', 'VEX', 'Charm', 'Speed', 'Vomma']
+SIDES = ['call', 'put', 'net']
+
+
+def exposure_columns(calls, puts):
+    """Colunas de exposição (inclusive *_notional) presentes nas duas cadeias."""
+    candidates = EXPOSURE_COLUMNS + [f'{col}_notional' for col in EXPOSURE_COLUMNS]
+    return [col for col in candidates if col in calls.columns and col in puts.columns]
+
+
+def aggregate_by_strike(calls, puts, columns=None):
+    """
+    Soma por strike de calls e puts em um só groupby. Colunas (exposição, lado), lado em
+    call/put/net; índice de strikes ordenado e único. Lado sem contratos no strike fica NaN
+    (net trata como 0). Net de GEX é call - put (a cadeia guarda o GEX de puts positivo);
+    nas outras exposições é call + put.
+    """
+    if columns is None:
+        columns = exposure_columns(calls, puts)
+    frames = [
+        # reindex: a column missing from one side just sums to NaN there
+        df.reindex(columns=['strike'] + columns).assign(side=side)
+        for side, df in (('call', calls), ('put', puts))
+        if df is not None and not df.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([columns, SIDES]),
+                            index=pd.Index([], dtype=float, name='strike'))
+
+    sums = (pd.concat(frames, ignore_index=True)
+            .groupby(['strike', 'side'], sort=True)[columns]
+            .sum(min_count=1)
+            .unstack('side')
+            .reindex(columns=pd.MultiIndex.from_product([columns, ['call', 'put']])))
+
+    table = {}
+    for col in columns:
+        call, put = sums[(col, 'call')], sums[(col, 'put')]
+        table[(col, 'call')] = call
+        table[(col, 'put')] = put
+        net = call.fillna(0) - put.fillna(0) if col.startswith('GEX') else call.fillna(0) + put.fillna(0)
+        table[(col, 'net')] = net
+    return pd.DataFrame(table, index=sums.index)
+
+
+def strike_exposure_table(calls, puts):
+    """
+    aggregate_by_strike de todas as colunas de exposição, uma vez por snapshot da cadeia
+    (cache 'strike_exposures' chaveado pelo fingerprint dos strikes e exposições).
+    """
+    columns = exposure_columns(calls, puts)
+    fingerprint_columns = ['strike'] + columns
+    cache_key = (tuple(columns), chain_fingerprint(calls, fingerprint_columns), chain_fingerprint(puts, fingerprint_columns))
+    return get_greeks_cache('strike_exposures', max_entries=16).get_or_compute(
+        cache_key,
+        lambda: aggregate_by_strike(calls, puts, columns)
+    )
+
+
+def absolute_net(table, column):
+    """Net 'Absolute' do GEX: o maior dos dois lados em módulo, positivo se for o de calls."""
+    call = table[(column, 'call')].fillna(0).abs()
+    put = table[(column, 'put')].fillna(0).abs()
+    return pd.Series(np.where(call >= put, call, -put), index=table.index)
+
+
+def strike_window(table, low, high):
+    """Linhas com low <= strike <= high (busca binária no índice ordenado)."""
+    strikes = table.index.to_numpy()
+    return table.iloc[np.searchsorted(strikes, low, 'left'):np.searchsorted(strikes, high, 'right')]
+
+
+def strikes_above(table, price):
+    """Linhas com strike > price."""
+    return table.iloc[np.searchsorted(table.index.to_numpy(), price, 'right'):]
+
+
+def strikes_below(table, price):
+    """Linhas com strike < price."""
+    return table.iloc[:np.searchsorted(table.index.to_numpy(), price, 'left')]
+
+
+def side_values(table, column, sides=('call', 'put')):
+    """Valores dos lados pedidos empilhados (strike, valor), sem strikes onde o lado não existe."""
+    return pd.concat([table[(column, side)].dropna() for side in sides])
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE BUSCA CONCORRENTE DE CADEIAS
+==================================
+
+Testa ordem dos vencimentos, tolerância a falhas, timeout por requisição
+o paralelismo do pool, a extração vetorizada do vencimento pelo símbolo
+e a representação compacta da cadeia.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from chain_fetcher import (fetch_concurrently, fetch_chains_concurrently, concat_chains,
+                           extract_expiry_from_contracts, compact_chain)
+
+DATES = ['2030-01-04', '2030-01-11', '2030-01-18', '2030-01-25', '2030-02-01', '2030-02-08']
+
+
+def _fake_fetch_options_for_date(ticker, date, S=None):
+    # Vencimentos mais próximos demoram mais, para embaralhar a ordem de conclusão
+    time.sleep(0.05 * (len(DATES) - DATES.index(date)))
+    if date == '2030-01-18':
+        raise RuntimeError("HTTP 500")
+    if date == '2030-01-25':
+        return pd.DataFrame(), pd.DataFrame()
+    chain = pd.DataFrame({'strike': [100.0], 'expiry': [date]})
+    return chain, chain.copy()
+
+
+def test_keeps_expiry_order_and_tolerates_failures():
+    start = time.perf_counter()
+    chains, failed = fetch_chains_concurrently(_fake_fetch_options_for_date, 'SPY', DATES, max_workers=6)
+    elapsed = time.perf_counter() - start
+
+    assert [date for date, _, _ in chains] == ['2030-01-04', '2030-01-11', '2030-02-01', '2030-02-08']
+    # O erro e a cadeia vazia voltam para quem chamou avisar na thread do script
+    assert failed == ['2030-01-18', '2030-01-25']
+    # Em série seriam ~1s; em paralelo, o tempo da requisição mais lenta
+    assert elapsed < 0.6
+
+    calls, puts = concat_chains(chains)
+    assert list(calls['expiry']) == ['2030-01-04', '2030-01-11', '2030-02-01', '2030-02-08']
+    assert len(puts) == 4
+
+
+def test_per_request_timeout():
+    def fetch(key):
+        time.sleep(2.0 if key == 'lento' else 0.01)
+        return key
+
+    start = time.perf_counter()
+    results = fetch_concurrently(fetch, ['a', 'lento', 'b'], max_workers=3, timeout=0.3)
+    elapsed = time.perf_counter() - start
+
+    assert results == [('a', 'a'), ('b', 'b')]
+    assert elapsed < 1.5
+
+
+def test_bounded_pool():
+    running = []
+    peak = []
+
+    def fetch(key):
+        running.append(key)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.remove(key)
+        return key
+
+    results = fetch_concurrently(fetch, range(12), max_workers=3)
+    assert [key for key, _ in results] == list(range(12))
+    assert max(peak) <= 3
+
+
+def _extract_expiry_row_by_row(contract_symbol):
+    # Implementação original (regex + strptime por linha), usada como referência
+    match = re.search(r'[A-Z]+W?(?P<date>\d{6}|\d{8})[CP]\d+', contract_symbol)
+    if not match:
+        return None
+    date_str = match.group("date")
+    try:
+        fmt = "%y%m%d" if len(date_str) == 6 else "%Y%m%d"
+        return datetime.strptime(date_str, fmt).date()
+    except ValueError:
+        return None
+
+
+def test_vectorized_expiry_matches_row_by_row():
+    symbols = ['SPY250117C00500000', 'SPXW250117P05000000', 'SPX20250321C04000000',
+               'QQQ991231C00100000', 'SPY251332C00500000', 'invalido', '']
+    chain = pd.Series(symbols * 5000, index=range(10, 10 + 7 * 5000))
+
+    start = time.perf_counter()
+    expected = chain.apply(_extract_expiry_row_by_row)
+    row_by_row = time.perf_counter() - start
+    start = time.perf_counter()
+    extracted = extract_expiry_from_contracts(chain)
+    vectorized = time.perf_counter() - start
+    print(f"35k símbolos: apply {row_by_row:.3f}s, vetorizado {vectorized:.3f}s")
+
+    assert extracted.index.equals(chain.index)
+    assert extracted.tolist() == expected.tolist()
+    assert extracted.iloc[5] is None
+
+
+def _raw_chain(expiry, count):
+    # Mesmas colunas que o yfinance devolve em option_chain()
+    strikes = 400.0 + np.arange(count)
+    symbols = [f'SPY{expiry}C{int(k * 1000):08d}' for k in strikes]
+    return pd.DataFrame({
+        'contractSymbol': symbols,
+        'lastTradeDate': pd.Timestamp('2030-01-10 15:59', tz='UTC'),
+        'strike': strikes, 'lastPrice': 1.25, 'bid': 1.2, 'ask': 1.3,
+        'change': 0.05, 'percentChange': 4.2,
+        'volume': np.where(np.arange(count) % 4 == 0, np.nan, 17.0),
+        'openInterest': 2500.0, 'impliedVolatility': 0.23,
+        'inTheMoney': False, 'contractSize': 'REGULAR', 'currency': 'USD',
+        'extracted_expiry': extract_expiry_from_contracts(pd.Series(symbols)),
+    })
+
+
+def test_compact_chain_keeps_values_and_saves_memory():
+    raw = _raw_chain('300118', 2000)
+    compact = compact_chain(raw)
+
+    assert 'currency' not in compact.columns and 'contractSize' not in compact.columns
+    assert compact['openInterest'].dtype == 'Int32' and compact['volume'].dtype == 'Int32'
+    assert compact['strike'].dtype == 'float64'
+    assert compact['impliedVolatility'].dtype == 'float32' and compact['bid'].dtype == 'float32'
+    assert isinstance(compact['extracted_expiry'].dtype, pd.CategoricalDtype)
+    # Volume ausente continua ausente (não vira 0); as somas são as do frame original
+    assert compact['volume'].isna().sum() == raw['volume'].isna().sum() == 500
+    assert compact['volume'].sum() == raw['volume'].sum()
+    # float32 guarda cotações e IV com folga de centavos / pontos-base
+    assert np.allclose(compact['bid'], raw['bid'], rtol=0, atol=1e-6)
+    assert np.allclose(compact['impliedVolatility'], raw['impliedVolatility'], rtol=0, atol=1e-7)
+    assert (compact['openInterest'] * compact['strike']).sum() == (raw['openInterest'] * raw['strike']).sum()
+    assert compact.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() * 0.6
+
+    # Vencimentos diferentes continuam categóricos depois do concat
+    calls, _ = concat_chains([('2030-01-18', compact, compact),
+                              ('2030-02-15', compact_chain(_raw_chain('300215', 10)), compact)])
+    assert isinstance(calls['extracted_expiry'].dtype, pd.CategoricalDtype)
+    assert calls['extracted_expiry'].nunique() == 2
+
+
+if __name__ == "__main__":
+    test_keeps_expiry_order_and_tolerates_failures()
+    test_per_request_timeout()
+    test_bounded_pool()
+    test_vectorized_expiry_matches_row_by_row()
+    test_compact_chain_keeps_values_and_saves_memory()
+    print("OK")
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE PROVIDER DE DADOS (GRAVAÇÃO E REPLAY)
+===========================================
+
+Testa que o RecordingProvider grava cadeias, preços, barras e vencimentos,
+que o ReplayProvider serve a gravação sem rede com o relógio andando na
+velocidade configurada, que um provider incompleto falha ao ser criado e a
+escolha do provider pelas variáveis de ambiente.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+from data_provider import (DataProvider, RecordingProvider, ReplayProvider, YFinanceProvider,
+                           provider_from_env)
+
+
+class _FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class _ScriptedProvider(DataProvider):
+    """Provider 'ao vivo' de mentira: o preço sobe a cada chamada."""
+
+    def __init__(self):
+        self.price = 500.0
+
+    def expirations(self, ticker):
+        return ('2030-01-18', '2030-02-15')
+
+    def option_chain(self, ticker, date):
+        chain = pd.DataFrame({'strike': [self.price], 'openInterest': [10]})
+        return chain, chain
+
+    def current_price(self, ticker):
+        self.price += 1.0
+        return self.price
+
+    def intraday_bars(self, symbol, overlay_symbols=()):
+        bars = pd.DataFrame({'Close': [self.price]})
+        return bars, {overlay: bars for overlay in overlay_symbols}
+
+    def risk_free_rate(self):
+        return 0.045
+
+
+def test_record_then_replay_offline():
+    path = os.path.join(tempfile.mkdtemp(), 'gravacao.sqlite')
+    recorder = RecordingProvider(_ScriptedProvider(), path)
+    assert not recorder.use_snapshot_store
+
+    # Dois "refreshes" gravados com 60s de intervalo
+    with mock.patch('snapshot_store.time.time', return_value=10_000.0):
+        recorder.expirations('SPY')
+        recorder.option_chain('SPY', '2030-01-18')
+        recorder.quotes(['SPY', '^VIX'])
+        recorder.intraday_bars('SPY', ('^VIX',))
+        recorder.risk_free_rate()
+    with mock.patch('snapshot_store.time.time', return_value=10_060.0):
+        recorder.current_price('SPY')
+        recorder.option_chain('SPY', '2030-01-18')
+
+    clock = _FakeClock()
+    frozen = ReplayProvider(path, speed=0, clock=clock)
+    assert frozen.expirations('SPY') == ('2030-01-18', '2030-02-15')
+    assert frozen.current_price('SPY') == 501.0
+    assert frozen.quotes(['SPY', '^VIX']) == {'SPY': 501.0, '^VIX': 502.0}
+    assert frozen.risk_free_rate() == 0.045
+    bars, overlays = frozen.intraday_bars('SPY', ('^VIX',))
+    assert list(overlays) == ['^VIX'] and bars['Close'].iloc[0] == 502.0
+    clock.now += 3600
+    assert frozen.current_price('SPY') == 501.0
+
+    # 10x: 6s reais = 60s da gravação
+    fast = ReplayProvider(path, speed=10, clock=clock)
+    assert fast.option_chain('SPY', '2030-01-18')[0]['strike'].iloc[0] == 500.0
+    clock.now += 6
+    assert fast.current_price('SPY') == 503.0
+    assert fast.option_chain('SPY', '2030-01-18')[0]['strike'].iloc[0] == 503.0
+    # Depois do fim da gravação, o último snapshot continua valendo
+    clock.now += 3600
+    assert fast.replay_time() == 10_060.0
+
+    try:
+        fast.option_chain('SPY', '2030-03-15')
+        assert False, "ValueError esperado"
+    except ValueError:
+        pass
+
+
+def test_incomplete_provider_fails_on_creation():
+    class _NoBars(DataProvider):
+        def expirations(self, ticker):
+            return ()
+
+        def option_chain(self, ticker, date):
+            return pd.DataFrame(), pd.DataFrame()
+
+        def current_price(self, ticker):
+            return None
+
+        def risk_free_rate(self):
+            return None
+
+    try:
+        _NoBars()
+        assert False, "TypeError esperado"
+    except TypeError as e:
+        assert 'intraday_bars' in str(e)
+    # quotes tem implementação padrão em cima de current_price
+    assert _ScriptedProvider().quotes(['SPY']) == {'SPY': 501.0}
+
+
+def test_provider_from_env():
+    assert isinstance(provider_from_env({}), YFinanceProvider)
+    path = os.path.join(tempfile.mkdtemp(), 'gravacao.sqlite')
+    recorder = provider_from_env({'EZOPTIONS_DATA_PROVIDER': f'record:{path}'})
+    assert isinstance(recorder, RecordingProvider) and isinstance(recorder.inner, YFinanceProvider)
+
+    replay = provider_from_env({'EZOPTIONS_DATA_PROVIDER': f'replay:{path}', 'EZOPTIONS_REPLAY_SPEED': '0'})
+    assert isinstance(replay, ReplayProvider) and replay.speed == 0.0
+    try:
+        provider_from_env({'EZOPTIONS_DATA_PROVIDER': 'replay:/nao/existe.sqlite'})
+        assert False, "FileNotFoundError esperado"
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    test_record_then_replay_offline()
+    test_incomplete_provider_fails_on_creation()
+    test_provider_from_env()
+    print("OK")
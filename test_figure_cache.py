@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE CACHE DE GRÁFICOS
+=======================
+
+Testa que o cache guarda o dicionário da figura (cada acerto monta uma figura
+independente), que um acerto custa bem menos que reconstruir um gráfico de 400
+strikes, que o limite de memória mede o tamanho do dicionário e que o gráfico
+de exposição sem a linha de preço é o mesmo para todo spot dentro do bucket.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from chart_utils import add_current_price_line, create_exposure_bar_chart
+from figure_cache import FigureCache
+from greeks_cache import spot_bucket
+
+
+def _chain(seed):
+    rng = np.random.default_rng(seed)
+    strikes = np.arange(95.0, 106.0)
+    return pd.DataFrame({'strike': strikes, 'GEX': rng.uniform(0, 5e4, len(strikes))})
+
+
+def _chart(S, **kwargs):
+    return create_exposure_bar_chart(_chain(1), _chain(2), 'GEX', 'Gamma Exposure', S,
+                                     strike_range_percentage=3.0, **kwargs)
+
+
+def _median_ms(run, repeat=15):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def test_hits_rebuild_independent_figures():
+    cache = FigureCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _chart(100.0)
+
+    first = cache.get_or_build('gex', build)
+    second = cache.get_or_build('gex', build)
+    assert len(builds) == 1 and cache.stats()['hits'] == 1
+    assert second is not first and json.loads(second.to_json()) == json.loads(first.to_json())
+
+    # Alterar a figura devolvida não muda o que está em cache
+    add_current_price_line(second, 100.0, 'Bar', 12)
+    third = cache.get_or_build('gex', build)
+    assert len(third.layout.shapes) == len(first.layout.shapes)
+    assert third.layout.title.text == first.layout.title.text
+
+
+def test_hit_is_much_cheaper_than_rebuild():
+    rng = np.random.default_rng(3)
+    strikes = np.arange(300.0, 700.0)
+    calls = pd.DataFrame({'strike': strikes, 'GEX': rng.uniform(-5e4, 5e4, len(strikes))})
+    puts = pd.DataFrame({'strike': strikes, 'GEX': rng.uniform(-5e4, 5e4, len(strikes))})
+
+    def build():
+        return create_exposure_bar_chart(calls, puts, 'GEX', 'Gamma Exposure', 500.0,
+                                         strike_range_percentage=50.0, price_line=False)
+
+    cache = FigureCache()
+    built = cache.get_or_build('gex', build)
+    assert len(built.data[0].x) == 400
+    rebuild_ms = _median_ms(build)
+    hit_ms = _median_ms(lambda: cache.get_or_build('gex', build))
+    print(f"gráfico de 400 strikes: reconstrução {rebuild_ms:.1f} ms, acerto {hit_ms:.1f} ms")
+    assert hit_ms * 4 < rebuild_ms
+    assert json.loads(cache.get_or_build('gex', build).to_json()) == json.loads(built.to_json())
+
+
+def test_byte_limit_uses_payload_size():
+    sizing = FigureCache()
+    sizing.get_or_build(100.0, lambda: _chart(100.0))
+    payload_bytes = sizing.stats()['bytes']
+    # Perto do tamanho do JSON da mesma figura
+    assert 0.5 < payload_bytes / len(_chart(100.0).to_json()) < 2
+    cache = FigureCache(max_bytes=int(payload_bytes * 2.5))
+    for S in (100.0, 101.0, 102.0):
+        cache.get_or_build(S, lambda: _chart(S))
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert payload_bytes * 1.5 < stats['bytes'] <= payload_bytes * 2.5
+
+
+def test_spot_ticks_inside_bucket_share_the_chart():
+    tick = FigureCache().spot_tick
+    assert spot_bucket(100.01, tick) == spot_bucket(100.02, tick) == 100.0
+    # Sem a linha de preço, o gráfico só depende do spot arredondado
+    base = _chart(spot_bucket(100.01, tick), price_line=False)
+    assert base.to_json() == _chart(spot_bucket(100.02, tick), price_line=False).to_json()
+    assert len(base.layout.shapes) == 0
+    assert len(_chart(100.0).layout.shapes) == 1
+
+
+if __name__ == "__main__":
+    test_hits_rebuild_independent_figures()
+    test_hit_is_much_cheaper_than_rebuild()
+    test_byte_limit_uses_payload_size()
+    test_spot_ticks_inside_bucket_share_the_chart()
+    print("OK")
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE PERFIL DE GEX / ZERO GAMMA
+================================
+
+Confere a grade vetorizada de spots contra um loop ingênuo, a interpolação
+do nível de zero gamma (sem nível quando nenhum contrato é utilizável) e o
+uso do nível pelo setup de mercado consolidado.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from greeks_calculator import (
+    calculate_greeks_vectorized,
+    compute_and_process_greeks_multi,
+    compute_gex_profile,
+    find_zero_gamma,
+)
+from trading_setups import TradingSetupAnalyzer
+
+S = 100.0
+R = 0.04
+
+
+def _chains():
+    today = datetime.today().date()
+    strikes = np.arange(80.0, 121.0, 2.5)
+    calls = pd.DataFrame({
+        'strike': strikes,
+        'impliedVolatility': np.linspace(0.35, 0.2, len(strikes)),
+        # Calls concentradas acima do spot, puts abaixo: cria um gamma flip
+        'openInterest': np.where(strikes >= 100, 5000, 200),
+    })
+    puts = pd.DataFrame({
+        'strike': strikes,
+        'impliedVolatility': np.linspace(0.4, 0.22, len(strikes)),
+        'openInterest': np.where(strikes <= 100, 9000, 300),
+    })
+    dates = [(today + timedelta(days=d)).strftime("%Y-%m-%d") for d in (7, 30)]
+    return compute_and_process_greeks_multi([(d, calls, puts) for d in dates], S, R)
+
+
+def test_profile_matches_naive_loop():
+    calls, puts = _chains()
+    profile, _ = compute_gex_profile(calls, puts, S, R, range_pct=0.1, steps=41)
+
+    for _, row in profile.iloc[::10].iterrows():
+        spot = row['spot']
+        expected = 0.0
+        for df, sign in ((calls, 1), (puts, -1)):
+            gamma = calculate_greeks_vectorized('c', spot, df['strike'], df['time_to_expiry'],
+                                                df['impliedVolatility'], R)['gamma']
+            expected += sign * np.sum(gamma * df['openInterest'] * 100 * spot * spot * 0.01)
+        assert np.isclose(row['net_gex'], expected, rtol=1e-9)
+
+    # No spot atual o perfil bate com a soma das colunas GEX
+    at_spot, _ = compute_gex_profile(calls, puts, S, R, range_pct=0.0, steps=1)
+    assert np.isclose(at_spot['net_gex'].iloc[0], calls['GEX'].sum() - puts['GEX'].sum())
+
+
+def test_zero_gamma_interpolation():
+    spots = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+    net = np.array([-4.0, -2.0, 2.0, 6.0, -1.0])
+    assert np.isclose(find_zero_gamma(spots, net, 100.0), 97.5)
+    assert find_zero_gamma(spots, np.abs(net), 100.0) is None
+
+    # Zeros exatos: só contam entre valores de sinais opostos (no meio da sequência de zeros)
+    assert find_zero_gamma(spots, np.array([-4.0, 0.0, 0.0, 6.0, 8.0]), 100.0) == 97.5
+    assert find_zero_gamma(spots, np.array([-4.0, -2.0, 0.0, 6.0, 8.0]), 110.0) == 100.0
+    assert find_zero_gamma(spots, np.array([0.0, 2.0, 0.0, 6.0, 0.0]), 100.0) is None
+    assert find_zero_gamma(spots, np.zeros(5), 100.0) is None
+
+
+def test_no_usable_rows_has_no_zero_gamma():
+    # Cadeias sem IV/time_to_expiry (como as simuladas dos agentes): perfil zerado, sem gamma flip
+    calls = pd.DataFrame({'strike': [95.0, 100.0, 105.0], 'openInterest': [100, 200, 300], 'GEX': [1.0, 2.0, 3.0]})
+    puts = calls.copy()
+    profile, zero_gamma = compute_gex_profile(calls, puts, S, R)
+    assert zero_gamma is None and (profile['net_gex'] == 0).all()
+    assert TradingSetupAnalyzer().calculate_zero_gamma_level(calls, puts, S) is None
+
+    calls, puts = _chains()
+    calls['openInterest'] = 0
+    puts['openInterest'] = 0
+    assert compute_gex_profile(calls, puts, S, R)[1] is None
+
+
+def test_zero_gamma_sets_consolidation_regime():
+    calls, puts = _chains()
+    _, zero_gamma = compute_gex_profile(calls, puts, S, R)
+    assert zero_gamma is not None
+
+    analyzer = TradingSetupAnalyzer()
+    derived = analyzer.analyze_all_setups(calls, puts, S, {'vwap': S})['consolidated_market']
+    given = analyzer.analyze_all_setups(calls, puts, S, {'vwap': S}, zero_gamma_level=zero_gamma)['consolidated_market']
+    assert derived.confidence == given.confidence
+
+    # Acima do gamma flip (dealers comprados em gamma) a consolidação ganha confiança; abaixo, perde
+    long_gamma = analyzer.analyze_all_setups(calls, puts, S, {'vwap': S}, zero_gamma_level=S - 5)['consolidated_market']
+    short_gamma = analyzer.analyze_all_setups(calls, puts, S, {'vwap': S}, zero_gamma_level=S + 5)['consolidated_market']
+    assert long_gamma.confidence > short_gamma.confidence
+    assert long_gamma.confidence - short_gamma.confidence <= 40
+
+
+if __name__ == "__main__":
+    test_profile_matches_naive_loop()
+    test_zero_gamma_interpolation()
+    test_no_usable_rows_has_no_zero_gamma()
+    test_zero_gamma_sets_consolidation_regime()
+    print("OK")
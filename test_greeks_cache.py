@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE CACHE DE GREEKS
+=====================
+
+Testa chave por fingerprint/spot, LRU por entradas e por memória,
+e os contadores de hit/miss.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from greeks_cache import GreeksCache, chain_fingerprint
+
+
+def _chain(n=50, iv=0.2):
+    return pd.DataFrame({
+        'strike': np.arange(n, dtype=float) + 400,
+        'impliedVolatility': np.full(n, iv),
+        'openInterest': np.arange(n),
+        'contractSymbol': [f"SPY{i}" for i in range(n)],
+    })
+
+
+def test_fingerprint_tracks_inputs_only():
+    base = _chain()
+    same = _chain()
+    same['contractSymbol'] = 'outro'
+    assert chain_fingerprint(base) == chain_fingerprint(same)
+
+    changed = _chain()
+    changed.loc[10, 'impliedVolatility'] = 0.25
+    assert chain_fingerprint(base) != chain_fingerprint(changed)
+
+    # Fingerprint de gráfico: só as colunas plotadas contam
+    base['GEX'] = 1.0
+    changed = base.copy()
+    changed.loc[10, 'impliedVolatility'] = 0.25
+    assert chain_fingerprint(base, ['strike', 'GEX']) == chain_fingerprint(changed, ['strike', 'GEX'])
+    changed.loc[10, 'GEX'] = 2.0
+    assert chain_fingerprint(base, ['strike', 'GEX']) != chain_fingerprint(changed, ['strike', 'GEX'])
+
+
+def test_spot_bucket_and_counters():
+    cache = GreeksCache(spot_tick=0.5)
+    calls, puts = _chain(), _chain()
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return calls.copy(), puts.copy()
+
+    key = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.10)
+    cache.get_or_compute(key, compute)
+    # Spot dentro do mesmo tick reaproveita
+    key_same = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.20)
+    cache.get_or_compute(key_same, compute)
+    # Spot em outro tick recalcula
+    key_moved = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 451.00)
+    cache.get_or_compute(key_moved, compute)
+
+    stats = cache.stats()
+    assert len(computed) == 2
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+
+def test_valuation_date_change_misses():
+    # Greeks dependem de t (calculado a partir de hoje): a virada do dia não pode reaproveitá-los
+    cache = GreeksCache()
+    calls, puts = _chain(), _chain()
+    today = date(2030, 1, 17)
+    key = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.0, valuation_date=today)
+    cache.put(key, (calls, puts))
+
+    same_day = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.0, valuation_date=today)
+    assert cache.get(same_day) is not None
+    next_day = cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.0,
+                              valuation_date=today + timedelta(days=1))
+    assert next_day != key
+    assert cache.get(next_day) is None
+
+    # Sem data explícita, vale a de hoje
+    assert cache.make_key('SPY', '2030-01-18', calls, puts, 0.05, 450.0)[2] == date.today()
+
+
+def test_returned_frames_do_not_leak_into_cache():
+    cache = GreeksCache()
+    key = cache.make_key('SPY', '2030-01-18', _chain(), _chain(), 0.05, 450.0)
+    calls, _ = cache.get_or_compute(key, lambda: (_chain(), _chain()))
+    calls['novo'] = 1.0
+    # Escrita no lugar: sem Copy-on-Write (pandas 2.x) uma cópia rasa alteraria o cache
+    calls.loc[0, 'impliedVolatility'] = 9.0
+    cached_calls, _ = cache.get(key)
+    assert 'novo' not in cached_calls.columns
+    assert cached_calls.loc[0, 'impliedVolatility'] == 0.2
+
+
+def test_eviction_by_entries_and_bytes():
+    cache = GreeksCache(max_entries=2)
+    for i in range(3):
+        cache.put(('k', i), (_chain(), _chain()))
+    assert cache.get(('k', 0)) is None
+    assert cache.get(('k', 2)) is not None
+    assert cache.stats()['evictions'] == 1
+
+    small = GreeksCache(max_entries=100, max_bytes=1)
+    small.put('grande', (_chain(), _chain()))
+    assert small.stats()['entries'] == 0
+
+    sized = (_chain(), _chain())
+    entry_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in sized)
+    cache = GreeksCache(max_entries=100, max_bytes=int(entry_bytes * 2.5))
+    for i in range(4):
+        cache.put(i, (_chain(), _chain()))
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= entry_bytes * 2.5
+
+
+if __name__ == "__main__":
+    test_fingerprint_tracks_inputs_only()
+    test_spot_bucket_and_counters()
+    test_valuation_date_change_misses()
+    test_returned_frames_do_not_leak_into_cache()
+    test_eviction_by_entries_and_bytes()
+    print("OK")
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE MOTOR DE GREEKS VETORIZADO
+================================
+
+Confere se o cálculo colunar bate com as funções escalares
+calculate_greeks / calculate_charm e mantém o preenchimento com zero.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from greeks_calculator import (
+    calculate_greeks,
+    calculate_charm,
+    calculate_greeks_vectorized,
+    compute_and_process_greeks,
+    compute_and_process_greeks_multi,
+    GREEK_COLUMNS,
+)
+
+S = 450.0
+R = 0.05
+
+
+def _chain():
+    return pd.DataFrame({
+        'strike': [400.0, 430.0, 450.0, 470.0, 500.0, 520.0],
+        'impliedVolatility': [0.35, 0.25, 0.2, 0.18, np.nan, 0.0],
+        'openInterest': [100, 2500, 4000, 3000, 50, 10],
+    })
+
+
+def test_vectorized_matches_scalar():
+    strikes = np.array([300.0, 420.0, 450.0, 480.0, 700.0])
+    sigmas = np.array([0.6, 0.3, 0.22, 0.2, 0.4])
+    for flag in ('c', 'p'):
+        for t in (0.0, 1 / 365.0, 0.25, 2.0):
+            result = calculate_greeks_vectorized(flag, S, strikes, t, sigmas, R)
+            for i, (K, sigma) in enumerate(zip(strikes, sigmas)):
+                delta, gamma, vanna = calculate_greeks(flag, S, K, t, sigma, R)
+                charm = calculate_charm(flag, S, K, t, sigma, R)
+                assert np.isclose(result['delta'][i], delta, rtol=1e-9, atol=1e-12)
+                assert np.isclose(result['gamma'][i], gamma, rtol=1e-9, atol=1e-12)
+                assert np.isclose(result['vanna'][i], vanna, rtol=1e-9, atol=1e-12)
+                assert np.isclose(result['charm'][i], charm, rtol=1e-9, atol=1e-12)
+
+
+def test_invalid_rows_are_zero():
+    result = calculate_greeks_vectorized('c', S, np.array([0.0, -5.0, 450.0]), 0.1,
+                                         np.array([0.2, 0.2, 0.0]), R)
+    for key in ('delta', 'gamma', 'vanna', 'charm'):
+        assert np.all(result[key] == 0.0)
+
+
+def test_higher_order_greeks_match_finite_differences():
+    K = np.array([420.0, 450.0, 490.0])
+    sigma = np.array([0.3, 0.22, 0.25])
+    t = 0.2
+    h_s, h_v, h_t = 0.01, 1e-5, 1e-6
+    for flag in ('c', 'p'):
+        base = calculate_greeks_vectorized(flag, S, K, t, sigma, R)
+        up_s = calculate_greeks_vectorized(flag, S + h_s, K, t, sigma, R)
+        dn_s = calculate_greeks_vectorized(flag, S - h_s, K, t, sigma, R)
+        up_v = calculate_greeks_vectorized(flag, S, K, t, sigma + h_v, R)
+        dn_v = calculate_greeks_vectorized(flag, S, K, t, sigma - h_v, R)
+        up_t = calculate_greeks_vectorized(flag, S, K, t + h_t, sigma, R)
+        dn_t = calculate_greeks_vectorized(flag, S, K, t - h_t, sigma, R)
+
+        # speed = dGamma/dS, zomma = dGamma/dVol, color = dGamma/dTime (tempo decorrendo)
+        assert np.allclose(base['speed'], (up_s['gamma'] - dn_s['gamma']) / (2 * h_s), rtol=1e-4)
+        assert np.allclose(base['zomma'], (up_v['gamma'] - dn_v['gamma']) / (2 * h_v), rtol=1e-4)
+        assert np.allclose(base['color'], -(up_t['gamma'] - dn_t['gamma']) / (2 * h_t), rtol=1e-4)
+        # vomma = dVega/dVol, vanna = dVega/dS
+        assert np.allclose(base['vomma'], (up_v['vega'] - dn_v['vega']) / (2 * h_v), rtol=1e-4)
+        assert np.allclose(base['vanna'], (up_s['vega'] - dn_s['vega']) / (2 * h_s), rtol=1e-4)
+
+
+def test_compute_and_process_greeks_columns():
+    expiry = (datetime.today().date() + timedelta(days=30)).strftime("%Y-%m-%d")
+    calls, puts = compute_and_process_greeks(_chain(), _chain(), S, expiry, R)
+
+    for df in (calls, puts):
+        for col in GREEK_COLUMNS:
+            assert col in df.columns
+        # Linhas com IV NaN ou zero são descartadas
+        assert len(df) == 4
+
+    t = 30 / 365.0
+    delta, gamma, vanna = calculate_greeks('p', S, 430.0, t, 0.25, R)
+    row = puts[puts['strike'] == 430.0].iloc[0]
+    assert np.isclose(row['GEX'], gamma * 2500 * 100 * S * S * 0.01)
+    assert np.isclose(row['DEX'], delta * 2500 * 100 * S)
+    assert np.isclose(row['VEX'], vanna * 2500 * 100 * S)
+
+
+def test_multi_expiry_matches_per_date():
+    today = datetime.today().date()
+    dates = [(today + timedelta(days=d)).strftime("%Y-%m-%d") for d in (0, 7, 45)]
+    past = (today - timedelta(days=3)).strftime("%Y-%m-%d")
+    chains = [(d, _chain(), _chain()) for d in dates] + [(past, _chain(), _chain())]
+
+    calls, puts = compute_and_process_greeks_multi(chains, S, R)
+    # Vencimento no passado é ignorado, como na versão por data
+    assert set(calls['expiry_date']) == set(dates)
+
+    for d in dates:
+        single_calls, single_puts = compute_and_process_greeks(_chain(), _chain(), S, d, R)
+        for combined, single in ((calls, single_calls), (puts, single_puts)):
+            part = combined[combined['expiry_date'] == d].reset_index(drop=True)
+            assert len(part) == len(single)
+            for col in GREEK_COLUMNS:
+                assert np.allclose(part[col].to_numpy(), single[col].to_numpy())
+
+
+def test_incremental_recompute_matches_full():
+    import greeks_calculator
+
+    expiry = (datetime.today().date() + timedelta(days=30)).strftime("%Y-%m-%d")
+    first = compute_and_process_greeks(_chain(), _chain(), S, expiry, R)
+
+    updated = _chain()
+    updated.loc[2, 'impliedVolatility'] = 0.21
+    updated.loc[3, 'openInterest'] = 9999
+    updated.loc[len(updated)] = [480.0, 0.19, 700]
+
+    sizes = []
+    original = greeks_calculator.calculate_greeks_vectorized
+
+    def counting(flag, S_, K, *args):
+        sizes.append(len(K))
+        return original(flag, S_, K, *args)
+
+    greeks_calculator.calculate_greeks_vectorized = counting
+    try:
+        calls, puts = compute_and_process_greeks(updated, updated, S, expiry, R, previous=first)
+    finally:
+        greeks_calculator.calculate_greeks_vectorized = original
+
+    # Só a linha com IV nova e o strike novo são recalculados
+    assert sizes == [2, 2]
+    full_calls, full_puts = compute_and_process_greeks(updated, updated, S, expiry, R)
+    for col in GREEK_COLUMNS:
+        assert np.allclose(calls[col].to_numpy(), full_calls[col].to_numpy())
+        assert np.allclose(puts[col].to_numpy(), full_puts[col].to_numpy())
+
+
+def test_incremental_spot_tolerance():
+    expiry = (datetime.today().date() + timedelta(days=30)).strftime("%Y-%m-%d")
+    first = compute_and_process_greeks(_chain(), _chain(), S, expiry, R)
+
+    # Dentro da tolerância: greeks ancorados no spot anterior
+    near_calls, _ = compute_and_process_greeks(_chain(), _chain(), S * 1.0005, expiry, R,
+                                               previous=first, spot_tolerance=0.001)
+    assert np.allclose(near_calls['calc_gamma'], first[0]['calc_gamma'])
+    assert near_calls.attrs['greeks_inputs']['S'] == S
+
+    # Fora da tolerância: recálculo completo no spot novo
+    moved_S = S * 1.01
+    moved_calls, _ = compute_and_process_greeks(_chain(), _chain(), moved_S, expiry, R,
+                                                previous=first, spot_tolerance=0.001)
+    full_calls, _ = compute_and_process_greeks(_chain(), _chain(), moved_S, expiry, R)
+    assert np.allclose(moved_calls['calc_gamma'], full_calls['calc_gamma'])
+    assert moved_calls.attrs['greeks_inputs']['S'] == moved_S
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_scalar()
+    test_invalid_rows_are_zero()
+    test_higher_order_greeks_match_finite_differences()
+    test_compute_and_process_greeks_columns()
+    test_multi_expiry_matches_per_date()
+    test_incremental_recompute_matches_full()
+    test_incremental_spot_tolerance()
+    print("OK")
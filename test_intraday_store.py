@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE BARRAS INTRADAY INCREMENTAIS
+==================================
+
+Testa que, depois da carga inicial do dia, só as barras novas são baixadas,
+que a última barra (ainda em formação) é substituída, o índice em US/Eastern
+com filtro de pregão, a recarga completa na virada do dia e o alinhamento
+do lote ativo + overlays (VIX, ES...) sem descartar barras do ativo.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import numpy as np
+
+from intraday_store import IntradayBarStore, EASTERN, split_aligned
+
+
+def _bars(start_utc, count, close=100.0):
+    index = pd.date_range(start_utc, periods=count, freq='1min', tz='UTC')
+    values = [close + i for i in range(count)]
+    return pd.DataFrame({'Open': values, 'High': values, 'Low': values, 'Close': values,
+                         'Volume': [10] * count}, index=index)
+
+
+def test_incremental_merge():
+    # 14:00 UTC = 09:00 ET (inverno): as primeiras 30 barras são pré-mercado
+    day = _bars('2030-01-16 14:00', 300)
+    requests = []
+
+    def fetch(start):
+        requests.append(start)
+        if start is None:
+            return day
+        # Barras a partir de `start`; a última mudou desde o fetch anterior
+        return _bars(start.tz_convert('UTC'), 3, close=500.0)
+
+    store = IntradayBarStore()
+    now = EASTERN.localize(pd.Timestamp('2030-01-16 14:00').to_pydatetime())
+    first = store.update('SPY', fetch, now=now)
+    assert str(first.index.tz) == 'US/Eastern'
+    assert first.index[0].strftime('%H:%M') == '09:30'
+    assert len(first) == 270
+
+    second = store.update('SPY', fetch, now=now)
+    assert requests[1] == first.index[-1]
+    # Última barra substituída + 2 novas
+    assert len(second) == 272
+    assert second['Close'].iloc[-3] == 500.0
+    assert second.index.is_monotonic_increasing and second.index.is_unique
+    assert store.stats()['full_fetches'] == 1
+    assert store.stats()['incremental_fetches'] == 1
+
+    # Mutar o retorno não afeta o que está guardado
+    second.loc[second.index[0], 'Close'] = -1.0
+    assert store.update('SPY', lambda start: pd.DataFrame(), now=now)['Close'].iloc[0] != -1.0
+
+
+def test_new_day_reloads():
+    calls = []
+
+    def fetch(start):
+        calls.append(start)
+        return _bars('2030-01-16 14:30', 10)
+
+    store = IntradayBarStore()
+    store.update('QQQ', fetch, now=EASTERN.localize(pd.Timestamp('2030-01-16 10:00').to_pydatetime()))
+    store.update('QQQ', fetch, now=EASTERN.localize(pd.Timestamp('2030-01-17 10:00').to_pydatetime()))
+    assert calls == [None, None]
+
+
+def _batch(start_utc, count, symbols):
+    # Mesmo formato de yf.download com vários tickers: colunas (campo, símbolo)
+    frames = {symbol: _bars(start_utc, count, close=100.0 * (i + 1)) for i, symbol in enumerate(symbols)}
+    return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+
+def test_batched_overlays_are_aligned():
+    frame = _batch('2030-01-16 14:30', 10, ['SPY', '^VIX', 'ES=F'])
+    # VIX sem a barra 3; SPY sem a barra 7 (só o VIX negociou naquele minuto)
+    frame.loc[frame.index[3], [(field, '^VIX') for field in ['Open', 'High', 'Low', 'Close']]] = np.nan
+    frame.loc[frame.index[7], [(field, 'SPY') for field in ['Open', 'High', 'Low', 'Close', 'Volume']]] = np.nan
+
+    spy, overlays = split_aligned(frame, 'SPY', ['^VIX', 'ES=F', 'DX-Y.NYB'])
+    assert len(spy) == 9
+    assert set(overlays) == {'^VIX', 'ES=F'}
+    assert overlays['^VIX'].index.equals(spy.index)
+    # Barra ausente do VIX recebe o último valor conhecido, em vez de derrubar a barra do SPY
+    assert overlays['^VIX']['Close'].iloc[3] == overlays['^VIX']['Close'].iloc[2]
+
+
+def test_batched_frame_updates_incrementally():
+    symbols = ('SPY', '^VIX')
+    requests = []
+
+    def fetch(start):
+        requests.append(start)
+        if start is None:
+            return _batch('2030-01-16 14:30', 20, list(symbols))
+        return _batch(start.tz_convert('UTC'), 2, list(symbols))
+
+    store = IntradayBarStore()
+    now = EASTERN.localize(pd.Timestamp('2030-01-16 10:00').to_pydatetime())
+    store.update(symbols, fetch, now=now)
+    merged = store.update(symbols, fetch, now=now)
+    assert len(merged) == 21
+    assert requests[0] is None and requests[1] is not None
+
+    store.invalidate('^VIX')
+    assert store.stats()['symbols'] == 0
+
+
+if __name__ == "__main__":
+    test_incremental_merge()
+    test_new_day_reloads()
+    test_batched_overlays_are_aligned()
+    test_batched_frame_updates_incrementally()
+    print("OK")
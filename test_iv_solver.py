@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE SOLVER DE VOLATILIDADE IMPLICITA
+======================================
+
+Recupera IVs conhecidas a partir de preços Black-Scholes e confere o
+preenchimento de IVs ausentes a partir do preço médio bid/ask.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from greeks_calculator import (
+    _bs_price_and_vega,
+    implied_volatility_vectorized,
+    apply_mid_implied_volatility,
+)
+
+S = 5000.0
+R = 0.04
+
+
+def test_recovers_known_volatility_for_50k_options():
+    rng = np.random.default_rng(7)
+    n = 50000
+    K = rng.uniform(3500, 6500, n)
+    t = rng.uniform(1 / 365, 1.5, n)
+    sigma = rng.uniform(0.05, 1.2, n)
+    is_call = rng.random(n) < 0.5
+    price, vega = _bs_price_and_vega(is_call, S, K, t, sigma, R)
+
+    start = time.perf_counter()
+    iv, converged = implied_volatility_vectorized(is_call, price, S, K, t, R)
+    elapsed = time.perf_counter() - start
+    print(f"50k opções resolvidas em {elapsed:.3f}s")
+
+    assert elapsed < 1.0
+    identifiable = vega > 1e-3
+    assert converged[identifiable].all()
+    assert np.allclose(iv[identifiable], sigma[identifiable], atol=1e-6)
+
+
+def test_prices_outside_arbitrage_bounds_are_nan():
+    K = np.array([4000.0, 6000.0, 5000.0])
+    # Abaixo do intrínseco, acima do spot e preço NaN
+    price = np.array([900.0, 5001.0, np.nan])
+    iv, converged = implied_volatility_vectorized('c', price, S, K, 0.25, R)
+    assert not converged.any()
+    assert np.isnan(iv).all()
+
+
+def test_fill_missing_iv_from_mid():
+    K = np.array([4800.0, 5000.0, 5200.0])
+    true_iv = np.array([0.22, 0.18, 0.16])
+    price, _ = _bs_price_and_vega(True, S, K, 0.1, true_iv, R)
+    chain = pd.DataFrame({
+        'strike': K,
+        'bid': price - 0.5,
+        'ask': price + 0.5,
+        'lastPrice': price,
+        'impliedVolatility': [0.3, np.nan, 0.0],
+    })
+
+    filled = apply_mid_implied_volatility(chain, 'c', S, 0.1, R)
+    # IV válida do Yahoo é mantida; ausente/zerada é resolvida do mid
+    assert filled['impliedVolatility'].iloc[0] == 0.3
+    assert np.allclose(filled['impliedVolatility'].iloc[1:], true_iv[1:], atol=1e-6)
+
+    replaced = apply_mid_implied_volatility(chain, 'c', S, 0.1, R, replace_all=True)
+    assert np.allclose(replaced['impliedVolatility'], true_iv, atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_recovers_known_volatility_for_50k_options()
+    test_prices_outside_arbitrage_bounds_are_nan()
+    test_fill_missing_iv_from_mid()
+    print("OK")
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE MAX PAIN (SOMAS ACUMULADAS)
+=================================
+
+Confere as curvas de dor e os strikes de max pain contra o loop ingênuo
+(refiltrando as cadeias a cada strike), o desempate pelo menor strike e a
+estrutura a termo (max pain de cada vencimento calculado num só lote), sem
+misturar linhas sem vencimento em nenhum grupo.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from max_pain_engine import max_pain, max_pain_term_structure, pain_table
+
+EXPIRIES = ['2030-01-18', '2030-02-15', '2030-03-15']
+
+
+def _naive(calls, puts):
+    strikes = sorted(set(calls['strike']) | set(puts['strike']))
+    call_pain = {k: (calls.loc[calls['strike'] <= k, 'openInterest'] * (k - calls.loc[calls['strike'] <= k, 'strike'])).sum()
+                 for k in strikes}
+    put_pain = {k: (puts.loc[puts['strike'] >= k, 'openInterest'] * (puts.loc[puts['strike'] >= k, 'strike'] - k)).sum()
+                for k in strikes}
+    total = {k: call_pain[k] + put_pain[k] for k in strikes}
+    first_min = lambda pain: min(pain.items(), key=lambda x: x[1])[0]
+    return first_min(total), first_min(call_pain), first_min(put_pain), total, call_pain, put_pain
+
+
+def _chain(rng, n, offset=0.0):
+    # Strikes repetidos (vários vencimentos) e, com offset, decimais não exatos em binário
+    strikes = np.round(np.arange(400.0, 600.0, 2.5) + offset, 2)
+    return pd.DataFrame({
+        'strike': rng.choice(strikes, n),
+        'openInterest': rng.integers(0, 5000, n).astype('int32'),
+        'extracted_expiry': pd.Categorical(rng.choice(EXPIRIES, n)),
+    })
+
+
+def test_matches_naive_loop():
+    rng = np.random.default_rng(11)
+    for trial in range(40):
+        offset = 0.37 if trial % 2 else 0.0
+        calls = _chain(rng, int(rng.integers(1, 200)), offset)
+        puts = _chain(rng, int(rng.integers(1, 200)), offset)
+        expected, result = _naive(calls, puts), max_pain(calls, puts)
+        assert result[:3] == expected[:3]
+        for got, want in zip(result[3:], expected[3:]):
+            assert list(got) == list(want)
+            assert np.allclose(list(got.values()), list(want.values()), rtol=1e-12, atol=1e-6)
+
+    assert max_pain(pd.DataFrame(), _chain(rng, 5)) == (None, None, None, None, None)
+
+
+def test_ties_go_to_lower_strike():
+    # Dor total igual em 100 e 105: vale o menor strike, como no min() original
+    calls = pd.DataFrame({'strike': [100.0], 'openInterest': [10]})
+    puts = pd.DataFrame({'strike': [105.0], 'openInterest': [10]})
+    table = pain_table(calls, puts)
+    assert table['total_pain'].tolist() == [50.0, 50.0]
+    assert max_pain(calls, puts)[:3] == (100.0, 100.0, 105.0)
+
+
+def test_term_structure_in_one_batch():
+    rng = np.random.default_rng(5)
+    calls, puts = _chain(rng, 600), _chain(rng, 600)
+    # Um vencimento só com calls fica de fora
+    calls = pd.concat([calls, pd.DataFrame({'strike': [450.0], 'openInterest': [7],
+                                            'extracted_expiry': ['2030-06-20']})], ignore_index=True)
+
+    term = max_pain_term_structure(calls, puts)
+    assert term['extracted_expiry'].tolist() == EXPIRIES
+    for _, row in term.iterrows():
+        expiry_calls = calls[calls['extracted_expiry'] == row['extracted_expiry']]
+        expiry_puts = puts[puts['extracted_expiry'] == row['extracted_expiry']]
+        expected = _naive(expiry_calls, expiry_puts)
+        assert row['max_pain'] == expected[0]
+        assert np.isclose(row['total_pain'], expected[3][expected[0]])
+        assert row['call_oi'] == expiry_calls['openInterest'].sum()
+
+    assert max_pain_term_structure(calls, puts.iloc[0:0]).empty
+
+
+def test_rows_without_expiry_are_left_out():
+    rng = np.random.default_rng(9)
+    calls, puts = _chain(rng, 300), _chain(rng, 300)
+    expected = max_pain_term_structure(calls, puts)
+
+    # Símbolo que não casa: vencimento ausente, com OI enorme para pesar se cair num grupo
+    orphan = pd.DataFrame({'strike': [597.5], 'openInterest': [10 ** 6], 'extracted_expiry': [None]})
+    calls = pd.concat([calls.astype({'extracted_expiry': object}), orphan], ignore_index=True)
+    puts = pd.concat([puts.astype({'extracted_expiry': object}), orphan], ignore_index=True)
+
+    term = max_pain_term_structure(calls, puts)
+    pd.testing.assert_frame_equal(term, expected, check_dtype=False)
+    table = pain_table(calls, puts, by='extracted_expiry')
+    assert set(table.index.get_level_values('extracted_expiry')) == set(EXPIRIES)
+
+
+if __name__ == "__main__":
+    test_matches_naive_loop()
+    test_ties_go_to_lower_strike()
+    test_term_structure_in_one_batch()
+    test_rows_without_expiry_are_left_out()
+    print("OK")
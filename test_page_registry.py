@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE REGISTRO DE PÁGINAS
+=========================
+
+Testa que o módulo de uma página só é importado na primeira visita, que
+render() dele é chamado a cada visita e que todas as páginas do app
+apontam para módulos de app_pages/ com uma função render().
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import inspect
+import tempfile
+
+from page_registry import PageRegistry, PAGE_MODULES
+
+
+def test_imports_on_first_visit_and_renders():
+    directory = tempfile.mkdtemp()
+    package = os.path.join(directory, 'paginas_teste')
+    os.mkdir(package)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    with open(os.path.join(package, 'pagina.py'), 'w', encoding='utf-8') as f:
+        f.write("rendered = []\n\n\ndef render():\n    rendered.append('GEX')\n")
+    sys.path.insert(0, directory)
+    try:
+        registry = PageRegistry({"Página": 'paginas_teste.pagina', "Outra": 'paginas_teste.outra'})
+        assert 'paginas_teste.pagina' not in sys.modules
+        assert registry.stats()['loaded'] == 0
+
+        registry.render("Página")
+        registry.render("Página")
+        assert sys.modules['paginas_teste.pagina'].rendered == ['GEX', 'GEX']
+        assert registry.stats()['loaded'] == 1
+        assert 'paginas_teste.outra' not in sys.modules
+
+        try:
+            registry.render("Inexistente")
+            assert False, "KeyError esperado"
+        except KeyError:
+            pass
+    finally:
+        sys.path.remove(directory)
+        for name in ('paginas_teste.pagina', 'paginas_teste'):
+            sys.modules.pop(name, None)
+
+
+def test_app_pages_import_and_define_render():
+    registry = PageRegistry()
+    for page in PAGE_MODULES:
+        render = registry.module(page).render
+        assert inspect.isfunction(render) and not inspect.signature(render).parameters, page
+    assert registry.stats()['loaded'] == len(set(PAGE_MODULES.values()))
+
+
+if __name__ == "__main__":
+    test_imports_on_first_visit_and_renders()
+    test_app_pages_import_and_define_render()
+    print("OK")
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE PREFETCH EM SEGUNDO PLANO
+===============================
+
+Testa que os jobs rodam antes de o cache expirar, a profundidade da fila,
+o descarte de jobs abandonados, a pausa com o mercado fechado e que o
+refresh mantém a página lendo do cache.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+
+import pandas as pd
+
+from prefetch_scheduler import PrefetchScheduler
+from scoped_cache import scoped_cache, get_scoped_cache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_idle(scheduler):
+    deadline = time.monotonic() + 2
+    while scheduler.queue_depth() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_jobs_run_ahead_of_ttl_and_expire_when_idle():
+    clock = _FakeClock()
+    scheduler = PrefetchScheduler(max_workers=2, lead=0.8, idle_timeout=60, clock=clock)
+    runs = []
+
+    scheduler.schedule(('chain', 'SPY', '2030-01-18'), lambda: runs.append(clock.now), interval=10)
+    scheduler._stop.set()  # Drive it by hand, without the background loop
+
+    assert scheduler.run_pending(now=0.0) == [('chain', 'SPY', '2030-01-18')]
+    _wait_idle(scheduler)
+    # Próxima execução aos 80% do TTL, não antes
+    assert scheduler.run_pending(now=7.9) == []
+    assert scheduler.run_pending(now=8.0) == [('chain', 'SPY', '2030-01-18')]
+    _wait_idle(scheduler)
+    assert len(runs) == 2
+
+    # Ninguém renovou o job por mais de idle_timeout: sai da agenda
+    assert scheduler.run_pending(now=100.0) == []
+    assert scheduler.stats()['jobs'] == 0
+    scheduler.stop()
+
+
+def test_closed_market_pauses_jobs():
+    clock = _FakeClock()
+    market = {'open': False}
+    scheduler = PrefetchScheduler(idle_timeout=60, clock=clock, is_active=lambda: market['open'])
+    runs = []
+
+    scheduler.schedule(('chain', 'SPY', '2030-01-18'), lambda: runs.append(clock.now), interval=10)
+    scheduler._stop.set()
+
+    # Mercado fechado: o job continua agendado, mas não dispara
+    assert scheduler.run_pending(now=0.0) == []
+    assert scheduler.run_pending(now=30.0) == []
+    assert scheduler.stats()['jobs'] == 1 and not scheduler.stats()['active']
+
+    market['open'] = True
+    assert scheduler.run_pending(now=31.0) == [('chain', 'SPY', '2030-01-18')]
+    _wait_idle(scheduler)
+    assert len(runs) == 1
+
+    # Jobs abandonados saem da agenda mesmo com o mercado fechado
+    market['open'] = False
+    assert scheduler.run_pending(now=200.0) == []
+    assert scheduler.stats()['jobs'] == 0
+    scheduler.stop()
+
+
+def test_queue_depth_and_shared_pool():
+    scheduler = PrefetchScheduler(max_workers=2, poll_interval=0.01)
+    release = threading.Event()
+    running = []
+    peak = []
+
+    def job():
+        running.append(1)
+        peak.append(len(running))
+        release.wait(2)
+        running.pop()
+
+    for expiry in range(5):
+        scheduler.schedule(('chain', 'QQQ', expiry), job, interval=60)
+    time.sleep(0.2)
+    assert scheduler.queue_depth() == 5
+    assert max(peak) <= 2
+
+    release.set()
+    scheduler.stop()
+    assert scheduler.queue_depth() == 0
+    assert scheduler.stats()['completed'] == 5
+
+
+def test_refresh_rewrites_cache_entry():
+    downloads = []
+
+    @scoped_cache('chain', ttl=60, ignore=('S',))
+    def fetch_chain(ticker, date, S=None):
+        downloads.append(date)
+        return pd.DataFrame({'strike': [100.0], 'versao': [len(downloads)]}), pd.DataFrame()
+
+    fetch_chain('TESTE_DIA', '2030-01-18', 450.0)
+    # S fica fora da chave: preço diferente, mesma entrada
+    assert fetch_chain('TESTE_DIA', '2030-01-18', S=451.0)[0]['versao'].iloc[0] == 1
+    fetch_chain.refresh('TESTE_DIA', '2030-01-18')
+    assert fetch_chain('TESTE_DIA', '2030-01-18')[0]['versao'].iloc[0] == 2
+    assert len(downloads) == 2
+    get_scoped_cache().invalidate(ticker='TESTE_DIA')
+
+
+if __name__ == "__main__":
+    test_jobs_run_ahead_of_ttl_and_expire_when_idle()
+    test_closed_market_pauses_jobs()
+    test_queue_depth_and_shared_pool()
+    test_refresh_rewrites_cache_entry()
+    print("OK")
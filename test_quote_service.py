@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE SERVICO DE COTACOES
+=========================
+
+Testa a busca em lote de vários tickers, o cache por tick de refresh,
+o alias SPX -> ^GSPC e o fallback individual quando o lote falha.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from quote_service import QuoteService, normalize_quote_symbol
+
+PRICES = {'SPY': 512.345, 'QQQ': 440.1, '^GSPC': 5123.456, '^VIX': 14.2}
+
+
+def test_batch_and_tick_cache():
+    batches = []
+    singles = []
+
+    def batch(symbols):
+        batches.append(list(symbols))
+        return {symbol: PRICES[symbol] for symbol in symbols if symbol in PRICES}
+
+    def single(symbol):
+        singles.append(symbol)
+        return PRICES.get(symbol)
+
+    service = QuoteService(tick_seconds=10, batch_fetch=batch, single_fetch=single)
+    quotes = service.get_quotes(['SPY', 'QQQ', '^SPX', '%5ESPX', '^VIX', 'XXXX'], now=100.0)
+
+    assert quotes == {'SPY': 512.35, 'QQQ': 440.1, '^SPX': 5123.46, '%5ESPX': 5123.46,
+                      '^VIX': 14.2, 'XXXX': None}
+    # Um lote só; apenas o ticker que o lote não trouxe vai para o caminho individual
+    assert batches == [['SPY', 'QQQ', '^GSPC', '^VIX', 'XXXX']]
+    assert singles == ['XXXX']
+
+    # Mesmo tick: tudo do cache
+    assert service.get_quote('SPY', now=109.0) == 512.35
+    assert len(batches) == 1 and singles == ['XXXX']
+
+    # Tick seguinte: busca de novo (um ticker só não usa lote)
+    service.get_quote('SPY', now=110.0)
+    assert singles == ['XXXX', 'SPY']
+
+
+def test_batch_failure_falls_back_to_single():
+    def batch(symbols):
+        raise RuntimeError("HTTP 429")
+
+    service = QuoteService(batch_fetch=batch, single_fetch=PRICES.get)
+    assert service.get_quotes(['SPY', '^VIX'], now=0.0) == {'SPY': 512.35, '^VIX': 14.2}
+    assert service.stats()['single_calls'] == 2
+    assert normalize_quote_symbol('%5EVIX') == '^VIX'
+
+
+if __name__ == "__main__":
+    test_batch_and_tick_cache()
+    test_batch_failure_falls_back_to_single()
+    print("OK")
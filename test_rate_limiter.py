@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE RATE LIMITER E RETRY
+==========================
+
+Testa que rajadas acima do orçamento entram na fila (em vez de falhar),
+o retry com backoff para throttling/5xx e que erros de uso não são repetidos.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+import threading
+import time
+
+from rate_limiter import TokenBucket, RetryPolicy, Upstream
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_burst_queues_instead_of_failing():
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(6)]
+    # 3 de rajada; os seguintes esperam 0.5s, 1.0s, 1.5s (um a cada 1/rate)
+    assert waits == [0.0, 0.0, 0.0, 0.5, 1.0, 1.5]
+
+    clock.now = 10.0
+    assert bucket.acquire() == 0.0
+
+
+def test_real_threads_respect_rate():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 2 imediatos + 10 a 20/s ~= 0.5s
+    assert time.perf_counter() - start >= 0.45
+
+
+def test_retry_with_backoff():
+    clock = _FakeClock()
+    upstream = Upstream('teste', rate=100, capacity=100, sleep=clock.sleep, clock=clock,
+                        retry=RetryPolicy(max_attempts=4, base_delay=0.5, rng=random.Random(1)))
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("connection reset")
+        return "ok"
+
+    assert upstream.call(flaky) == "ok"
+    assert len(attempts) == 3
+    # Jitter total: cada espera em [0, base * 2**n]
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 0.5 and 0 <= clock.sleeps[1] <= 1.0
+
+    statuses = [_Response(200), _Response(503), _Response(429)]
+    assert upstream.call(statuses.pop).status_code == 200
+    assert upstream.stats()['retries'] == 4
+
+
+def test_usage_errors_are_not_retried():
+    clock = _FakeClock()
+    upstream = Upstream('teste', rate=100, capacity=100, sleep=clock.sleep, clock=clock)
+    calls = []
+
+    def bad_expiry():
+        calls.append(1)
+        raise ValueError("Expiration `2030-01-01` cannot be found")
+
+    try:
+        upstream.call(bad_expiry)
+        assert False, "ValueError esperado"
+    except ValueError:
+        pass
+    assert len(calls) == 1
+    assert upstream.stats()['failures'] == 1
+
+
+if __name__ == "__main__":
+    test_burst_queues_instead_of_failing()
+    test_real_threads_respect_rate()
+    test_retry_with_backoff()
+    test_usage_errors_are_not_retried()
+    print("OK")
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE CACHE COM ESCOPO POR TICKER
+=================================
+
+Testa que o refresh de um ticker invalida só as entradas dele (os outros
+tickers e datasets continuam em cache), o TTL lido na consulta, o
+snapshot em disco ignorado após a invalidação e o agrupamento de
+buscas simultâneas (single-flight).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+
+import pandas as pd
+
+from scoped_cache import ScopedCache, SingleFlight, scoped_cache, get_scoped_cache, get_single_flight
+from snapshot_store import SnapshotStore
+
+
+def test_invalidate_only_one_ticker():
+    downloads = []
+
+    @scoped_cache('chain', ttl=60)
+    def fetch_chain(ticker, date):
+        downloads.append((ticker, date))
+        return pd.DataFrame({'strike': [100.0]}), pd.DataFrame({'strike': [100.0]})
+
+    @scoped_cache('price', ttl=60)
+    def fetch_price(ticker):
+        downloads.append((ticker, 'price'))
+        return 450.0
+
+    for ticker in ('TESTE_SPY', 'TESTE_QQQ'):
+        fetch_chain(ticker, '2030-01-18')
+        fetch_price(ticker)
+    assert len(downloads) == 4
+
+    # Mutar o resultado não contamina o cache
+    calls, _ = fetch_chain('TESTE_SPY', '2030-01-18')
+    calls['GEX'] = 1.0
+    assert 'GEX' not in fetch_chain('TESTE_SPY', '2030-01-18')[0].columns
+    assert len(downloads) == 4
+
+    assert get_scoped_cache().invalidate(ticker='TESTE_SPY', dataset='chain') == 1
+    fetch_chain('TESTE_SPY', '2030-01-18')
+    fetch_price('TESTE_SPY')
+    fetch_chain('TESTE_QQQ', '2030-01-18')
+    assert downloads[4:] == [('TESTE_SPY', '2030-01-18')]
+
+    assert get_scoped_cache().invalidate(ticker='TESTE_QQQ') == 2
+    get_scoped_cache().invalidate(ticker='TESTE_SPY')
+
+
+def test_ttl_checked_on_read():
+    cache = ScopedCache(max_entries=2)
+    now = time.time()
+    cache.put('price', 'SPY', 'last', 1.0, now=now - 30)
+    assert cache.get('price', 'SPY', 'last', ttl=60, now=now) == 1.0
+    # Um refresh rate menor vale também para o que já está em cache
+    assert cache.get('price', 'SPY', 'last', ttl=10, now=now) is None
+
+    cache.put('price', 'QQQ', 'last', 2.0)
+    cache.put('price', 'IWM', 'last', 3.0)
+    assert cache.stats()['entries'] == 2
+    assert cache.get('price', 'SPY', 'last', ttl=60) is None
+
+
+def test_callable_ttl_read_per_call():
+    downloads = []
+    refresh = {'seconds': 60}
+
+    @scoped_cache('price', ttl=lambda: refresh['seconds'])
+    def fetch_price(ticker):
+        downloads.append(ticker)
+        return 450.0
+
+    fetch_price('TESTE_DIA')
+    fetch_price('TESTE_DIA')
+    assert downloads == ['TESTE_DIA']
+    # O refresh rate publicado depois vale para a entrada que já estava em cache
+    refresh['seconds'] = 0
+    fetch_price('TESTE_DIA')
+    assert downloads == ['TESTE_DIA', 'TESTE_DIA']
+    get_scoped_cache().invalidate(ticker='TESTE_DIA')
+
+
+def test_snapshot_invalidation_keeps_history():
+    store = SnapshotStore(':memory:')
+    now = time.time()
+    store.save('price', 'SPY', 'last', 1.0, snapshot_ts=now - 5)
+    store.save('price', 'QQQ', 'last', 2.0, snapshot_ts=now - 5)
+
+    store.invalidate('SPY', now=now)
+    assert store.load('price', 'SPY', 'last', max_age=60, now=now) is None
+    assert store.load('price', 'QQQ', 'last', max_age=60, now=now) == 2.0
+
+    store.save('price', 'SPY', 'last', 3.0, snapshot_ts=now + 1)
+    assert store.load('price', 'SPY', 'last', max_age=60, now=now + 2) == 3.0
+    count = store._conn.execute("SELECT COUNT(*) FROM snapshots WHERE ticker = 'SPY'").fetchone()[0]
+    assert count == 2
+
+
+def test_concurrent_misses_share_one_fetch():
+    downloads = []
+    coalesced_before = get_single_flight().stats()['coalesced']
+
+    @scoped_cache('chain', ttl=60)
+    def fetch_chain(ticker, date):
+        downloads.append(date)
+        time.sleep(0.2)
+        return pd.DataFrame({'strike': [100.0]}), pd.DataFrame({'strike': [100.0]})
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(fetch_chain('TESTE_IWM', '2030-01-18')))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert downloads == ['2030-01-18']
+    assert len(results) == 8
+    # Cada sessão recebe sua própria cópia
+    assert len({id(calls) for calls, _ in results}) == 8
+    assert get_single_flight().stats()['coalesced'] - coalesced_before == 7
+    get_scoped_cache().invalidate(ticker='TESTE_IWM')
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("HTTP 429")
+
+    def call():
+        try:
+            flight.do('SPY', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ["HTTP 429", "HTTP 429"]
+    assert flight.stats() == {'executed': 1, 'coalesced': 1, 'in_flight': 0}
+
+
+if __name__ == "__main__":
+    test_invalidate_only_one_ticker()
+    test_ttl_checked_on_read()
+    test_callable_ttl_read_per_call()
+    test_snapshot_invalidation_keeps_history()
+    test_concurrent_misses_share_one_fetch()
+    test_single_flight_shares_errors()
+    print("OK")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE SNAPSHOTS EM DISCO
+========================
+
+Testa gravação/leitura sob TTL, leitura direta (read-through),
+retenção e a regra de TTL com o mercado fechado.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from snapshot_store import SnapshotStore, market_is_open, snapshot_ttl, CLOSED_MARKET_TTL_SECONDS
+
+
+def _chain(price):
+    return pd.DataFrame({'strike': [100.0, 105.0], 'lastPrice': [price, price / 2]})
+
+
+def test_save_and_load_latest_under_ttl():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, 'snap.sqlite'))
+        now = time.time()
+        store.save('chain', 'SPY', '2030-01-18', (_chain(1.0), _chain(2.0)), snapshot_ts=now - 100)
+        store.save('chain', 'SPY', '2030-01-18', (_chain(3.0), _chain(4.0)), snapshot_ts=now - 5)
+
+        calls, puts = store.load('chain', 'SPY', '2030-01-18', max_age=30)
+        assert calls['lastPrice'].iloc[0] == 3.0
+        assert store.load('chain', 'SPY', '2030-01-18', max_age=1) is None
+        assert store.load('chain', 'QQQ', '2030-01-18', max_age=3600) is None
+        store.close()
+
+        # Reinício a quente: outro processo abre o mesmo arquivo
+        reopened = SnapshotStore(os.path.join(tmp, 'snap.sqlite'))
+        calls, _ = reopened.load('chain', 'SPY', '2030-01-18', max_age=30)
+        assert calls['lastPrice'].iloc[0] == 3.0
+        reopened.close()
+
+
+def test_read_through_fetches_once():
+    store = SnapshotStore(':memory:')
+    fetched = []
+
+    def fetch():
+        fetched.append(1)
+        return 452.31
+
+    assert store.read_through('price', 'SPY', 'last', 60, fetch) == 452.31
+    assert store.read_through('price', 'SPY', 'last', 60, fetch) == 452.31
+    assert len(fetched) == 1
+
+    # Resultados vazios não são gravados
+    empty = (pd.DataFrame(), pd.DataFrame())
+    store.read_through('chain', 'SPY', 'x', 60, lambda: empty,
+                       should_store=lambda chain: not chain[0].empty)
+    assert store.load('chain', 'SPY', 'x', 60) is None
+
+
+def test_prune_and_closed_market_ttl():
+    store = SnapshotStore(':memory:', retention_seconds=60)
+    now = time.time()
+    store.save('price', 'SPY', 'last', 1.0, snapshot_ts=now - 120)
+    store.prune(now)
+    assert store.load('price', 'SPY', 'last', max_age=3600, now=now) is None
+
+    eastern = pytz.timezone('US/Eastern')
+    session = eastern.localize(datetime(2030, 1, 16, 11, 0))   # quarta-feira
+    evening = eastern.localize(datetime(2030, 1, 16, 20, 0))
+    weekend = eastern.localize(datetime(2030, 1, 19, 11, 0))   # sábado
+    assert market_is_open(session)
+    assert not market_is_open(evening)
+    assert not market_is_open(weekend)
+    assert snapshot_ttl(10, session) == 10
+    assert snapshot_ttl(10, evening) == CLOSED_MARKET_TTL_SECONDS
+
+
+if __name__ == "__main__":
+    test_save_and_load_latest_under_ttl()
+    test_read_through_fetches_once()
+    test_prune_and_closed_market_ttl()
+    print("OK")
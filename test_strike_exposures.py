@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE TABELA DE EXPOSIÇÕES POR STRIKE
+=====================================
+
+Confere a agregação por strike (vários vencimentos no mesmo strike, strikes
+só de calls ou só de puts), as regras de net (GEX = call - put, demais =
+call + put, Absolute = lado dominante), o recorte por faixa de strikes com
+searchsorted contra a máscara booleana e o uso da tabela pelos setups
+(inclusive com vários vencimentos, em que os setups somam o GEX por strike).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from chart_utils import create_exposure_bar_chart
+from strike_exposures import (absolute_net, aggregate_by_strike, exposure_columns, side_values,
+                              strike_exposure_table, strike_window, strikes_above, strikes_below)
+from trading_setups import TradingSetupAnalyzer
+
+
+def _chain(strikes, seed):
+    rng = np.random.default_rng(seed)
+    n = len(strikes)
+    return pd.DataFrame({
+        'strike': strikes,
+        'GEX': rng.uniform(0, 5e4, n),
+        'DEX': rng.normal(0, 5e4, n),
+        'VEX': rng.normal(0, 5e4, n),
+        'openInterest': rng.integers(0, 1000, n),
+    })
+
+
+def _multi_expiry():
+    # Dois vencimentos; 102.5 só existe nas calls e 97.5 só nas puts
+    calls = pd.concat([_chain(np.arange(95.0, 106.0), 1), _chain(np.array([100.0, 102.5]), 2)])
+    puts = pd.concat([_chain(np.arange(95.0, 106.0), 3), _chain(np.array([97.5, 100.0]), 4)])
+    return calls, puts
+
+
+def test_aggregate_matches_groupby():
+    calls, puts = _multi_expiry()
+    assert exposure_columns(calls, puts) == ['GEX', 'DEX', 'VEX']
+
+    table = aggregate_by_strike(calls, puts)
+    assert table.index.is_monotonic_increasing and table.index.is_unique
+    for col in ['GEX', 'DEX', 'VEX']:
+        call_sums = calls.groupby('strike')[col].sum()
+        put_sums = puts.groupby('strike')[col].sum()
+        assert np.allclose(table[(col, 'call')].dropna(), call_sums)
+        assert np.allclose(table[(col, 'put')].dropna(), put_sums)
+
+    # Lado ausente fica NaN, mas o net existe
+    assert np.isnan(table.loc[102.5, ('GEX', 'put')])
+    assert np.isclose(table.loc[102.5, ('GEX', 'net')], table.loc[102.5, ('GEX', 'call')])
+    assert np.isclose(table.loc[97.5, ('GEX', 'net')], -table.loc[97.5, ('GEX', 'put')])
+    assert np.isclose(table.loc[100.0, ('DEX', 'net')],
+                      calls.loc[calls['strike'] == 100.0, 'DEX'].sum() + puts.loc[puts['strike'] == 100.0, 'DEX'].sum())
+
+
+def test_absolute_net_matches_loop():
+    calls, puts = _multi_expiry()
+    table = aggregate_by_strike(calls, puts, ['GEX'])
+    calls_gex = calls.groupby('strike')['GEX'].sum()
+    puts_gex = puts.groupby('strike')['GEX'].sum()
+    expected = {}
+    for strike in set(calls_gex.index) | set(puts_gex.index):
+        call_val = abs(calls_gex.get(strike, 0))
+        put_val = abs(puts_gex.get(strike, 0))
+        expected[strike] = call_val if call_val >= put_val else -put_val
+    net = absolute_net(table, 'GEX')
+    assert np.allclose(net.to_numpy(), pd.Series(expected).sort_index().to_numpy())
+
+
+def test_strike_slices_match_masks():
+    calls, puts = _multi_expiry()
+    table = aggregate_by_strike(calls, puts)
+    strikes = table.index
+    for low, high in [(97.5, 102.5), (96.2, 103.9), (90.0, 94.0), (110.0, 120.0), (100.0, 100.0)]:
+        assert strike_window(table, low, high).index.equals(strikes[(strikes >= low) & (strikes <= high)])
+    assert strikes_above(table, 100.0).index.equals(strikes[strikes > 100.0])
+    assert strikes_below(table, 100.0).index.equals(strikes[strikes < 100.0])
+    assert len(side_values(strikes_below(table, 98.0), 'GEX')) == 3 + 4
+
+    # Cadeias vazias: tabela vazia com as colunas esperadas
+    empty = aggregate_by_strike(pd.DataFrame(), pd.DataFrame(), ['GEX'])
+    assert empty.empty and strikes_above(empty, 100.0)[('GEX', 'call')].empty
+
+
+def test_chart_and_setups_share_table():
+    calls, puts = _multi_expiry()
+    table = aggregate_by_strike(calls, puts)
+    shared = create_exposure_bar_chart(calls, puts, 'GEX', 'GEX', 100.0, exposures=table,
+                                       strike_range_percentage=3.0)
+    alone = create_exposure_bar_chart(calls, puts, 'GEX', 'GEX', 100.0, strike_range_percentage=3.0)
+    assert shared.layout.title.text == alone.layout.title.text
+    net = [trace for trace in shared.data if trace.name == 'Net'][0]
+    assert list(net.x) == list(strike_window(table, 97.0, 103.0).index)
+
+    results = TradingSetupAnalyzer().analyze_all_setups(calls, puts, 100.2, {'vwap': 100.0},
+                                                        zero_gamma_level=99.0, exposures=table)
+    # Resistência: strike acima do preço com o maior GEX de calls somado entre vencimentos
+    expected = strikes_above(table, 100.2)[('GEX', 'call')].idxmax()
+    assert results['bullish_breakout'].details == f"Bullish breakout potential at {expected:.2f}"
+    assert not any(result.details.startswith("Error") for result in results.values())
+
+
+def test_setups_sum_gex_per_strike_across_expiries():
+    # Regressão: com vários vencimentos os setups leem o GEX somado por strike.
+    # 101: um contrato de 30k; 102: dois vencimentos de 20k (40k no total).
+    calls = pd.DataFrame({'strike': [101.0, 102.0, 102.0, 103.0], 'GEX': [30000.0, 20000.0, 20000.0, 5000.0]})
+    # 98 aparece em dois vencimentos: antes, strikes repetidos derrubavam os setups de baixa
+    puts = pd.DataFrame({'strike': [98.0, 98.0, 99.0], 'GEX': [15000.0, 15000.0, 25000.0]})
+    table = strike_exposure_table(calls, puts)
+    assert strike_exposure_table(calls, puts).equals(table)
+
+    results = TradingSetupAnalyzer().analyze_all_setups(calls, puts, 100.0, {'vwap': 100.0},
+                                                        zero_gamma_level=99.0, exposures=table)
+    # O maior contrato isolado está em 101, mas o maior GEX somado está em 102
+    assert results['bullish_breakout'].details == "Bullish breakout potential at 102.00"
+    assert results['pullback_top'].target_price == 102.0
+    # Abaixo do preço: 98 soma 30k e passa o 99 (25k)
+    assert results['pullback_bottom'].target_price == 98.0
+    assert not any(result.details.startswith("Error") for result in results.values())
+
+    # Sem tabela, o analisador monta a mesma agregação
+    alone = TradingSetupAnalyzer().analyze_all_setups(calls, puts, 100.0, {'vwap': 100.0}, zero_gamma_level=99.0)
+    assert {key: result.details for key, result in alone.items()} == \
+           {key: result.details for key, result in results.items()}
+
+
+if __name__ == "__main__":
+    test_aggregate_matches_groupby()
+    test_absolute_net_matches_loop()
+    test_strike_slices_match_masks()
+    test_chart_and_setups_share_table()
+    test_setups_sum_gex_per_strike_across_expiries()
+    print("OK")
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+TESTE REGISTRO DE TICKERS
+=========================
+
+Testa que o yf.Ticker e a lista de vencimentos são reaproveitados entre
+chamadas, renovados após o TTL e que listas vazias não ficam em cache.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+
+from ticker_registry import TickerRegistry
+
+
+class _FakeTicker:
+    created = []
+    downloads = []
+
+    def __init__(self, symbol):
+        self.ticker = symbol
+        _FakeTicker.created.append(symbol)
+
+    @property
+    def options(self):
+        _FakeTicker.downloads.append(self.ticker)
+        time.sleep(0.05)
+        return () if self.ticker == 'VAZIO' else ('2030-01-18', '2030-01-25')
+
+
+def test_reuses_ticker_and_expirations():
+    _FakeTicker.created.clear()
+    _FakeTicker.downloads.clear()
+    registry = TickerRegistry(expirations_ttl=3600, ticker_factory=_FakeTicker)
+
+    threads = [threading.Thread(target=registry.get_expirations, args=('SPY',)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.get_expirations('SPY') == ('2030-01-18', '2030-01-25')
+    assert registry.get_ticker('SPY') is registry.get_ticker('SPY')
+    assert _FakeTicker.created == ['SPY']
+    assert _FakeTicker.downloads == ['SPY']
+
+    registry.invalidate('SPY')
+    registry.get_expirations('SPY')
+    assert _FakeTicker.downloads == ['SPY', 'SPY']
+
+
+def test_ttl_and_empty_lists():
+    _FakeTicker.created.clear()
+    _FakeTicker.downloads.clear()
+    registry = TickerRegistry(expirations_ttl=0.1, ticker_factory=_FakeTicker)
+
+    registry.get_expirations('QQQ')
+    time.sleep(0.15)
+    registry.get_expirations('QQQ')
+    assert _FakeTicker.created == ['QQQ', 'QQQ']
+
+    # Falha transitória (lista vazia) é tentada de novo na próxima chamada
+    assert registry.get_expirations('VAZIO') == ()
+    assert registry.get_expirations('VAZIO') == ()
+    assert _FakeTicker.downloads.count('VAZIO') == 2
+
+
+if __name__ == "__main__":
+    test_reuses_ticker_and_expirations()
+    test_ttl_and_empty_lists()
+    print("OK")
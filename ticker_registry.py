@@ -0,0 +1,112 @@
+# ticker_registry.py
+# Registro de objetos yf.Ticker e das listas de vencimentos, compartilhado pelo processo.
+# A lista de vencimentos muda no máximo uma vez por dia, então tem TTL próprio (bem maior
+# que o refresh da página) e é renovada na virada do dia em Nova York.
+import threading
+import time
+from datetime import datetime
+
+import pytz
+import yfinance as yf
+
+from rate_limiter import call_upstream
+
+DEFAULT_EXPIRATIONS_TTL = 4 * 3600  # Segundos
+
+
+def _market_date(now=None):
+    eastern = pytz.timezone('US/Eastern')
+    return datetime.fromtimestamp(time.time() if now is None else now, tz=eastern).date()
+
+
+class TickerRegistry:
+    """Cache de yf.Ticker + vencimentos por símbolo, com TTL e virada de dia."""
+
+    def __init__(self, expirations_ttl=DEFAULT_EXPIRATIONS_TTL, ticker_factory=None):
+        self.expirations_ttl = expirations_ttl
+        self.ticker_factory = ticker_factory or yf.Ticker
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # symbol -> {'ticker', 'expirations', 'fetched_at', 'market_date'}
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _fresh(self, entry, now):
+        return (entry is not None
+                and now - entry['fetched_at'] <= self.expirations_ttl
+                and entry['market_date'] == _market_date(now))
+
+    def _entry(self, symbol, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if not self._fresh(entry, now):
+                # A new Ticker also drops yfinance's own expiration map for this symbol
+                entry = {
+                    'ticker': self.ticker_factory(symbol),
+                    'expirations': None,
+                    'fetched_at': now,
+                    'market_date': _market_date(now),
+                }
+                self._entries[symbol] = entry
+            return entry
+
+    def get_ticker(self, symbol):
+        """yf.Ticker compartilhado para `symbol`."""
+        return self._entry(symbol)['ticker']
+
+    def get_expirations(self, symbol):
+        """Tupla de vencimentos ('YYYY-MM-DD') de `symbol`."""
+        entry = self._entry(symbol)
+        if entry['expirations'] is not None:
+            self.hits += 1
+            return entry['expirations']
+        # One download per symbol even when several pages/threads ask at once
+        with self._symbol_lock(symbol):
+            if entry['expirations'] is not None:
+                self.hits += 1
+                return entry['expirations']
+            self.misses += 1
+            # Reading .options fills the Ticker's internal expiration map, so
+            # later option_chain(date) calls skip their own expirations request
+            expirations = tuple(call_upstream('yahoo', lambda: entry['ticker'].options) or ())
+            if expirations:
+                # Empty lists usually mean a transient failure; retry on the next call
+                entry['expirations'] = expirations
+            return expirations
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self):
+        with self._lock:
+            return {'symbols': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_ticker_registry():
+    """Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TickerRegistry()
+        return _registry
+
+
+def get_ticker(symbol):
+    return get_ticker_registry().get_ticker(symbol)
+
+
+def get_expirations(symbol):
+    return get_ticker_registry().get_expirations(symbol)
@@ -1,5 +1,6 @@
 from enum import Enum
-import pandas as pd
+from greeks_calculator import compute_gex_profile
+from strike_exposures import aggregate_by_strike, side_values, strikes_above, strikes_below
 
 class SetupType(Enum):
     BULLISH_BREAKOUT = "bullish_breakout"
@@ -26,37 +27,64 @@ class TradingSetupAnalyzer:
     def __init__(self):
         self.GEX_THRESHOLD = 10000
 
-    def analyze_all_setups(self, calls_df, puts_df, current_price, vwap_data):
-        """Analyze all possible setups and return results"""
+    def analyze_all_setups(self, calls_df, puts_df, current_price, vwap_data, zero_gamma_level=None, exposures=None):
+        """
+        Analyze all possible setups and return results.
+
+        Setups read GEX summed per strike (aggregate_by_strike), not per contract. With a
+        single expiry that is the same thing; with several expiries a strike's contracts are
+        added up, so levels are picked by their combined GEX, GEX thresholds see the sums and
+        averages are taken over strikes. Pass `exposures` (strike_exposure_table) to reuse
+        the table the charts already built for the same chains.
+        """
         results = {}
 
+        # Per-strike GEX table shared by every setup
+        if exposures is None:
+            exposures = aggregate_by_strike(calls_df, puts_df, ['GEX'])
+
+        # Gamma flip level: use the precomputed one if given, otherwise derive it from the chains
+        if zero_gamma_level is None:
+            zero_gamma_level = self.calculate_zero_gamma_level(calls_df, puts_df, current_price)
+
         # Analyze Bullish Breakout Setup
-        results['bullish_breakout'] = self._analyze_bullish_breakout(calls_df, puts_df, current_price, vwap_data)
+        results['bullish_breakout'] = self._analyze_bullish_breakout(exposures, current_price, vwap_data)
 
         # Analyze Bearish Breakout Setup
-        results['bearish_breakout'] = self._analyze_bearish_breakout(calls_df, puts_df, current_price, vwap_data)
+        results['bearish_breakout'] = self._analyze_bearish_breakout(exposures, current_price, vwap_data)
 
         # Analyze Pullback to Top Setup
-        results['pullback_top'] = self._analyze_pullback_top(calls_df, puts_df, current_price, vwap_data)
+        results['pullback_top'] = self._analyze_pullback_top(exposures, current_price, vwap_data)
 
         # Analyze Pullback to Bottom Setup
-        results['pullback_bottom'] = self._analyze_pullback_bottom(calls_df, puts_df, current_price, vwap_data)
+        results['pullback_bottom'] = self._analyze_pullback_bottom(exposures, current_price, vwap_data)
 
         # Analyze Consolidated Market Setup
-        results['consolidated_market'] = self._analyze_consolidated_market(calls_df, puts_df, current_price, vwap_data)
+        results['consolidated_market'] = self._analyze_consolidated_market(exposures, current_price, vwap_data, zero_gamma_level)
 
         # Analyze Gamma Negative Protection Setup
-        results['gamma_negative_protection'] = self._analyze_gamma_negative_protection(calls_df, puts_df, current_price, vwap_data)
+        results['gamma_negative_protection'] = self._analyze_gamma_negative_protection(exposures, current_price, vwap_data)
 
         return results
 
-    def _analyze_bullish_breakout(self, calls_df, puts_df, current_price, vwap_data):
+    def calculate_zero_gamma_level(self, calls_df, puts_df, current_price):
+        """Spot level where net dealer gamma flips sign, or None if it can't be found"""
+        try:
+            if calls_df.empty or puts_df.empty:
+                return None
+            _, zero_gamma = compute_gex_profile(calls_df, puts_df, current_price)
+            return zero_gamma
+        except Exception as e:
+            print(f"Error calculating zero gamma level: {str(e)}")
+            return None
+
+    def _analyze_bullish_breakout(self, exposures, current_price, vwap_data):
         """Analyze bullish breakout setup"""
         try:
             # Look for high gamma exposure above current price (potential resistance)
-            gex_above_price = calls_df[calls_df['strike'] > current_price] if not calls_df.empty else pd.DataFrame()
+            gex_above_price = strikes_above(exposures, current_price)[('GEX', 'call')].dropna()
             
-            if gex_above_price.empty or gex_above_price.empty:
+            if gex_above_price.empty:
                 return SetupResult(
                     SetupType.BULLISH_BREAKOUT,
                     False,
@@ -66,8 +94,8 @@ class TradingSetupAnalyzer:
                     "LOW"
                 )
             
-            max_gex_strike = gex_above_price.loc[gex_above_price['GEX'].idxmax(), 'strike']
-            max_gex_value = gex_above_price['GEX'].max()
+            max_gex_strike = gex_above_price.idxmax()
+            max_gex_value = gex_above_price.max()
             
             # Calculate confidence based on GEX value and distance from price
             distance_from_price = (max_gex_strike - current_price) / current_price
@@ -102,12 +130,11 @@ class TradingSetupAnalyzer:
                 "LOW"
             )
 
-    def _analyze_bearish_breakout(self, calls_df, puts_df, current_price, vwap_data):
+    def _analyze_bearish_breakout(self, exposures, current_price, vwap_data):
         """Analyze bearish breakout setup"""
         try:
             # Look for high gamma exposure below current price (potential support that could break)
-            all_gex = pd.concat([calls_df[['strike', 'GEX']], puts_df[['strike', 'GEX']]]) if not calls_df.empty and not puts_df.empty else pd.DataFrame()
-            gex_below_price = all_gex[all_gex['strike'] < current_price] if not all_gex.empty else pd.DataFrame()
+            gex_below_price = side_values(strikes_below(exposures, current_price), 'GEX')
             
             if gex_below_price.empty:
                 return SetupResult(
@@ -121,8 +148,8 @@ class TradingSetupAnalyzer:
             
             # Find the strike with the highest negative GEX (highest put gamma)
             if not gex_below_price.empty:
-                min_gex_strike = gex_below_price.loc[gex_below_price['GEX'].idxmin(), 'strike']
-                min_gex_value = gex_below_price['GEX'].min()
+                min_gex_strike = gex_below_price.idxmin()
+                min_gex_value = gex_below_price.min()
                 
                 # Calculate confidence
                 distance_from_price = (current_price - min_gex_strike) / current_price
@@ -164,11 +191,11 @@ class TradingSetupAnalyzer:
                 "LOW"
             )
 
-    def _analyze_pullback_top(self, calls_df, puts_df, current_price, vwap_data):
+    def _analyze_pullback_top(self, exposures, current_price, vwap_data):
         """Analyze pullback to top (resistance) setup"""
         try:
             # Look for resistance levels above price with high option gamma
-            gex_above_price = calls_df[calls_df['strike'] > current_price] if not calls_df.empty else pd.DataFrame()
+            gex_above_price = strikes_above(exposures, current_price)[('GEX', 'call')].dropna()
             if gex_above_price.empty:
                 return SetupResult(
                     SetupType.PULLBACK_TOP,
@@ -179,7 +206,7 @@ class TradingSetupAnalyzer:
                     "LOW"
                 )
             
-            max_gex_strike = gex_above_price.loc[gex_above_price['GEX'].idxmax(), 'strike']
+            max_gex_strike = gex_above_price.idxmax()
             
             # Check if price is approaching this level (pullback)
             distance_from_price = (max_gex_strike - current_price) / current_price
@@ -194,7 +221,7 @@ class TradingSetupAnalyzer:
                 )
             
             # Confidence based on proximity and GEX value
-            gex_value = gex_above_price['GEX'].max()
+            gex_value = gex_above_price.max()
             gex_confidence = min(40, (gex_value / self.GEX_THRESHOLD) * 40)
             proximity_confidence = max(10, 50 - (distance_from_price * 1000))
             
@@ -219,12 +246,11 @@ class TradingSetupAnalyzer:
                 "LOW"
             )
 
-    def _analyze_pullback_bottom(self, calls_df, puts_df, current_price, vwap_data):
+    def _analyze_pullback_bottom(self, exposures, current_price, vwap_data):
         """Analyze pullback to bottom (support) setup"""
         try:
             # Look for support levels below price with high option gamma
-            all_gex = pd.concat([calls_df[['strike', 'GEX']], puts_df[['strike', 'GEX']]]) if not calls_df.empty and not puts_df.empty else pd.DataFrame()
-            gex_below_price = all_gex[all_gex['strike'] < current_price] if not all_gex.empty else pd.DataFrame()
+            gex_below_price = side_values(strikes_below(exposures, current_price), 'GEX')
             if gex_below_price.empty:
                 return SetupResult(
                     SetupType.PULLBACK_BOTTOM,
@@ -235,7 +261,7 @@ class TradingSetupAnalyzer:
                     "LOW"
                 )
             
-            max_gex_strike = gex_below_price.loc[gex_below_price['GEX'].idxmax(), 'strike'] if not gex_below_price.empty else 0
+            max_gex_strike = gex_below_price.idxmax() if not gex_below_price.empty else 0
             
             if max_gex_strike == 0:
                 return SetupResult(
@@ -260,7 +286,7 @@ class TradingSetupAnalyzer:
                 )
             
             # Confidence based on proximity and GEX value
-            gex_value = gex_below_price['GEX'].max()
+            gex_value = gex_below_price.max()
             gex_confidence = min(40, (gex_value / self.GEX_THRESHOLD) * 40)
             proximity_confidence = max(10, 50 - (distance_from_price * 1000))
             
@@ -285,15 +311,15 @@ class TradingSetupAnalyzer:
                 "LOW"
             )
 
-    def _analyze_consolidated_market(self, calls_df, puts_df, current_price, vwap_data):
+    def _analyze_consolidated_market(self, exposures, current_price, vwap_data, zero_gamma_level=None):
         """Analyze consolidated/ranging market setup"""
         try:
             # Look for balanced GEX above and below price, indicating possible range
-            gex_above = calls_df[calls_df['strike'] > current_price] if not calls_df.empty else pd.DataFrame()
-            gex_below = pd.concat([calls_df[calls_df['strike'] < current_price], puts_df[puts_df['strike'] < current_price]]) if (not calls_df.empty or not puts_df.empty) else pd.DataFrame()
+            gex_above = strikes_above(exposures, current_price)[('GEX', 'call')].dropna()
+            gex_below = side_values(strikes_below(exposures, current_price), 'GEX')
             
-            avg_gex_above = gex_above['GEX'].mean() if not gex_above.empty else 0
-            avg_gex_below = gex_below['GEX'].mean() if not gex_below.empty else 0
+            avg_gex_above = gex_above.mean() if not gex_above.empty else 0
+            avg_gex_below = gex_below.mean() if not gex_below.empty else 0
             
             # Check if GEX is relatively balanced (indicating possible consolidation)
             gex_balance = abs(avg_gex_above - avg_gex_below) / max(avg_gex_above + avg_gex_below, 1)
@@ -305,8 +331,14 @@ class TradingSetupAnalyzer:
             
             balance_confidence = max(0, (1 - gex_balance) * 50)
             vwap_confidence = vwap_proximity * 30
+
+            # Dealer gamma regime: above the zero gamma level dealers are long gamma and damp moves,
+            # below it they are short gamma and amplify them
+            regime_confidence = 0
+            if zero_gamma_level is not None:
+                regime_confidence = 20 if current_price > zero_gamma_level else -20
             
-            total_confidence = min(100, balance_confidence + vwap_confidence)
+            total_confidence = min(100, max(0, balance_confidence + vwap_confidence + regime_confidence))
             active = total_confidence >= 40
             
             # For ranging market, target could be mean reversion to VWAP
@@ -332,11 +364,11 @@ class TradingSetupAnalyzer:
                 "LOW"
             )
 
-    def _analyze_gamma_negative_protection(self, calls_df, puts_df, current_price, vwap_data):
+    def _analyze_gamma_negative_protection(self, exposures, current_price, vwap_data):
         """Analyze gamma negative protection setup"""
         try:
             # Look for high put gamma (negative GEX) that could provide protection
-            puts_gex = puts_df[puts_df['strike'] < current_price] if not puts_df.empty else pd.DataFrame()  # Puts below price
+            puts_gex = strikes_below(exposures, current_price)[('GEX', 'put')].dropna()  # Puts below price
             if puts_gex.empty:
                 return SetupResult(
                     SetupType.GAMMA_NEGATIVE_PROTECTION,
@@ -349,8 +381,8 @@ class TradingSetupAnalyzer:
             
             # Find the strike with highest put gamma (most negative GEX)
             if not puts_gex.empty:
-                min_gex_strike = puts_gex.loc[puts_gex['GEX'].idxmin(), 'strike']
-                min_gex_value = puts_gex['GEX'].min()
+                min_gex_strike = puts_gex.idxmin()
+                min_gex_value = puts_gex.min()
                 
                 # Calculate confidence based on gamma value and distance from price
                 distance_from_price = (current_price - min_gex_strike) / current_price